@@ -0,0 +1,321 @@
+"""
+Endpoint benchmark suite with regression thresholds.
+
+Starts benchmarks/upstream_simulator.py and python_backend (uvicorn, real HTTP)
+against it, then measures every scenario in three phases:
+
+    cold        first request for each distinct key (empty caches, upstream I/O)
+    warm        the same requests again, sequentially (served from cache)
+    concurrent  warm requests from --concurrency client threads (throughput)
+
+For each phase it records p50/p95/p99 latency and the number of upstream calls
+the simulator served; warm and concurrent phases are repeated --rounds times and
+the median is kept. Results are compared with a JSON baseline; the run exits
+non-zero when p50/p95 latency (cold, warm), throughput (concurrent) or upstream
+call counts regress beyond the tolerances. p99 is reported but not gated - on a
+small runner it is mostly scheduler noise; upstream call counts are exact.
+
+Scenarios run in order against one backend, so later scenarios see the caches
+earlier ones filled (stock-overview after fundamentals), as a real session would.
+Compare runs made with the same settings on the same machine.
+
+/api/price-changes and /api/peer-comparison fetch through yfinance, which talks
+to Yahoo directly and cannot be pointed at the simulator - they only run with
+--include-live.
+
+Usage:
+    python benchmarks/endpoint_suite.py                    # compare with benchmarks/baselines/endpoints.json
+    python benchmarks/endpoint_suite.py --save-baseline    # record a new baseline
+    python benchmarks/endpoint_suite.py --only search fundamentals --tolerance 0.5
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from threading import local
+
+import requests
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "endpoints.json"
+
+SYMBOLS = ["AAPL", "MSFT", "NVDA", "AMZN", "GOOGL", "META", "TSLA", "JPM"]
+SEARCH_QUERIES = ["AP", "MICRO", "NV", "AMA", "ALPH", "TES", "JP", "WAL"]
+HEATMAP_SYMBOL_SETS = [",".join(SYMBOLS[i:i + 4] + ["SAP.DE", "SIE.DE"]) for i in range(0, len(SYMBOLS), 4)]
+
+# name -> (paths, needs a heatmap session, goes to live Yahoo through yfinance)
+SCENARIOS = {
+    "fundamentals": ([f"/api/fundamentals/{s}" for s in SYMBOLS], False, False),
+    "stock-overview": ([f"/api/stock-overview/{s}" for s in SYMBOLS], False, False),
+    "search": ([f"/api/search?q={q}" for q in SEARCH_QUERIES], False, False),
+    "heatmap-quotes": ([f"/api/heatmap-quotes?symbols={s}" for s in HEATMAP_SYMBOL_SETS], True, False),
+    "market-cap": ([f"/api/market-cap?symbols={s}" for s in HEATMAP_SYMBOL_SETS], True, False),
+    "dax-heatmap": (["/api/dax-heatmap"], False, False),
+    "sp500-heatmap": (["/api/sp500-heatmap"], False, False),
+    "nasdaq100-heatmap": (["/api/nasdaq100-heatmap"], False, False),
+    "nikkei225-heatmap": (["/api/nikkei225-heatmap"], False, False),
+    "hangseng-heatmap": (["/api/hangseng-heatmap"], False, False),
+    "price-changes": ([f"/api/price-changes/{s}" for s in SYMBOLS], False, True),
+    "peer-comparison": ([f"/api/peer-comparison/{s}" for s in SYMBOLS], False, True),
+}
+
+# Backend settings for a reproducible run: no limits that the load itself would trip,
+# no background jobs adding upstream calls of their own
+BACKEND_ENV = {
+    "FINNHUB_API_KEY": "benchmark",
+    "GOOGLE_API_KEY": "benchmark",
+    "ENVIRONMENT": "development",
+    "LOG_LEVEL": "WARNING",
+    "RATE_LIMIT_REQUESTS": "1000000",
+    "SESSION_DURATION": "86400",
+    "FINNHUB_RATE_LIMIT_PER_MINUTE": "1000000",
+    "AVAILABILITY_BATCH_SIZE": "0",
+    "USE_YFINANCE_EXTRAS": "False",
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(url: str, process: subprocess.Popen, timeout: float = 60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"{url} exited with code {process.returncode} during startup")
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise SystemExit(f"{url} did not come up within {timeout:.0f}s")
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    rank = max(1, round(pct / 100 * len(ordered) + 0.5 - 1e-9))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(latencies: list, statuses: list, upstream_calls: int, elapsed: float) -> dict:
+    return {
+        "requests": len(latencies),
+        "errors": sum(1 for status in statuses if status >= 400),
+        "p50Ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95Ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99Ms": round(percentile(latencies, 99) * 1000, 2),
+        "throughputRps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "upstreamCalls": upstream_calls,
+        "upstreamCallsPerRequest": round(upstream_calls / len(latencies), 2),
+    }
+
+
+class Suite:
+    def __init__(self, backend_url: str, simulator_url: str, args):
+        self.backend_url = backend_url
+        self.simulator_url = simulator_url
+        self.args = args
+        self._local = local()
+
+    def session(self) -> requests.Session:
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+            self._local.session.headers["Accept-Encoding"] = "gzip"
+        return self._local.session
+
+    def upstream_total(self) -> int:
+        stats = requests.get(f"{self.simulator_url}/_sim/stats", timeout=5).json()
+        # Injected faults are counted twice (route + fault), only count routes
+        return sum(count for key, count in stats.items() if not key.endswith((" 429", " 5xx")))
+
+    def wait_for_quiet_upstream(self, quiet_seconds: float = 1.5, timeout: float = 120):
+        """Let startup jobs (symbol index download) finish so they don't count against a scenario."""
+        deadline = time.time() + timeout
+        last, last_change = self.upstream_total(), time.time()
+        while time.time() < deadline:
+            time.sleep(0.25)
+            current = self.upstream_total()
+            if current != last:
+                last, last_change = current, time.time()
+            elif time.time() - last_change >= quiet_seconds:
+                return
+
+    def get(self, path: str):
+        started = time.perf_counter()
+        response = self.session().get(self.backend_url + path, timeout=120)
+        return time.perf_counter() - started, response.status_code
+
+    def phase(self, paths: list, requests_total: int, concurrency: int = 1) -> dict:
+        work = [paths[i % len(paths)] for i in range(requests_total)]
+        before = self.upstream_total()
+        started = time.perf_counter()
+        if concurrency == 1:
+            results = [self.get(path) for path in work]
+        else:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                results = list(pool.map(self.get, work))
+        elapsed = time.perf_counter() - started
+        return summarize([r[0] for r in results], [r[1] for r in results], self.upstream_total() - before, elapsed)
+
+    def median_phase(self, paths: list, requests_total: int, concurrency: int = 1) -> dict:
+        rounds = [self.phase(paths, requests_total, concurrency) for _ in range(self.args.rounds)]
+        return {key: statistics.median(r[key] for r in rounds) if key != "errors" else max(r[key] for r in rounds)
+                for key in rounds[0]}
+
+    def run_scenario(self, name: str) -> dict:
+        paths, needs_session, _ = SCENARIOS[name]
+        if needs_session:
+            self.session().post(self.backend_url + "/api/session-start", timeout=10)
+        return {
+            "cold": self.phase(paths, len(paths)),
+            "warm": self.median_phase(paths, self.args.warm_requests),
+            "concurrent": self.median_phase(paths, self.args.concurrent_requests, self.args.concurrency),
+        }
+
+
+def compare(results: dict, baseline: dict, args) -> list:
+    """Regressions as human-readable strings (empty when everything is within tolerance)."""
+    regressions = []
+    for name, phases in results.items():
+        for phase, current in phases.items():
+            previous = baseline.get("results", {}).get(name, {}).get(phase)
+            if not previous:
+                continue
+            label = f"{name}/{phase}"
+            # Closed-loop concurrent latency is just concurrency / throughput - gate throughput instead
+            for key in (("p50Ms", "p95Ms") if phase != "concurrent" else ()):
+                limit = previous[key] * (1 + args.tolerance)
+                if current[key] > limit and current[key] - previous[key] > args.min_delta_ms:
+                    regressions.append(f"{label}: {key} {current[key]:.1f} > {previous[key]:.1f} (+{args.tolerance:.0%})")
+            if phase == "concurrent" and previous.get("throughputRps"):
+                floor = previous["throughputRps"] * (1 - args.tolerance)
+                if current["throughputRps"] < floor:
+                    regressions.append(f"{label}: throughput {current['throughputRps']:.1f} rps < {floor:.1f}")
+            if current["upstreamCallsPerRequest"] > previous["upstreamCallsPerRequest"] + args.call_tolerance:
+                regressions.append(
+                    f"{label}: upstream calls/request {current['upstreamCallsPerRequest']} > {previous['upstreamCallsPerRequest']}"
+                )
+            if current["errors"] > previous.get("errors", 0):
+                regressions.append(f"{label}: {current['errors']} error responses (baseline {previous.get('errors', 0)})")
+    return regressions
+
+
+def print_table(results: dict):
+    print(f"\n{'scenario':<20}{'phase':<12}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rps':>10}{'upstream/req':>14}{'errors':>8}")
+    for name, phases in results.items():
+        for phase, r in phases.items():
+            print(f"{name:<20}{phase:<12}{r['requests']:>6}{r['p50Ms']:>10.1f}{r['p95Ms']:>10.1f}{r['p99Ms']:>10.1f}"
+                  f"{r['throughputRps'] or 0:>10.1f}{r['upstreamCallsPerRequest']:>14.2f}{r['errors']:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=sorted(SCENARIOS), help="Run only these scenarios")
+    parser.add_argument("--include-live", action="store_true", help="Also run the yfinance scenarios (live Yahoo traffic)")
+    parser.add_argument("--warm-requests", type=int, default=100, help="Sequential warm requests per scenario (default: 100)")
+    parser.add_argument("--concurrent-requests", type=int, default=400, help="Warm requests in the concurrent phase (default: 400)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Client threads in the concurrent phase (default: 16)")
+    parser.add_argument("--rounds", type=int, default=3, help="Repetitions of the warm and concurrent phases, median is kept (default: 3)")
+    parser.add_argument("--upstream-latency-ms", type=float, default=20, help="Simulated upstream latency (default: 20)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help=f"Baseline file (default: {DEFAULT_BASELINE.relative_to(ROOT)})")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed relative latency/throughput regression (default: 0.5)")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="Ignore latency regressions smaller than this (default: 5)")
+    parser.add_argument("--call-tolerance", type=float, default=0.0, help="Allowed extra upstream calls per request (default: 0)")
+    parser.add_argument("--output", type=Path, help="Also write this run's results to a JSON file")
+    args = parser.parse_args()
+
+    names = args.only or [name for name, (_, _, live) in SCENARIOS.items() if args.include_live or not live]
+    simulator_port, backend_port = free_port(), free_port()
+    simulator_url, backend_url = f"http://127.0.0.1:{simulator_port}", f"http://127.0.0.1:{backend_port}"
+
+    with tempfile.TemporaryDirectory(prefix="dashboard-bench-") as state_dir:
+        env = dict(os.environ, **BACKEND_ENV)
+        env.update({
+            "UPSTREAM_SIMULATOR_URL": simulator_url,
+            # Fresh on-disk caches, so "cold" really is cold
+            "AI_CACHE_PATH": str(Path(state_dir) / "ai_cache.sqlite3"),
+            "SYMBOL_INDEX_PATH": str(Path(state_dir) / "symbol_index.bin"),
+        })
+        simulator = subprocess.Popen(
+            [sys.executable, str(ROOT / "benchmarks" / "upstream_simulator.py"), "--port", str(simulator_port),
+             "--latency-ms", str(args.upstream_latency_ms), "--jitter-ms", "0", "--service-latency", f"gemini={args.upstream_latency_ms}"],
+            cwd=ROOT, env=env,
+        )
+        backend = None
+        try:
+            wait_until_up(f"{simulator_url}/_sim/config", simulator)
+            backend = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "python_backend:app", "--port", str(backend_port), "--log-level", "warning"],
+                cwd=ROOT, env=env, stdout=subprocess.DEVNULL,
+            )
+            wait_until_up(f"{backend_url}/api/health", backend)
+
+            suite = Suite(backend_url, simulator_url, args)
+            suite.wait_for_quiet_upstream()
+            results = {}
+            for name in names:
+                print(f"[Bench] {name}...", file=sys.stderr)
+                results[name] = suite.run_scenario(name)
+        finally:
+            for process in (backend, simulator):
+                if process is not None:
+                    process.terminate()
+                    process.wait(timeout=10)
+
+    print_table(results)
+    report = {
+        "recordedAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "settings": {
+            "upstreamLatencyMs": args.upstream_latency_ms,
+            "warmRequests": args.warm_requests,
+            "concurrentRequests": args.concurrent_requests,
+            "concurrency": args.concurrency,
+            "rounds": args.rounds,
+        },
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.save_baseline:
+        # --only refreshes just those scenarios in an existing baseline
+        previous = json.loads(args.baseline.read_text())["results"] if args.baseline.exists() and args.only else {}
+        baseline = dict(report, results={**previous, **results})
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline} - run with --save-baseline first")
+        return 0
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("settings") != report["settings"]:
+        print("\nWarning: baseline was recorded with different settings, comparison may be meaningless")
+    regressions = compare(results, baseline, args)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
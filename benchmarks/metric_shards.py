@@ -0,0 +1,78 @@
+"""
+Regression check: metric shards must not accumulate with short-lived threads.
+
+Counters and histograms keep one shard per writing thread. Several endpoints
+build a ThreadPoolExecutor per call, so every request starts (and ends) new
+threads; their shards have to be folded into the metric's retired total when
+the threads exit. This sends repeated /api/check-data requests (one executor
+per request, upstream calls refused by a closed local port, so it runs offline)
+and checks that the total shard count stays flat and no counts are lost.
+
+Usage:
+    python benchmarks/metric_shards.py [--requests 300]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+STATE_DIR = tempfile.mkdtemp(prefix="metric-shards-")
+os.environ.setdefault("FINNHUB_API_KEY", "benchmark")
+# Port 9 (discard) is closed on any normal host - upstream calls fail immediately
+os.environ.setdefault("UPSTREAM_SIMULATOR_URL", "http://127.0.0.1:9")
+os.environ.setdefault("AVAILABILITY_BATCH_SIZE", "0")
+os.environ.setdefault("RATE_LIMIT_PER_MINUTE", "1000000")
+os.environ.setdefault("AI_CACHE_PATH", os.path.join(STATE_DIR, "ai_cache.db"))
+os.environ.setdefault("SYMBOL_INDEX_PATH", os.path.join(STATE_DIR, "symbol_index.bin"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.testclient import TestClient
+
+import python_backend as backend
+
+
+def shard_count() -> int:
+    return sum(len(metric._shards) for metric in backend.metrics_registry if isinstance(metric, backend.ShardedMetric))
+
+
+def upstream_total() -> int:
+    return sum(backend.upstream_requests_total.totals().values())
+
+
+def main(request_count: int) -> int:
+    with TestClient(backend.app) as client:
+        # Warm-up: the event loop and anyio worker threads create their (long-lived) shards
+        for i in range(20):
+            client.get(f"/api/check-data?symbols=WARM{i}")
+        gc.collect()
+        baseline_shards, baseline_upstream = shard_count(), upstream_total()
+
+        for i in range(request_count):
+            client.get(f"/api/check-data?symbols=SHARD{i}")
+        gc.collect()
+        shards, upstream = shard_count(), upstream_total()
+
+    print(f"shards after warm-up: {baseline_shards}, after {request_count} requests: {shards}")
+    print(f"upstream calls counted during the run: {upstream - baseline_upstream}")
+
+    failed = False
+    # Live threads may hold a few shards at any moment; growth with the request count is the bug
+    if shards > baseline_shards + 10:
+        print("FAIL: shard count grows with requests (shards of exited threads are not retired)")
+        failed = True
+    if upstream - baseline_upstream < request_count:
+        print("FAIL: counts written by exited threads went missing")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300, help="Requests to send (default: 300)")
+    args = parser.parse_args()
+    sys.exit(main(args.requests))
@@ -0,0 +1,140 @@
+"""
+Microbenchmark: per-request cost of the response middleware.
+
+Compares the former stack of three @app.middleware("http") layers
+(error handling, security headers, X-Session-Remaining) with the single
+pure-ASGI ResponseHeadersMiddleware now used by python_backend.
+
+Requests are driven straight through the ASGI interface (no sockets, no
+HTTP client), so the difference between the two runs is middleware
+overhead only.
+
+Usage:
+    python benchmarks/middleware_overhead.py [--requests 20000] [--rounds 5]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("FINNHUB_API_KEY", "benchmark")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi import FastAPI, HTTPException, Request
+
+import python_backend as backend
+
+
+def build_app(legacy: bool) -> FastAPI:
+    """Minimal app with one JSON endpoint, wrapped in the old or the new middleware."""
+    app = FastAPI(default_response_class=backend.FastJSONResponse)
+
+    @app.get("/api/bench")
+    async def bench():
+        return {"status": "ok"}
+
+    if not legacy:
+        app.add_middleware(backend.ResponseHeadersMiddleware)
+        return app
+
+    # The three layers as they were before they were merged
+    @app.middleware("http")
+    async def error_handling_middleware(request: Request, call_next):
+        try:
+            return await call_next(request)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+    @app.middleware("http")
+    async def add_security_headers(request: Request, call_next):
+        response = await call_next(request)
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["X-XSS-Protection"] = "1; mode=block"
+        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+        return response
+
+    @app.middleware("http")
+    async def add_session_remaining_header(request: Request, call_next):
+        response = await call_next(request)
+        if 200 <= response.status_code < 300 and request.url.path.startswith("/api/"):
+            entry = backend.session_rate_limit_cache.get(backend.get_remote_address(request))
+            now = time.time()
+            if entry and entry.get('session_end') and now < entry['session_end']:
+                response.headers["X-Session-Remaining"] = str(int(entry['session_end'] - now))
+            else:
+                response.headers["X-Session-Remaining"] = "0"
+        return response
+
+    return app
+
+
+async def run_requests(app, count: int) -> float:
+    """Send `count` GET /api/bench requests through the ASGI app, return seconds elapsed."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/bench",
+        "raw_path": b"/api/bench",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"localhost"), (b"x-forwarded-for", b"203.0.113.7")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 3001),
+    }
+
+    start = time.perf_counter()
+    for _ in range(count):
+        request_sent = False
+        response_complete = asyncio.Event()
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # Like uvicorn: nothing more until the response is complete, then a disconnect
+            await response_complete.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_complete.set()
+
+        await app(dict(scope), receive, send)
+    return time.perf_counter() - start
+
+
+async def main(requests_per_round: int, rounds: int):
+    # An active session, so the session header path does its full lookup
+    backend.session_rate_limit_cache["203.0.113.7"] = {"session_end": time.time() + 900}
+
+    results = {}
+    for label, legacy in (("3x @app.middleware", True), ("ResponseHeadersMiddleware", False)):
+        app = build_app(legacy)
+        await run_requests(app, 500)  # Warm-up (route compilation, middleware stack build)
+        timings = [await run_requests(app, requests_per_round) for _ in range(rounds)]
+        results[label] = statistics.median(timings) / requests_per_round * 1e6
+
+    print(f"{'middleware':<28}{'us/request':>12}")
+    for label, per_request in results.items():
+        print(f"{label:<28}{per_request:>12.1f}")
+    legacy_us, new_us = results.values()
+    print(f"\nSaved {legacy_us - new_us:.1f} us per request ({(1 - new_us / legacy_us) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000, help="Requests per round (default: 20000)")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds per variant, median is reported (default: 5)")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.rounds))
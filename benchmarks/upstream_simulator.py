@@ -0,0 +1,790 @@
+"""
+Offline stand-in for the third-party APIs python_backend talks to.
+
+Serves the exact upstream paths the backend uses, with payloads shaped like
+the real responses:
+
+    Finnhub      /api/v1/quote, /stock/metric, /stock/profile2, /company-news,
+                 /search, /stock/symbol, /stock/recommendation, /stock/price-target,
+                 /calendar/earnings, /stock/earnings, /stock/insider-transactions,
+                 /stock/social-sentiment, /stock/financials (403, like the free plan)
+    Yahoo        /v7/finance/quote, /v8/finance/chart/{symbol}
+    Google News  /rss/search
+    Gemini       /v1beta/models/{model}:generateContent and :streamGenerateContent
+
+Data is generated deterministically from the symbol, so runs are reproducible;
+quotes drift slowly with the wall clock. Symbols starting with "ZZZ" behave like
+unknown tickers (empty payloads). Latency, 5xx errors and 429s are injected per
+service and can be changed at runtime via PUT /_sim/config.
+
+Usage:
+    python benchmarks/upstream_simulator.py [--port 8900] [--latency-ms 80] [--jitter-ms 30]
+        [--error-rate 0.01] [--rate-limit-rate 0.02] [--service-latency gemini=1500]
+
+    # then start the backend against it
+    UPSTREAM_SIMULATOR_URL=http://127.0.0.1:8900 FINNHUB_API_KEY=sim GOOGLE_API_KEY=sim python python_backend.py
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import zlib
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+
+import uvicorn
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+
+SERVICES = ("finnhub", "yahoo", "news", "gemini")
+
+# Injection settings per service; replaced from the command line and PUT /_sim/config
+config = {
+    service: {"latency_ms": 80.0, "jitter_ms": 30.0, "error_rate": 0.0, "rate_limit_rate": 0.0}
+    for service in SERVICES
+}
+config["gemini"]["latency_ms"] = 1200.0
+config["gemini"]["jitter_ms"] = 400.0
+config["symbols_per_exchange"] = 3000
+
+stats = Counter()
+
+app = FastAPI(title="Upstream simulator")
+
+
+# ===========================================
+# Deterministic data
+# ===========================================
+
+WELL_KNOWN = [
+    ("AAPL", "Apple Inc", "Technology"), ("MSFT", "Microsoft Corp", "Technology"),
+    ("NVDA", "NVIDIA Corp", "Semiconductors"), ("AMZN", "Amazon.com Inc", "Retail"),
+    ("GOOGL", "Alphabet Inc", "Media"), ("META", "Meta Platforms Inc", "Media"),
+    ("TSLA", "Tesla Inc", "Automobiles"), ("BRK.B", "Berkshire Hathaway Inc", "Financial Services"),
+    ("JPM", "JPMorgan Chase & Co", "Banking"), ("V", "Visa Inc", "Financial Services"),
+    ("JNJ", "Johnson & Johnson", "Pharmaceuticals"), ("WMT", "Walmart Inc", "Retail"),
+    ("XOM", "Exxon Mobil Corp", "Energy"), ("PG", "Procter & Gamble Co", "Consumer products"),
+    ("AMD", "Advanced Micro Devices Inc", "Semiconductors"), ("NFLX", "Netflix Inc", "Media"),
+    ("SAP.DE", "SAP SE", "Technology"), ("SIE.DE", "Siemens AG", "Industrial Conglomerates"),
+    ("BTC-USD", "Bitcoin USD", "Crypto"), ("ETH-USD", "Ethereum USD", "Crypto"),
+]
+NAME_PARTS = (
+    ["Apex", "Blue", "Cedar", "Delta", "Evergreen", "Frontier", "Granite", "Harbor", "Iron", "Juniper",
+     "Keystone", "Lumen", "Meridian", "Northern", "Orion", "Pioneer", "Quantum", "Redwood", "Summit", "Titan"],
+    ["Bio", "Data", "Energy", "Foods", "Health", "Logistics", "Materials", "Networks", "Pharma", "Systems"],
+    ["Inc", "Corp", "Holdings", "Group", "Ltd", "PLC", "SE", "AG"],
+)
+SECTORS = ["Technology", "Banking", "Pharmaceuticals", "Retail", "Energy", "Utilities", "Media",
+           "Semiconductors", "Insurance", "Industrial Conglomerates", "Real Estate", "Telecommunication"]
+EXCHANGE_SUFFIXES = {"US": "", "DE": ".DE", "L": ".L", "PA": ".PA", "T": ".T", "TO": ".TO", "HK": ".HK"}
+KNOWN = {symbol: (name, sector) for symbol, name, sector in WELL_KNOWN}
+
+
+def rng_for(*parts) -> random.Random:
+    """Stable per-symbol (and per-whatever) random source."""
+    return random.Random(zlib.crc32("|".join(str(part) for part in parts).encode("utf-8")))
+
+
+def is_unknown(symbol: str) -> bool:
+    return not symbol or symbol.upper().startswith("ZZZ")
+
+
+def company(symbol: str) -> dict:
+    symbol = symbol.upper()
+    rng = rng_for("company", symbol)
+    if symbol in KNOWN:
+        name, sector = KNOWN[symbol]
+    else:
+        name = " ".join(rng.choice(part) for part in NAME_PARTS)
+        sector = rng.choice(SECTORS)
+    base_price = round(math.exp(rng.uniform(math.log(3), math.log(900))), 2)
+    if symbol.endswith("-USD"):
+        base_price *= 50
+    shares = round(rng.uniform(20, 16000), 3)  # millions, as Finnhub reports them
+    return {
+        "symbol": symbol,
+        "name": name,
+        "sector": sector,
+        "base_price": base_price,
+        "shares": shares,
+        "phase": rng.uniform(0, 2 * math.pi),
+        "currency": "EUR" if symbol.endswith((".DE", ".PA")) else "USD",
+        "rng": rng,
+    }
+
+
+def price_at(info: dict, ts: float) -> float:
+    """Slow deterministic drift around the base price (a few percent per hour)."""
+    wave = 0.03 * math.sin(ts / 3600 + info["phase"]) + 0.01 * math.sin(ts / 300 + 2 * info["phase"])
+    return round(info["base_price"] * (1 + wave), 4)
+
+
+def previous_close(info: dict, now: float) -> float:
+    midnight = now - now % 86400
+    return round(price_at(info, midnight - 1), 4)
+
+
+def symbol_universe(exchange: str) -> list:
+    suffix = EXCHANGE_SUFFIXES.get(exchange, f".{exchange}")
+    items = [(s, n) for s, n, _ in WELL_KNOWN if (s.endswith(suffix) if suffix else "." not in s and "-" not in s)]
+    rng = rng_for("universe", exchange)
+    seen = {s for s, _ in items}
+    while len(items) < config["symbols_per_exchange"]:
+        ticker = "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXY") for _ in range(rng.randint(2, 4))) + suffix
+        if ticker in seen:
+            continue
+        seen.add(ticker)
+        items.append((ticker, company(ticker)["name"]))
+    return items
+
+
+_universe_cache = {}
+
+
+def universe(exchange: str) -> list:
+    key = (exchange, config["symbols_per_exchange"])
+    if key not in _universe_cache:
+        _universe_cache[key] = symbol_universe(exchange)
+    return _universe_cache[key]
+
+
+# ===========================================
+# Latency / fault injection
+# ===========================================
+
+ERROR_BODIES = {
+    "finnhub": (500, {"error": "Internal Server Error"}),
+    "yahoo": (502, "Bad Gateway\r\n"),
+    "news": (503, "<html><body>Service Unavailable</body></html>"),
+    "gemini": (500, {"error": {"code": 500, "message": "An internal error has occurred.", "status": "INTERNAL"}}),
+}
+RATE_LIMIT_BODIES = {
+    "finnhub": (429, {"error": "API limit reached. Please try again later. Remaining Limit: 0"}),
+    "yahoo": (429, "Too Many Requests\r\n"),
+    "news": (429, "<html><body>Too Many Requests</body></html>"),
+    "gemini": (429, {"error": {"code": 429, "message": "Resource has been exhausted (e.g. check quota).", "status": "RESOURCE_EXHAUSTED"}}),
+}
+
+
+def fault_response(status: int, body) -> Response:
+    if isinstance(body, dict):
+        return JSONResponse(body, status_code=status)
+    return PlainTextResponse(body, status_code=status)
+
+
+async def inject(service: str, route: str):
+    """Sleep for the configured latency, then maybe return an injected 429 / 5xx response."""
+    settings = config[service]
+    stats[f"{service} {route}"] += 1
+    delay = max(0.0, random.gauss(settings["latency_ms"], settings["jitter_ms"])) / 1000
+    if delay:
+        await asyncio.sleep(delay)
+    roll = random.random()
+    if roll < settings["rate_limit_rate"]:
+        stats[f"{service} 429"] += 1
+        return fault_response(*RATE_LIMIT_BODIES[service])
+    if roll < settings["rate_limit_rate"] + settings["error_rate"]:
+        stats[f"{service} 5xx"] += 1
+        return fault_response(*ERROR_BODIES[service])
+    return None
+
+
+def finnhub_auth(request: Request):
+    if not request.query_params.get("token"):
+        return JSONResponse({"error": "Invalid API key"}, status_code=401)
+    return None
+
+
+async def finnhub_guard(request: Request, route: str):
+    return finnhub_auth(request) or await inject("finnhub", route)
+
+
+# ===========================================
+# Finnhub
+# ===========================================
+
+@app.get("/api/v1/quote")
+async def finnhub_quote(request: Request, symbol: str = ""):
+    if (fault := await finnhub_guard(request, "quote")):
+        return fault
+    if is_unknown(symbol):
+        return {"c": 0, "d": None, "dp": None, "h": 0, "l": 0, "o": 0, "pc": 0, "t": 0}
+    info = company(symbol)
+    now = time.time()
+    price, prev = price_at(info, now), previous_close(info, now)
+    return {
+        "c": round(price, 2), "d": round(price - prev, 2), "dp": round((price - prev) / prev * 100, 4),
+        "h": round(max(price, prev) * 1.006, 2), "l": round(min(price, prev) * 0.994, 2),
+        "o": round(prev * 1.001, 2), "pc": round(prev, 2), "t": int(now),
+    }
+
+
+def series(rng: random.Random, years: int, start: float, growth: float, period: str) -> list:
+    """Finnhub series: [{"period": "2023-12-31", "v": 1.23}, ...], newest first."""
+    points, value = [], start
+    today = datetime.now(timezone.utc).date()
+    for i in range(years):
+        if period == "annual":
+            date = f"{today.year - 1 - i}-12-31"
+        else:
+            quarter_end = today.replace(day=1) - timedelta(days=1 + 91 * i)
+            date = quarter_end.isoformat()
+        points.append({"period": date, "v": round(value, 4)})
+        value /= 1 + growth + rng.uniform(-0.08, 0.08)
+    return points
+
+
+@app.get("/api/v1/stock/metric")
+async def finnhub_metric(request: Request, symbol: str = "", metric: str = "all"):
+    if (fault := await finnhub_guard(request, "stock/metric")):
+        return fault
+    if is_unknown(symbol):
+        return {"metric": {}, "metricType": metric, "series": {}, "symbol": symbol.upper()}
+    info = company(symbol)
+    rng = rng_for("metric", info["symbol"])
+    price = price_at(info, time.time())
+    eps = price / rng.uniform(8, 60)
+    revenue_per_share = eps * rng.uniform(3, 12)
+    book_value = price / rng.uniform(1, 15)
+    margin = eps / revenue_per_share * 100
+    growth = rng.uniform(-0.05, 0.25)
+    values = {
+        "marketCapitalization": round(price * info["shares"], 2),
+        "beta": round(rng.uniform(0.4, 2.2), 4),
+        "peTTM": round(price / eps, 4), "peExclExtraTTM": round(price / eps * 1.01, 4),
+        "peBasicExclExtraTTM": round(price / eps * 1.02, 4), "forwardPE": round(price / (eps * (1 + growth)), 4),
+        "pegTTM": round(price / eps / max(growth * 100, 1), 4),
+        "pb": round(price / book_value, 4), "pbAnnual": round(price / book_value * 1.03, 4),
+        "psTTM": round(price / revenue_per_share, 4), "psAnnual": round(price / revenue_per_share * 1.02, 4),
+        "pcfShareTTM": round(price / (eps * 1.3), 4), "pcfShareAnnual": round(price / (eps * 1.25), 4),
+        "pfcfShareTTM": round(price / (eps * 1.1), 4), "pfcfShareAnnual": round(price / (eps * 1.05), 4),
+        "evEbitdaTTM": round(rng.uniform(5, 40), 4), "evRevenueTTM": round(rng.uniform(0.5, 15), 4),
+        "epsTTM": round(eps, 4), "epsAnnual": round(eps * 0.95, 4),
+        "epsExclExtraItemsTTM": round(eps, 4), "epsExclExtraItemsAnnual": round(eps * 0.95, 4),
+        "epsGrowthTTMYoy": round(growth * 100, 4), "epsGrowth3Y": round(growth * 90, 4), "epsGrowth5Y": round(growth * 80, 4),
+        "revenueGrowthTTMYoy": round(growth * 80, 4), "revenueGrowth3Y": round(growth * 70, 4), "revenueGrowth5Y": round(growth * 60, 4),
+        "revenuePerShareTTM": round(revenue_per_share, 4), "revenuePerShareAnnual": round(revenue_per_share * 0.96, 4),
+        "bookValuePerShareAnnual": round(book_value, 4), "bookValuePerShareQuarterly": round(book_value * 1.01, 4),
+        "grossMarginTTM": round(margin * 2.5, 4), "grossMarginAnnual": round(margin * 2.4, 4),
+        "operatingMarginTTM": round(margin * 1.4, 4), "operatingMarginAnnual": round(margin * 1.35, 4),
+        "pretaxMarginTTM": round(margin * 1.25, 4), "pretaxMarginAnnual": round(margin * 1.2, 4),
+        "netProfitMarginTTM": round(margin, 4), "netProfitMarginAnnual": round(margin * 0.97, 4),
+        "roeTTM": round(rng.uniform(-5, 45), 4), "roaTTM": round(rng.uniform(-2, 20), 4), "roiTTM": round(rng.uniform(-3, 30), 4),
+        "52WeekHigh": round(price * rng.uniform(1.02, 1.4), 2), "52WeekLow": round(price * rng.uniform(0.6, 0.98), 2),
+        "10DayAverageTradingVolume": round(rng.uniform(0.2, 80), 4),
+        "sharesOutstanding": info["shares"],
+    }
+    if rng.random() < 0.6:
+        dividend = price * rng.uniform(0.005, 0.05)
+        values.update({
+            "dividendPerShareAnnual": round(dividend, 4), "dividendPerShareTTM": round(dividend, 4),
+            "currentDividendYieldTTM": round(dividend / price * 100, 4), "dividendYieldTTM": round(dividend / price * 100, 4),
+            "dividendYieldIndicatedAnnual": round(dividend / price * 100, 4),
+        })
+    return {
+        "metric": values,
+        "metricType": metric,
+        "series": {
+            period: {
+                "eps": series(rng, count, eps, growth, period),
+                "bookValue": series(rng, count, book_value, 0.04, period),
+                "revenuePerShare": series(rng, count, revenue_per_share, growth * 0.8, period),
+                "cashFlowPerShare": series(rng, count, eps * 1.3, growth, period),
+                "netMargin": series(rng, count, margin / 100, 0.0, period),
+                "pe": series(rng, count, price / eps, 0.0, period),
+            }
+            for period, count in (("annual", 10), ("quarterly", 20))
+        },
+        "symbol": info["symbol"],
+    }
+
+
+@app.get("/api/v1/stock/profile2")
+async def finnhub_profile(request: Request, symbol: str = ""):
+    if (fault := await finnhub_guard(request, "stock/profile2")):
+        return fault
+    if is_unknown(symbol):
+        return {}
+    info = company(symbol)
+    rng = info["rng"]
+    domain = info["name"].split()[0].lower().strip(".,&")
+    return {
+        "country": "DE" if info["currency"] == "EUR" else "US",
+        "currency": info["currency"],
+        "estimateCurrency": info["currency"],
+        "exchange": "XETRA" if info["symbol"].endswith(".DE") else rng.choice(["NASDAQ NMS - GLOBAL MARKET", "NEW YORK STOCK EXCHANGE, INC."]),
+        "finnhubIndustry": info["sector"],
+        "ipo": f"{rng.randint(1970, 2021)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "logo": f"https://static2.finnhub.io/file/publicdatany/finnhubimage/stock_logo/{info['symbol']}.png",
+        "marketCapitalization": round(price_at(info, time.time()) * info["shares"], 2),
+        "name": info["name"],
+        "phone": f"1{rng.randint(200, 999)}{rng.randint(1000000, 9999999)}",
+        "shareOutstanding": info["shares"],
+        "ticker": info["symbol"],
+        "weburl": f"https://www.{domain}.example.com/",
+    }
+
+
+@app.get("/api/v1/company-news")
+async def finnhub_company_news(request: Request, symbol: str = ""):
+    if (fault := await finnhub_guard(request, "company-news")):
+        return fault
+    if is_unknown(symbol):
+        return []
+    info = company(symbol)
+    now = int(time.time())
+    hour = now - now % 3600
+    items = []
+    for i in range(60):
+        rng = rng_for("news", info["symbol"], hour - i * 7200)
+        headline = rng.choice([
+            "{name} shares move after analyst update",
+            "{name} announces new product line",
+            "What to watch as {name} heads into earnings",
+            "{name} expands buyback program",
+            "Is {name} stock a buy right now?",
+        ]).format(name=info["name"])
+        items.append({
+            "category": "company",
+            "datetime": hour - i * 7200,
+            "headline": headline,
+            "id": zlib.crc32(f"{info['symbol']}{hour - i * 7200}".encode()),
+            "image": "",
+            "related": info["symbol"],
+            "source": rng.choice(["Yahoo", "MarketWatch", "SeekingAlpha", "Reuters"]),
+            "summary": f"{headline}. " + "Simulated article body for load testing. " * rng.randint(2, 8),
+            "url": f"https://news.example.com/{info['symbol'].lower()}/{hour - i * 7200}",
+        })
+    return items
+
+
+@app.get("/api/v1/search")
+async def finnhub_search(request: Request, q: str = ""):
+    if (fault := await finnhub_guard(request, "search")):
+        return fault
+    query = q.strip().upper()
+    results = []
+    if query:
+        for symbol, name in universe("US"):
+            if symbol.startswith(query) or query in name.upper():
+                results.append({"description": name.upper(), "displaySymbol": symbol, "symbol": symbol, "type": "Common Stock"})
+                if len(results) >= 30:
+                    break
+    return {"count": len(results), "result": results}
+
+
+@app.get("/api/v1/stock/symbol")
+async def finnhub_stock_symbol(request: Request, exchange: str = "US"):
+    if (fault := await finnhub_guard(request, "stock/symbol")):
+        return fault
+    return [
+        {
+            "currency": "EUR" if symbol.endswith((".DE", ".PA")) else "USD",
+            "description": name.upper(),
+            "displaySymbol": symbol,
+            "figi": f"BBG{zlib.crc32(symbol.encode()):09d}",
+            "mic": "XNAS" if exchange.upper() == "US" else f"X{exchange.upper()}",
+            "symbol": symbol,
+            "type": "ETP" if i % 17 == 0 else "Common Stock",
+        }
+        for i, (symbol, name) in enumerate(universe(exchange.upper()))
+    ]
+
+
+@app.get("/api/v1/stock/recommendation")
+async def finnhub_recommendation(request: Request, symbol: str = ""):
+    if (fault := await finnhub_guard(request, "stock/recommendation")):
+        return fault
+    if is_unknown(symbol):
+        return []
+    info = company(symbol)
+    rng = rng_for("recommendation", info["symbol"])
+    month = datetime.now(timezone.utc).date().replace(day=1)
+    trends = []
+    for i in range(4):
+        period = (month - timedelta(days=30 * i)).replace(day=1)
+        trends.append({
+            "buy": rng.randint(3, 25), "hold": rng.randint(2, 15), "sell": rng.randint(0, 4),
+            "strongBuy": rng.randint(0, 15), "strongSell": rng.randint(0, 2),
+            "period": period.isoformat(), "symbol": info["symbol"],
+        })
+    return trends
+
+
+@app.get("/api/v1/stock/price-target")
+async def finnhub_price_target(request: Request, symbol: str = ""):
+    if (fault := await finnhub_guard(request, "stock/price-target")):
+        return fault
+    if is_unknown(symbol):
+        return {}
+    info = company(symbol)
+    rng = rng_for("target", info["symbol"])
+    base = info["base_price"]
+    return {
+        "lastUpdated": (datetime.now(timezone.utc) - timedelta(days=rng.randint(0, 20))).strftime("%Y-%m-%d 00:00:00"),
+        "symbol": info["symbol"],
+        "targetHigh": round(base * rng.uniform(1.2, 1.6), 2),
+        "targetLow": round(base * rng.uniform(0.6, 0.9), 2),
+        "targetMean": round(base * rng.uniform(1.0, 1.2), 2),
+        "targetMedian": round(base * rng.uniform(1.0, 1.2), 2),
+    }
+
+
+def quarters(count: int):
+    """(year, quarter, period end) for the last `count` fiscal quarters."""
+    today = datetime.now(timezone.utc).date()
+    year, quarter = today.year, (today.month - 1) // 3
+    for _ in range(count):
+        if quarter == 0:
+            year, quarter = year - 1, 4
+        end_month = quarter * 3
+        end = (datetime(year + (end_month == 12), end_month % 12 + 1, 1) - timedelta(days=1)).date()
+        yield year, quarter, end
+        quarter -= 1
+
+
+@app.get("/api/v1/stock/earnings")
+async def finnhub_earnings_history(request: Request, symbol: str = ""):
+    if (fault := await finnhub_guard(request, "stock/earnings")):
+        return fault
+    if is_unknown(symbol):
+        return []
+    info = company(symbol)
+    rng = rng_for("earnings", info["symbol"])
+    eps = info["base_price"] / rng.uniform(30, 120)
+    history = []
+    for year, quarter, end in quarters(8):
+        estimate = round(eps * rng.uniform(0.9, 1.1), 4)
+        actual = round(estimate * rng.uniform(0.85, 1.2), 4)
+        history.append({
+            "actual": actual, "estimate": estimate, "period": end.isoformat(), "quarter": quarter, "year": year,
+            "surprise": round(actual - estimate, 4), "surprisePercent": round((actual - estimate) / abs(estimate) * 100, 4),
+            "symbol": info["symbol"],
+        })
+    return history
+
+
+@app.get("/api/v1/calendar/earnings")
+async def finnhub_earnings_calendar(request: Request, symbol: str = ""):
+    if (fault := await finnhub_guard(request, "calendar/earnings")):
+        return fault
+    if is_unknown(symbol):
+        return {"earningsCalendar": []}
+    info = company(symbol)
+    rng = rng_for("calendar", info["symbol"])
+    eps = info["base_price"] / rng.uniform(30, 120)
+    revenue = info["shares"] * 1e6 * eps * rng.uniform(4, 10)
+    upcoming = datetime.now(timezone.utc).date() + timedelta(days=rng.randint(5, 80))
+    calendar = [{
+        "date": upcoming.isoformat(), "epsActual": None, "epsEstimate": round(eps, 4), "hour": rng.choice(["bmo", "amc"]),
+        "quarter": (upcoming.month - 1) // 3 + 1, "revenueActual": None, "revenueEstimate": round(revenue),
+        "symbol": info["symbol"], "year": upcoming.year,
+    }]
+    for year, quarter, end in quarters(4):
+        report = end + timedelta(days=rng.randint(20, 40))
+        calendar.append({
+            "date": report.isoformat(), "epsActual": round(eps * rng.uniform(0.85, 1.2), 4), "epsEstimate": round(eps, 4),
+            "hour": rng.choice(["bmo", "amc"]), "quarter": quarter, "revenueActual": round(revenue * rng.uniform(0.9, 1.1)),
+            "revenueEstimate": round(revenue), "symbol": info["symbol"], "year": year,
+        })
+    return {"earningsCalendar": calendar}
+
+
+@app.get("/api/v1/stock/insider-transactions")
+async def finnhub_insider_transactions(request: Request, symbol: str = ""):
+    if (fault := await finnhub_guard(request, "stock/insider-transactions")):
+        return fault
+    if is_unknown(symbol):
+        return {"data": [], "symbol": symbol.upper()}
+    info = company(symbol)
+    rng = rng_for("insider", info["symbol"])
+    today = datetime.now(timezone.utc).date()
+    data = []
+    for i in range(25):
+        change = rng.randint(-50000, 20000)
+        day = today - timedelta(days=3 * i + rng.randint(0, 2))
+        data.append({
+            "name": f"{rng.choice(NAME_PARTS[0])} {rng.choice(['Smith', 'Chen', 'Garcia', 'Müller', 'Kim'])}",
+            "share": rng.randint(10000, 5000000), "change": change,
+            "filingDate": (day + timedelta(days=2)).isoformat(), "transactionDate": day.isoformat(),
+            "transactionCode": "S" if change < 0 else rng.choice(["P", "M", "A"]),
+            "transactionPrice": round(info["base_price"] * rng.uniform(0.9, 1.1), 2),
+        })
+    return {"data": data, "symbol": info["symbol"]}
+
+
+@app.get("/api/v1/stock/social-sentiment")
+async def finnhub_social_sentiment(request: Request, symbol: str = ""):
+    if (fault := await finnhub_guard(request, "stock/social-sentiment")):
+        return fault
+    rng = rng_for("sentiment", symbol.upper())
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    reddit = []
+    if not is_unknown(symbol):
+        for i in range(24):
+            positive, negative = rng.randint(0, 40), rng.randint(0, 30)
+            mentions = positive + negative + rng.randint(0, 20)
+            reddit.append({
+                "atTime": (now - timedelta(hours=i)).strftime("%Y-%m-%d %H:%M:%S"), "mention": mentions,
+                "positiveMention": positive, "negativeMention": negative,
+                "positiveScore": round(rng.uniform(0.5, 1), 4), "negativeScore": round(-rng.uniform(0.5, 1), 4),
+                "score": round((positive - negative) / max(mentions, 1), 4),
+            })
+    return {"reddit": reddit, "symbol": symbol.upper(), "twitter": []}
+
+
+@app.get("/api/v1/stock/financials")
+async def finnhub_financials(request: Request):
+    if (fault := await finnhub_guard(request, "stock/financials")):
+        return fault
+    # Premium endpoint - the free plan answers 403, which is what the backend is built around
+    return JSONResponse({"error": "You don't have access to this resource."}, status_code=403)
+
+
+# ===========================================
+# Yahoo Finance
+# ===========================================
+
+INTERVAL_SECONDS = {"1m": 60, "2m": 120, "5m": 300, "15m": 900, "30m": 1800, "60m": 3600, "90m": 5400,
+                    "1h": 3600, "1d": 86400, "5d": 432000, "1wk": 604800, "1mo": 2592000, "3mo": 7776000}
+RANGE_SECONDS = {"1d": 86400, "5d": 432000, "1mo": 2592000, "3mo": 7776000, "6mo": 15552000, "1y": 31536000,
+                 "2y": 63072000, "5y": 157680000, "10y": 315360000, "ytd": 31536000, "max": 631152000}
+
+
+@app.get("/v7/finance/quote")
+async def yahoo_quote(symbols: str = ""):
+    if (fault := await inject("yahoo", "v7/finance/quote")):
+        return fault
+    now = time.time()
+    result = []
+    for symbol in [s for s in symbols.split(",") if s]:
+        if is_unknown(symbol):
+            continue
+        info = company(symbol)
+        price, prev = price_at(info, now), previous_close(info, now)
+        result.append({
+            "symbol": info["symbol"], "shortName": info["name"], "longName": info["name"], "currency": info["currency"],
+            "quoteType": "CRYPTOCURRENCY" if info["symbol"].endswith("-USD") else "EQUITY",
+            "regularMarketPrice": price, "regularMarketPreviousClose": prev,
+            "regularMarketChange": round(price - prev, 4), "regularMarketChangePercent": round((price - prev) / prev * 100, 4),
+            "regularMarketTime": int(now), "marketCap": int(price * info["shares"] * 1e6),
+            "marketState": "REGULAR",
+        })
+    return {"quoteResponse": {"result": result, "error": None}}
+
+
+@app.get("/v8/finance/chart/{symbol}")
+async def yahoo_chart(symbol: str, interval: str = "1d", range_: str = Query("1mo", alias="range")):
+    if (fault := await inject("yahoo", "v8/finance/chart")):
+        return fault
+    if is_unknown(symbol):
+        return JSONResponse(
+            {"chart": {"result": None, "error": {"code": "Not Found", "description": "No data found, symbol may be delisted"}}},
+            status_code=404,
+        )
+    info = company(symbol)
+    step = INTERVAL_SECONDS.get(interval, 86400)
+    span = RANGE_SECONDS.get(range_, 2592000)
+    now = int(time.time())
+    points = max(1, min(span // step, 2000))
+    timestamps = [now - now % step - (points - 1 - i) * step for i in range(points)]
+    closes = [round(price_at(info, ts), 4) for ts in timestamps]
+    rng = rng_for("chart", info["symbol"], interval, range_)
+    return {"chart": {"result": [{
+        "meta": {
+            "currency": info["currency"], "symbol": info["symbol"], "exchangeName": "NMS",
+            "regularMarketPrice": price_at(info, now), "chartPreviousClose": closes[0],
+            "previousClose": previous_close(info, now), "regularMarketPreviousClose": previous_close(info, now),
+            "regularMarketTime": now, "dataGranularity": interval, "range": range_,
+        },
+        "timestamp": timestamps,
+        "indicators": {"quote": [{
+            "open": [round(c * rng.uniform(0.995, 1.005), 4) for c in closes],
+            "high": [round(c * rng.uniform(1.0, 1.01), 4) for c in closes],
+            "low": [round(c * rng.uniform(0.99, 1.0), 4) for c in closes],
+            "close": closes,
+            "volume": [rng.randint(10000, 5000000) for _ in closes],
+        }]},
+    }], "error": None}}
+
+
+# ===========================================
+# Google News RSS
+# ===========================================
+
+@app.get("/rss/search")
+async def google_news_rss(q: str = ""):
+    if (fault := await inject("news", "rss/search")):
+        return fault
+    now = int(time.time())
+    hour = now - now % 3600
+    items = []
+    for i in range(40):
+        published = hour - i * 1800
+        rng = rng_for("rss", q, published)
+        source = rng.choice(["Reuters", "Bloomberg", "CNBC", "Financial Times", "MarketWatch"])
+        title = f"{rng.choice(['Stocks', 'Markets', 'Bonds', 'Oil', 'Tech shares'])} {rng.choice(['rally', 'slip', 'steady', 'surge'])} as investors weigh {rng.choice(['inflation data', 'Fed outlook', 'earnings', 'jobs report'])} - {source}"
+        link = f"https://news.example.com/articles/{zlib.crc32(title.encode())}"
+        description = f'<a href="{link}">{title}</a>'
+        items.append(
+            "<item>"
+            f"<title>{escape(title)}</title>"
+            f"<link>{link}</link>"
+            f'<guid isPermaLink="false">{zlib.crc32(link.encode())}</guid>'
+            f"<pubDate>{format_datetime(datetime.fromtimestamp(published, timezone.utc), usegmt=True)}</pubDate>"
+            f"<description>{escape(description)}</description>"
+            f'<source url="https://news.example.com">{escape(source)}</source>'
+            "</item>"
+        )
+    body = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/"><channel>'
+        f"<title>\"{escape(q)}\" - Google News</title><link>https://news.google.com/</link>"
+        "<language>en-US</language>"
+        + "".join(items)
+        + "</channel></rss>"
+    )
+    return Response(content=body, media_type="application/xml; charset=utf-8")
+
+
+# ===========================================
+# Gemini
+# ===========================================
+
+SWOT_POINTS = {
+    "strengths": ["Strong brand recognition", "Healthy balance sheet", "High recurring revenue", "Scale advantages"],
+    "weaknesses": ["Dependence on a few key products", "Rising operating costs", "Limited geographic diversification"],
+    "opportunities": ["Expansion into emerging markets", "New AI-driven product lines", "Strategic acquisitions"],
+    "threats": ["Intensifying competition", "Regulatory scrutiny", "Macroeconomic slowdown"],
+}
+
+
+def gemini_text(prompt: str) -> str:
+    """SWOT prompts get the JSON the backend parses, everything else a markdown summary."""
+    rng = rng_for("gemini", prompt[:200])
+    if "SWOT" in prompt:
+        priorities = ["high", "high", "medium", "low", "low"]
+        return json.dumps({
+            category: [{"point": point, "priority": priorities[i]} for i, point in enumerate(rng.sample(points, len(points)))]
+            for category, points in SWOT_POINTS.items()
+        }, indent=2)
+    paragraphs = [
+        "**Market overview:** Equities traded mixed as investors balanced resilient earnings against rate uncertainty.",
+        "**Key drivers:** Technology led gains while energy lagged on softer crude prices.",
+        "**What to watch:** Upcoming inflation data and central bank commentary could set the tone for the week.",
+        "**Risks:** Elevated valuations leave little room for disappointment in guidance.",
+    ]
+    rng.shuffle(paragraphs)
+    return "\n\n".join(paragraphs)
+
+
+def gemini_payload(text: str, prompt: str, finished: bool = True) -> dict:
+    payload = {
+        "candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}],
+        "modelVersion": "gemini-flash-latest",
+    }
+    if finished:
+        payload["candidates"][0]["finishReason"] = "STOP"
+        payload["usageMetadata"] = {
+            "promptTokenCount": len(prompt) // 4,
+            "candidatesTokenCount": len(text) // 4,
+            "totalTokenCount": (len(prompt) + len(text)) // 4,
+        }
+    return payload
+
+
+@app.post("/v1beta/models/{model_action}")
+async def gemini(model_action: str, request: Request):
+    _, _, action = model_action.partition(":")
+    if action not in ("generateContent", "streamGenerateContent"):
+        return JSONResponse({"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}}, status_code=404)
+    if not request.query_params.get("key"):
+        return JSONResponse({"error": {"code": 403, "message": "API key not valid", "status": "PERMISSION_DENIED"}}, status_code=403)
+    if (fault := await inject("gemini", action)):
+        return fault
+    body = await request.json()
+    prompt = "".join(part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", []))
+    text = gemini_text(prompt)
+    if action == "generateContent":
+        return gemini_payload(text, prompt)
+
+    async def events():
+        # Roughly token-sized chunks at ~100 tokens/s after the injected time-to-first-token
+        chunks = [text[i:i + 60] for i in range(0, len(text), 60)]
+        for i, chunk in enumerate(chunks):
+            yield f"data: {json.dumps(gemini_payload(chunk, prompt, finished=i == len(chunks) - 1))}\r\n\r\n"
+            await asyncio.sleep(0.15)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+# ===========================================
+# Control
+# ===========================================
+
+@app.get("/_sim/config")
+async def get_config():
+    return config
+
+
+@app.put("/_sim/config")
+async def update_config(request: Request):
+    """Merge e.g. {"finnhub": {"rate_limit_rate": 0.2}} or {"all": {"latency_ms": 0}} into the settings."""
+    changes = await request.json()
+    for service, settings in changes.items():
+        if service == "symbols_per_exchange":
+            config[service] = int(settings)
+            continue
+        for target in (SERVICES if service == "all" else [service]):
+            for key, value in settings.items():
+                if key in config[target]:
+                    config[target][key] = float(value)
+    return config
+
+
+@app.get("/_sim/stats")
+async def get_stats():
+    """Requests served per service and route, plus injected faults."""
+    return dict(sorted(stats.items()))
+
+
+def parse_service_settings(pairs: list, key: str):
+    for pair in pairs or []:
+        service, _, value = pair.partition("=")
+        if service not in SERVICES:
+            raise SystemExit(f"Unknown service '{service}' (expected one of {', '.join(SERVICES)})")
+        config[service][key] = float(value)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, help="Mean latency for Finnhub, Yahoo and News (default: 80; Gemini: 1200)")
+    parser.add_argument("--jitter-ms", type=float, help="Standard deviation of the latency (default: 30; Gemini: 400)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with a 5xx (default: 0)")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests answered with a 429 (default: 0)")
+    parser.add_argument("--service-latency", action="append", metavar="SERVICE=MS", help="Per-service mean latency, repeatable")
+    parser.add_argument("--service-error-rate", action="append", metavar="SERVICE=RATE", help="Per-service 5xx rate, repeatable")
+    parser.add_argument("--service-rate-limit-rate", action="append", metavar="SERVICE=RATE", help="Per-service 429 rate, repeatable")
+    parser.add_argument("--symbols-per-exchange", type=int, default=3000, help="Size of each /stock/symbol list (default: 3000)")
+    args = parser.parse_args()
+
+    for service in SERVICES:
+        if args.latency_ms is not None and service != "gemini":
+            config[service]["latency_ms"] = args.latency_ms
+        if args.jitter_ms is not None and service != "gemini":
+            config[service]["jitter_ms"] = args.jitter_ms
+        config[service]["error_rate"] = args.error_rate
+        config[service]["rate_limit_rate"] = args.rate_limit_rate
+    parse_service_settings(args.service_latency, "latency_ms")
+    parse_service_settings(args.service_error_rate, "error_rate")
+    parse_service_settings(args.service_rate_limit_rate, "rate_limit_rate")
+    config["symbols_per_exchange"] = args.symbols_per_exchange
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
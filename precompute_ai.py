@@ -0,0 +1,185 @@
+"""
+Nightly AI precompute job.
+
+Walks the heatmap index constituents (DAX 40, Nasdaq 100, S&P 500 leaders)
+and warms the AI cache with SWOT analyses and AI summaries, so daytime
+requests for those names are served from cache instead of waiting on Gemini.
+
+Runs against the same AI cache as the backend (AI_CACHE_PATH), so start it
+on the backend host, e.g. via cron:
+
+    0 3 * * 1-5  cd /app && python precompute_ai.py --token-budget 400000
+
+Finnhub requests (fundamentals, analyst data) run as background work and get
+their own quota bucket (--finnhub-per-minute, default half the backend's
+limit), so the job leaves the rest of the API key's quota to the live backend.
+
+Usage:
+    python precompute_ai.py [--indices dax,nasdaq100,sp500] [--concurrency 3]
+                            [--token-budget 0] [--min-fresh-hours 12]
+                            [--finnhub-per-minute 30]
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from datetime import timedelta
+
+from fastapi import HTTPException
+
+import python_backend as backend
+
+
+logger = logging.getLogger("precompute_ai")
+
+INDEX_CHOICES = ("dax", "nasdaq100", "sp500", "nikkei225", "hangseng")
+# Tokens reserved per Gemini call until the job has measured its own average
+DEFAULT_TOKENS_PER_CALL = 3000
+PROGRESS_EVERY = 25  # Log progress every N finished items
+
+
+def collect_symbols(indices, sp500_per_sector):
+    """Return the de-duplicated constituent symbols of the requested indices (list order kept)."""
+    symbols = []
+    for index in indices:
+        if index == "dax":
+            symbols.extend(symbol for symbol, _ in backend.DAX_STOCKS)
+        elif index == "nasdaq100":
+            symbols.extend(symbol for symbol, _ in backend.NASDAQ100_STOCKS)
+        elif index == "sp500":
+            # Leaders only: the lists are ordered by market cap within each sector
+            for sector_symbols in backend.SP500_BY_SECTOR.values():
+                symbols.extend(sector_symbols[:sp500_per_sector])
+        elif index == "nikkei225":
+            symbols.extend(symbol for symbol, _ in backend.NIKKEI225_STOCKS)
+        elif index == "hangseng":
+            symbols.extend(symbol for symbol, _ in backend.HANGSENG_STOCKS)
+    return list(dict.fromkeys(symbols))
+
+
+async def precompute(symbols, kinds, concurrency, token_budget, min_fresh, pause):
+    """
+    Generate the AI responses for all symbols with bounded concurrency and an optional token budget.
+    Each item reserves its expected token cost before it starts, so concurrent items can't overshoot the budget.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    start_usage = dict(backend.gemini_usage)
+    stats = {"done": 0, "failed": 0, "skipped": 0}
+    reserved = 0  # Tokens set aside for items in progress
+    total = len(symbols) * len(kinds)
+    
+    def tokens_used():
+        return backend.gemini_usage["tokens"] - start_usage["tokens"]
+    
+    def tokens_per_call():
+        calls = backend.gemini_usage["calls"] - start_usage["calls"]
+        return tokens_used() / calls if calls else DEFAULT_TOKENS_PER_CALL
+    
+    budget_released = asyncio.Condition()
+    
+    def fits(estimate):
+        return not token_budget or tokens_used() + reserved + estimate <= token_budget
+    
+    async def run(symbol, kind):
+        nonlocal reserved
+        async with semaphore:
+            # Wait while only in-progress reservations stand in the way - they may well cost less
+            async with budget_released:
+                await budget_released.wait_for(lambda: not reserved or fits(tokens_per_call()))
+                estimate = tokens_per_call()
+                if not fits(estimate):
+                    stats["skipped"] += 1
+                    return
+                reserved += estimate
+            calls_before = backend.gemini_usage["calls"]
+            try:
+                if kind == "swot":
+                    await backend.generate_swot_analysis(symbol, min_fresh=min_fresh)
+                else:
+                    await backend.generate_ai_summary(symbol, min_fresh=min_fresh)
+                stats["done"] += 1
+            except HTTPException as e:
+                stats["failed"] += 1
+                logger.warning("[Precompute] %s %s failed: %s", kind, symbol, e.detail)
+            except Exception as e:
+                stats["failed"] += 1
+                logger.warning("[Precompute] %s %s failed: %s", kind, symbol, e)
+            finally:
+                async with budget_released:
+                    reserved -= estimate
+                    budget_released.notify_all()
+            
+            finished = stats["done"] + stats["failed"] + stats["skipped"]
+            if finished % PROGRESS_EVERY == 0:
+                logger.info("[Precompute] %s/%s done, %s Gemini calls, ~%s tokens", finished, total,
+                            backend.gemini_usage["calls"] - start_usage["calls"], tokens_used())
+            
+            # Only pace real Gemini calls, cache hits are free
+            if backend.gemini_usage["calls"] > calls_before and pause:
+                await asyncio.sleep(pause)
+    
+    # Fundamentals/analyst fetches only use Finnhub quota above the background reserve (the context
+    # carries into the gathered tasks and their worker threads)
+    with backend.finnhub_background():
+        await asyncio.gather(*(run(symbol, kind) for symbol in symbols for kind in kinds))
+    
+    stats["calls"] = backend.gemini_usage["calls"] - start_usage["calls"]
+    stats["tokens"] = tokens_used()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute AI summaries and SWOT analyses for index constituents")
+    parser.add_argument("--indices", default="dax,nasdaq100,sp500",
+                        help=f"Comma-separated indices ({', '.join(INDEX_CHOICES)})")
+    parser.add_argument("--kinds", default="swot,summary", help="Comma-separated kinds (swot, summary)")
+    parser.add_argument("--sp500-per-sector", type=int, default=10, help="S&P 500 leaders taken per sector")
+    parser.add_argument("--concurrency", type=int, default=3, help="Concurrent Gemini requests")
+    parser.add_argument("--token-budget", type=int, default=0, help="Stop after this many Gemini tokens (0 = unlimited)")
+    parser.add_argument("--min-fresh-hours", type=float, default=12,
+                        help="Regenerate cache entries expiring within this many hours")
+    parser.add_argument("--pause", type=float, default=1.0, help="Seconds to wait after each Gemini call per worker")
+    parser.add_argument("--finnhub-per-minute", type=int, default=max(1, backend.FINNHUB_RATE_LIMIT_PER_MINUTE // 2),
+                        help="Finnhub requests per minute for this job (default: half of FINNHUB_RATE_LIMIT_PER_MINUTE, "
+                             "the backend uses the same API key)")
+    args = parser.parse_args()
+    
+    indices = [i.strip().lower() for i in args.indices.split(",") if i.strip()]
+    unknown = [i for i in indices if i not in INDEX_CHOICES]
+    if unknown:
+        parser.error(f"Unknown indices: {', '.join(unknown)}")
+    kinds = [k.strip().lower() for k in args.kinds.split(",") if k.strip()]
+    if any(k not in ("swot", "summary") for k in kinds):
+        parser.error("--kinds accepts swot and summary")
+    
+    if not backend.GOOGLE_API_KEY:
+        logger.error("[Precompute] GOOGLE_API_KEY not configured")
+        raise SystemExit(1)
+    
+    # This process has its own bucket - size it so the backend keeps the rest of the key's quota
+    backend.finnhub_quota = backend.FinnhubQuotaGovernor(args.finnhub_per_minute)
+    
+    symbols = collect_symbols(indices, args.sp500_per_sector)
+    logger.info("[Precompute] %s symbols x %s kinds from %s (concurrency %s, token budget %s, Finnhub %s/min)",
+                len(symbols), len(kinds), ", ".join(indices), args.concurrency, args.token_budget or "unlimited",
+                args.finnhub_per_minute)
+    
+    started = time.time()
+    stats = asyncio.run(precompute(
+        symbols,
+        kinds,
+        max(1, args.concurrency),
+        args.token_budget,
+        timedelta(hours=args.min_fresh_hours),
+        args.pause,
+    ))
+    
+    logger.info("[Precompute] Finished in %.0fs: %s ok, %s failed, %s skipped (budget), %s Gemini calls, ~%s tokens",
+                time.time() - started, stats["done"], stats["failed"], stats["skipped"], stats["calls"], stats["tokens"])
+    if stats["failed"]:
+        raise SystemExit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,18 +2,45 @@
 Python FastAPI Backend for Stock Fundamentals using Finnhub API
 Runs on port 3001
 """
+import time
+
+# Startup timing starts before the heavy imports below
+MODULE_IMPORT_STARTED = time.perf_counter()
+
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response, FileResponse, HTMLResponse, JSONResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import Response, JSONResponse, StreamingResponse
 from pathlib import Path
 import requests
-import time
+from requests.adapters import HTTPAdapter
 import re
 import json
-from datetime import datetime, timedelta
+import asyncio
+import hashlib
+import base64
+import importlib
+import importlib.util
+import hmac
+import gzip
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+import heapq
+import mmap
+import sys
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from urllib.parse import urlsplit
+from datetime import datetime, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo
 import os
 import logging
+import queue
+import atexit
+from logging.handlers import QueueHandler, QueueListener
 from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import xml.etree.ElementTree as ET
@@ -25,14 +52,15 @@ load_dotenv()
 # Environment Variables Validation
 # ===========================================
 
-def check_environment_variables():
+def check_environment_variables(verbose: bool = True):
     """
     Check all required and optional environment variables.
-    Prints a status report to console on startup.
+    Prints the full status report when `verbose`, otherwise one summary line (plus any errors).
     """
-    print("\n" + "=" * 60)
-    print("🔧 PYTHON BACKEND - ENVIRONMENT VARIABLES CHECK")
-    print("=" * 60)
+    report = []
+    report.append("\n" + "=" * 60)
+    report.append("🔧 PYTHON BACKEND - ENVIRONMENT VARIABLES CHECK")
+    report.append("=" * 60)
     
     errors = []
     warnings = []
@@ -70,64 +98,73 @@ def check_environment_variables():
     }
     
     # Check required variables
-    print("\n📋 REQUIRED API KEYS:")
+    report.append("\n📋 REQUIRED API KEYS:")
     for var, value in required_vars.items():
         if value:
             # Show first 10 chars only for security
             masked = value[:10] + "..." if len(value) > 10 else value
-            print(f"   ✅ {var} = {masked}")
+            report.append(f"   ✅ {var} = {masked}")
         else:
-            print(f"   ❌ {var} = NOT SET")
+            report.append(f"   ❌ {var} = NOT SET")
             errors.append(f"{var} is required but not set!")
     
     # Check optional variables
-    print("\n📋 OPTIONAL API KEYS:")
+    report.append("\n📋 OPTIONAL API KEYS:")
     for var, value in optional_vars.items():
         if value:
             masked = value[:10] + "..." if len(value) > 10 else value
-            print(f"   ✅ {var} = {masked}")
+            report.append(f"   ✅ {var} = {masked}")
         else:
-            print(f"   ⚠️  {var} = NOT SET")
+            report.append(f"   ⚠️  {var} = NOT SET")
             warnings.append(f"{var} is not set. Some features may be disabled.")
     
     # Show server configuration
-    print("\n📋 SERVER CONFIGURATION:")
+    report.append("\n📋 SERVER CONFIGURATION:")
     for var, value in config_vars.items():
-        print(f"   ℹ️  {var} = {value}")
+        report.append(f"   ℹ️  {var} = {value}")
     
     # Show rate limiting
-    print("\n📋 RATE LIMITING:")
+    report.append("\n📋 RATE LIMITING:")
     for var, value in rate_limit_vars.items():
-        print(f"   ℹ️  {var} = {value}")
+        report.append(f"   ℹ️  {var} = {value}")
     
     # Show feature flags
-    print("\n📋 FEATURE FLAGS:")
+    report.append("\n📋 FEATURE FLAGS:")
     for var, value in feature_vars.items():
-        print(f"   ℹ️  {var} = {value}")
+        report.append(f"   ℹ️  {var} = {value}")
     
     # Summary
-    print("\n" + "-" * 60)
+    report.append("\n" + "-" * 60)
     if errors:
-        print("❌ ERRORS FOUND:")
+        report.append("❌ ERRORS FOUND:")
         for error in errors:
-            print(f"   • {error}")
+            report.append(f"   • {error}")
     
     if warnings:
-        print("⚠️  WARNINGS:")
+        report.append("⚠️  WARNINGS:")
         for warning in warnings:
-            print(f"   • {warning}")
+            report.append(f"   • {warning}")
     
     if not errors and not warnings:
-        print("✅ All environment variables are properly configured!")
+        report.append("✅ All environment variables are properly configured!")
     elif not errors:
-        print("✅ Required variables OK, but some optional variables are missing.")
+        report.append("✅ Required variables OK, but some optional variables are missing.")
     
-    print("=" * 60 + "\n")
+    report.append("=" * 60 + "\n")
+    
+    if verbose:
+        print("\n".join(report))
+    else:
+        status = "missing required variables" if errors else "OK"
+        print(f"[Python Backend] Environment {status} (ENVIRONMENT={config_vars['ENVIRONMENT']}, "
+              f"USE_YFINANCE_EXTRAS={feature_vars['USE_YFINANCE_EXTRAS']})")
+        for message in errors + warnings:
+            print(f"[Python Backend]   {message}")
     
     return len(errors) == 0
 
-# Run environment check on startup
-env_check_passed = check_environment_variables()
+# Run environment check on startup - the full report only when started directly (one line per uvicorn worker otherwise)
+env_check_passed = check_environment_variables(verbose=__name__ == "__main__" or os.getenv("ENV_CHECK_VERBOSE", "").lower() == "true")
 
 if not env_check_passed:
     print("❌ FATAL: Required environment variables are missing!")
@@ -138,14 +175,43 @@ if not env_check_passed:
 # Default: False - yfinance causes delays and errors, Finnhub provides all needed data
 USE_YFINANCE_EXTRAS = os.getenv("USE_YFINANCE_EXTRAS", "False").lower() == "true"
 
-# Try to import yfinance (only used if USE_YFINANCE_EXTRAS=True)
-try:
-    import yfinance as yf
-    YFINANCE_AVAILABLE = True
-except ImportError:
-    YFINANCE_AVAILABLE = False
+# yfinance pulls in pandas and numpy (about a second and tens of MB per worker) but only a few endpoints
+# use it, so it is imported on first use; at startup we only check that it is installed.
+YFINANCE_AVAILABLE = importlib.util.find_spec("yfinance") is not None
+if not YFINANCE_AVAILABLE:
     print("[Python Backend] yfinance not available, using Finnhub only")
 
+lazy_import_seconds = {}  # {module name: import duration} - exported as dashboard_lazy_import_seconds
+_lazy_modules = {}
+_lazy_import_lock = threading.Lock()
+
+
+def lazy_import(module_name: str):
+    """Import `module_name` on first use (once, thread-safe) and record how long the import took."""
+    module = _lazy_modules.get(module_name)
+    if module is not None:
+        return module
+    with _lazy_import_lock:
+        module = _lazy_modules.get(module_name)
+        if module is None:
+            started = time.perf_counter()
+            module = importlib.import_module(module_name)
+            lazy_import_seconds[module_name] = time.perf_counter() - started
+            _lazy_modules[module_name] = module
+            logger.info("[Lazy Import] %s loaded in %.0f ms", module_name, lazy_import_seconds[module_name] * 1000)
+    return module
+
+
+def get_yfinance():
+    """The yfinance module, imported on first call (blocking - from async code use load_yfinance())."""
+    return lazy_import("yfinance")
+
+
+async def load_yfinance():
+    """Import yfinance off the event loop; the first import takes around a second."""
+    if "yfinance" not in _lazy_modules:
+        await asyncio.to_thread(get_yfinance)
+
 if not USE_YFINANCE_EXTRAS:
     print("[Python Backend] yfinance extras disabled - using Finnhub only for maximum performance")
 
@@ -155,7 +221,17 @@ if not USE_YFINANCE_EXTRAS:
 
 # Finnhub API Key (required for fundamentals data)
 FINNHUB_API_KEY = os.getenv("FINNHUB_API_KEY")
-FINNHUB_BASE_URL = "https://finnhub.io/api/v1"
+
+# Upstream base URLs. UPSTREAM_SIMULATOR_URL points all of them at benchmarks/upstream_simulator.py
+# (load tests, benchmarks, CI); the per-service variables override single upstreams.
+UPSTREAM_SIMULATOR_URL = os.getenv("UPSTREAM_SIMULATOR_URL", "").rstrip("/")
+FINNHUB_BASE_URL = os.getenv("FINNHUB_BASE_URL", f"{UPSTREAM_SIMULATOR_URL}/api/v1" if UPSTREAM_SIMULATOR_URL else "https://finnhub.io/api/v1")
+YAHOO_BASE_URL = os.getenv("YAHOO_BASE_URL", UPSTREAM_SIMULATOR_URL or "https://query1.finance.yahoo.com")
+GOOGLE_NEWS_BASE_URL = os.getenv("GOOGLE_NEWS_BASE_URL", UPSTREAM_SIMULATOR_URL or "https://news.google.com")
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", UPSTREAM_SIMULATOR_URL or "https://generativelanguage.googleapis.com")
+
+if UPSTREAM_SIMULATOR_URL:
+    print(f"[Python Backend] Using upstream simulator at {UPSTREAM_SIMULATOR_URL}")
 
 if not FINNHUB_API_KEY:
     raise ValueError("FINNHUB_API_KEY environment variable is required! Please set it in .env file or docker-compose.yml")
@@ -166,21 +242,809 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 # FRED API Key (for macroeconomic data - used by frontend through this backend)
 FRED_API_KEY = os.getenv("FRED_API_KEY")
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO if os.getenv("ENVIRONMENT", "development") == "production" else logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('backend.log') if os.getenv("ENVIRONMENT") == "production" else logging.StreamHandler(),
-    ]
-)
+# ===========================================
+# Logging
+# ===========================================
+
+# Records are handed to a queue and written by a listener thread, so request handlers never block on
+# stdout/file writes. Message formatting (%-args) also happens on the listener thread, and only for
+# records that pass the level gate - hot paths log with logger.debug("...", arg) instead of f-strings.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO" if os.getenv("ENVIRONMENT", "development") == "production" else "DEBUG").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()  # "text" or "json" (one object per line)
+LOG_SAMPLE_SECONDS = float(os.getenv("LOG_SAMPLE_SECONDS", "10"))  # Window for log_sampled() messages
+
+_LOG_COMPONENT = re.compile(r"^\[([^\]]+)\]\s*")
+
+
+class JsonLogFormatter(logging.Formatter):
+    """One JSON object per record; a leading "[Component]" tag becomes its own field."""
+    
+    def format(self, record):
+        message = record.getMessage()
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, dt_timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+        }
+        match = _LOG_COMPONENT.match(message)
+        if match:
+            entry["component"] = match.group(1)
+            message = message[match.end():]
+        entry["msg"] = message
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread instead of the logging call site."""
+    
+    def prepare(self, record):
+        return record
+
+
+def setup_logging():
+    """Route all logging through a queue drained by a background listener thread."""
+    if LOG_FORMAT == "json":
+        formatter = JsonLogFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if os.getenv("ENVIRONMENT") == "production":
+        handlers.append(logging.FileHandler('backend.log'))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers = [DeferredQueueHandler(log_queue)]
+    root.setLevel(LOG_LEVEL)
+    
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)  # Flush queued records on shutdown
+    return listener
+
+
+log_listener = setup_logging()
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+_log_samples = {}  # {key: [window_start, suppressed_count]}
+
+
+def log_sampled(key: str, level: int, msg: str, *args):
+    """
+    Log a high-frequency message at most once per LOG_SAMPLE_SECONDS per `key`.
+    Suppressed repeats are counted and reported with the next message that gets through.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    now = time.monotonic()
+    sample = _log_samples.get(key)
+    if sample is not None and now - sample[0] < LOG_SAMPLE_SECONDS:
+        sample[1] += 1
+        return
+    suppressed = sample[1] if sample is not None else 0
+    _log_samples[key] = [now, 0]
+    if suppressed:
+        logger.log(level, msg + " (+%d similar suppressed)", *args, suppressed)
+    else:
+        logger.log(level, msg, *args)
+
+# ===========================================
+# Metrics (Prometheus text exposition)
+# ===========================================
+
+# Every metric is sharded per thread: the event loop and each worker thread only ever write their own
+# shard, so recording is a dict update without locks. /metrics sums the shards when it is scraped.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+metrics_registry = []  # All metrics rendered by /metrics, in registration order
+
+
+class _ShardOwner:
+    """Per-thread sentinel held in a metric's thread-local; it is collected when its thread exits."""
+    
+    __slots__ = ("__weakref__",)
+
+
+class ShardedMetric:
+    """
+    Base class: per-thread shards of {label values: value}.
+    Shards of exited threads (per-call ThreadPoolExecutors) are folded into `_retired`, so the shard list
+    stays bounded by the number of live threads.
+    """
+    
+    kind = "untyped"
+    
+    def __init__(self, name: str, help_text: str, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._local = threading.local()
+        self._shards = []
+        self._retired = {}
+        self._lock = threading.Lock()  # Shard registration/retirement and snapshots - never the write path
+        metrics_registry.append(self)
+    
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            owner = _ShardOwner()
+            # threading.local drops the owner when the thread exits, which retires the shard
+            weakref.finalize(owner, self._retire, shard)
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            self._local.owner = owner
+        return shard
+    
+    def _retire(self, shard: dict):
+        with self._lock:
+            for labels, value in shard.items():
+                self._retired[labels] = self._fold(self._retired.get(labels), value)
+            try:
+                self._shards.remove(shard)
+            except ValueError:
+                pass
+    
+    def _fold(self, total, value):
+        """Add one shard's value for a label set to a running total (None = no total yet)."""
+        return value if total is None else total + value
+    
+    def _snapshot(self):
+        """(labels, value) pairs of the retired total and every live shard - values are copied, shards keep being written."""
+        with self._lock:
+            shards = list(self._shards)
+            retired = [(labels, self._fold(None, value)) for labels, value in self._retired.items()]
+        yield from retired
+        for shard in shards:
+            for labels, value in list(shard.items()):
+                yield labels, value
+    
+    def samples(self):
+        """Yield (sample name, [(label, value), ...], value) for the exposition format."""
+        raise NotImplementedError
+
+
+class Counter(ShardedMetric):
+    kind = "counter"
+    
+    def inc(self, *labels, amount=1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+    
+    def totals(self) -> dict:
+        totals = {}
+        for labels, value in self._snapshot():
+            totals[labels] = totals.get(labels, 0) + value
+        return totals
+    
+    def samples(self):
+        for labels, value in self.totals().items():
+            yield self.name, list(zip(self.label_names, labels)), value
+
+
+class Histogram(ShardedMetric):
+    kind = "histogram"
+    
+    def __init__(self, name: str, help_text: str, label_names=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(buckets)
+    
+    def _fold(self, total, counts):
+        if total is None:
+            return list(counts)
+        return [a + b for a, b in zip(total, counts)]
+    
+    def observe(self, value: float, *labels):
+        shard = self._shard()
+        counts = shard.get(labels)
+        if counts is None:
+            # One slot per bucket, one for +Inf, then the running sum
+            counts = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+    
+    def samples(self):
+        merged = {}
+        for labels, counts in self._snapshot():
+            total = merged.get(labels)
+            merged[labels] = list(counts) if total is None else [a + b for a, b in zip(total, counts)]
+        
+        bounds = [format_metric_value(bound) for bound in self.buckets] + ["+Inf"]
+        for labels, counts in merged.items():
+            label_pairs = list(zip(self.label_names, labels))
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                yield f"{self.name}_bucket", label_pairs + [("le", bound)], cumulative
+            yield f"{self.name}_count", label_pairs, cumulative
+            yield f"{self.name}_sum", label_pairs, counts[-1]
+
+
+class CallbackGauge:
+    """Gauge computed at scrape time by `collect()`, which returns {label values: value}."""
+    
+    kind = "gauge"
+    
+    def __init__(self, name: str, help_text: str, collect, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.collect = collect
+        metrics_registry.append(self)
+    
+    def samples(self):
+        for labels, value in self.collect().items():
+            yield self.name, list(zip(self.label_names, labels)), value
+
+
+def format_metric_value(value) -> str:
+    if isinstance(value, float):
+        return repr(value) if value == value else "NaN"
+    return str(value)
+
+
+def _escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render_metrics() -> str:
+    """All registered metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for metric in metrics_registry:
+        lines.append(f"# HELP {metric.name} {metric.help_text}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        try:
+            for name, label_pairs, value in metric.samples():
+                if label_pairs:
+                    labels = ",".join(f'{key}="{_escape_label_value(val)}"' for key, val in label_pairs)
+                    lines.append(f"{name}{{{labels}}} {format_metric_value(value)}")
+                else:
+                    lines.append(f"{name} {format_metric_value(value)}")
+        except Exception as e:
+            logger.warning("[Metrics] Could not collect %s: %s", metric.name, e)
+    return "\n".join(lines) + "\n"
+
+
+http_requests_total = Counter("dashboard_http_requests_total", "HTTP requests by route, method and status.", ("route", "method", "status"))
+http_request_duration = Histogram("dashboard_http_request_duration_seconds", "HTTP request latency by route (SSE streams excluded).", ("route", "method"))
+http_requests_in_flight = 0  # Only touched by the event loop thread (ResponseHeadersMiddleware)
+CallbackGauge("dashboard_http_requests_in_flight", "HTTP requests currently being handled.", lambda: {(): http_requests_in_flight})
+
+cache_lookups = Counter("dashboard_cache_lookups_total", "Response/data cache lookups by namespace and result (hit or miss).", ("namespace", "result"))
+
+
+def _cache_hit_ratios() -> dict:
+    lookups = cache_lookups.totals()
+    ratios = {}
+    for namespace in {labels[0] for labels in lookups}:
+        hits = lookups.get((namespace, "hit"), 0)
+        total = hits + lookups.get((namespace, "miss"), 0)
+        ratios[(namespace,)] = hits / total if total else 0.0
+    return ratios
+
+
+CallbackGauge("dashboard_cache_hit_ratio", "Cache hit ratio per namespace since startup.", _cache_hit_ratios, ("namespace",))
+
+upstream_requests_total = Counter("dashboard_upstream_requests_total", "Upstream API calls by host and HTTP status (\"error\" = no response).", ("host", "status"))
+upstream_request_duration = Histogram("dashboard_upstream_request_duration_seconds", "Upstream API latency by host (until response headers).", ("host",))
+upstream_calls_per_request = Histogram(
+    "dashboard_upstream_calls_per_request", "Upstream calls made while handling one API request, by route.", ("route",),
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250, 500),
+)
+upstream_budget_refused_total = Counter("dashboard_upstream_budget_refused_total", "Upstream calls refused because the request's budget was used up, by route.", ("route",))
+
+
+def _executor_queue_depth() -> dict:
+    depth = {}
+    try:
+        executor = asyncio.get_running_loop()._default_executor
+        # asyncio.to_thread() work waiting for a free worker thread
+        depth[("asyncio_default",)] = executor._work_queue.qsize() if executor else 0
+    except (RuntimeError, AttributeError):
+        pass
+    try:
+        # Sync FastAPI endpoints run on anyio's worker threads
+        import anyio.to_thread
+        depth[("anyio_threadpool",)] = anyio.to_thread.current_default_thread_limiter().statistics().tasks_waiting
+    except Exception:
+        pass
+    return depth
+
+
+CallbackGauge("dashboard_executor_queue_depth", "Tasks waiting for a worker thread, per executor.", _executor_queue_depth, ("executor",))
+
+
+def resident_memory_bytes() -> int:
+    """Current resident set size of this process (peak RSS where /proc is not available)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+startup_seconds = None  # Module import until the startup event, set by log_startup_time()
+CallbackGauge("dashboard_startup_seconds", "Seconds from module import to the startup event.", lambda: {(): startup_seconds} if startup_seconds is not None else {})
+CallbackGauge("dashboard_lazy_import_seconds", "Time spent importing lazily loaded modules (yfinance, pandas), per module.", lambda: {(name,): seconds for name, seconds in lazy_import_seconds.items()}, ("module",))
+CallbackGauge("dashboard_resident_memory_bytes", "Resident memory of this worker process.", lambda: {(): resident_memory_bytes()})
+
+
+# ===========================================
+# Request Timing (Server-Timing)
+# ===========================================
+
+# Spans (cache lookups, upstream calls, serialization/encoding) are appended to a per-request list held in a
+# ContextVar; asyncio.to_thread() and with_request_context() carry it into worker threads.
+# ResponseHeadersMiddleware turns them into a Server-Timing header and keeps the slowest recent requests.
+SLOW_REQUEST_THRESHOLD = float(os.getenv("SLOW_REQUEST_THRESHOLD_MS", "500")) / 1000
+SLOW_REQUEST_LOG_SIZE = int(os.getenv("SLOW_REQUEST_LOG_SIZE", "50"))
+
+_request_timings = ContextVar("request_timings", default=None)
+slow_requests = deque(maxlen=SLOW_REQUEST_LOG_SIZE)  # Ring buffer of requests above the threshold
+
+
+def parse_upstream_budgets(spec: str) -> list:
+    """"/api/stock-overview=25,/api/market-cap=60" -> [(path prefix, max upstream calls)], longest prefix first."""
+    budgets = []
+    for item in spec.split(","):
+        prefix, _, limit = item.strip().partition("=")
+        if not prefix or not limit:
+            continue
+        try:
+            budgets.append((prefix.strip(), int(limit)))
+        except ValueError:
+            print(f"[Python Backend] Ignoring invalid UPSTREAM_BUDGETS entry '{item.strip()}'")
+    return sorted(budgets, key=lambda budget: len(budget[0]), reverse=True)
+
+
+# Optional caps on upstream calls per incoming request, by path prefix. Calls beyond the cap fail fast with
+# UpstreamBudgetExceeded - the endpoints already degrade to partial data on failed upstream calls - and
+# get_cached() serves expired entries instead of missing for the rest of that request.
+UPSTREAM_BUDGETS = parse_upstream_budgets(os.getenv("UPSTREAM_BUDGETS", ""))
+
+
+def upstream_budget_for(path: str):
+    for prefix, limit in UPSTREAM_BUDGETS:
+        if path.startswith(prefix):
+            return limit
+    return None
+
+
+class UpstreamBudgetExceeded(requests.exceptions.RequestException):
+    """The current request has used up its upstream call budget."""
+
+
+class RequestTimings:
+    """Timing spans and upstream call accounting of one request."""
+    
+    __slots__ = ("started", "spans", "upstream_budget", "upstream_calls", "upstream_refused", "lock")
+    
+    def __init__(self, upstream_budget: int = None):
+        self.started = time.perf_counter()
+        self.spans = []  # (name, start, end) - list.append is atomic, worker threads append too
+        self.upstream_budget = upstream_budget
+        self.upstream_calls = 0
+        self.upstream_refused = 0
+        self.lock = threading.Lock()
+    
+    def charge_upstream(self) -> bool:
+        """Count one outbound call; False (and counted as refused) once the budget is used up."""
+        with self.lock:
+            if self.upstream_budget is not None and self.upstream_calls >= self.upstream_budget:
+                self.upstream_refused += 1
+                return False
+            self.upstream_calls += 1
+            return True
+    
+    def upstream_header(self) -> str:
+        """X-Upstream-Calls value: "total=14, finnhub=12, yahoo=2" (plus refused=N over budget)."""
+        per_host = {}
+        for name, _, _ in list(self.spans):
+            if name.startswith("upstream-"):
+                host = name[len("upstream-"):]
+                per_host[host] = per_host.get(host, 0) + 1
+        parts = [f"total={self.upstream_calls}"] + [f"{host}={count}" for host, count in per_host.items()]
+        if self.upstream_refused:
+            parts.append(f"refused={self.upstream_refused}")
+        return ", ".join(parts)
+    
+    def summary(self, end: float) -> dict:
+        """
+        {name: [seconds, count]} per span name, plus "app": wall time not covered by any span
+        (our own transform code). Overlapping spans (parallel upstream calls) are only counted once for "app".
+        """
+        totals = {}
+        intervals = []
+        for name, start, stop in list(self.spans):
+            total = totals.setdefault(name, [0.0, 0])
+            total[0] += stop - start
+            total[1] += 1
+            intervals.append((max(start, self.started), min(stop, end)))
+        
+        covered = 0.0
+        current_start = current_end = None
+        for start, stop in sorted(intervals):
+            if current_end is None or start > current_end:
+                if current_end is not None:
+                    covered += current_end - current_start
+                current_start, current_end = start, stop
+            else:
+                current_end = max(current_end, stop)
+        if current_end is not None:
+            covered += current_end - current_start
+        
+        totals["app"] = [max(0.0, end - self.started - covered), 1]
+        totals["total"] = [end - self.started, 1]
+        return totals
+    
+    def server_timing(self, end: float) -> str:
+        parts = []
+        for name, (seconds, count) in self.summary(end).items():
+            part = f"{name};dur={seconds * 1000:.1f}"
+            if count > 1:
+                part += f';desc="{count}x"'
+            parts.append(part)
+        return ", ".join(parts)
+
+
+def record_span(name: str, start: float):
+    """Record a span from `start` (time.perf_counter()) until now on the current request, if any."""
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.spans.append((name, start, time.perf_counter()))
+
+
+def with_request_context(fn):
+    """Wrap `fn` for ThreadPoolExecutor.submit/map so spans recorded in the worker land on the calling request."""
+    timings = _request_timings.get()
+    if timings is None:
+        return fn
+    
+    def run(*args, **kwargs):
+        token = _request_timings.set(timings)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _request_timings.reset(token)
+    return run
+
+
+def upstream_span_name(host: str) -> str:
+    """Short Server-Timing name for an upstream host, e.g. query1.finance.yahoo.com -> upstream-yahoo."""
+    parts = host.split(".")
+    if len(parts) < 2 or parts[-1].isdigit():
+        # localhost / IP address, e.g. the upstream simulator
+        return "upstream-" + host
+    return "upstream-" + parts[-2]
+
+
+# ===========================================
+# JSON Rendering & Compression
+# ===========================================
+
+# orjson is several times faster than the standard encoder on the large nested payloads
+# (quoteSummary, ~500-row heatmaps, news lists) - fall back to json if it is not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    logger.info("[JSON] orjson not installed, using the standard json encoder")
+
+# Brotli is optional - without it only gzip is offered
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_MIN_SIZE = 1024  # Bytes - smaller bodies are not worth the CPU or the header overhead
+COMPRESSIBLE_TYPES = ("application/json",)
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)  # Server preference order
+# Cached variants are built once per cache fill, so they can afford higher levels than per-request compression
+PRECOMPRESS_LEVELS = {"gzip": 9, "br": 9}
+DYNAMIC_COMPRESS_LEVELS = {"gzip": 6, "br": 4}
+
+
+def _json_default(value):
+    """Encode values neither encoder handles natively (numpy scalars, pandas Timestamps, sets)."""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
+
+def dumps_json(content) -> bytes:
+    """Serialize `content` to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_json_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, default=_json_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class - renders with orjson when available."""
+    
+    def render(self, content) -> bytes:
+        started = time.perf_counter()
+        body = dumps_json(content)
+        record_span("serialize", started)
+        return body
+
+
+def negotiate_encoding(accept_encoding: str):
+    """Pick the best supported content coding from an Accept-Encoding header (None = identity)."""
+    if not accept_encoding:
+        return None
+    
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip()] = q
+    
+    best, best_q = None, 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress_body(body: bytes, encoding: str, levels: dict = DYNAMIC_COMPRESS_LEVELS) -> bytes:
+    """Compress `body` with a negotiated content coding."""
+    if encoding == "br":
+        return brotli.compress(body, quality=levels["br"])
+    # mtime=0 keeps the output byte-identical for identical input
+    return gzip.compress(body, compresslevel=levels["gzip"], mtime=0)
+
+
+class EncodedEntry:
+    """Serialized (and precompressed) form of a `cache` entry, kept next to the object it was encoded from."""
+    
+    __slots__ = ("data", "body", "digest", "variants")
+    
+    def __init__(self, data, body: bytes):
+        self.data = data
+        self.body = body
+        # Content hash of the JSON body - strong ETags are derived from it per content coding
+        self.digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.variants = {}  # {content coding: compressed body}
+        if len(body) >= COMPRESSION_MIN_SIZE:
+            for encoding in SUPPORTED_ENCODINGS:
+                self.variants[encoding] = compress_body(body, encoding, PRECOMPRESS_LEVELS)
+    
+    def etag(self, encoding: str = None) -> str:
+        """Strong ETag of one representation (identity or a compressed variant)."""
+        if encoding is None:
+            return f'"{self.digest}"'
+        return f'"{self.digest}-{encoding}"'
+
+
+# Least recently used entries are dropped beyond either limit (one entry per search query etc. would
+# otherwise accumulate forever); an evicted entry is simply encoded again on its next hit
+ENCODED_CACHE_MAX_ENTRIES = int(os.getenv("ENCODED_CACHE_MAX_ENTRIES", "2000"))
+ENCODED_CACHE_MAX_BYTES = int(os.getenv("ENCODED_CACHE_MAX_MB", "64")) * 1024 * 1024
+
+encoded_cache = OrderedDict()  # {cache_key: EncodedEntry}, least recently used first
+encoded_cache_bytes = 0
+_encoded_cache_lock = threading.Lock()  # Entries are encoded on the event loop and in worker threads
+
+
+def _encoded_size(entry: EncodedEntry) -> int:
+    return len(entry.body) + sum(len(variant) for variant in entry.variants.values())
+
+
+def forget_encoded_entry(cache_key: str):
+    """Drop the encoded form of a `cache` entry (its data was replaced)."""
+    global encoded_cache_bytes
+    with _encoded_cache_lock:
+        entry = encoded_cache.pop(cache_key, None)
+        if entry is not None:
+            encoded_cache_bytes -= _encoded_size(entry)
+
+
+def encode_cache_entry(cache_key: str, data) -> EncodedEntry:
+    """
+    Serialize and precompress the object stored in `cache[cache_key]`, once per cache entry.
+    A new object under the key is encoded again; the same object reuses the stored bytes.
+    """
+    global encoded_cache_bytes
+    with _encoded_cache_lock:
+        entry = encoded_cache.get(cache_key)
+        if entry is not None and entry.data is data:
+            encoded_cache.move_to_end(cache_key)
+            return entry
+    
+    started = time.perf_counter()
+    entry = EncodedEntry(data, dumps_json(data))
+    record_span("encode", started)  # Serialization plus precompressed variants
+    
+    with _encoded_cache_lock:
+        previous = encoded_cache.pop(cache_key, None)
+        if previous is not None:
+            encoded_cache_bytes -= _encoded_size(previous)
+        encoded_cache[cache_key] = entry
+        encoded_cache_bytes += _encoded_size(entry)
+        while len(encoded_cache) > 1 and (
+            len(encoded_cache) > ENCODED_CACHE_MAX_ENTRIES or encoded_cache_bytes > ENCODED_CACHE_MAX_BYTES
+        ):
+            _, evicted = encoded_cache.popitem(last=False)
+            encoded_cache_bytes -= _encoded_size(evicted)
+    return entry
+
+
+def etag_matches(if_none_match: str, digest: str) -> bool:
+    """
+    True if an If-None-Match header names any representation of `digest`.
+    Representations only differ in content coding, so a tag from another variant still means "unchanged".
+    """
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag.strip('"').partition("-")[0] == digest:
+            return True
+    return False
+
+
+def cached_json_response(cache_key: str, data, request: Request = None) -> Response:
+    """
+    JSON response for the object stored in `cache[cache_key]`.
+    Cache hits skip FastAPI's jsonable_encoder pass and any serialization or compression:
+    the body is the precompressed variant matching the request's Accept-Encoding.
+    Requests whose If-None-Match names the current content get an empty 304 instead.
+    """
+    entry = encode_cache_entry(cache_key, data)
+    encoding = None
+    # no-cache: browsers keep the body but revalidate it with If-None-Match on every poll
+    headers = {"Cache-Control": "no-cache"}
+    if entry.variants:
+        headers["Vary"] = "Accept-Encoding"
+        encoding = negotiate_encoding(request.headers.get("accept-encoding")) if request else None
+    headers["ETag"] = entry.etag(encoding)
+    
+    if request and etag_matches(request.headers.get("if-none-match"), entry.digest):
+        return Response(status_code=304, headers=headers)
+    
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+        return Response(content=entry.variants[encoding], media_type="application/json", headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing uncached JSON responses per request.
+    Responses that already carry a Content-Encoding (precompressed cache entries) pass through untouched,
+    as do streamed bodies (SSE) and anything below COMPRESSION_MIN_SIZE.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        accept_encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate_encoding(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        
+        start_message = None
+        
+        async def send_compressed(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                headers = {k.lower(): v for k, v in message.get("headers", [])}
+                content_type = headers.get(b"content-type", b"").decode("latin-1")
+                if b"content-encoding" in headers or not content_type.startswith(COMPRESSIBLE_TYPES):
+                    await send(message)
+                else:
+                    start_message = message  # Hold until the body shows whether it is worth compressing
+                return
+            
+            if start_message is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+            
+            held, start_message = start_message, None
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < COMPRESSION_MIN_SIZE:
+                await send(held)
+                await send(message)
+                return
+            
+            body = compress_body(body, encoding)
+            headers = [(k, v) for k, v in held.get("headers", []) if k.lower() not in (b"content-length", b"vary")]
+            headers += [
+                (b"content-encoding", encoding.encode("latin-1")),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"vary", b"Accept-Encoding"),
+            ]
+            await send({**held, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+        
+        await self.app(scope, receive, send_compressed)
+
+
+app = FastAPI(default_response_class=FastJSONResponse)
+
+class ResponseCache(dict):
+    """
+    {key: (data, datetime)}. Entries written by a request that ran over its upstream budget hold partial
+    data, so they are stored as already expired: usable as a stale fallback, never served as a fresh hit.
+    """
+    
+    def __setitem__(self, key, value):
+        timings = _request_timings.get()
+        if timings is not None and timings.upstream_refused and isinstance(value, tuple) and len(value) == 2:
+            value = (value[0], datetime.min)
+        previous = self.get(key)
+        if isinstance(previous, tuple) and isinstance(value, tuple) and previous[0] is not value[0]:
+            # New data under the key - its old encoded form can go now instead of waiting for LRU eviction
+            forget_encoded_entry(key)
+        super().__setitem__(key, value)
+
 
 # Simple in-memory cache (expires after 2 hours)
-cache = {}
+cache = ResponseCache()
 CACHE_DURATION = timedelta(hours=2)
+CACHE_MISS = object()  # get_cached() default for namespaces that cache None as a valid value
+
+
+def get_cached(namespace: str, cache_key: str, ttl: timedelta, default=None):
+    """
+    Return the `cache` entry for `cache_key` if younger than `ttl`, else `default` (hit/miss counted per namespace).
+    A request that has used up its upstream budget gets expired entries too ("stale").
+    """
+    started = time.perf_counter()
+    entry = cache.get(cache_key)
+    if entry is not None and datetime.now() - entry[1] < ttl:
+        result = "hit"
+    elif entry is not None and _upstream_budget_exhausted():
+        result = "stale"
+    else:
+        result = "miss"
+    cache_lookups.inc(namespace, result)
+    record_span("cache", started)
+    return entry[0] if result != "miss" else default
+
+
+def _upstream_budget_exhausted() -> bool:
+    timings = _request_timings.get()
+    return (
+        timings is not None and timings.upstream_budget is not None
+        and timings.upstream_calls >= timings.upstream_budget
+    )
 
 # Error caches to avoid repeated failed API calls
 # Cache for yfinance errors (e.g., "symbol may be delisted")
@@ -195,6 +1059,303 @@ SENTIMENT_403_TTL = timedelta(hours=24)  # Cache 403 errors for 24 hours
 price_changes_error_cache = {}  # {symbol: datetime}
 PRICE_CHANGES_ERROR_TTL = timedelta(hours=1)  # Cache errors for 1 hour
 
+# Finnhub quotes change by the minute - short TTL, shared by analyst data and AI summary
+QUOTE_CACHE_TTL = timedelta(seconds=60)
+
+# Finnhub /stock/metric payloads (fundamentals, dividends, data checks) - updated at most daily
+METRIC_CACHE_TTL = timedelta(hours=6)
+
+# Per-symbol data availability for /api/check-data - negatives expire sooner (short check timeouts)
+data_availability_cache = {}  # {symbol: (result, datetime)}
+DATA_AVAILABILITY_TTL = timedelta(hours=6)
+DATA_UNAVAILABLE_TTL = timedelta(minutes=30)
+
+# ===========================================
+# Upstream HTTP Session & Finnhub Quota Governor
+# ===========================================
+
+# Finnhub free tier allows 60 calls/minute. All Finnhub requests draw from one token bucket:
+# interactive requests never wait (they may run the bucket into debt), background jobs wait
+# until the bucket is above a reserve so they only use quota users are not using.
+FINNHUB_RATE_LIMIT_PER_MINUTE = int(os.getenv("FINNHUB_RATE_LIMIT_PER_MINUTE", "60"))
+FINNHUB_BACKGROUND_RESERVE = 0.3  # Share of the bucket background jobs leave for users
+
+_finnhub_background = ContextVar("finnhub_background", default=False)
+
+
+class FinnhubQuotaGovernor:
+    """Token bucket shared by every Finnhub request of this process."""
+    
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def acquire(self, background: bool = False, timeout: float = None) -> bool:
+        """Take one token. Background callers block until the bucket is above the reserve."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        reserve = self.capacity * FINNHUB_BACKGROUND_RESERVE if background else None
+        while True:
+            with self.lock:
+                self._refill()
+                if reserve is None or self.tokens - 1 >= reserve:
+                    # Debt is capped so a burst of user traffic can't starve background jobs for long
+                    self.tokens = max(self.tokens - 1, -self.capacity)
+                    return True
+                wait = (reserve + 1 - self.tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+    
+    def penalize(self):
+        """Finnhub answered 429 - drain the bucket so background work backs off."""
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, 0.0)
+    
+    def available(self) -> float:
+        with self.lock:
+            self._refill()
+            return self.tokens
+
+
+finnhub_quota = FinnhubQuotaGovernor(FINNHUB_RATE_LIMIT_PER_MINUTE)
+
+
+@contextmanager
+def finnhub_background():
+    """Mark Finnhub requests made inside this block (in this thread/task) as background work."""
+    token = _finnhub_background.set(True)
+    try:
+        yield
+    finally:
+        _finnhub_background.reset(token)
+
+
+# Record/replay of upstream traffic ("cassettes"): UPSTREAM_CASSETTE_MODE=record appends every
+# outbound exchange to a gzip'd JSON-lines archive (API keys scrubbed); =replay serves responses
+# from it with their recorded latency instead of touching the network.
+UPSTREAM_CASSETTE_MODE = os.getenv("UPSTREAM_CASSETTE_MODE", "").lower()
+UPSTREAM_CASSETTE_PATH = os.getenv("UPSTREAM_CASSETTE_PATH", str(Path(__file__).resolve().parent / "upstream_cassette.jsonl.gz"))
+# Replay latency multiplier: 1 = as recorded, 0 = as fast as possible
+UPSTREAM_CASSETTE_SPEED = float(os.getenv("UPSTREAM_CASSETTE_SPEED", "1"))
+
+CASSETTE_SECRET_PARAMS = {"token", "key", "apikey", "api_key", "crumb"}
+# Date-window parameters (company-news, earnings calendar) are ignored when matching, so a
+# recording made yesterday still replays today
+CASSETTE_VOLATILE_PARAMS = {"from", "to", "period1", "period2", "_"}
+CASSETTE_SECRET_HEADERS = {"x-finnhub-token", "x-goog-api-key", "authorization", "cookie"}
+# Bodies are stored decoded, so drop headers describing the wire encoding
+CASSETTE_DROPPED_RESPONSE_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "set-cookie", "connection"}
+
+
+def scrub_url(url: str, dropped: set = CASSETTE_SECRET_PARAMS) -> str:
+    """URL without credential query parameters (or any other `dropped` ones)."""
+    parts = urlsplit(url)
+    if not parts.query:
+        return url
+    query = "&".join(
+        pair for pair in parts.query.split("&")
+        if pair.split("=", 1)[0].lower() not in dropped
+    )
+    return parts._replace(query=query).geturl()
+
+
+def cassette_match_url(url: str) -> str:
+    return scrub_url(url, CASSETTE_SECRET_PARAMS | CASSETTE_VOLATILE_PARAMS)
+
+
+class UpstreamCassette:
+    """Append-only recorder / in-memory player for upstream HTTP exchanges."""
+    
+    def __init__(self, mode: str, path: str):
+        self.mode = mode
+        self.path = path
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.recorded = 0
+        self._file = None
+        self._entries = {}  # {(method, match url, body digest): [entry, ...]} in recorded order
+        self._entries_any_body = {}  # {(method, match url): [entry, ...]} for POSTs whose body changed
+        self._positions = {}
+    
+    @staticmethod
+    def body_digest(request) -> str:
+        body = request.body or b""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        return hashlib.blake2b(body, digest_size=8).hexdigest() if body else ""
+    
+    # --- record ---
+    
+    def record(self, request, response, elapsed: float):
+        # Reading .content buffers streamed bodies too (the caller's iter_lines then reads the buffer)
+        content = response.content
+        try:
+            body, encoding = content.decode("utf-8"), "text"
+        except UnicodeDecodeError:
+            body, encoding = base64.b64encode(content).decode("ascii"), "base64"
+        entry = {
+            "at": round(time.time() - self.started, 3),
+            "method": request.method,
+            "url": scrub_url(request.url),
+            "bodyDigest": self.body_digest(request),
+            "status": response.status_code,
+            "headers": {
+                name: value for name, value in response.headers.items()
+                if name.lower() not in CASSETTE_DROPPED_RESPONSE_HEADERS and name.lower() not in CASSETTE_SECRET_HEADERS
+            },
+            "elapsed": round(elapsed, 4),
+            "bodyEncoding": encoding,
+            "body": body,
+        }
+        line = (dumps_json(entry) + b"\n")
+        with self.lock:
+            if self._file is None:
+                # Appending adds a new gzip member - still one valid archive
+                self._file = gzip.open(self.path, "ab", compresslevel=6)
+                atexit.register(self.close)
+            self._file.write(line)
+            self.recorded += 1
+            if self.recorded % 100 == 0:
+                self._file.flush()
+    
+    def close(self):
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                logger.info("[Cassette] Recorded %s upstream exchanges to %s", self.recorded, self.path)
+    
+    # --- replay ---
+    
+    def load(self):
+        count = 0
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                match_url = cassette_match_url(entry["url"])
+                self._entries.setdefault((entry["method"], match_url, entry["bodyDigest"]), []).append(entry)
+                self._entries_any_body.setdefault((entry["method"], match_url), []).append(entry)
+                count += 1
+        logger.info("[Cassette] Replaying %s upstream exchanges (%s distinct requests) from %s", count, len(self._entries), self.path)
+    
+    def replay(self, request):
+        """Recorded response for this request; repeated requests walk through the recordings, then repeat the last."""
+        match_url = cassette_match_url(request.url)
+        key = (request.method, match_url, self.body_digest(request))
+        entries = self._entries.get(key)
+        if not entries:
+            # e.g. a Gemini prompt that embeds today's date
+            key = (request.method, match_url)
+            entries = self._entries_any_body.get(key)
+        if not entries:
+            raise requests.exceptions.ConnectionError(f"No cassette recording for {request.method} {scrub_url(request.url)}", request=request)
+        with self.lock:
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+        entry = entries[min(position, len(entries) - 1)]
+        if UPSTREAM_CASSETTE_SPEED > 0:
+            time.sleep(entry["elapsed"] * UPSTREAM_CASSETTE_SPEED)
+        
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.headers = requests.structures.CaseInsensitiveDict(entry["headers"])
+        response._content = base64.b64decode(entry["body"]) if entry["bodyEncoding"] == "base64" else entry["body"].encode("utf-8")
+        response._content_consumed = True
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.reason = "Replayed"
+        response.elapsed = timedelta(seconds=entry["elapsed"])
+        return response
+
+
+upstream_cassette = None
+if UPSTREAM_CASSETTE_MODE in ("record", "replay"):
+    upstream_cassette = UpstreamCassette(UPSTREAM_CASSETTE_MODE, UPSTREAM_CASSETTE_PATH)
+    if UPSTREAM_CASSETTE_MODE == "replay":
+        upstream_cassette.load()
+    else:
+        logger.info("[Cassette] Recording upstream exchanges to %s", UPSTREAM_CASSETTE_PATH)
+elif UPSTREAM_CASSETTE_MODE:
+    logger.warning("[Cassette] Unknown UPSTREAM_CASSETTE_MODE '%s' (expected record or replay), ignoring", UPSTREAM_CASSETTE_MODE)
+
+
+class InstrumentedAdapter(HTTPAdapter):
+    """Transport adapter recording call counts, status and latency per upstream host (and per request)."""
+    
+    @staticmethod
+    def charge_request_budget(request, host: str):
+        """Count the call against the current request's upstream budget, raise if it is used up."""
+        if getattr(request, "budget_charged", False):
+            return
+        request.budget_charged = True
+        timings = _request_timings.get()
+        if timings is not None and not timings.charge_upstream():
+            upstream_requests_total.inc(host, "budget")
+            raise UpstreamBudgetExceeded(
+                f"Upstream budget of {timings.upstream_budget} calls used up for this request", request=request
+            )
+    
+    def send(self, request, **kwargs):
+        host = urlsplit(request.url).hostname or "unknown"
+        self.charge_request_budget(request, host)
+        started = time.perf_counter()
+        try:
+            if upstream_cassette is not None and upstream_cassette.mode == "replay":
+                response = upstream_cassette.replay(request)
+            else:
+                response = super().send(request, **kwargs)
+                if upstream_cassette is not None:
+                    upstream_cassette.record(request, response, time.perf_counter() - started)
+        except Exception:
+            upstream_requests_total.inc(host, "error")
+            record_span(upstream_span_name(host), started)
+            raise
+        upstream_requests_total.inc(host, str(response.status_code))
+        upstream_request_duration.observe(time.perf_counter() - started, host)
+        record_span(upstream_span_name(host), started)
+        return response
+
+
+class FinnhubQuotaAdapter(InstrumentedAdapter):
+    """Transport adapter that charges every Finnhub request to the quota governor."""
+    
+    def send(self, request, **kwargs):
+        if upstream_cassette is not None and upstream_cassette.mode == "replay":
+            # Recorded latencies already reflect the quota; nothing real is spent
+            return super().send(request, **kwargs)
+        # Before taking a quota token - a call refused by the request budget must not spend one
+        self.charge_request_budget(request, urlsplit(request.url).hostname or "unknown")
+        started = time.perf_counter()
+        finnhub_quota.acquire(background=_finnhub_background.get())
+        record_span("finnhub-quota", started)
+        response = super().send(request, **kwargs)
+        if response.status_code == 429:
+            logger.warning("[FinnhubQuota] Finnhub returned 429, draining quota bucket")
+            finnhub_quota.penalize()
+        return response
+
+
+# Shared session: keep-alive connection pools for all upstream APIs (heatmaps fan out to 30 threads)
+http_session = requests.Session()
+http_session.mount("https://", InstrumentedAdapter(pool_connections=20, pool_maxsize=32))
+http_session.mount("http://", InstrumentedAdapter(pool_connections=20, pool_maxsize=32))
+http_session.mount(FINNHUB_BASE_URL, FinnhubQuotaAdapter(pool_connections=1, pool_maxsize=32))
+
 # ===========================================
 # Rate Limiting Configuration (from environment)
 # ===========================================
@@ -280,6 +1441,9 @@ def validate_symbol(symbol: str) -> str:
     
     return symbol
 
+# Compress uncached JSON responses (cached ones carry precompressed variants)
+app.add_middleware(CompressionMiddleware)
+
 # Enable CORS - UPDATE FOR PRODUCTION!
 # In production, replace "*" with your actual domain(s)
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "*").split(",")
@@ -291,66 +1455,142 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Error handling middleware
-@app.middleware("http")
-async def error_handling_middleware(request: Request, call_next):
-    try:
-        response = await call_next(request)
-        return response
-    except HTTPException:
-        # Re-raise HTTP exceptions (they're intentional)
-        raise
-    except Exception as e:
-        # Log unexpected errors without exposing sensitive information
-        logger.error(f"Unexpected error in {request.url.path}: {type(e).__name__}", exc_info=True)
-        # Don't expose internal error details in production
-        if os.getenv("ENVIRONMENT") == "production":
-            raise HTTPException(status_code=500, detail="Internal server error")
-        else:
-            raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
-
-# Security headers middleware
-@app.middleware("http")
-async def add_security_headers(request: Request, call_next):
-    response = await call_next(request)
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-Frame-Options"] = "DENY"
-    response.headers["X-XSS-Protection"] = "1; mode=block"
-    response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-    return response
-
-# Session remaining header middleware
-@app.middleware("http")
-async def add_session_remaining_header(request: Request, call_next):
-    response = await call_next(request)
-    
-    # Only add header for successful API responses
-    if response.status_code >= 200 and response.status_code < 300:
-        # Check if this is an API endpoint that uses session rate limiting
-        path = request.url.path
-        if path.startswith("/api/"):
-            # Get client IP
-            client_ip = get_remote_address(request)
-            
-            # Check if session exists and is active
-            if client_ip in session_rate_limit_cache:
-                entry = session_rate_limit_cache[client_ip]
-                now = time.time()
-                
-                # Check if session is active (not in cooldown and session_end exists and is in future)
-                if entry.get('session_end') and now < entry['session_end']:
-                    session_remaining = int(entry['session_end'] - now)
-                    response.headers["X-Session-Remaining"] = str(session_remaining)
-                else:
-                    # No active session (either expired or in cooldown)
-                    response.headers["X-Session-Remaining"] = "0"
-            else:
-                # No session in cache - check if we should have started one
-                # For endpoints that start sessions, the session should now be in cache
-                # If not, it means the endpoint doesn't use session rate limiting
-                response.headers["X-Session-Remaining"] = "0"
+# ===========================================
+# Response Middleware
+# ===========================================
+
+SECURITY_HEADERS = [
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"x-xss-protection", b"1; mode=block"),
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+]
+_SECURITY_HEADER_NAMES = {name for name, _ in SECURITY_HEADERS}
+
+
+def get_scope_client_ip(scope) -> str:
+    """get_remote_address() for a raw ASGI scope (no Request object needed)."""
+    forwarded = real_ip = None
+    for name, value in scope["headers"]:
+        if name == b"x-forwarded-for":
+            forwarded = value
+        elif name == b"x-real-ip":
+            real_ip = value
+    if forwarded:
+        return forwarded.decode("latin-1").split(",")[0].strip()
+    if real_ip:
+        return real_ip.decode("latin-1")
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def session_remaining_header(scope) -> bytes:
+    """X-Session-Remaining value: seconds left in the client's active session, else 0."""
+    if not session_rate_limit_cache:
+        return b"0"
+    entry = session_rate_limit_cache.get(get_scope_client_ip(scope))
+    if entry and entry.get('session_end'):
+        remaining = entry['session_end'] - time.time()
+        if remaining > 0:
+            return str(int(remaining)).encode("latin-1")
+    return b"0"
+
+
+class ResponseHeadersMiddleware:
+    """
+    Single pure-ASGI layer for error handling, security headers, X-Session-Remaining and request metrics.
+    Headers are added to the http.response.start message; the body is passed through untouched,
+    so there is no per-request task or streaming wrapper as with @app.middleware("http").
+    """
+    
+    def __init__(self, app):
+        self.app = app
     
-    return response
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        global http_requests_in_flight
+        http_requests_in_flight += 1
+        started = time.perf_counter()
+        response_started = False
+        status = 500
+        streaming = False
+        # Per-request timing spans for API calls (static files and the SPA shell are not worth it)
+        timings = RequestTimings(upstream_budget_for(scope["path"])) if scope["path"].startswith("/api/") else None
+        timings_token = _request_timings.set(timings)
+        
+        async def send_with_headers(message):
+            nonlocal response_started, status, streaming
+            if message["type"] == "http.response.start":
+                response_started = True
+                status = message["status"]
+                for name, value in message.get("headers", []):
+                    if name.lower() == b"content-type":
+                        streaming = value.startswith(b"text/event-stream")
+                headers = [(k, v) for k, v in message.get("headers", []) if k.lower() not in _SECURITY_HEADER_NAMES]
+                headers += SECURITY_HEADERS
+                # Session header only for successful API responses (session rate limited endpoints)
+                if 200 <= message["status"] < 300 and scope["path"].startswith("/api/"):
+                    headers = [(k, v) for k, v in headers if k.lower() != b"x-session-remaining"]
+                    headers.append((b"x-session-remaining", session_remaining_header(scope)))
+                if timings is not None and not streaming:
+                    headers.append((b"server-timing", timings.server_timing(time.perf_counter()).encode("latin-1")))
+                    headers.append((b"x-upstream-calls", timings.upstream_header().encode("latin-1")))
+                    if timings.upstream_budget is not None:
+                        headers.append((b"x-upstream-budget", str(timings.upstream_budget).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_headers)
+        except Exception as e:
+            # Log unexpected errors without exposing sensitive information
+            logger.error("Unexpected error in %s: %s", scope['path'], type(e).__name__, exc_info=True)
+            if response_started:
+                raise
+            # Don't expose internal error details in production
+            if os.getenv("ENVIRONMENT") == "production":
+                detail = "Internal server error"
+            else:
+                detail = f"Internal server error: {str(e)}"
+            response = FastJSONResponse({"detail": detail}, status_code=500)
+            await response(scope, receive, send_with_headers)
+        finally:
+            http_requests_in_flight -= 1
+            _request_timings.reset(timings_token)
+            finished = time.perf_counter()
+            # Route templates ("/api/fundamentals/{symbol}") keep label cardinality bounded
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            http_requests_total.inc(route_path, scope["method"], str(status))
+            if timings is not None:
+                upstream_calls_per_request.observe(timings.upstream_calls, route_path)
+                if timings.upstream_refused:
+                    upstream_budget_refused_total.inc(route_path, amount=timings.upstream_refused)
+                    log_sampled(
+                        f"upstream_budget_{route_path}", logging.WARNING,
+                        "[Upstream Budget] %s used its budget of %s calls, refused %s more",
+                        scope["path"], timings.upstream_budget, timings.upstream_refused,
+                    )
+            if not streaming:
+                http_request_duration.observe(finished - started, route_path, scope["method"])
+                if timings is not None and finished - started >= SLOW_REQUEST_THRESHOLD:
+                    slow_requests.append({
+                        "path": scope["path"],
+                        "query": scope.get("query_string", b"").decode("latin-1"),
+                        "method": scope["method"],
+                        "status": status,
+                        "at": datetime.now().isoformat(timespec="seconds"),
+                        "durationMs": round((finished - started) * 1000, 1),
+                        "upstreamCalls": timings.upstream_calls,
+                        "spans": {name: {"ms": round(seconds * 1000, 1), "count": count}
+                                  for name, (seconds, count) in timings.summary(finished).items()},
+                    })
+
+
+app.add_middleware(ResponseHeadersMiddleware)
 
 # Root API health check (different from SPA root)
 @app.get("/api/health")
@@ -358,6 +1598,155 @@ def api_health():
     return {"message": "Python Finnhub Backend", "status": "running"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint (text exposition format). Served on the backend port only, not proxied by Node."""
+    return Response(content=render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+# ===========================================
+# Admin Diagnostics
+# ===========================================
+
+# Admin endpoints are disabled (404) unless ADMIN_TOKEN is set; callers send it as X-Admin-Token.
+# They live on the backend port only - the Node proxy does not forward /api/admin.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+
+def require_admin(request: Request):
+    """Raise unless the request carries the admin token."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not found")
+    supplied = request.headers.get("X-Admin-Token", "")
+    if not hmac.compare_digest(supplied.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+@app.get("/api/admin/slow-requests")
+async def get_slow_requests(request: Request, limit: int = 20):
+    """
+    Slowest recent API requests (above SLOW_REQUEST_THRESHOLD_MS) with their Server-Timing spans.
+    Taken from a ring buffer of the last SLOW_REQUEST_LOG_SIZE slow requests.
+    """
+    require_admin(request)
+    entries = sorted(slow_requests, key=lambda entry: entry["durationMs"], reverse=True)
+    return {
+        "thresholdMs": SLOW_REQUEST_THRESHOLD * 1000,
+        "buffered": len(slow_requests),
+        "requests": entries[:max(1, limit)],
+    }
+
+
+PROFILE_MAX_SECONDS = 60
+# Only one profile at a time per worker - the sampler itself should never become the CPU spike
+profile_lock = threading.Lock()
+
+
+class StackSampler:
+    """
+    Statistical profiler: a daemon thread snapshots every thread's Python stack
+    (sys._current_frames) at a fixed interval and counts identical stacks.
+    Nothing is installed in the profiled threads, so the cost is one frame walk
+    per thread per sample, paid by the sampler thread alone.
+    """
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self._labels = {}
+        self._stop = threading.Event()
+    
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            # ';' separates frames in the collapsed format
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ",")
+            self._labels[code] = label
+        return label
+    
+    def _sample(self):
+        own_ident = threading.get_ident()
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            frames = []
+            while frame is not None:
+                frames.append(self._label(frame.f_code))
+                frame = frame.f_back
+            frames.append(thread_names.get(ident, f"thread-{ident}").replace(";", ","))
+            stack = ";".join(reversed(frames))
+            self.stacks[stack] = self.stacks.get(stack, 0) + 1
+        self.samples += 1
+    
+    def run(self, duration: float):
+        """Sample until `duration` seconds have passed (blocking - call from a worker thread)."""
+        deadline = time.perf_counter() + duration
+        next_sample = time.perf_counter()
+        while not self._stop.is_set():
+            self._sample()
+            next_sample += self.interval
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            # If a sample overran the interval, skip ahead instead of sampling back-to-back
+            if next_sample < now:
+                next_sample = now
+            self._stop.wait(min(next_sample, deadline) - now)
+    
+    def stop(self):
+        self._stop.set()
+    
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded format ("thread;outer;...;inner count"), ready for flamegraph.pl / speedscope."""
+        lines = [f"{stack} {count}" for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1])]
+        return "\n".join(lines) + "\n"
+
+
+@app.get("/api/admin/profile")
+async def profile_workers(request: Request, seconds: float = 5, interval_ms: float = 10, format: str = "collapsed"):
+    """
+    Sample the stacks of every thread in this worker (event loop, executor threads
+    blocked in requests.get, background tasks) for `seconds` and return them as
+    collapsed stacks (text) or, with format=json, as a list sorted by sample count.
+    """
+    require_admin(request)
+    if format not in ("collapsed", "json"):
+        raise HTTPException(status_code=400, detail="format must be 'collapsed' or 'json'")
+    seconds = min(max(seconds, 0.1), PROFILE_MAX_SECONDS)
+    interval = min(max(interval_ms, 1), 1000) / 1000
+    if not profile_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    
+    sampler = StackSampler(interval)
+    try:
+        logger.info("[Profile] Sampling all threads for %.1fs every %.0fms", seconds, interval * 1000)
+        # A dedicated thread, not the executor - a saturated pool is exactly what we may be profiling
+        thread = threading.Thread(target=sampler.run, args=(seconds,), name="stack-sampler", daemon=True)
+        thread.start()
+        try:
+            while thread.is_alive():
+                await asyncio.sleep(0.05)
+        finally:
+            # Client went away or the server is shutting down
+            sampler.stop()
+    finally:
+        profile_lock.release()
+    
+    if format == "collapsed":
+        return Response(content=sampler.collapsed(), media_type="text/plain")
+    return {
+        "seconds": seconds,
+        "intervalMs": interval * 1000,
+        "samples": sampler.samples,
+        "stacks": [
+            {"stack": stack.split(";"), "count": count}
+            for stack, count in sorted(sampler.stacks.items(), key=lambda item: -item[1])
+        ],
+    }
+
+
 # Frontend config endpoint - NO API keys exposed
 @app.get("/api/config")
 def get_config():
@@ -410,30 +1799,38 @@ async def start_session(request: Request):
     }
 
 
-def _check_fundamentals(symbol: str) -> bool:
-    """Check if Finnhub fundamentals are available."""
+def _check_fundamentals(symbol: str, timeout: float = 1.5, store: bool = True):
+    """
+    Check if Finnhub fundamentals are available (uses the shared metric store).
+    Returns None if the check itself failed (timeout, 429, 5xx) - that says nothing about the symbol.
+    """
     try:
-        url = f"{FINNHUB_BASE_URL}/stock/metric?symbol={symbol}&metric=all&token={FINNHUB_API_KEY}"
-        resp = requests.get(url, timeout=1.5)
-        if resp.status_code == 200:
-            metrics = resp.json().get("metric", {})
-            return bool(metrics.get("peBasicExclExtraTTM") or metrics.get("peTTM") or 
-                       metrics.get("marketCapitalization") or metrics.get("revenuePerShareTTM"))
-    except:
-        pass
+        metric_data = fetch_finnhub_metrics(symbol, timeout=timeout, store=store, raise_transient=True)
+    except Exception:
+        return None
+    if metric_data:
+        metrics = metric_data.get("metric") or {}
+        return bool(metrics.get("peBasicExclExtraTTM") or metrics.get("peTTM") or 
+                   metrics.get("marketCapitalization") or metrics.get("revenuePerShareTTM"))
     return False
 
-def _check_price(symbol: str) -> bool:
-    """Check if Yahoo Finance price data is available."""
+def _check_price(symbol: str, timeout: float = 1.5):
+    """Check if Yahoo Finance price data is available (None if the check itself failed)."""
+    # A fresh cached Finnhub quote with a price already answers this without a request
+    quote_data = get_cached("quote", f"quote_{symbol}", QUOTE_CACHE_TTL)
+    if quote_data and quote_data.get("c"):
+        return True
     try:
-        url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}?interval=1d&range=1d"
-        resp = requests.get(url, timeout=1.5, headers={"User-Agent": "Mozilla/5.0"})
+        url = f"{YAHOO_BASE_URL}/v8/finance/chart/{symbol}?interval=1d&range=1d"
+        resp = http_session.get(url, timeout=timeout, headers={"User-Agent": "Mozilla/5.0"})
+        if resp.status_code == 429 or resp.status_code >= 500:
+            return None
         if resp.status_code == 200:
             result = resp.json().get("chart", {}).get("result")
             if result and len(result) > 0:
                 return result[0].get("meta", {}).get("regularMarketPrice") is not None
-    except:
-        pass
+    except Exception:
+        return None
     return False
 
 def check_data_availability(symbol: str) -> dict:
@@ -442,73 +1839,606 @@ def check_data_availability(symbol: str) -> dict:
     Runs both checks in parallel for speed.
     """
     with ThreadPoolExecutor(max_workers=2) as executor:
-        fund_future = executor.submit(_check_fundamentals, symbol)
-        price_future = executor.submit(_check_price, symbol)
+        fund_future = executor.submit(with_request_context(_check_fundamentals), symbol)
+        price_future = executor.submit(with_request_context(_check_price), symbol)
         
         has_fundamentals = fund_future.result()
         has_price = price_future.result()
     
-    is_complete = has_fundamentals and has_price
+    is_complete = bool(has_fundamentals and has_price)
+    result = {"score": 1 if is_complete else 0, "full": is_complete, "maxScore": 1}
+    # Negatives are only cached when confirmed - a failed check (timeout, 429) is retried on the next request
+    if is_complete or has_fundamentals is False or has_price is False:
+        data_availability_cache[symbol] = (result, datetime.now())
+    # The bitmap only takes definite answers for both checks
+    if has_fundamentals is not None and has_price is not None:
+        record_data_availability(symbol, has_fundamentals, has_price)
+    return result
+
+
+def get_cached_data_availability(symbol: str):
+    """Cached availability result for a symbol, or None if unknown/expired."""
+    known = lookup_data_availability(symbol)
+    if known is not None:
+        cache_lookups.inc("data_availability", "hit")
+        return known
+    if symbol in data_availability_cache:
+        cached_data, cached_time = data_availability_cache[symbol]
+        ttl = DATA_AVAILABILITY_TTL if cached_data["full"] else DATA_UNAVAILABLE_TTL
+        if datetime.now() - cached_time < ttl:
+            cache_lookups.inc("data_availability", "hit")
+            return cached_data
+    cache_lookups.inc("data_availability", "miss")
+    return None
+
+
+@app.get("/api/check-data")
+async def check_data_endpoint(symbols: str = "", request: Request = None):
+    """
+    Check data availability for a list of symbols (comma-separated).
+    Returns scores for each symbol.
+    Cached per symbol, so overlapping symbol sets only check the symbols not seen yet.
+    """
+    if not symbols:
+        return {"scores": {}}
+    
+    symbol_list = list(dict.fromkeys(s.strip().upper() for s in symbols.split(",") if s.strip()))[:20]
+    
+    if not symbol_list:
+        return {"scores": {}}
+    
+    scores = {}
+    missing = []
+    for symbol in symbol_list:
+        cached_result = get_cached_data_availability(symbol)
+        if cached_result is not None:
+            scores[symbol] = cached_result
+        else:
+            missing.append(symbol)
+    
+    if missing:
+        logger.debug("[DataCheck] Checking %s of %s symbols: %s", len(missing), len(symbol_list), missing)
+        
+        # Check in parallel, off the event loop
+        def check_all():
+            with ThreadPoolExecutor(max_workers=5) as executor:
+                return list(executor.map(with_request_context(check_data_availability), missing))
+        
+        for symbol, result in zip(missing, await asyncio.to_thread(check_all)):
+            scores[symbol] = result
+    else:
+        logger.debug("[DataCheck] Returning cached data for %s symbols", len(symbol_list))
+    
+    result = {"scores": {symbol: scores[symbol] for symbol in symbol_list}}
+    logger.debug("[DataCheck] Results: %s", [(s, result['scores'][s]['score']) for s in symbol_list])
+    return result
+
+
+# ===========================================
+# Symbol Search Index
+# ===========================================
+# In-process index over Finnhub /stock/symbol snapshots so typeahead search never waits on Finnhub.
+# The index is persisted to SYMBOL_INDEX_PATH and memory-mapped on startup, refreshes swap it atomically.
+# Entries are ordered by static rank (no dot, shorter symbol first), so within every relevance
+# tier the lowest entry ids are the best results. All lookups are bisects on sorted key arrays.
+
+SYMBOL_INDEX_EXCHANGES = [e.strip().upper() for e in os.getenv("SYMBOL_INDEX_EXCHANGES", "US").split(",") if e.strip()]
+SYMBOL_INDEX_REFRESH_HOURS = float(os.getenv("SYMBOL_INDEX_REFRESH_HOURS", "24"))
+SYMBOL_INDEX_RETRY_SECONDS = 15 * 60
+SYMBOL_INDEX_PATH = os.getenv("SYMBOL_INDEX_PATH", str(Path(__file__).resolve().parent / "symbol_index.bin"))
+SYMBOL_INDEX_TYPES = {"Common Stock", "ADR", "ETF", "ETP", ""}
+
+# Data availability bitmap: one flag byte per index entry, refreshed in slow rolling batches
+AVAILABILITY_CHECKED = 1
+AVAILABILITY_FUNDAMENTALS = 2
+AVAILABILITY_PRICE = 4
+AVAILABILITY_BATCH_SIZE = int(os.getenv("AVAILABILITY_BATCH_SIZE", "20"))  # 0 disables the job
+AVAILABILITY_BATCH_SECONDS = int(os.getenv("AVAILABILITY_BATCH_SECONDS", "60"))
+AVAILABILITY_PATH = f"{SYMBOL_INDEX_PATH}.avail"
+
+# Highest key for prefix ranges (sorts after every character used in symbols and names)
+_PREFIX_END = "\uffff"
+
+
+def _availability_score(flags: int):
+    """
+    Data score in the /api/check-data format, None if the symbol was never checked.
+    Entries are only written from definite probe results - a failed probe (None) never marks a symbol unavailable.
+    """
+    if not flags & AVAILABILITY_CHECKED:
+        return None
+    is_complete = bool(flags & AVAILABILITY_FUNDAMENTALS and flags & AVAILABILITY_PRICE)
     return {"score": 1 if is_complete else 0, "full": is_complete, "maxScore": 1}
 
 
-@app.get("/api/check-data")
-async def check_data_endpoint(symbols: str = "", request: Request = None):
-    """
-    Check data availability for a list of symbols (comma-separated).
-    Returns scores for each symbol.
-    Aggressively cached to reduce redundant API calls.
-    """
-    if not symbols:
-        return {"scores": {}}
-    
-    symbol_list = [s.strip().upper() for s in symbols.split(",") if s.strip()][:10]
-    
-    if not symbol_list:
-        return {"scores": {}}
-    
-    # Check cache first - cache key is sorted symbol list for consistency
-    cache_key = f"check_data_{','.join(sorted(symbol_list))}"
-    if cache_key in cache:
-        cached_data, cached_time = cache[cache_key]
-        # Cache for 5 minutes (check-data doesn't change frequently)
-        if datetime.now() - cached_time < timedelta(minutes=5):
-            print(f"[DataCheck] Returning cached data for {len(symbol_list)} symbols")
-            return cached_data
-    
-    print(f"[DataCheck] Checking {len(symbol_list)} symbols: {symbol_list}")
-    
-    # Check in parallel
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        results = list(executor.map(check_data_availability, symbol_list))
-    
-    scores = {}
-    for i, symbol in enumerate(symbol_list):
-        scores[symbol] = results[i]
-    
-    result = {"scores": scores}
-    
-    # Cache the result for 5 minutes
-    cache[cache_key] = (result, datetime.now())
-    
-    print(f"[DataCheck] Results: {[(s, scores[s]['score']) for s in scores]}")
-    return result
+def _symbol_name_words(name: str):
+    """Start offsets of the words of a lowercased name (after the first word)."""
+    return [m.start() for m in re.finditer(r"(?<=[\s\-&/(])\w", name)]
+
+
+def _deletion_variants(token: str):
+    """The token itself plus every single-character deletion (SymSpell-style, edit distance 1)."""
+    variants = {token}
+    for i in range(len(token)):
+        variants.add(token[:i] + token[i + 1:])
+    return variants
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """True if a and b differ by at most one insertion, deletion, substitution or adjacent swap."""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        rest_a, rest_b = a[i + 1:], b[i + 1:]
+        if rest_a == rest_b:
+            return True
+        # Adjacent transposition ("APLP" -> "APPL")
+        return i + 1 < len(a) and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2:] == b[i + 2:]
+    return a[i:] == b[i + 1:]
+
+
+class _MappedStrings:
+    """Read-only sequence of strings backed by a memory-mapped offsets table and UTF-8 blob."""
+    
+    def __init__(self, buffer, offsets_start: int, count: int, blob_start: int, blob_size: int):
+        self._offsets = buffer[offsets_start:offsets_start + 4 * (count + 1)].cast("I")
+        self._blob = buffer[blob_start:blob_start + blob_size]
+        self._count = count
+    
+    def __len__(self):
+        return self._count
+    
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("string index out of range")
+        return str(self._blob[self._offsets[i]:self._offsets[i + 1]], "utf-8")
+
+
+class SymbolIndex:
+    """
+    Immutable search index. Relevance tiers match the former Finnhub-backed search:
+    exact symbol, symbol prefix, name prefix, word prefix inside the name, then typo-tolerant matches.
+    """
+    
+    MIN_FUZZY_LENGTH = 4
+    
+    def __init__(self, symbols, names, types, symbol_keys, symbol_ids, name_keys, name_ids,
+                 word_keys, word_ids, fuzzy_keys, fuzzy_ids, built_at):
+        self.symbols = symbols          # entry id -> display symbol
+        self.names = names              # entry id -> company name
+        self.types = types              # entry id -> security type
+        self.symbol_keys = symbol_keys  # sorted uppercase symbols
+        self.symbol_ids = symbol_ids
+        self.name_keys = name_keys      # sorted lowercase names
+        self.name_ids = name_ids
+        self.word_keys = word_keys      # sorted lowercase name suffixes starting at a word boundary
+        self.word_ids = word_ids
+        self.fuzzy_keys = fuzzy_keys    # sorted deletion variants of symbols and name words
+        self.fuzzy_ids = fuzzy_ids
+        self.built_at = built_at
+        self.availability = bytearray(len(symbols))  # entry id -> AVAILABILITY_* flags
+        self.availability_cursor = 0  # Next entry id for the rolling availability refresh
+    
+    def __len__(self):
+        return len(self.symbols)
+    
+    @classmethod
+    def build(cls, items, built_at=None):
+        """Build an index from Finnhub /stock/symbol items (dicts with symbol, description, type)."""
+        entries = {}
+        for item in items:
+            symbol = (item.get("displaySymbol") or item.get("symbol") or "").strip()
+            name = (item.get("description") or "").strip()
+            item_type = item.get("type") or ""
+            if not symbol or not name or item_type not in SYMBOL_INDEX_TYPES:
+                continue
+            entries.setdefault(symbol.upper(), (symbol, name, item_type))
+        
+        ordered = sorted(entries.values(), key=lambda e: ('.' in e[0], len(e[0]), e[0].upper()))
+        symbols = [e[0] for e in ordered]
+        names = [e[1] for e in ordered]
+        types = [e[2] for e in ordered]
+        
+        symbol_pairs = []
+        name_pairs = []
+        word_pairs = []
+        fuzzy_pairs = []
+        for entry_id, (symbol, name, _) in enumerate(ordered):
+            symbol_upper = symbol.upper()
+            name_lower = name.lower()
+            symbol_pairs.append((symbol_upper, entry_id))
+            name_pairs.append((name_lower, entry_id))
+            for start in _symbol_name_words(name_lower):
+                word_pairs.append((name_lower[start:], entry_id))
+            
+            tokens = {symbol_upper.lower()}
+            tokens.update(w for w in re.findall(r"\w+", name_lower)[:3] if len(w) >= cls.MIN_FUZZY_LENGTH)
+            variants = set()
+            for token in tokens:
+                variants.update(_deletion_variants(token))
+            fuzzy_pairs.extend((variant, entry_id) for variant in variants)
+        
+        def split(pairs):
+            pairs.sort()
+            return [key for key, _ in pairs], array("i", (entry_id for _, entry_id in pairs))
+        
+        return cls(symbols, names, types, *split(symbol_pairs), *split(name_pairs),
+                   *split(word_pairs), *split(fuzzy_pairs), built_at or datetime.now())
+    
+    # On-disk format: magic, uint32 header length, JSON header, then 8-byte aligned sections.
+    # String sections are a uint32 offsets table plus a UTF-8 blob, id sections are int32 arrays.
+    FILE_MAGIC = b"SYMIDX1\x00"
+    STRING_SECTIONS = ("symbols", "names", "types", "symbol_keys", "name_keys", "word_keys", "fuzzy_keys")
+    ID_SECTIONS = ("symbol_ids", "name_ids", "word_ids", "fuzzy_ids")
+    
+    def save(self, path: str):
+        """Write the index to `path` atomically (temp file + rename)."""
+        chunks = []
+        sections = {}
+        position = 0
+        
+        def add(data: bytes):
+            nonlocal position
+            start = position
+            padding = -len(data) % 8
+            chunks.append(data + b"\x00" * padding)
+            position += len(data) + padding
+            return start
+        
+        for name in self.STRING_SECTIONS:
+            encoded = [value.encode("utf-8") for value in getattr(self, name)]
+            offsets = array("I", [0])
+            for value in encoded:
+                offsets.append(offsets[-1] + len(value))
+            blob = b"".join(encoded)
+            sections[name] = {
+                "count": len(encoded),
+                "offsets": add(offsets.tobytes()),
+                "blob": add(blob),
+                "size": len(blob),
+            }
+        for name in self.ID_SECTIONS:
+            ids = getattr(self, name)
+            data = ids.tobytes() if isinstance(ids, array) else bytes(ids)
+            sections[name] = {"count": len(ids), "start": add(data)}
+        
+        header = json.dumps({
+            "byteorder": sys.byteorder,
+            "built_at": self.built_at.isoformat(),
+            "sections": sections,
+        }).encode("utf-8")
+        data_start = len(self.FILE_MAGIC) + 4 + len(header)
+        data_start += -data_start % 8
+        
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self.FILE_MAGIC)
+            f.write(len(header).to_bytes(4, "little"))
+            f.write(header)
+            f.write(b"\x00" * (data_start - f.tell()))
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path: str):
+        """Memory-map an index written by save(). Pages are loaded lazily by the OS on first access."""
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(mapped)
+        magic_size = len(cls.FILE_MAGIC)
+        if bytes(buffer[:magic_size]) != cls.FILE_MAGIC:
+            raise ValueError(f"{path} is not a symbol index file")
+        header_size = int.from_bytes(buffer[magic_size:magic_size + 4], "little")
+        header = json.loads(bytes(buffer[magic_size + 4:magic_size + 4 + header_size]))
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(f"{path} was written on a {header['byteorder']}-endian machine")
+        data_start = magic_size + 4 + header_size
+        data_start += -data_start % 8
+        
+        sections = header["sections"]
+        fields = {}
+        for name in cls.STRING_SECTIONS:
+            section = sections[name]
+            fields[name] = _MappedStrings(
+                buffer,
+                data_start + section["offsets"],
+                section["count"],
+                data_start + section["blob"],
+                section["size"],
+            )
+        for name in cls.ID_SECTIONS:
+            section = sections[name]
+            start = data_start + section["start"]
+            fields[name] = buffer[start:start + 4 * section["count"]].cast("i")
+        
+        return cls(built_at=datetime.fromisoformat(header["built_at"]), **fields)
+    
+    def entry_id(self, symbol: str):
+        """Entry id of an exact symbol, or None."""
+        symbol_upper = symbol.upper()
+        i = bisect_left(self.symbol_keys, symbol_upper)
+        if i < len(self.symbol_keys) and self.symbol_keys[i] == symbol_upper:
+            return self.symbol_ids[i]
+        return None
+    
+    @staticmethod
+    def _range(keys, low, high):
+        return bisect_left(keys, low), bisect_left(keys, high)
+    
+    def _collect(self, keys, ids, low, high, results, seen, limit):
+        start, end = self._range(keys, low, high)
+        if start == end:
+            return
+        candidates = ids[start:end]
+        if end - start > limit:
+            candidates = heapq.nsmallest(limit + len(seen), candidates)
+        else:
+            candidates = sorted(candidates)
+        for entry_id in candidates:
+            if entry_id not in seen:
+                seen.add(entry_id)
+                results.append(entry_id)
+                if len(results) >= limit:
+                    return
+    
+    def _collect_fuzzy(self, query_lower, results, seen, limit):
+        matches = set()
+        for variant in _deletion_variants(query_lower):
+            start, end = self._range(self.fuzzy_keys, variant, variant + "\x00")
+            for entry_id in self.fuzzy_ids[start:end]:
+                if entry_id in seen or entry_id in matches:
+                    continue
+                tokens = [self.symbols[entry_id].lower()] + re.findall(r"\w+", self.names[entry_id].lower())[:3]
+                if any(_within_one_edit(query_lower, token) for token in tokens):
+                    matches.add(entry_id)
+        for entry_id in sorted(matches)[:limit - len(results)]:
+            seen.add(entry_id)
+            results.append(entry_id)
+    
+    def search(self, query: str, limit: int = 10):
+        """Return up to `limit` results as dicts (symbol, name, type), best first."""
+        query_upper = query.upper()
+        query_lower = query.lower()
+        results = []
+        seen = set()
+        
+        # Priority 1 + 2: exact symbol match, then symbol starts with query
+        self._collect(self.symbol_keys, self.symbol_ids, query_upper, query_upper + "\x00", results, seen, limit)
+        if len(results) < limit:
+            self._collect(self.symbol_keys, self.symbol_ids, query_upper, query_upper + _PREFIX_END, results, seen, limit)
+        # Priority 3: name starts with query
+        if len(results) < limit:
+            self._collect(self.name_keys, self.name_ids, query_lower, query_lower + _PREFIX_END, results, seen, limit)
+        # Priority 4: a later word of the name starts with query
+        if len(results) < limit:
+            self._collect(self.word_keys, self.word_ids, query_lower, query_lower + _PREFIX_END, results, seen, limit)
+        # Priority 5: typo-tolerant match on symbol or leading name words
+        if len(results) < limit and len(query_lower) >= self.MIN_FUZZY_LENGTH:
+            self._collect_fuzzy(query_lower, results, seen, limit)
+        
+        output = []
+        for i in results:
+            item = {"symbol": self.symbols[i], "name": self.names[i], "type": self.types[i] or "Stock"}
+            score = _availability_score(self.availability[i])
+            if score is not None:
+                item["dataScore"] = score
+            output.append(item)
+        return output
+
+
+symbol_index = None  # Current SymbolIndex, replaced wholesale on refresh
+
+
+def lookup_data_availability(symbol: str):
+    """O(1)-ish availability lookup in the bitmap (None if not in the index or not checked yet)."""
+    index = symbol_index
+    if index is None:
+        return None
+    entry_id = index.entry_id(symbol)
+    if entry_id is None:
+        return None
+    return _availability_score(index.availability[entry_id])
+
+
+def record_data_availability(symbol: str, has_fundamentals: bool, has_price: bool):
+    index = symbol_index
+    if index is None:
+        return
+    entry_id = index.entry_id(symbol)
+    if entry_id is not None:
+        index.availability[entry_id] = (
+            AVAILABILITY_CHECKED
+            | (AVAILABILITY_FUNDAMENTALS if has_fundamentals else 0)
+            | (AVAILABILITY_PRICE if has_price else 0)
+        )
+
+
+def save_availability(index):
+    """Persist the bitmap next to the index file (header line with the index build time + raw flags)."""
+    header = json.dumps({"built_at": index.built_at.isoformat(), "cursor": index.availability_cursor}).encode("utf-8")
+    tmp_path = f"{AVAILABILITY_PATH}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header + b"\n")
+        f.write(index.availability)
+    os.replace(tmp_path, AVAILABILITY_PATH)
+
+
+def load_availability(index):
+    """Load a persisted bitmap (and rolling cursor) if it belongs to this index build."""
+    if not os.path.exists(AVAILABILITY_PATH):
+        return
+    try:
+        with open(AVAILABILITY_PATH, "rb") as f:
+            header = json.loads(f.readline())
+            flags = f.read()
+        if header["built_at"] != index.built_at.isoformat() or len(flags) != len(index):
+            return
+        index.availability[:] = flags
+        index.availability_cursor = header.get("cursor", 0)
+    except Exception as e:
+        logger.warning("[Availability] Could not load %s: %s", AVAILABILITY_PATH, e)
+
+
+def _migrate_availability(old_index, new_index):
+    """Carry bitmap flags over to a rebuilt index (entry ids change between builds)."""
+    for entry_id, flags in enumerate(old_index.availability):
+        if flags:
+            new_id = new_index.entry_id(old_index.symbols[entry_id])
+            if new_id is not None:
+                new_index.availability[new_id] = flags
+
+
+def refresh_availability_batch(index):
+    """
+    Probe the next AVAILABILITY_BATCH_SIZE index entries (blocking), wrapping around at the end.
+    Runs as background Finnhub work, so it only spends quota users leave unused.
+    """
+    checked = 0
+    with finnhub_background():
+        for _ in range(min(AVAILABILITY_BATCH_SIZE, len(index))):
+            entry_id = index.availability_cursor % len(index)
+            index.availability_cursor = entry_id + 1
+            symbol = index.symbols[entry_id]
+            has_fundamentals = _check_fundamentals(symbol, timeout=5, store=False)
+            has_price = _check_price(symbol, timeout=5)
+            checked += 1
+            if has_fundamentals is None or has_price is None:
+                continue  # A failed probe (timeout, 429, 5xx) leaves the entry as it was
+            index.availability[entry_id] = (
+                AVAILABILITY_CHECKED
+                | (AVAILABILITY_FUNDAMENTALS if has_fundamentals else 0)
+                | (AVAILABILITY_PRICE if has_price else 0)
+            )
+    try:
+        save_availability(index)
+    except OSError as e:
+        logger.warning("[Availability] Could not persist bitmap: %s", e)
+    logger.info("[Availability] Checked %s symbols, cursor %s/%s", checked, index.availability_cursor, len(index))
+
+
+async def _availability_refresh_loop():
+    while True:
+        await asyncio.sleep(AVAILABILITY_BATCH_SECONDS)
+        index = symbol_index
+        if index is None or not len(index):
+            continue
+        try:
+            await asyncio.to_thread(refresh_availability_batch, index)
+        except Exception as e:
+            logger.warning("[Availability] Batch failed: %s", e)
+
+
+def fetch_symbol_snapshot():
+    """Download the Finnhub /stock/symbol lists for all configured exchanges."""
+    items = []
+    for exchange in SYMBOL_INDEX_EXCHANGES:
+        response = http_session.get(
+            f"{FINNHUB_BASE_URL}/stock/symbol",
+            params={"exchange": exchange, "token": FINNHUB_API_KEY},
+            timeout=60
+        )
+        if response.status_code != 200:
+            logger.debug("[SymbolIndex] Finnhub /stock/symbol returned %s for exchange %s", response.status_code, exchange)
+            continue
+        data = response.json()
+        if isinstance(data, list):
+            items.extend(data)
+            logger.debug("[SymbolIndex] Loaded %s symbols for exchange %s", len(data), exchange)
+    return items
+
+
+def refresh_symbol_index():
+    """
+    Rebuild the symbol index from a fresh snapshot (blocking), persist it and swap it in.
+    Queries keep using the old index until the single reference assignment; it is kept on failure.
+    """
+    global symbol_index
+    if not FINNHUB_API_KEY:
+        return
+    started = time.time()
+    try:
+        items = fetch_symbol_snapshot()
+        if not items:
+            logger.info("[SymbolIndex] Empty snapshot, keeping current index")
+            return
+        index = SymbolIndex.build(items)
+        if symbol_index is not None:
+            _migrate_availability(symbol_index, index)
+        try:
+            index.save(SYMBOL_INDEX_PATH)
+            # Serve from the mapped file so the built lists can be freed
+            flags = index.availability
+            index = SymbolIndex.load(SYMBOL_INDEX_PATH)
+            index.availability[:] = flags
+        except OSError as e:
+            # e.g. Windows refuses to replace a file that is still mapped - keep the in-memory build
+            logger.warning("[SymbolIndex] Could not persist index to %s: %s", SYMBOL_INDEX_PATH, e)
+        symbol_index = index
+        logger.info("[SymbolIndex] Indexed %s symbols in %.1fs", len(index), time.time() - started)
+    except Exception as e:
+        logger.warning("[SymbolIndex] Refresh failed: %s", e)
+
+
+def load_persisted_symbol_index():
+    """Map the index saved by the last refresh, so search works right after startup."""
+    global symbol_index
+    if not os.path.exists(SYMBOL_INDEX_PATH):
+        return
+    try:
+        index = SymbolIndex.load(SYMBOL_INDEX_PATH)
+        load_availability(index)
+        symbol_index = index
+        logger.info("[SymbolIndex] Mapped %s symbols from %s (built %s)", len(symbol_index), SYMBOL_INDEX_PATH, format(symbol_index.built_at, "%Y-%m-%d %H:%M"))
+    except Exception as e:
+        logger.warning("[SymbolIndex] Could not load %s, rebuilding: %s", SYMBOL_INDEX_PATH, e)
+
+
+async def _symbol_index_refresh_loop():
+    await asyncio.to_thread(load_persisted_symbol_index)
+    while True:
+        index = symbol_index
+        if index is not None:
+            age = (datetime.now() - index.built_at).total_seconds()
+            await asyncio.sleep(max(0, SYMBOL_INDEX_REFRESH_HOURS * 3600 - age))
+        
+        await asyncio.to_thread(refresh_symbol_index)
+        if symbol_index is index:
+            # Refresh failed (or no API key) - retry later instead of spinning
+            await asyncio.sleep(SYMBOL_INDEX_RETRY_SECONDS)
+
+
+@app.on_event("startup")
+async def start_symbol_index_refresh():
+    # Search falls back to live Finnhub queries until an index is mapped or built
+    app.state.symbol_index_task = asyncio.create_task(_symbol_index_refresh_loop())
+    if AVAILABILITY_BATCH_SIZE > 0:
+        app.state.availability_task = asyncio.create_task(_availability_refresh_loop())
 
 
 @app.get("/api/search")
 async def search_symbols(q: str = "", request: Request = None):
     """
     Search for stock symbols by company name or ticker.
-    Uses Finnhub's symbol search API.
+    Uses the local symbol index, falling back to Finnhub's symbol search API.
     Fast search - data availability is checked separately via /api/check-data
     """
-    logger.info(f"[Search] Received query: '{q}'")
+    logger.debug("[Search] Received query: '%s'", q)
     
     # Rate limiting (only if request is available)
     if request:
         client_ip = get_remote_address(request)
         if not check_rate_limit(client_ip):
-            logger.warning(f"[Search] Rate limit exceeded for {client_ip}")
+            log_sampled("search_rate_limit", logging.WARNING, "[Search] Rate limit exceeded for %s", client_ip)
             raise HTTPException(status_code=429, detail="Rate limit exceeded")
     
     if not q or len(q.strip()) < 1:
@@ -518,28 +2448,35 @@ async def search_symbols(q: str = "", request: Request = None):
     # Sanitize input
     q = q.strip()[:50]  # Limit query length
     
+    # Local symbol index (no upstream call); fall back to Finnhub while it is not built or has no match
+    index = symbol_index
+    if index is not None:
+        results = index.search(q, 10)
+        if results:
+            logger.debug("[Search] Returning %s index results for '%s'", len(results), q)
+            return {"results": results}
+    
     # Check cache
     cache_key = f"search_{q.lower()}"
-    if cache_key in cache:
-        cached_data, cached_time = cache[cache_key]
-        if datetime.now() - cached_time < timedelta(minutes=30):
-            logger.debug(f"[Search] Returning cached results for '{q}'")
-            return cached_data
+    cached_data = get_cached("search", cache_key, timedelta(minutes=30))
+    if cached_data is not None:
+        logger.debug("[Search] Returning cached results for '%s'", q)
+        return cached_json_response(cache_key, cached_data, request)
     
     try:
         # Use Finnhub symbol search
         url = f"{FINNHUB_BASE_URL}/search?q={q}&token={FINNHUB_API_KEY}"
-        logger.debug(f"[Search] Fetching from Finnhub: {url[:80]}...")
-        response = requests.get(url, timeout=3)  # Reduced timeout from 10s to 3s for faster response
+        logger.debug("[Search] Fetching from Finnhub: %s...", url[:80])
+        response = http_session.get(url, timeout=3)  # Reduced timeout from 10s to 3s for faster response
         
-        logger.debug(f"[Search] Finnhub response status: {response.status_code}")
+        logger.debug("[Search] Finnhub response status: %s", response.status_code)
         
         if response.status_code != 200:
-            logger.warning(f"[Search] Finnhub error response: {response.status_code} - {response.text[:200]}")
+            logger.warning("[Search] Finnhub error response: %s - %s", response.status_code, response.text[:200])
             return {"results": []}
         
         data = response.json()
-        logger.info(f"[Search] Finnhub returned {len(data.get('result', []))} results for query '{q}'")
+        logger.debug("[Search] Finnhub returned %s results for query '%s'", len(data.get('result', [])), q)
         results = []
         
         # Filter and format results - prioritize US stocks
@@ -600,28 +2537,28 @@ async def search_symbols(q: str = "", request: Request = None):
         
         # Return top 10 results
         result = {"results": results[:10]}
-        logger.info(f"[Search] Returning {len(result['results'])} results for query '{q}'")
+        log_sampled("search_results", logging.INFO, "[Search] Returning %s results for query '%s'", len(result['results']), q)
         
         # Cache result
         cache[cache_key] = (result, datetime.now())
         
-        return result
-        
+        return cached_json_response(cache_key, result, request)
+    
     except requests.exceptions.Timeout:
-        logger.error(f"[Search] Timeout fetching from Finnhub for query '{q}'")
+        logger.error("[Search] Timeout fetching from Finnhub for query '%s'", q)
         return {"results": []}
     except requests.exceptions.RequestException as e:
-        logger.error(f"[Search] Request error for query '{q}': {str(e)}")
+        logger.error("[Search] Request error for query '%s': %s", q, str(e))
         return {"results": []}
     except Exception as e:
-        logger.error(f"[Search] Unexpected error for query '{q}': {str(e)}", exc_info=True)
+        logger.error("[Search] Unexpected error for query '%s': %s", q, e, exc_info=True)
         return {"results": []}
 
 
 def fetch_from_yfinance(symbol: str):
     """
     Fetch company description from yfinance using the exact approach:
-    ticker = yf.Ticker(symbol)
+    ticker = get_yfinance().Ticker(symbol)
     info = ticker.info
     beschreibung = info.get("longBusinessSummary")
     
@@ -629,15 +2566,15 @@ def fetch_from_yfinance(symbol: str):
     we'll return None and fall back to Finnhub.
     """
     if not YFINANCE_AVAILABLE:
-        print(f"[Python Backend] yfinance not available for {symbol}")
+        logger.debug("[Python Backend] yfinance not available for %s", symbol)
         return None
     
     try:
         # Add a small delay to avoid rate limiting
         time.sleep(1)
         
-        print(f"[Python Backend] Fetching description from yfinance for {symbol}")
-        ticker = yf.Ticker(symbol)
+        logger.debug("[Python Backend] Fetching description from yfinance for %s", symbol)
+        ticker = get_yfinance().Ticker(symbol)
         
         # Try to get info with timeout
         try:
@@ -645,29 +2582,30 @@ def fetch_from_yfinance(symbol: str):
         except Exception as e:
             error_str = str(e)
             if "429" in error_str or "Too Many Requests" in error_str:
-                print(f"[Python Backend] Yahoo Finance rate limited (429) for {symbol}, skipping yfinance")
+                logger.warning("[Python Backend] Yahoo Finance rate limited (429) for %s, skipping yfinance", symbol)
                 return None
             else:
                 raise  # Re-raise if it's a different error
         
         # Debug: Print all available keys in info
-        print(f"[Python Backend] yfinance info keys (first 30): {list(info.keys())[:30]}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[Python Backend] yfinance info keys (first 30): %s", list(info.keys())[:30])
         
         # Get longBusinessSummary as primary description (exactly as requested)
         long_business_summary = info.get("longBusinessSummary")
         
-        print(f"[Python Backend] yfinance longBusinessSummary type: {type(long_business_summary)}")
-        print(f"[Python Backend] yfinance longBusinessSummary value: '{long_business_summary}'")
-        print(f"[Python Backend] yfinance longBusinessSummary length: {len(long_business_summary) if long_business_summary else 0}")
+        logger.debug("[Python Backend] yfinance longBusinessSummary type: %s", type(long_business_summary))
+        logger.debug("[Python Backend] yfinance longBusinessSummary value: '%s'", long_business_summary)
+        logger.debug("[Python Backend] yfinance longBusinessSummary length: %s", len(long_business_summary) if long_business_summary else 0)
         
         if long_business_summary:
-            print(f"[Python Backend] yfinance longBusinessSummary preview (first 300 chars): {long_business_summary[:300]}")
+            logger.debug("[Python Backend] yfinance longBusinessSummary preview (first 300 chars): %s", long_business_summary[:300])
         else:
-            print(f"[Python Backend] No longBusinessSummary found for {symbol}, trying fallbacks")
+            logger.debug("[Python Backend] No longBusinessSummary found for %s, trying fallbacks", symbol)
             long_business_summary = info.get("longDescription") or info.get("description") or ""
-            print(f"[Python Backend] Fallback description length: {len(long_business_summary) if long_business_summary else 0}")
+            logger.debug("[Python Backend] Fallback description length: %s", len(long_business_summary) if long_business_summary else 0)
             if long_business_summary:
-                print(f"[Python Backend] Fallback description preview: {long_business_summary[:300]}")
+                logger.debug("[Python Backend] Fallback description preview: %s", long_business_summary[:300])
         
         # Extract all relevant fields from yfinance
         description_data = {
@@ -684,18 +2622,16 @@ def fetch_from_yfinance(symbol: str):
             "city": info.get("city") or "",
         }
         
-        print(f"[Python Backend] Final description_data longBusinessSummary length: {len(description_data.get('longBusinessSummary', ''))}")
-        print(f"[Python Backend] Final description_data longBusinessSummary preview: {description_data.get('longBusinessSummary', '')[:300]}")
+        logger.debug("[Python Backend] Final description_data longBusinessSummary length: %s", len(description_data.get('longBusinessSummary', '')))
+        logger.debug("[Python Backend] Final description_data longBusinessSummary preview: %s", description_data.get('longBusinessSummary', '')[:300])
         return description_data
     except Exception as e:
         error_str = str(e)
         if "429" in error_str or "Too Many Requests" in error_str:
-            print(f"[Python Backend] Yahoo Finance rate limited (429) for {symbol}, will use Finnhub fallback")
+            logger.warning("[Python Backend] Yahoo Finance rate limited (429) for %s, will use Finnhub fallback", symbol)
             return None
         else:
-            print(f"[Python Backend] yfinance error for description: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.warning("[Python Backend] yfinance error for description: %s", e, exc_info=True)
             return None
 
 def generate_company_description(company_name: str, sector: str, industry: str, symbol: str):
@@ -737,22 +2673,22 @@ def fetch_company_description_from_wikipedia(symbol: str, company_name: str = No
             try:
                 # Wikipedia API: Search for articles
                 search_url = "https://en.wikipedia.org/api/rest_v1/page/summary/" + requests.utils.quote(search_term.replace(" ", "_"))
-                print(f"[Python Backend] Trying Wikipedia for: {search_term}")
+                logger.debug("[Python Backend] Trying Wikipedia for: %s", search_term)
                 
-                wiki_response = requests.get(search_url, timeout=10)
+                wiki_response = http_session.get(search_url, timeout=10)
                 if wiki_response.status_code == 200:
                     wiki_data = wiki_response.json()
                     extract = wiki_data.get("extract", "")
                     if extract and len(extract) > 50:  # Only return if we have substantial content
-                        print(f"[Python Backend] Found Wikipedia description (length: {len(extract)})")
+                        logger.debug("[Python Backend] Found Wikipedia description (length: %s)", len(extract))
                         return extract
             except Exception as e:
-                print(f"[Python Backend] Wikipedia search failed for {search_term}: {e}")
+                logger.warning("[Python Backend] Wikipedia search failed for %s: %s", search_term, e)
                 continue
         
         return None
     except Exception as e:
-        print(f"[Python Backend] Wikipedia API error: {e}")
+        logger.warning("[Python Backend] Wikipedia API error: %s", e)
         return None
 
 def fetch_from_finnhub(symbol: str):
@@ -760,7 +2696,7 @@ def fetch_from_finnhub(symbol: str):
     Fetch fundamentals using Finnhub API (reliable, no rate limiting issues).
     """
     try:
-        print(f"[Python Backend] Fetching from Finnhub API for {symbol}")
+        logger.debug("[Python Backend] Fetching from Finnhub API for %s", symbol)
         
         # Fetch company profile
         profile_url = f"{FINNHUB_BASE_URL}/stock/profile2"
@@ -769,8 +2705,8 @@ def fetch_from_finnhub(symbol: str):
             "token": FINNHUB_API_KEY
         }
         
-        print(f"[Python Backend] Fetching company profile...")
-        profile_response = requests.get(profile_url, params=profile_params, timeout=10)
+        logger.debug("[Python Backend] Fetching company profile...")
+        profile_response = http_session.get(profile_url, params=profile_params, timeout=10)
         
         if profile_response.status_code != 200:
             raise Exception(f"Finnhub profile API returned {profile_response.status_code}: {profile_response.text}")
@@ -780,22 +2716,12 @@ def fetch_from_finnhub(symbol: str):
         if not profile_data or profile_data.get("ticker") is None:
             raise Exception(f"No profile data returned for {symbol}")
         
-        # Fetch basic financials/metrics
-        financials_url = f"{FINNHUB_BASE_URL}/stock/metric"
-        financials_params = {
-            "symbol": symbol,
-            "metric": "all",
-            "token": FINNHUB_API_KEY
-        }
-        
-        print(f"[Python Backend] Fetching basic financials...")
-        financials_response = requests.get(financials_url, params=financials_params, timeout=10)
-        
-        financials_data = {}
-        if financials_response.status_code == 200:
-            financials_data = financials_response.json()
-        else:
-            print(f"[Python Backend] Financials API returned {financials_response.status_code}, continuing without it...")
+        # Fetch basic financials/metrics (shared metric store)
+        logger.debug("[Python Backend] Fetching basic financials...")
+        financials_data = fetch_finnhub_metrics(symbol)
+        if not financials_data:
+            financials_data = {}
+            logger.debug("[Python Backend] Financials API returned no data, continuing without it...")
         
         # Combine data
         result = {
@@ -803,23 +2729,84 @@ def fetch_from_finnhub(symbol: str):
             "financials": financials_data
         }
         
-        # Debug: Print raw metric data for inspection
-        if financials_data and "metric" in financials_data:
+        # Debug: Print raw metric data for inspection (skipped entirely unless debug logging is on)
+        if financials_data and "metric" in financials_data and logger.isEnabledFor(logging.DEBUG):
             metric_data = financials_data["metric"]
-            print(f"[Python Backend] DEBUG - Raw metric keys for {symbol}: {list(metric_data.keys())[:20]}...")
-            print(f"[Python Backend] DEBUG - Sample metric values for {symbol}:")
+            logger.debug("[Python Backend] DEBUG - Raw metric keys for %s: %s...", symbol, list(metric_data.keys())[:20])
+            logger.debug("[Python Backend] DEBUG - Sample metric values for %s:", symbol)
             sample_keys = ["netProfitMarginTTM", "operatingMarginTTM", "revenuePerShareTTM", "sharesOutstanding", "roeTTM", "roaTTM", "currentDividendYieldTTM"]
             for key in sample_keys:
                 if key in metric_data:
-                    print(f"  {key}: {metric_data[key]}")
+                    logger.debug("  %s: %s", key, metric_data[key])
         
-        print(f"[Python Backend] Successfully fetched from Finnhub for {symbol}")
+        logger.debug("[Python Backend] Successfully fetched from Finnhub for %s", symbol)
         return result
-        
+    
     except Exception as e:
-        print(f"[Python Backend] Finnhub API error: {str(e)}")
+        logger.warning("[Python Backend] Finnhub API error: %s", str(e))
         raise
 
+def fetch_finnhub_metrics(symbol: str, timeout: float = 10, store: bool = True, raise_transient: bool = False):
+    """
+    Fetch Finnhub /stock/metric?metric=all for a symbol (cached for METRIC_CACHE_TTL).
+    Returns the raw payload (metric + series) or None.
+    store=False skips caching the payload (bulk scans over thousands of symbols).
+    raise_transient=True raises on 429/5xx instead of returning None (availability checks tell the two apart).
+    """
+    symbol_upper = symbol.upper()
+    cache_key = f"metric_{symbol_upper}"
+    cached_data = get_cached("metric", cache_key, METRIC_CACHE_TTL)
+    if cached_data is not None:
+        return cached_data
+    
+    metric_url = f"{FINNHUB_BASE_URL}/stock/metric"
+    metric_params = {
+        "symbol": symbol_upper,
+        "metric": "all",
+        "token": FINNHUB_API_KEY
+    }
+    metric_response = http_session.get(metric_url, params=metric_params, timeout=timeout)
+    if metric_response.status_code != 200:
+        logger.debug("[Python Backend] Finnhub metric API returned %s for %s", metric_response.status_code, symbol_upper)
+        if raise_transient and (metric_response.status_code == 429 or metric_response.status_code >= 500):
+            metric_response.raise_for_status()
+        return None
+    
+    metric_data = metric_response.json()
+    if not isinstance(metric_data, dict):
+        return None
+    
+    if store:
+        cache[cache_key] = (metric_data, datetime.now())
+    return metric_data
+
+def fetch_finnhub_quote(symbol: str):
+    """
+    Fetch the current Finnhub quote for a symbol (cached for QUOTE_CACHE_TTL).
+    Returns the raw quote dict or None.
+    """
+    symbol_upper = symbol.upper()
+    cache_key = f"quote_{symbol_upper}"
+    cached_data = get_cached("quote", cache_key, QUOTE_CACHE_TTL)
+    if cached_data is not None:
+        return cached_data
+    
+    quote_url = f"{FINNHUB_BASE_URL}/quote"
+    quote_params = {
+        "symbol": symbol_upper,
+        "token": FINNHUB_API_KEY
+    }
+    quote_response = http_session.get(quote_url, params=quote_params, timeout=10)
+    if quote_response.status_code != 200:
+        return None
+    
+    quote_data = quote_response.json()
+    if not quote_data or 'c' not in quote_data:
+        return None
+    
+    cache[cache_key] = (quote_data, datetime.now())
+    return quote_data
+
 @app.get("/api/fundamentals/historical/debug/{symbol}")
 def debug_historical_fundamentals(symbol: str):
     """Debug endpoint to see raw Finnhub API response"""
@@ -832,7 +2819,7 @@ def debug_historical_fundamentals(symbol: str):
             "freq": "annual",
             "token": FINNHUB_API_KEY
         }
-        response = requests.get(url, params=params, timeout=10)
+        response = http_session.get(url, params=params, timeout=10)
         return {
             "status_code": response.status_code,
             "response": response.json() if response.status_code == 200 else response.text
@@ -868,7 +2855,7 @@ async def get_historical_fundamentals(symbol: str, request: Request):
             "token": FINNHUB_API_KEY
         }
         
-        response = requests.get(url, params=params, timeout=10)
+        response = http_session.get(url, params=params, timeout=10)
         
         # If 404 or no data, try alternative symbol formats for German stocks
         if response.status_code == 404 or (response.status_code == 200 and not response.json().get('series')):
@@ -876,15 +2863,15 @@ async def get_historical_fundamentals(symbol: str, request: Request):
             if '.DE' in test_symbol:
                 test_symbol = test_symbol.replace('.DE', '')
                 params["symbol"] = test_symbol
-                response = requests.get(url, params=params, timeout=10)
-                print(f"[Python Backend] Trying symbol without .DE: {test_symbol}")
+                response = http_session.get(url, params=params, timeout=10)
+                logger.debug("[Python Backend] Trying symbol without .DE: %s", test_symbol)
             
             # Try with -DE suffix
             if response.status_code == 404 and '.DE' in symbol_upper:
                 test_symbol = symbol_upper.replace('.DE', '-DE')
                 params["symbol"] = test_symbol
-                response = requests.get(url, params=params, timeout=10)
-                print(f"[Python Backend] Trying symbol with -DE: {test_symbol}")
+                response = http_session.get(url, params=params, timeout=10)
+                logger.debug("[Python Backend] Trying symbol with -DE: %s", test_symbol)
         
         if response.status_code != 200:
             raise Exception(f"Finnhub metric API returned {response.status_code} for {symbol_upper}. Tried: {test_symbol}. Response: {response.text[:200]}")
@@ -902,8 +2889,8 @@ async def get_historical_fundamentals(symbol: str, request: Request):
         available_metrics = {}
         
         # Log all available series keys for debugging
-        print(f"[Python Backend] Available annual series keys: {list(annual_series.keys())}")
-        print(f"[Python Backend] Available quarterly series keys: {list(quarterly_series.keys())}")
+        logger.debug("[Python Backend] Available annual series keys: %s", list(annual_series.keys()))
+        logger.debug("[Python Backend] Available quarterly series keys: %s", list(quarterly_series.keys()))
         
         # Revenue (from revenuePerShare * sharesOutstanding)
         # Try different possible field names
@@ -911,7 +2898,7 @@ async def get_historical_fundamentals(symbol: str, request: Request):
         for field in ['revenuePerShare', 'revenuePerShareAnnual', 'revenueShare', 'salesPerShare', 'revenue']:
             if field in annual_series or field in quarterly_series:
                 revenue_field = field
-                print(f"[Python Backend] Found revenue field: {revenue_field}")
+                logger.debug("[Python Backend] Found revenue field: %s", revenue_field)
                 break
         
         if revenue_field:
@@ -920,17 +2907,17 @@ async def get_historical_fundamentals(symbol: str, request: Request):
                 'quarterly': quarterly_series.get(revenue_field, []),
                 'isPerShare': True if 'PerShare' in revenue_field else False
             }
-            print(f"[Python Backend] Revenue annual data points: {len(available_metrics['revenue']['annual'])}")
-            print(f"[Python Backend] Revenue quarterly data points: {len(available_metrics['revenue']['quarterly'])}")
+            logger.debug("[Python Backend] Revenue annual data points: %s", len(available_metrics['revenue']['annual']))
+            logger.debug("[Python Backend] Revenue quarterly data points: %s", len(available_metrics['revenue']['quarterly']))
         else:
-            print(f"[Python Backend] No revenue field found in series")
+            logger.debug("[Python Backend] No revenue field found in series")
         
         # Net Income (from EPS * sharesOutstanding, or direct netIncome if available)
         net_income_field = None
         for field in ['netIncome', 'netIncomeCommon', 'netIncomeToCommon', 'netIncomeAvailable']:
             if field in annual_series or field in quarterly_series:
                 net_income_field = field
-                print(f"[Python Backend] Found netIncome field: {net_income_field}")
+                logger.debug("[Python Backend] Found netIncome field: %s", net_income_field)
                 break
         
         if net_income_field:
@@ -939,19 +2926,19 @@ async def get_historical_fundamentals(symbol: str, request: Request):
                 'quarterly': quarterly_series.get(net_income_field, []),
                 'isPerShare': False
             }
-            print(f"[Python Backend] Net Income annual data points: {len(available_metrics['netIncome']['annual'])}")
+            logger.debug("[Python Backend] Net Income annual data points: %s", len(available_metrics['netIncome']['annual']))
         elif 'eps' in annual_series or 'eps' in quarterly_series:
             # Calculate Net Income from EPS * sharesOutstanding
-            print(f"[Python Backend] Calculating Net Income from EPS * sharesOutstanding")
+            logger.debug("[Python Backend] Calculating Net Income from EPS * sharesOutstanding")
             available_metrics['netIncome'] = {
                 'annual': annual_series.get('eps', []),
                 'quarterly': quarterly_series.get('eps', []),
                 'isPerShare': True,  # Will be converted to total using sharesOutstanding
                 'calculatedFrom': 'eps'
             }
-            print(f"[Python Backend] Net Income (from EPS) annual data points: {len(available_metrics['netIncome']['annual'])}")
+            logger.debug("[Python Backend] Net Income (from EPS) annual data points: %s", len(available_metrics['netIncome']['annual']))
         else:
-            print(f"[Python Backend] No netIncome or EPS field found")
+            logger.debug("[Python Backend] No netIncome or EPS field found")
         
         # Book Value (already available)
         if 'bookValue' in annual_series or 'bookValue' in quarterly_series:
@@ -960,7 +2947,7 @@ async def get_historical_fundamentals(symbol: str, request: Request):
                 'quarterly': quarterly_series.get('bookValue', []),
                 'isPerShare': False
             }
-            print(f"[Python Backend] Book Value annual data points: {len(available_metrics['bookValue']['annual'])}")
+            logger.debug("[Python Backend] Book Value annual data points: %s", len(available_metrics['bookValue']['annual']))
         
         # Cash Flow per Share
         if 'cashFlowPerShare' in annual_series or 'cashFlowPerShare' in quarterly_series:
@@ -969,7 +2956,7 @@ async def get_historical_fundamentals(symbol: str, request: Request):
                 'quarterly': quarterly_series.get('cashFlowPerShare', []),
                 'isPerShare': True
             }
-            print(f"[Python Backend] Cash Flow annual data points: {len(available_metrics['cashFlow']['annual'])}")
+            logger.debug("[Python Backend] Cash Flow annual data points: %s", len(available_metrics['cashFlow']['annual']))
         
         # EPS
         if 'eps' in annual_series or 'eps' in quarterly_series:
@@ -978,14 +2965,14 @@ async def get_historical_fundamentals(symbol: str, request: Request):
                 'quarterly': quarterly_series.get('eps', []),
                 'isPerShare': True
             }
-            print(f"[Python Backend] EPS annual data points: {len(available_metrics['eps']['annual'])}")
+            logger.debug("[Python Backend] EPS annual data points: %s", len(available_metrics['eps']['annual']))
         
         # PE Ratio (try different field names)
         pe_field = None
         for field in ['peTTM', 'peExclExtraTTM', 'peBasicExclExtraTTM', 'pe', 'priceToEarnings']:
             if field in annual_series or field in quarterly_series:
                 pe_field = field
-                print(f"[Python Backend] Found PE ratio field: {pe_field}")
+                logger.debug("[Python Backend] Found PE ratio field: %s", pe_field)
                 break
         
         if pe_field:
@@ -994,17 +2981,17 @@ async def get_historical_fundamentals(symbol: str, request: Request):
                 'quarterly': quarterly_series.get(pe_field, []),
                 'isPerShare': False
             }
-            print(f"[Python Backend] PE Ratio annual data points: {len(available_metrics['peRatio']['annual'])}")
-            print(f"[Python Backend] PE Ratio quarterly data points: {len(available_metrics['peRatio']['quarterly'])}")
+            logger.debug("[Python Backend] PE Ratio annual data points: %s", len(available_metrics['peRatio']['annual']))
+            logger.debug("[Python Backend] PE Ratio quarterly data points: %s", len(available_metrics['peRatio']['quarterly']))
         else:
-            print(f"[Python Backend] No PE ratio field found in series")
+            logger.debug("[Python Backend] No PE ratio field found in series")
         
         # Forward PE Ratio (try different field names)
         forward_pe_field = None
         for field in ['forwardPE', 'forwardPe', 'peForward', 'priceToEarningsForward']:
             if field in annual_series or field in quarterly_series:
                 forward_pe_field = field
-                print(f"[Python Backend] Found Forward PE ratio field: {forward_pe_field}")
+                logger.debug("[Python Backend] Found Forward PE ratio field: %s", forward_pe_field)
                 break
         
         if forward_pe_field:
@@ -1013,10 +3000,10 @@ async def get_historical_fundamentals(symbol: str, request: Request):
                 'quarterly': quarterly_series.get(forward_pe_field, []),
                 'isPerShare': False
             }
-            print(f"[Python Backend] Forward PE Ratio annual data points: {len(available_metrics['forwardPE']['annual'])}")
-            print(f"[Python Backend] Forward PE Ratio quarterly data points: {len(available_metrics['forwardPE']['quarterly'])}")
+            logger.debug("[Python Backend] Forward PE Ratio annual data points: %s", len(available_metrics['forwardPE']['annual']))
+            logger.debug("[Python Backend] Forward PE Ratio quarterly data points: %s", len(available_metrics['forwardPE']['quarterly']))
         else:
-            print(f"[Python Backend] No Forward PE ratio field found in series")
+            logger.debug("[Python Backend] No Forward PE ratio field found in series")
         
         # Get shares outstanding to calculate total values
         metric = data.get('metric', {})
@@ -1036,22 +3023,19 @@ async def get_historical_fundamentals(symbol: str, request: Request):
                 "isPerShare": metric_data.get('isPerShare', False)
             }
         
-        print(f"[Python Backend] Extracted {len(available_metrics)} metrics with historical data")
-        print(f"[Python Backend] Available metrics: {list(available_metrics.keys())}")
+        logger.debug("[Python Backend] Extracted %s metrics with historical data", len(available_metrics))
+        logger.debug("[Python Backend] Available metrics: %s", list(available_metrics.keys()))
         
         return result
-        
+    
     except Exception as e:
         error_msg = str(e)
-        print(f"[Python Backend] Error in get_historical_fundamentals: {error_msg}")
-        import traceback
-        traceback.print_exc()
+        logger.warning("[Python Backend] Error in get_historical_fundamentals: %s", error_msg, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error fetching historical fundamentals: {error_msg}")
 
-@app.get("/api/fundamentals/{symbol}")
-def get_fundamentals(symbol: str, request: Request = None):
+def fetch_fundamentals(symbol: str, request: Request = None):
     """
-    Get comprehensive fundamental data for a stock using Finnhub API.
+    Get comprehensive fundamental data for a stock using Finnhub API (blocking, returns the dict).
     Protected by session-based rate limiting: 15 minutes usage, then 15 minutes cooldown.
     Session must be started via /api/session-start (on first user click).
     """
@@ -1074,12 +3058,11 @@ def get_fundamentals(symbol: str, request: Request = None):
         # Check cache first - aggressive caching for fundamentals
         symbol_upper = symbol.upper()
         cache_key = f"fundamentals_{symbol_upper}"
-        if cache_key in cache:
-            cached_data, cached_time = cache[cache_key]
-            # Use shorter cache duration (15 minutes) for fundamentals to balance freshness and performance
-            if datetime.now() - cached_time < timedelta(minutes=15):
-                print(f"[Python Backend] Returning cached fundamentals data for {symbol_upper}")
-                return cached_data
+        # Use shorter cache duration (15 minutes) for fundamentals to balance freshness and performance
+        cached_data = get_cached("fundamentals", cache_key, timedelta(minutes=15))
+        if cached_data is not None:
+            logger.debug("[Python Backend] Returning cached fundamentals data for %s", symbol_upper)
+            return cached_data
         
         # Use Finnhub API (reliable, no rate limiting issues)
         # Note: yfinance is disabled due to Yahoo Finance rate limiting (429 errors)
@@ -1097,7 +3080,7 @@ def get_fundamentals(symbol: str, request: Request = None):
         
         # Generate description from available Finnhub data
         company_description = generate_company_description(company_name, sector, industry, symbol)
-        print(f"[Python Backend] Generated description from Finnhub data: {company_description[:100]}...")
+        logger.debug("[Python Backend] Generated description from Finnhub data: %s...", company_description[:100])
         
         # Initialize variables for yfinance data (only used if USE_YFINANCE_EXTRAS=True)
         yfinance_profile_data = {}
@@ -1139,11 +3122,8 @@ def get_fundamentals(symbol: str, request: Request = None):
         pretax_margin_raw = metric.get("pretaxMarginTTM") or metric.get("pretaxMarginAnnual")
         
         # Log raw values for debugging
-        print(f"[Python Backend] DEBUG - Raw margin values from Finnhub for {symbol}:")
-        print(f"  profit_margin_raw: {profit_margin_raw}")
-        print(f"  operating_margin_raw: {operating_margin_raw}")
-        print(f"  gross_margin_raw: {gross_margin_raw}")
-        print(f"  pretax_margin_raw: {pretax_margin_raw}")
+        logger.debug("[Python Backend] Raw margins from Finnhub for %s: profit=%s operating=%s gross=%s pretax=%s",
+                     symbol, profit_margin_raw, operating_margin_raw, gross_margin_raw, pretax_margin_raw)
         
         # Initialize all variables to None (will be overridden by yfinance if available)
         profit_margin = profit_margin_raw
@@ -1177,8 +3157,8 @@ def get_fundamentals(symbol: str, request: Request = None):
         
         if use_yfinance:
             try:
-                print(f"[Python Backend] Fetching fundamental data from yfinance (as fallback/supplement)...")
-                ticker = yf.Ticker(symbol_upper)
+                logger.debug("[Python Backend] Fetching fundamental data from yfinance (as fallback/supplement)...")
+                ticker = get_yfinance().Ticker(symbol_upper)
                 info = ticker.info
                 
                 # Override ALL values with yfinance data (direct values, no calculations)
@@ -1197,7 +3177,7 @@ def get_fundamentals(symbol: str, request: Request = None):
                     market_cap = info["marketCap"]
                 if "enterpriseValue" in info and info["enterpriseValue"] is not None:
                     enterprise_value = info["enterpriseValue"]
-                    print(f"[Python Backend] Got enterpriseValue from yfinance: {enterprise_value}")
+                    logger.debug("[Python Backend] Got enterpriseValue from yfinance: %s", enterprise_value)
                 if "enterpriseToEbitda" in info and info["enterpriseToEbitda"]:
                     ev_ebitda = info["enterpriseToEbitda"]
                 if "enterpriseToRevenue" in info and info["enterpriseToRevenue"]:
@@ -1232,22 +3212,22 @@ def get_fundamentals(symbol: str, request: Request = None):
                 # Financial Data - Absolute values directly from yfinance
                 if "totalRevenue" in info and info["totalRevenue"]:
                     total_revenue = info["totalRevenue"]
-                    print(f"[Python Backend] Got totalRevenue from yfinance: {total_revenue}")
+                    logger.debug("[Python Backend] Got totalRevenue from yfinance: %s", total_revenue)
                 if "ebitda" in info and info["ebitda"]:
                     ebitda = info["ebitda"]
-                    print(f"[Python Backend] Got ebitda from yfinance: {ebitda}")
+                    logger.debug("[Python Backend] Got ebitda from yfinance: %s", ebitda)
                 if "operatingCashflow" in info and info["operatingCashflow"]:
                     operating_cashflow = info["operatingCashflow"]
-                    print(f"[Python Backend] Got operatingCashflow from yfinance: {operating_cashflow}")
+                    logger.debug("[Python Backend] Got operatingCashflow from yfinance: %s", operating_cashflow)
                 if "freeCashflow" in info and info["freeCashflow"]:
                     free_cashflow = info["freeCashflow"]
-                    print(f"[Python Backend] Got freeCashflow from yfinance: {free_cashflow}")
+                    logger.debug("[Python Backend] Got freeCashflow from yfinance: %s", free_cashflow)
                 if "netIncomeToCommon" in info and info["netIncomeToCommon"]:
                     net_income = info["netIncomeToCommon"]
-                    print(f"[Python Backend] Got netIncome from yfinance: {net_income}")
+                    logger.debug("[Python Backend] Got netIncome from yfinance: %s", net_income)
                 if "ebit" in info and info["ebit"]:
                     ebit = info["ebit"]
-                    print(f"[Python Backend] Got ebit from yfinance: {ebit}")
+                    logger.debug("[Python Backend] Got ebit from yfinance: %s", ebit)
                 
                 # Ratios - Direct from yfinance
                 if "returnOnEquity" in info and info["returnOnEquity"] is not None:
@@ -1269,12 +3249,10 @@ def get_fundamentals(symbol: str, request: Request = None):
                 if "payoutRatio" in info and info["payoutRatio"] is not None:
                     payout_ratio = info["payoutRatio"]
                 
-                print(f"[Python Backend] Successfully fetched fundamentals from yfinance")
+                logger.debug("[Python Backend] Successfully fetched fundamentals from yfinance")
             except Exception as e:
                 error_msg = str(e)
-                print(f"[Python Backend] yfinance error for {symbol_upper}: {error_msg}")
-                import traceback
-                traceback.print_exc()
+                logger.warning("[Python Backend] yfinance error for %s: %s", symbol_upper, error_msg, exc_info=True)
                 
                 # Cache the error to avoid repeated calls
                 # Check if it's a "delisted" or "no data" type error
@@ -1283,10 +3261,10 @@ def get_fundamentals(symbol: str, request: Request = None):
                         "error": error_msg,
                         "timestamp": datetime.now()
                     }
-                    print(f"[Python Backend] Cached yfinance error for {symbol_upper} (will skip for {YFINANCE_ERROR_TTL})")
+                    logger.warning("[Python Backend] Cached yfinance error for %s (will skip for %s)", symbol_upper, YFINANCE_ERROR_TTL)
                 
                 # If yfinance fails, values stay as None (use Finnhub data if available)
-                print(f"[Python Backend] Using Finnhub data as fallback")
+                logger.debug("[Python Backend] Using Finnhub data as fallback")
         
         # NO CALCULATIONS - if yfinance doesn't provide it, it stays None
         
@@ -1294,7 +3272,7 @@ def get_fundamentals(symbol: str, request: Request = None):
         total_assets = None
         if USE_YFINANCE_EXTRAS and use_yfinance:
             try:
-                ticker = yf.Ticker(symbol_upper)
+                ticker = get_yfinance().Ticker(symbol_upper)
                 info = ticker.info
                 if "totalAssets" in info and info["totalAssets"]:
                     total_assets = info["totalAssets"]
@@ -1402,23 +3380,23 @@ def get_fundamentals(symbol: str, request: Request = None):
             }
         }
         
-        print(f"[Python Backend] Successfully got fundamentals from Finnhub")
-        print(f"[Python Backend] Extracted: PE={current_pe}, MarketCap={market_cap}, EPS={eps}")
+        logger.debug("[Python Backend] Successfully got fundamentals from Finnhub")
+        logger.debug("[Python Backend] Extracted: PE=%s, MarketCap=%s, EPS=%s", current_pe, market_cap, eps)
         
         # Cache the response with consistent cache key
         cache[cache_key] = (response, datetime.now())
-        print(f"[Python Backend] Cached fundamentals data for {symbol_upper} (TTL: 15 minutes)")
+        logger.debug("[Python Backend] Cached fundamentals data for %s (TTL: 15 minutes)", symbol_upper)
         
         return response
-        
+    
     except HTTPException:
         # Re-raise HTTP exceptions (like 429) as-is
         raise
     except Exception as e:
         error_msg = str(e)
         error_type = type(e).__name__
-        print(f"[Python Backend] Error for {symbol} ({error_type}): {error_msg}")
-        print(f"[Python Backend] Full error: {repr(e)}")
+        logger.warning("[Python Backend] Error for %s (%s): %s", symbol, error_type, error_msg)
+        logger.warning("[Python Backend] Full error: %s", repr(e))
         
         # Provide meaningful error message
         if not error_msg or error_msg.strip() == "":
@@ -1426,6 +3404,16 @@ def get_fundamentals(symbol: str, request: Request = None):
         
         raise HTTPException(status_code=500, detail=f"Error fetching fundamentals: {error_msg}")
 
+
+@app.get("/api/fundamentals/{symbol}")
+def get_fundamentals(symbol: str, request: Request = None):
+    """
+    Fundamentals endpoint - see fetch_fundamentals().
+    Served from the pre-encoded cache entry; the dict is only serialized when it changes.
+    """
+    data = fetch_fundamentals(symbol, request)
+    return cached_json_response(f"fundamentals_{symbol.upper()}", data, request)
+
 @app.get("/api/debug/{symbol}")
 def debug_finnhub(symbol: str):
     """Debug endpoint to see what fields are actually returned by Finnhub"""
@@ -1502,8 +3490,8 @@ async def get_stock_news(symbol: str, request: Request):
             "token": FINNHUB_API_KEY
         }
         
-        print(f"[Python Backend] Fetching news for {symbol_upper}...")
-        response = requests.get(url, params=params, timeout=10)
+        logger.debug("[Python Backend] Fetching news for %s...", symbol_upper)
+        response = http_session.get(url, params=params, timeout=10)
         
         if response.status_code != 200:
             raise Exception(f"Finnhub news API returned {response.status_code}: {response.text[:200]}")
@@ -1516,17 +3504,17 @@ async def get_stock_news(symbol: str, request: Request):
         # Sort by date (newest first) and limit to 20
         news_items = sorted(data, key=lambda x: x.get('datetime', 0), reverse=True)[:20]
         
-        print(f"[Python Backend] Found {len(news_items)} news items for {symbol_upper}")
+        logger.debug("[Python Backend] Found %s news items for %s", len(news_items), symbol_upper)
         
         return {
             "symbol": symbol_upper,
             "news": news_items,
             "count": len(news_items)
         }
-        
+    
     except Exception as e:
         error_msg = str(e)
-        print(f"[Python Backend] Error fetching news: {error_msg}")
+        logger.warning("[Python Backend] Error fetching news: %s", error_msg)
         raise HTTPException(status_code=500, detail=f"Error fetching news: {error_msg}")
 
 @app.get("/api/market-news")
@@ -1560,10 +3548,10 @@ async def get_market_news(request: Request, filter: str = None):
     
     try:
         # Google News RSS feed with filter query
-        rss_url = f"https://news.google.com/rss/search?q={query}&hl=en&gl=US&ceid=US:en"
+        rss_url = f"{GOOGLE_NEWS_BASE_URL}/rss/search?q={query}&hl=en&gl=US&ceid=US:en"
         
-        print(f"[Python Backend] Fetching market news from Google News RSS...")
-        response = requests.get(rss_url, timeout=15, headers={
+        logger.debug("[Python Backend] Fetching market news from Google News RSS...")
+        response = http_session.get(rss_url, timeout=15, headers={
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
         
@@ -1639,23 +3627,23 @@ async def get_market_news(request: Request, filter: str = None):
                     'source': 'Google News'
                 })
             except Exception as e:
-                print(f"[Python Backend] Error parsing news item: {str(e)}")
+                logger.warning("[Python Backend] Error parsing news item: %s", str(e))
                 continue
         
         # Sort by date (newest first)
         news_items.sort(key=lambda x: x.get('datetime', 0), reverse=True)
         
-        print(f"[Python Backend] Found {len(news_items)} market news items")
+        logger.debug("[Python Backend] Found %s market news items", len(news_items))
         
         return {
             "news": news_items,
             "count": len(news_items),
             "source": "Google News RSS"
         }
-        
+    
     except Exception as e:
         error_msg = str(e)
-        print(f"[Python Backend] Error fetching market news: {error_msg}")
+        logger.warning("[Python Backend] Error fetching market news: %s", error_msg)
         raise HTTPException(status_code=500, detail=f"Error fetching market news: {error_msg}")
 
 @app.get("/api/crypto-overview")
@@ -1703,9 +3691,9 @@ async def get_crypto_overview(request: Request, timeRange: str = "1D"):
         """Helper function to fetch data for a single cryptocurrency"""
         try:
             # Use Yahoo Finance Chart API with time range
-            url = f"https://query1.finance.yahoo.com/v8/finance/chart/{crypto['symbol']}?interval={interval_param}&range={range_param}"
+            url = f"{YAHOO_BASE_URL}/v8/finance/chart/{crypto['symbol']}?interval={interval_param}&range={range_param}"
             
-            response = requests.get(url, timeout=10, headers={
+            response = http_session.get(url, timeout=10, headers={
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             })
             
@@ -1739,13 +3727,13 @@ async def get_crypto_overview(request: Request, timeRange: str = "1D"):
                     
                     # If still no start_price, skip this crypto
                     if not current_price or not start_price or start_price <= 0:
-                        print(f"[Python Backend] Skipping {crypto['symbol']}: current_price={current_price}, start_price={start_price}")
+                        logger.debug("[Python Backend] Skipping %s: current_price=%s, start_price=%s", crypto['symbol'], current_price, start_price)
                         return None
                     
                     change = current_price - start_price
                     change_percent = (change / start_price * 100) if start_price > 0 else 0
                     
-                    print(f"[Python Backend] {crypto['symbol']}: current={current_price}, start={start_price}, change={change_percent:.2f}%")
+                    logger.debug("[Python Backend] %s: current=%s, start=%s, change=%.2f%%", crypto['symbol'], current_price, start_price, change_percent)
                     
                     return {
                         "symbol": crypto["symbol"],
@@ -1758,28 +3746,28 @@ async def get_crypto_overview(request: Request, timeRange: str = "1D"):
             
             return None
         except Exception as e:
-            print(f"[Python Backend] Error fetching {crypto['symbol']}: {str(e)}")
+            logger.warning("[Python Backend] Error fetching %s: %s", crypto['symbol'], str(e))
             return None
     
     try:
         # Fetch all cryptocurrencies in parallel for better performance
-        print(f"[Python Backend] Fetching {len(crypto_symbols)} cryptocurrencies in parallel...")
+        logger.debug("[Python Backend] Fetching %s cryptocurrencies in parallel...", len(crypto_symbols))
         with ThreadPoolExecutor(max_workers=5) as executor:
-            results = list(executor.map(fetch_crypto_data, crypto_symbols))
+            results = list(executor.map(with_request_context(fetch_crypto_data), crypto_symbols))
         
         # Filter out None results
         crypto_data = [r for r in results if r is not None]
         
-        print(f"[Python Backend] Fetched {len(crypto_data)} cryptocurrency prices")
+        logger.debug("[Python Backend] Fetched %s cryptocurrency prices", len(crypto_data))
         
         return {
             "cryptos": crypto_data,
             "count": len(crypto_data)
         }
-        
+    
     except Exception as e:
         error_msg = str(e)
-        print(f"[Python Backend] Error fetching crypto overview: {error_msg}")
+        logger.warning("[Python Backend] Error fetching crypto overview: %s", error_msg)
         raise HTTPException(status_code=500, detail=f"Error fetching crypto overview: {error_msg}")
 
 # Cache für Beschreibungen (separat vom Hauptcache)
@@ -1813,14 +3801,14 @@ def get_company_description(symbol: str, request: Request = None):
     # Check cache first
     cached = get_cached_description(symbol_upper)
     if cached:
-        print(f"[Company Description] Returning cached description for {symbol_upper}")
+        logger.debug("[Company Description] Returning cached description for %s", symbol_upper)
         return {"symbol": symbol_upper, "description": cached, "source": "cache"}
     
     # Try yfinance if enabled
     if USE_YFINANCE_EXTRAS and YFINANCE_AVAILABLE:
         try:
-            print(f"[Company Description] Fetching longBusinessSummary from yfinance for {symbol_upper}")
-            ticker = yf.Ticker(symbol_upper)
+            logger.debug("[Company Description] Fetching longBusinessSummary from yfinance for %s", symbol_upper)
+            ticker = get_yfinance().Ticker(symbol_upper)
             info = ticker.info
             
             desc = info.get("longBusinessSummary")
@@ -1831,7 +3819,7 @@ def get_company_description(symbol: str, request: Request = None):
                 set_cached_description(symbol_upper, desc)
                 return {"symbol": symbol_upper, "description": desc, "source": "yfinance"}
         except Exception as e:
-            print(f"[Company Description] yfinance failed: {e}")
+            logger.warning("[Company Description] yfinance failed: %s", e)
     
     # Try Wikipedia if yfinance didn't work
     try:
@@ -1843,7 +3831,7 @@ def get_company_description(symbol: str, request: Request = None):
             set_cached_description(symbol_upper, wiki_desc)
             return {"symbol": symbol_upper, "description": wiki_desc, "source": "wikipedia"}
     except Exception as e:
-        print(f"[Company Description] Wikipedia failed: {e}")
+        logger.warning("[Company Description] Wikipedia failed: %s", e)
     
     # Fallback: Generate from Finnhub data
     finnhub_data = fetch_from_finnhub(symbol_upper)
@@ -1866,13 +3854,12 @@ async def get_stock_overview(symbol: str, request: Request = None):
     
     # Check cache for aggregated data
     cache_key = f"stock_overview_{symbol_upper}"
-    if cache_key in cache:
-        cached_data, cached_time = cache[cache_key]
-        if datetime.now() - cached_time < timedelta(minutes=5):  # Shorter cache for overview
-            print(f"[Stock Overview] Returning cached data for {symbol_upper}")
-            return cached_data
+    cached_data = get_cached("stock_overview", cache_key, timedelta(minutes=5))  # Shorter cache for overview
+    if cached_data is not None:
+        logger.debug("[Stock Overview] Returning cached data for %s", symbol_upper)
+        return cached_json_response(cache_key, cached_data, request)
     
-    print(f"[Stock Overview] Fetching aggregated data for {symbol_upper}...")
+    logger.debug("[Stock Overview] Fetching aggregated data for %s...", symbol_upper)
     
     # Import here to avoid circular dependencies
     from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -1889,12 +3876,10 @@ async def get_stock_overview(symbol: str, request: Request = None):
     }
     
     # Fetch all data in parallel using asyncio.gather
-    # Note: get_fundamentals is sync, others are async
-    import asyncio
-    
+    # Note: fetch_fundamentals is sync, others are async
     try:
         # Run sync function in thread pool, async functions directly
-        fundamentals_task = asyncio.to_thread(get_fundamentals, symbol_upper, request)
+        fundamentals_task = asyncio.to_thread(fetch_fundamentals, symbol_upper, request)
         
         # Execute all in parallel
         fundamentals, dividends, earnings, price_changes, sentiment, news = await asyncio.gather(
@@ -1937,91 +3922,151 @@ async def get_stock_overview(symbol: str, request: Request = None):
             results["news"] = news
         else:
             results["errors"]["news"] = str(news)
-            
+    
     except Exception as e:
-        print(f"[Stock Overview] Error in parallel fetch: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.warning("[Stock Overview] Error in parallel fetch: %s", e, exc_info=True)
     
     # Cache the results
     cache[cache_key] = (results, datetime.now())
     
-    print(f"[Stock Overview] Completed fetching data for {symbol_upper}")
-    return results
+    logger.debug("[Stock Overview] Completed fetching data for %s", symbol_upper)
+    return cached_json_response(cache_key, results, request)
 
-@app.get("/api/analyst/{symbol}")
-async def get_analyst_data(symbol: str, request: Request):
+# Analyst data cache TTLs - recommendation trends are published monthly, price targets change slowly
+ANALYST_RECOMMENDATION_TTL = timedelta(hours=12)
+ANALYST_PRICE_TARGET_TTL = timedelta(hours=6)
+ANALYST_BATCH_MAX_SYMBOLS = 20
+
+
+def _fetch_analyst_recommendations(symbol_upper: str) -> list:
+    """Fetch (cached) Finnhub recommendation trends, most recent first."""
+    cache_key = f"analyst_rec_{symbol_upper}"
+    cached_data = get_cached("analyst_rec", cache_key, ANALYST_RECOMMENDATION_TTL)
+    if cached_data is not None:
+        return cached_data
+    
+    rec_url = f"{FINNHUB_BASE_URL}/stock/recommendation"
+    rec_params = {
+        "symbol": symbol_upper,
+        "token": FINNHUB_API_KEY
+    }
+    
+    logger.debug("[Python Backend] Fetching analyst recommendations for %s...", symbol_upper)
+    rec_response = http_session.get(rec_url, params=rec_params, timeout=10)
+    
+    recommendation_trends = []
+    if rec_response.status_code == 200:
+        rec_data = rec_response.json()
+        if isinstance(rec_data, list):
+            recommendation_trends = rec_data
+        cache[cache_key] = (recommendation_trends, datetime.now())
+    return recommendation_trends
+
+
+def _fetch_analyst_price_target(symbol_upper: str):
+    """Fetch (cached) Finnhub price target, None if unavailable."""
+    cache_key = f"analyst_target_{symbol_upper}"
+    cached_data = get_cached("analyst_target", cache_key, ANALYST_PRICE_TARGET_TTL, default=CACHE_MISS)
+    if cached_data is not CACHE_MISS:
+        return cached_data
+    
+    target_url = f"{FINNHUB_BASE_URL}/stock/price-target"
+    target_params = {
+        "symbol": symbol_upper,
+        "token": FINNHUB_API_KEY
+    }
+    
+    logger.debug("[Python Backend] Fetching price target for %s...", symbol_upper)
+    target_response = http_session.get(target_url, params=target_params, timeout=10)
+    
+    price_target = None
+    if target_response.status_code == 200:
+        price_target = target_response.json() or None
+        cache[cache_key] = (price_target, datetime.now())
+    return price_target
+
+
+def _fetch_current_price(symbol_upper: str):
+    """Current price for the price target visualization (None on any error)."""
+    try:
+        quote_data = fetch_finnhub_quote(symbol_upper)
+        if quote_data:
+            return quote_data['c']
+    except:
+        pass
+    return None
+
+
+def fetch_analyst_data(symbol: str):
     """
-    Get analyst recommendations and price targets from Finnhub API.
+    Fetch analyst recommendations, price target and current price from Finnhub (blocking).
+    The three requests run in parallel, each with its own cache.
     """
     try:
         symbol_upper = symbol.upper()
         
-        # Fetch recommendation trends
-        rec_url = f"{FINNHUB_BASE_URL}/stock/recommendation"
-        rec_params = {
-            "symbol": symbol_upper,
-            "token": FINNHUB_API_KEY
-        }
-        
-        print(f"[Python Backend] Fetching analyst recommendations for {symbol_upper}...")
-        rec_response = requests.get(rec_url, params=rec_params, timeout=10)
-        
-        recommendations = []
-        recommendation_trends = []
-        if rec_response.status_code == 200:
-            rec_data = rec_response.json()
-            if isinstance(rec_data, list) and len(rec_data) > 0:
-                # Get most recent recommendation
-                recommendations = rec_data[0] if rec_data else {}
-                # Get all trends for timeline chart
-                recommendation_trends = rec_data if rec_data else []
-        
-        # Fetch price target
-        target_url = f"{FINNHUB_BASE_URL}/stock/price-target"
-        target_params = {
-            "symbol": symbol_upper,
-            "token": FINNHUB_API_KEY
-        }
-        
-        print(f"[Python Backend] Fetching price target for {symbol_upper}...")
-        target_response = requests.get(target_url, params=target_params, timeout=10)
-        
-        price_target = None
-        if target_response.status_code == 200:
-            target_data = target_response.json()
-            if target_data:
-                price_target = target_data
-        
-        # Fetch current price for price target visualization
-        current_price = None
-        try:
-            quote_url = f"{FINNHUB_BASE_URL}/quote"
-            quote_params = {
-                "symbol": symbol_upper,
-                "token": FINNHUB_API_KEY
-            }
-            quote_response = requests.get(quote_url, params=quote_params, timeout=10)
-            if quote_response.status_code == 200:
-                quote_data = quote_response.json()
-                if quote_data and 'c' in quote_data:
-                    current_price = quote_data['c']
-        except:
-            pass
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            rec_future = executor.submit(with_request_context(_fetch_analyst_recommendations), symbol_upper)
+            target_future = executor.submit(with_request_context(_fetch_analyst_price_target), symbol_upper)
+            price_future = executor.submit(with_request_context(_fetch_current_price), symbol_upper)
+            
+            recommendation_trends = rec_future.result()
+            price_target = target_future.result()
+            current_price = price_future.result()
         
         return {
             "symbol": symbol_upper,
-            "recommendations": recommendations,
+            # Most recent recommendation + all trends for timeline chart
+            "recommendations": recommendation_trends[0] if recommendation_trends else [],
             "recommendationTrends": recommendation_trends,
             "priceTarget": price_target,
             "currentPrice": current_price
         }
-        
+    
     except Exception as e:
         error_msg = str(e)
-        print(f"[Python Backend] Error fetching analyst data: {error_msg}")
+        logger.warning("[Python Backend] Error fetching analyst data: %s", error_msg)
         raise HTTPException(status_code=500, detail=f"Error fetching analyst data: {error_msg}")
 
+@app.get("/api/analyst")
+async def get_analyst_data_batch(symbols: str = "", request: Request = None):
+    """
+    Get analyst data for several symbols at once (comma-separated, for comparison views).
+    Returns {"results": {symbol: data}, "errors": {symbol: message}}.
+    """
+    symbol_list = list(dict.fromkeys(s.strip().upper() for s in symbols.split(",") if s.strip()))
+    if not symbol_list:
+        raise HTTPException(status_code=400, detail="No symbols provided")
+    if len(symbol_list) > ANALYST_BATCH_MAX_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {ANALYST_BATCH_MAX_SYMBOLS} symbols per request")
+    
+    def fetch_one(symbol):
+        try:
+            return symbol, fetch_analyst_data(symbol), None
+        except HTTPException as e:
+            return symbol, None, e.detail
+    
+    def fetch_all():
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            return list(executor.map(with_request_context(fetch_one), symbol_list))
+    
+    results = {}
+    errors = {}
+    for symbol, data, error in await asyncio.to_thread(fetch_all):
+        if data is not None:
+            results[symbol] = data
+        else:
+            errors[symbol] = error
+    
+    return {"results": results, "errors": errors}
+
+@app.get("/api/analyst/{symbol}")
+async def get_analyst_data(symbol: str, request: Request):
+    """
+    Get analyst recommendations and price targets from Finnhub API.
+    """
+    return await asyncio.to_thread(fetch_analyst_data, symbol)
+
 @app.get("/api/sentiment/{symbol}")
 async def get_sentiment_data(symbol: str, request: Request):
     """
@@ -2042,55 +4087,55 @@ async def get_sentiment_data(symbol: str, request: Request):
         if symbol_upper in sentiment_403_cache:
             cache_time = sentiment_403_cache[symbol_upper]
             if datetime.now() - cache_time < SENTIMENT_403_TTL:
-                print(f"[Python Backend] Skipping sentiment API for {symbol_upper} - known to return 403 (cached)")
+                log_sampled("sentiment_403_skip", logging.INFO, "[Python Backend] Skipping sentiment API for %s - known to return 403 (cached)", symbol_upper)
             else:
                 # Cache expired, remove it
                 del sentiment_403_cache[symbol_upper]
                 # Fetch sentiment after cache expired
-                print(f"[Python Backend] Fetching social sentiment for {symbol_upper}...")
-                sentiment_response = requests.get(sentiment_url, params=sentiment_params, timeout=10)
+                logger.debug("[Python Backend] Fetching social sentiment for %s...", symbol_upper)
+                sentiment_response = http_session.get(sentiment_url, params=sentiment_params, timeout=10)
                 
                 if sentiment_response.status_code == 200:
                     sentiment_data = sentiment_response.json()
-                    print(f"[Python Backend] Sentiment response: {sentiment_data}")
+                    logger.debug("[Python Backend] Sentiment response: %s", sentiment_data)
                     if sentiment_data and 'reddit' in sentiment_data:
                         reddit_data = sentiment_data.get('reddit', [])
                         if reddit_data and len(reddit_data) > 0:
                             sentiment = sentiment_data
-                            print(f"[Python Backend] Found {len(reddit_data)} Reddit sentiment entries")
+                            logger.debug("[Python Backend] Found %s Reddit sentiment entries", len(reddit_data))
                         else:
-                            print(f"[Python Backend] Reddit data is empty")
+                            logger.debug("[Python Backend] Reddit data is empty")
                     else:
-                        print(f"[Python Backend] No 'reddit' key in sentiment data")
+                        logger.debug("[Python Backend] No 'reddit' key in sentiment data")
                 elif sentiment_response.status_code == 403:
                     # Cache 403 errors to avoid repeated calls
                     sentiment_403_cache[symbol_upper] = datetime.now()
-                    print(f"[Python Backend] Sentiment API returned 403 for {symbol_upper} - caching to skip future requests for {SENTIMENT_403_TTL}")
+                    logger.warning("[Python Backend] Sentiment API returned 403 for %s - caching to skip future requests for %s", symbol_upper, SENTIMENT_403_TTL)
                 else:
-                    print(f"[Python Backend] Sentiment API returned status {sentiment_response.status_code}")
+                    logger.debug("[Python Backend] Sentiment API returned status %s", sentiment_response.status_code)
         else:
             # Not in cache, fetch sentiment
-            print(f"[Python Backend] Fetching social sentiment for {symbol_upper}...")
-            sentiment_response = requests.get(sentiment_url, params=sentiment_params, timeout=10)
+            logger.debug("[Python Backend] Fetching social sentiment for %s...", symbol_upper)
+            sentiment_response = http_session.get(sentiment_url, params=sentiment_params, timeout=10)
             
             if sentiment_response.status_code == 200:
                 sentiment_data = sentiment_response.json()
-                print(f"[Python Backend] Sentiment response: {sentiment_data}")
+                logger.debug("[Python Backend] Sentiment response: %s", sentiment_data)
                 if sentiment_data and 'reddit' in sentiment_data:
                     reddit_data = sentiment_data.get('reddit', [])
                     if reddit_data and len(reddit_data) > 0:
                         sentiment = sentiment_data
-                        print(f"[Python Backend] Found {len(reddit_data)} Reddit sentiment entries")
+                        logger.debug("[Python Backend] Found %s Reddit sentiment entries", len(reddit_data))
                     else:
-                        print(f"[Python Backend] Reddit data is empty")
+                        logger.debug("[Python Backend] Reddit data is empty")
                 else:
-                    print(f"[Python Backend] No 'reddit' key in sentiment data")
+                    logger.debug("[Python Backend] No 'reddit' key in sentiment data")
             elif sentiment_response.status_code == 403:
                 # Cache 403 errors to avoid repeated calls
                 sentiment_403_cache[symbol_upper] = datetime.now()
-                print(f"[Python Backend] Sentiment API returned 403 for {symbol_upper} - caching to skip future requests for {SENTIMENT_403_TTL}")
+                logger.warning("[Python Backend] Sentiment API returned 403 for %s - caching to skip future requests for %s", symbol_upper, SENTIMENT_403_TTL)
             else:
-                print(f"[Python Backend] Sentiment API returned status {sentiment_response.status_code}")
+                logger.debug("[Python Backend] Sentiment API returned status %s", sentiment_response.status_code)
         
         # Fetch insider transactions
         insider_url = f"{FINNHUB_BASE_URL}/stock/insider-transactions"
@@ -2099,172 +4144,525 @@ async def get_sentiment_data(symbol: str, request: Request):
             "token": FINNHUB_API_KEY
         }
         
-        print(f"[Python Backend] Fetching insider transactions for {symbol_upper}...")
-        insider_response = requests.get(insider_url, params=insider_params, timeout=10)
+        logger.debug("[Python Backend] Fetching insider transactions for %s...", symbol_upper)
+        insider_response = http_session.get(insider_url, params=insider_params, timeout=10)
         
         insider_transactions = []
         if insider_response.status_code == 200:
             insider_data = insider_response.json()
-            print(f"[Python Backend] Insider transactions response type: {type(insider_data)}")
+            logger.debug("[Python Backend] Insider transactions response type: %s", type(insider_data))
             
             # Handle both list and dict responses
             if isinstance(insider_data, list):
                 # Direct list response
                 insider_transactions = insider_data[:10] if insider_data else []
-                print(f"[Python Backend] Found {len(insider_transactions)} insider transactions (list format)")
+                logger.debug("[Python Backend] Found %s insider transactions (list format)", len(insider_transactions))
             elif isinstance(insider_data, dict):
                 # Dictionary response with 'data' key
                 if 'data' in insider_data and isinstance(insider_data['data'], list):
                     insider_transactions = insider_data['data'][:10] if insider_data['data'] else []
-                    print(f"[Python Backend] Found {len(insider_transactions)} insider transactions (dict format)")
+                    logger.debug("[Python Backend] Found %s insider transactions (dict format)", len(insider_transactions))
                 else:
-                    print(f"[Python Backend] Insider data dict doesn't contain 'data' list: {insider_data.keys() if isinstance(insider_data, dict) else 'N/A'}")
+                    logger.debug("[Python Backend] Insider data dict doesn't contain 'data' list: %s", insider_data.keys() if isinstance(insider_data, dict) else 'N/A')
             else:
-                print(f"[Python Backend] Insider data is neither list nor dict: {type(insider_data)}")
+                logger.debug("[Python Backend] Insider data is neither list nor dict: %s", type(insider_data))
         else:
-            print(f"[Python Backend] Insider transactions API returned status {insider_response.status_code}")
+            logger.debug("[Python Backend] Insider transactions API returned status %s", insider_response.status_code)
         
         result = {
             "symbol": symbol_upper,
             "sentiment": sentiment,
             "insiderTransactions": insider_transactions
         }
-        print(f"[Python Backend] Returning sentiment data: sentiment={sentiment is not None}, transactions={len(insider_transactions)}")
+        logger.debug("[Python Backend] Returning sentiment data: sentiment=%s, transactions=%s", sentiment is not None, len(insider_transactions))
         return result
-        
+    
     except Exception as e:
         error_msg = str(e)
-        print(f"[Python Backend] Error fetching sentiment data: {error_msg}")
+        logger.warning("[Python Backend] Error fetching sentiment data: %s", error_msg)
         raise HTTPException(status_code=500, detail=f"Error fetching sentiment data: {error_msg}")
 
-@app.get("/api/ai-summary/{symbol}")
-async def get_ai_summary(symbol: str, request: Request):
+# ===========================================
+# AI Response Cache (Gemini)
+# ===========================================
+# Gemini calls take 5-30 seconds, so generated texts are cached server-side.
+# Keys are a hash of the structured prompt inputs (not the prompt text), with
+# volatile numbers bucketed so near-identical inputs share one entry.
+# Entries are persisted in SQLite so they survive restarts and are shared
+# between workers and the offline precompute job.
+
+AI_CACHE_PATH = os.getenv("AI_CACHE_PATH", str(Path(__file__).resolve().parent / "ai_cache.sqlite3"))
+AI_SUMMARY_CACHE_TTL = timedelta(hours=int(os.getenv("AI_CACHE_TTL_HOURS", "24")))
+AI_SWOT_CACHE_TTL = timedelta(hours=int(os.getenv("AI_SWOT_CACHE_TTL_HOURS", "72")))
+AI_MARKET_CACHE_TTL = timedelta(minutes=int(os.getenv("AI_MARKET_CACHE_TTL_MINUTES", "30")))
+
+GEMINI_GENERATE_URL = f"{GEMINI_BASE_URL}/v1beta/models/gemini-flash-latest:generateContent"
+GEMINI_STREAM_URL = f"{GEMINI_BASE_URL}/v1beta/models/gemini-flash-latest:streamGenerateContent"
+
+ai_cache = {}  # {key: (data, expires_at)} - in-process mirror of the SQLite table
+_ai_cache_lock = threading.Lock()
+_ai_cache_db = None
+_ai_inflight = {}  # {key: asyncio.Task} - single-flight for concurrent identical requests
+
+# Gemini usage counters (read by the precompute job to enforce its token budget)
+gemini_usage = {"calls": 0, "tokens": 0}
+_gemini_usage_lock = threading.Lock()
+
+
+def _get_ai_cache_db():
+    """Open the SQLite AI cache lazily. Returns None if the file is not usable."""
+    global _ai_cache_db
+    if _ai_cache_db is None:
+        try:
+            conn = sqlite3.connect(AI_CACHE_PATH, timeout=5, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ai_cache ("
+                "key TEXT PRIMARY KEY, kind TEXT, data TEXT, created REAL, expires REAL)"
+            )
+            conn.commit()
+            _ai_cache_db = conn
+        except sqlite3.Error as e:
+            logger.info("[AI Cache] SQLite cache unavailable (%s): %s - using memory only", AI_CACHE_PATH, e)
+            _ai_cache_db = False
+    return _ai_cache_db or None
+
+
+def _record_gemini_usage(prompt: str, text: str, usage: dict = None):
+    """Count one Gemini call. Uses usageMetadata when present, else estimates ~4 chars per token."""
+    tokens = (usage or {}).get("totalTokenCount") or (len(prompt) + len(text)) // 4
+    with _gemini_usage_lock:
+        gemini_usage["calls"] += 1
+        gemini_usage["tokens"] += tokens
+
+
+def _ai_bucket(value, digits: int = 2):
+    """Round a number to a few significant digits so small moves share a cache key."""
+    if not isinstance(value, (int, float)) or value == 0:
+        return value
+    return float(f"{value:.{digits}g}")
+
+
+def ai_cache_key(kind: str, inputs: dict) -> str:
+    """Build a stable cache key from normalized prompt inputs."""
+    payload = json.dumps(inputs, sort_keys=True, default=str, separators=(",", ":"))
+    return f"{kind}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+def get_cached_ai_response(key: str, min_fresh: timedelta = timedelta(0)):
+    """Return a cached AI response if it is still valid for at least `min_fresh`."""
+    deadline = time.time() + min_fresh.total_seconds()
+    namespace = key.split(":", 1)[0]  # The AI kind, e.g. "swot"
+    entry = ai_cache.get(key)
+    if entry and entry[1] > deadline:
+        cache_lookups.inc(namespace, "hit")
+        return entry[0]
+    
+    with _ai_cache_lock:
+        db = _get_ai_cache_db()
+        if not db:
+            cache_lookups.inc(namespace, "miss")
+            return None
+        try:
+            row = db.execute("SELECT data, expires FROM ai_cache WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("[AI Cache] Read error: %s", e)
+            cache_lookups.inc(namespace, "miss")
+            return None
+    
+    if not row or row[1] <= deadline:
+        cache_lookups.inc(namespace, "miss")
+        return None
+    cache_lookups.inc(namespace, "hit")
+    data = json.loads(row[0])
+    ai_cache[key] = (data, row[1])
+    return data
+
+
+def set_cached_ai_response(key: str, data: dict, ttl: timedelta):
+    """Store an AI response in memory and in the persistent cache."""
+    now = time.time()
+    expires = now + ttl.total_seconds()
+    ai_cache[key] = (data, expires)
+    
+    with _ai_cache_lock:
+        db = _get_ai_cache_db()
+        if not db:
+            return
+        try:
+            db.execute(
+                "INSERT OR REPLACE INTO ai_cache (key, kind, data, created, expires) VALUES (?, ?, ?, ?, ?)",
+                (key, key.split(":", 1)[0], json.dumps(data), now, expires)
+            )
+            db.execute("DELETE FROM ai_cache WHERE expires < ?", (now,))
+            db.commit()
+        except sqlite3.Error as e:
+            logger.warning("[AI Cache] Write error: %s", e)
+
+
+def _start_ai_flight(key: str, coroutine) -> asyncio.Task:
     """
-    Get AI-generated summary for a stock using Google Gemini API.
+    Run `coroutine` as the in-flight generation for `key`.
+    It is a task of its own, so it does not belong to the request that started it: a caller that disconnects
+    only stops waiting (callers await it through asyncio.shield), the generation finishes for everyone else.
+    """
+    async def run():
+        try:
+            return await coroutine
+        finally:
+            if _ai_inflight.get(key) is task:
+                _ai_inflight.pop(key, None)
+    
+    task = asyncio.ensure_future(run())
+    # Mark the exception as retrieved when nobody is waiting any more
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    _ai_inflight[key] = task
+    return task
+
+
+def link_ai_response(alias_key: str, key: str):
+    """Store the cached response of `key` under `alias_key` as well, expiring at the same time."""
+    entry = ai_cache.get(key)
+    if entry is not None:
+        remaining = entry[1] - time.time()
+        if remaining > 0:
+            set_cached_ai_response(alias_key, entry[0], timedelta(seconds=remaining))
+
+
+async def ai_single_flight(key: str, producer, ttl: timedelta, min_fresh: timedelta = timedelta(0)):
+    """
+    Return the cached response for `key`, or run `producer()` once and cache its result.
+    Concurrent callers for the same key wait for the first call instead of hitting Gemini again.
+    """
+    cached = get_cached_ai_response(key, min_fresh)
+    if cached is not None:
+        logger.debug("[AI Cache] Hit for %s...", key[:40])
+        return cached
+    
+    task = _ai_inflight.get(key)
+    if task is not None:
+        logger.debug("[AI Cache] Joining in-flight request for %s...", key[:40])
+    else:
+        async def produce():
+            result = await producer()
+            set_cached_ai_response(key, result, ttl)
+            return result
+        
+        task = _start_ai_flight(key, produce())
+    return await asyncio.shield(task)
+
+
+def call_gemini(prompt: str, log_prefix: str = "[Gemini]", timeout: int = 30) -> str:
     """
+    Call Gemini generateContent and return the generated text.
+    Blocking - run it via asyncio.to_thread from async endpoints.
+    """
+    url = f"{GEMINI_GENERATE_URL}?key={GOOGLE_API_KEY}"
+    payload = {
+        "contents": [{
+            "parts": [{
+                "text": prompt
+            }]
+        }]
+    }
+    
+    logger.debug("%s Calling Gemini API (prompt length: %s characters)...", log_prefix, len(prompt))
+    
     try:
-        symbol_upper = symbol.upper()
+        response = http_session.post(url, json=payload, headers={"Content-Type": "application/json"}, timeout=timeout)
+    except requests.exceptions.RequestException as e:
+        logger.debug("%s Request exception: %s", log_prefix, str(e))
+        raise HTTPException(status_code=500, detail=f"Failed to connect to Gemini API: {str(e)}")
+    
+    if response.status_code != 200:
+        error_text = response.text
+        logger.warning("%s Gemini API error: %s - %s", log_prefix, response.status_code, error_text)
+        try:
+            error_detail = response.json().get("error", {}).get("message", error_text)
+        except:
+            error_detail = error_text
+        raise HTTPException(status_code=response.status_code, detail=f"Gemini API error: {error_detail}")
+    
+    try:
+        data = response.json()
+    except Exception as e:
+        logger.warning("%s Failed to parse Gemini response: %s", log_prefix, str(e))
+        raise HTTPException(status_code=500, detail=f"Invalid response from Gemini API: {str(e)}")
+    
+    # Extract generated text
+    text = ""
+    if "candidates" in data and len(data["candidates"]) > 0:
+        candidate = data["candidates"][0]
+        if "content" in candidate and "parts" in candidate["content"]:
+            for part in candidate["content"]["parts"]:
+                if "text" in part:
+                    text += part["text"]
+    
+    _record_gemini_usage(prompt, text, data.get("usageMetadata"))
+    
+    if not text:
+        logger.debug("%s No text found in Gemini response. Response keys: %s", log_prefix, list(data.keys()))
+    return text
+
+
+def stream_gemini(prompt: str, log_prefix: str = "[Gemini]", timeout: int = 30):
+    """
+    Call Gemini streamGenerateContent (SSE) and yield text chunks as they arrive.
+    Blocking generator - iterate it from a worker thread.
+    """
+    url = f"{GEMINI_STREAM_URL}?alt=sse&key={GOOGLE_API_KEY}"
+    payload = {
+        "contents": [{
+            "parts": [{
+                "text": prompt
+            }]
+        }]
+    }
+    
+    logger.debug("%s Streaming from Gemini API (prompt length: %s characters)...", log_prefix, len(prompt))
+    
+    try:
+        response = http_session.post(url, json=payload, headers={"Content-Type": "application/json"}, timeout=timeout, stream=True)
+    except requests.exceptions.RequestException as e:
+        logger.debug("%s Request exception: %s", log_prefix, str(e))
+        raise HTTPException(status_code=500, detail=f"Failed to connect to Gemini API: {str(e)}")
+    
+    try:
+        if response.status_code != 200:
+            error_text = response.text
+            logger.warning("%s Gemini API error: %s - %s", log_prefix, response.status_code, error_text)
+            try:
+                error_detail = response.json().get("error", {}).get("message", error_text)
+            except:
+                error_detail = error_text
+            raise HTTPException(status_code=response.status_code, detail=f"Gemini API error: {error_detail}")
         
-        if not GOOGLE_API_KEY:
-            print("[Python Backend] ERROR: GOOGLE_API_KEY not configured")
-            raise HTTPException(
-                status_code=503, 
-                detail="AI Summary feature is not available. Google API key not configured. Please set GOOGLE_API_KEY environment variable or contact the administrator."
-            )
+        streamed = []
+        usage = None
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            try:
+                data = json.loads(line[5:].strip())
+            except json.JSONDecodeError:
+                continue
+            usage = data.get("usageMetadata") or usage
+            for candidate in data.get("candidates", [])[:1]:
+                for part in candidate.get("content", {}).get("parts", []):
+                    if part.get("text"):
+                        streamed.append(part["text"])
+                        yield part["text"]
         
-        # Fetch comprehensive stock data
-        print(f"[Python Backend] Fetching data for AI summary: {symbol_upper}")
+        _record_gemini_usage(prompt, "".join(streamed), usage)
+    finally:
+        response.close()
+
+
+def _sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # Disable proxy buffering (nginx) so chunks reach the client immediately
+}
+
+
+async def _generate_ai_stream(cache_key: str, prompt: str, ttl: timedelta, build_response, log_prefix: str, chunks: asyncio.Queue,
+                              alias_key: str = None):
+    """
+    In-flight task behind a streamed AI response: reads Gemini's stream in a worker thread, forwards the text
+    deltas to `chunks` (None marks the end) and caches the full response. It runs to completion even when
+    the client that started it disconnects, so the generation it already pays for is cached, not discarded.
+    """
+    iterator = stream_gemini(prompt, log_prefix)
+    parts = []
+    try:
+        while True:
+            chunk = await asyncio.to_thread(next, iterator, None)
+            if chunk is None:
+                break
+            parts.append(chunk)
+            chunks.put_nowait(chunk)
         
-        # Get fundamentals
+        text = "".join(parts)
+        if not text:
+            raise HTTPException(status_code=500, detail="No summary generated by Gemini API")
+        result = build_response(text)
+        set_cached_ai_response(cache_key, result, ttl)
+        if alias_key:
+            link_ai_response(alias_key, cache_key)
+        return result
+    finally:
+        chunks.put_nowait(None)
+
+
+async def _stream_cached_ai_response(cached: dict, text_field: str):
+    """SSE events for a cached AI response: the whole text as one chunk, then `done`."""
+    yield _sse_event("chunk", {"text": cached.get(text_field, "")})
+    yield _sse_event("done", {**cached, "cached": True})
+
+
+async def _stream_ai_response(cache_key: str, prompt: str, ttl: timedelta, build_response, text_field: str, log_prefix: str,
+                              alias_key: str = None):
+    """
+    Async SSE generator for AI texts.
+    Emits `chunk` events with text deltas, then a `done` event with the full response.
+    Cache hits (and requests joining an in-flight generation) are sent as a single chunk.
+    The complete text is stored in the AI cache when the generation finishes - also if the client left early -
+    and, with `alias_key`, linked under that key too (see link_ai_response).
+    """
+    cached = get_cached_ai_response(cache_key)
+    if cached is not None:
+        if alias_key:
+            link_ai_response(alias_key, cache_key)
+        async for event in _stream_cached_ai_response(cached, text_field):
+            yield event
+        return
+    
+    task = _ai_inflight.get(cache_key)
+    chunks = None
+    if task is None:
+        chunks = asyncio.Queue()
+        task = _start_ai_flight(cache_key, _generate_ai_stream(cache_key, prompt, ttl, build_response, log_prefix, chunks, alias_key))
+    
+    try:
+        if chunks is None:
+            # Joining a generation started by another request - send it whole once it is done
+            result = await asyncio.shield(task)
+            yield _sse_event("chunk", {"text": result.get(text_field, "")})
+            yield _sse_event("done", {**result, "cached": True})
+            return
+        
+        while True:
+            chunk = await chunks.get()
+            if chunk is None:
+                break
+            yield _sse_event("chunk", {"text": chunk})
+        result = await asyncio.shield(task)
+        yield _sse_event("done", {**result, "cached": False})
+    except HTTPException as e:
+        yield _sse_event("error", {"detail": e.detail})
+    except Exception as e:
+        logger.warning("%s Stream error: %s", log_prefix, str(e))
+        yield _sse_event("error", {"detail": str(e)})
+
+
+async def _prepare_ai_summary(symbol_upper: str, request: Request = None):
+    """
+    Gather stock data for the AI summary.
+    Returns (prompt, cache_key).
+    """
+    logger.debug("[Python Backend] Fetching data for AI summary: %s", symbol_upper)
+    
+    # Get fundamentals and analyst data concurrently, off the event loop (both hit their caches first)
+    fundamentals_data, analyst_data = await asyncio.gather(
+        asyncio.to_thread(fetch_fundamentals, symbol_upper),
+        asyncio.to_thread(fetch_analyst_data, symbol_upper),
+        return_exceptions=True
+    )
+    if isinstance(fundamentals_data, BaseException):
+        logger.warning("[Python Backend] Warning: Could not fetch fundamentals: %s", str(fundamentals_data))
         fundamentals_data = None
+    if isinstance(analyst_data, BaseException):
+        logger.warning("[Python Backend] Warning: Could not fetch analyst data: %s", str(analyst_data))
+        analyst_data = None
+    
+    # Get current price - analyst data already carries it, only fall back to the (cached) quote
+    current_price = analyst_data.get("currentPrice") if analyst_data else None
+    if current_price is None:
         try:
-            fundamentals_data = get_fundamentals(symbol_upper)
-        except Exception as e:
-            print(f"[Python Backend] Warning: Could not fetch fundamentals: {str(e)}")
+            quote_data = await asyncio.to_thread(fetch_finnhub_quote, symbol_upper)
+            if quote_data:
+                current_price = quote_data['c']
+        except:
             pass
-        
-        # Get analyst data
-        analyst_data = None
+    
+    # Build comprehensive prompt
+    company_name = symbol_upper
+    sector = "N/A"
+    industry = "N/A"
+    market_cap = None
+    description = None
+    
+    if fundamentals_data:
+        quote_summary = fundamentals_data.get("quoteSummary", {})
+        if quote_summary and "result" in quote_summary and len(quote_summary["result"]) > 0:
+            profile = quote_summary["result"][0].get("summaryProfile", {})
+            company_name = profile.get("longName") or profile.get("name") or symbol_upper
+            sector = profile.get("sector") or "N/A"
+            industry = profile.get("industry") or "N/A"
+            description = profile.get("longBusinessSummary") or profile.get("description") or None
+        
+        # Get market cap and other metrics
         try:
-            analyst_data = await get_analyst_data(symbol_upper, request)
+            if quote_summary.get("result") and len(quote_summary["result"]) > 0:
+                if "defaultKeyStatistics" in quote_summary["result"][0]:
+                    stats = quote_summary["result"][0]["defaultKeyStatistics"]
+                    if "marketCap" in stats and stats["marketCap"]:
+                        market_cap = stats["marketCap"].get("raw")
         except Exception as e:
-            print(f"[Python Backend] Warning: Could not fetch analyst data: {str(e)}")
+            logger.warning("[Python Backend] Warning: Could not extract market cap: %s", str(e))
             pass
-        
-        # Get current price
-        current_price = None
-        try:
-            quote_url = f"{FINNHUB_BASE_URL}/quote"
-            quote_params = {
-                "symbol": symbol_upper,
-                "token": FINNHUB_API_KEY
-            }
-            quote_response = requests.get(quote_url, params=quote_params, timeout=10)
-            if quote_response.status_code == 200:
-                quote_data = quote_response.json()
-                if quote_data and 'c' in quote_data:
-                    current_price = quote_data['c']
-        except:
-            pass
-        
-        # Build comprehensive prompt
-        company_name = symbol_upper
-        sector = "N/A"
-        industry = "N/A"
-        market_cap = None
-        description = None
-        
-        if fundamentals_data:
-            quote_summary = fundamentals_data.get("quoteSummary", {})
-            if quote_summary and "result" in quote_summary and len(quote_summary["result"]) > 0:
-                profile = quote_summary["result"][0].get("summaryProfile", {})
-                company_name = profile.get("longName") or profile.get("name") or symbol_upper
-                sector = profile.get("sector") or "N/A"
-                industry = profile.get("industry") or "N/A"
-                description = profile.get("longBusinessSummary") or profile.get("description") or None
+    
+    # Build financial metrics string
+    financial_metrics = []
+    key_metrics = {}  # Bucketed raw values for the cache key
+    if fundamentals_data:
+        quote_summary = fundamentals_data.get("quoteSummary", {})
+        if quote_summary and "result" in quote_summary and len(quote_summary["result"]) > 0:
+            result = quote_summary["result"][0]
             
-            # Get market cap and other metrics
-            try:
-                if quote_summary.get("result") and len(quote_summary["result"]) > 0:
-                    if "defaultKeyStatistics" in quote_summary["result"][0]:
-                        stats = quote_summary["result"][0]["defaultKeyStatistics"]
-                        if "marketCap" in stats and stats["marketCap"]:
-                            market_cap = stats["marketCap"].get("raw")
-            except Exception as e:
-                print(f"[Python Backend] Warning: Could not extract market cap: {str(e)}")
-                pass
-        
-        # Build financial metrics string
-        financial_metrics = []
-        if fundamentals_data:
-            quote_summary = fundamentals_data.get("quoteSummary", {})
-            if quote_summary and "result" in quote_summary and len(quote_summary["result"]) > 0:
-                result = quote_summary["result"][0]
-                
-                # Valuation metrics
-                if "defaultKeyStatistics" in result:
-                    stats = result["defaultKeyStatistics"]
-                    if "trailingPE" in stats and stats["trailingPE"]:
-                        financial_metrics.append(f"P/E Ratio: {stats['trailingPE'].get('raw', 'N/A')}")
-                    if "priceToBook" in stats and stats["priceToBook"]:
-                        financial_metrics.append(f"Price/Book: {stats['priceToBook'].get('raw', 'N/A')}")
-                    if "beta" in stats and stats["beta"]:
-                        financial_metrics.append(f"Beta: {stats['beta'].get('raw', 'N/A')}")
-                
-                # Financials
-                if "financialData" in result:
-                    financial = result["financialData"]
-                    if "profitMargins" in financial and financial["profitMargins"]:
-                        financial_metrics.append(f"Profit Margin: {financial['profitMargins'].get('raw', 'N/A') * 100:.2f}%")
-                    if "revenueGrowth" in financial and financial["revenueGrowth"]:
-                        financial_metrics.append(f"Revenue Growth: {financial['revenueGrowth'].get('raw', 'N/A') * 100:.2f}%")
-                    if "earningsGrowth" in financial and financial["earningsGrowth"]:
-                        financial_metrics.append(f"Earnings Growth: {financial['earningsGrowth'].get('raw', 'N/A') * 100:.2f}%")
-        
-        # Build analyst recommendations string
-        analyst_info = []
-        if analyst_data:
-            if "recommendations" in analyst_data and analyst_data["recommendations"]:
-                rec = analyst_data["recommendations"]
-                if isinstance(rec, dict):
-                    analyst_info.append(f"Strong Buy: {rec.get('strongBuy', 0)}")
-                    analyst_info.append(f"Buy: {rec.get('buy', 0)}")
-                    analyst_info.append(f"Hold: {rec.get('hold', 0)}")
-                    analyst_info.append(f"Sell: {rec.get('sell', 0)}")
-                    analyst_info.append(f"Strong Sell: {rec.get('strongSell', 0)}")
+            # Valuation metrics
+            if "defaultKeyStatistics" in result:
+                stats = result["defaultKeyStatistics"]
+                if "trailingPE" in stats and stats["trailingPE"]:
+                    financial_metrics.append(f"P/E Ratio: {stats['trailingPE'].get('raw', 'N/A')}")
+                    key_metrics["P/E Ratio"] = _ai_bucket(stats['trailingPE'].get('raw'))
+                if "priceToBook" in stats and stats["priceToBook"]:
+                    financial_metrics.append(f"Price/Book: {stats['priceToBook'].get('raw', 'N/A')}")
+                    key_metrics["Price/Book"] = _ai_bucket(stats['priceToBook'].get('raw'))
+                if "beta" in stats and stats["beta"]:
+                    financial_metrics.append(f"Beta: {stats['beta'].get('raw', 'N/A')}")
+                    key_metrics["Beta"] = _ai_bucket(stats['beta'].get('raw'))
             
-            if "priceTarget" in analyst_data and analyst_data["priceTarget"]:
-                target = analyst_data["priceTarget"]
-                if isinstance(target, dict):
-                    if "targetMean" in target:
-                        analyst_info.append(f"Mean Price Target: ${target['targetMean']:.2f}")
-                    if "targetHigh" in target:
-                        analyst_info.append(f"High Price Target: ${target['targetHigh']:.2f}")
-                    if "targetLow" in target:
-                        analyst_info.append(f"Low Price Target: ${target['targetLow']:.2f}")
-        
-        # Create comprehensive prompt
-        prompt = f"""Analyze the stock {symbol_upper} ({company_name}) and provide a comprehensive investment summary.
+            # Financials
+            if "financialData" in result:
+                financial = result["financialData"]
+                if "profitMargins" in financial and financial["profitMargins"]:
+                    financial_metrics.append(f"Profit Margin: {financial['profitMargins'].get('raw', 'N/A') * 100:.2f}%")
+                    key_metrics["Profit Margin"] = _ai_bucket(financial['profitMargins'].get('raw'))
+                if "revenueGrowth" in financial and financial["revenueGrowth"]:
+                    financial_metrics.append(f"Revenue Growth: {financial['revenueGrowth'].get('raw', 'N/A') * 100:.2f}%")
+                    key_metrics["Revenue Growth"] = _ai_bucket(financial['revenueGrowth'].get('raw'))
+                if "earningsGrowth" in financial and financial["earningsGrowth"]:
+                    financial_metrics.append(f"Earnings Growth: {financial['earningsGrowth'].get('raw', 'N/A') * 100:.2f}%")
+                    key_metrics["Earnings Growth"] = _ai_bucket(financial['earningsGrowth'].get('raw'))
+    
+    # Build analyst recommendations string
+    analyst_info = []
+    if analyst_data:
+        if "recommendations" in analyst_data and analyst_data["recommendations"]:
+            rec = analyst_data["recommendations"]
+            if isinstance(rec, dict):
+                analyst_info.append(f"Strong Buy: {rec.get('strongBuy', 0)}")
+                analyst_info.append(f"Buy: {rec.get('buy', 0)}")
+                analyst_info.append(f"Hold: {rec.get('hold', 0)}")
+                analyst_info.append(f"Sell: {rec.get('sell', 0)}")
+                analyst_info.append(f"Strong Sell: {rec.get('strongSell', 0)}")
+        
+        if "priceTarget" in analyst_data and analyst_data["priceTarget"]:
+            target = analyst_data["priceTarget"]
+            if isinstance(target, dict):
+                if "targetMean" in target:
+                    analyst_info.append(f"Mean Price Target: ${target['targetMean']:.2f}")
+                if "targetHigh" in target:
+                    analyst_info.append(f"High Price Target: ${target['targetHigh']:.2f}")
+                if "targetLow" in target:
+                    analyst_info.append(f"Low Price Target: ${target['targetLow']:.2f}")
+    
+    # Create comprehensive prompt
+    prompt = f"""Analyze the stock {symbol_upper} ({company_name}) and provide a comprehensive investment summary.
 
 Company Information:
 - Symbol: {symbol_upper}
@@ -2292,120 +4690,147 @@ Please provide a comprehensive summary covering:
 
 Format the response in clear, readable paragraphs. Be specific and data-driven. Use the financial metrics and analyst data provided to support your analysis."""
 
-        # Call Gemini API - Use gemini-1.5-flash-latest
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-flash-latest:generateContent?key={GOOGLE_API_KEY}"
-        
-        headers = {
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "contents": [{
-                "parts": [{
-                    "text": prompt
-                }]
-            }]
-        }
-        
-        print(f"[Python Backend] Calling Gemini API for {symbol_upper}...")
-        print(f"[Python Backend] Prompt length: {len(prompt)} characters")
-        
-        try:
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
-        except requests.exceptions.RequestException as e:
-            print(f"[Python Backend] Request exception: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Failed to connect to Gemini API: {str(e)}")
-        
-        if response.status_code != 200:
-            error_text = response.text
-            print(f"[Python Backend] Gemini API error: {response.status_code} - {error_text}")
-            try:
-                error_json = response.json()
-                error_detail = error_json.get("error", {}).get("message", error_text)
-            except:
-                error_detail = error_text
-            raise HTTPException(status_code=response.status_code, detail=f"Gemini API error: {error_detail}")
-        
-        try:
-            data = response.json()
-        except Exception as e:
-            print(f"[Python Backend] Failed to parse Gemini response: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Invalid response from Gemini API: {str(e)}")
-        
-        # Extract summary text
-        summary = ""
-        try:
-            if "candidates" in data and len(data["candidates"]) > 0:
-                candidate = data["candidates"][0]
-                if "content" in candidate and "parts" in candidate["content"]:
-                    for part in candidate["content"]["parts"]:
-                        if "text" in part:
-                            summary += part["text"]
-        except Exception as e:
-            print(f"[Python Backend] Error extracting summary from response: {str(e)}")
-            print(f"[Python Backend] Response structure: {list(data.keys())}")
-            raise HTTPException(status_code=500, detail=f"Could not extract summary from Gemini response: {str(e)}")
-        
+    cache_key = ai_cache_key("ai_summary", {
+        "symbol": symbol_upper,
+        "name": company_name,
+        "sector": sector,
+        "industry": industry,
+        "marketCap": _ai_bucket(market_cap),
+        "metrics": key_metrics,
+        "analyst": analyst_info,
+    })
+    
+    return prompt, cache_key
+
+
+def ai_summary_symbol_key(symbol_upper: str) -> str:
+    """
+    Symbol-level AI summary entry. The content key needs fresh fundamentals and analyst data to compute;
+    this one is checked first, so a cache hit costs no upstream call at all.
+    """
+    return f"ai_summary:symbol:{symbol_upper}"
+
+
+async def generate_ai_summary(symbol_upper: str, request: Request = None, min_fresh: timedelta = timedelta(0)):
+    """
+    Return the (cached) AI summary response for a symbol.
+    `min_fresh` forces regeneration of cache entries expiring sooner than that (used by precompute_ai.py).
+    """
+    symbol_key = ai_summary_symbol_key(symbol_upper)
+    cached = get_cached_ai_response(symbol_key, min_fresh)
+    if cached is not None:
+        return cached
+    
+    prompt, cache_key = await _prepare_ai_summary(symbol_upper, request)
+    
+    async def generate():
+        logger.debug("[Python Backend] Calling Gemini API for %s...", symbol_upper)
+        summary = await asyncio.to_thread(call_gemini, prompt, "[Python Backend]")
         if not summary:
-            print(f"[Python Backend] No summary text found in response. Response keys: {list(data.keys())}")
             raise HTTPException(status_code=500, detail="No summary generated by Gemini API")
-        
         return {
             "symbol": symbol_upper,
             "summary": summary
         }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"[Python Backend] Error in get_ai_summary: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    
+    result = await ai_single_flight(cache_key, generate, AI_SUMMARY_CACHE_TTL, min_fresh)
+    link_ai_response(symbol_key, cache_key)
+    return result
 
 
-@app.get("/api/swot/{symbol}")
-async def get_swot_analysis(symbol: str, request: Request):
+@app.get("/api/ai-summary/{symbol}")
+async def get_ai_summary(symbol: str, request: Request):
     """
-    Generate SWOT analysis for a stock using Google Gemini API.
-    API key is read from .env file - never exposed to frontend.
+    Get AI-generated summary for a stock using Google Gemini API.
+    Responses are cached by their structured inputs (see AI Response Cache).
     """
     try:
         symbol_upper = symbol.upper()
         
         if not GOOGLE_API_KEY:
-            print("[Python Backend] ERROR: GOOGLE_API_KEY not configured")
+            logger.debug("[Python Backend] ERROR: GOOGLE_API_KEY not configured")
             raise HTTPException(
-                status_code=503, 
-                detail="SWOT Analysis feature is not available. Google API key not configured."
+                status_code=503,
+                detail="AI Summary feature is not available. Google API key not configured. Please set GOOGLE_API_KEY environment variable or contact the administrator."
             )
         
-        # Fetch company information
-        print(f"[SWOT Analysis] Fetching company info for {symbol_upper}...")
-        company_info = {}
-        try:
-            finnhub_data = fetch_from_finnhub(symbol_upper)
-            if finnhub_data:
-                profile = finnhub_data.get("profile", {})
-                financials = finnhub_data.get("financials", {})
-                metrics = financials.get("metric", {}) if financials else {}
-                
-                company_info = {
-                    "name": profile.get("name") or symbol_upper,
-                    "sector": profile.get("finnhubIndustry") or "N/A",
-                    "industry": profile.get("finnhubIndustry") or "N/A",
-                    "marketCap": profile.get("marketCapitalization"),
-                    "pe": metrics.get("peTTM") or metrics.get("peExclExtraTTM"),
-                    "profitMargin": metrics.get("netProfitMarginTTM"),
-                    "revenueGrowth": metrics.get("revenueGrowthTTMYoy"),
-                }
-        except Exception as e:
-            print(f"[SWOT Analysis] Error fetching company info: {e}")
-        
-        # Build SWOT prompt - request JSON format
-        company_name = company_info.get("name", symbol_upper)
-        sector = company_info.get("sector", "N/A")
-        industry = company_info.get("industry", "N/A")
-        
-        prompt = f"""Analyze the company {company_name} ({symbol_upper}) and provide a SWOT analysis.
+        return await generate_ai_summary(symbol_upper, request)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.warning("[Python Backend] Error in get_ai_summary: %s", str(e))
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/ai-summary/{symbol}/stream")
+async def stream_ai_summary(symbol: str, request: Request):
+    """
+    Streaming variant of /api/ai-summary/{symbol} using Server-Sent Events.
+    Events: `chunk` ({"text": ...}) as Gemini generates, then `done` with the full response,
+    or `error` ({"detail": ...}).
+    """
+    symbol_upper = symbol.upper()
+    
+    if not GOOGLE_API_KEY:
+        logger.debug("[Python Backend] ERROR: GOOGLE_API_KEY not configured")
+        raise HTTPException(
+            status_code=503,
+            detail="AI Summary feature is not available. Google API key not configured. Please set GOOGLE_API_KEY environment variable or contact the administrator."
+        )
+    
+    # Symbol-level hit: served straight from the AI cache, no fundamentals/analyst fetch
+    symbol_key = ai_summary_symbol_key(symbol_upper)
+    cached = get_cached_ai_response(symbol_key)
+    if cached is not None:
+        return StreamingResponse(_stream_cached_ai_response(cached, "summary"), media_type="text/event-stream", headers=SSE_HEADERS)
+    
+    prompt, cache_key = await _prepare_ai_summary(symbol_upper, request)
+    
+    return StreamingResponse(
+        _stream_ai_response(
+            cache_key, prompt, AI_SUMMARY_CACHE_TTL,
+            lambda text: {"symbol": symbol_upper, "summary": text},
+            "summary", "[Python Backend]", symbol_key
+        ),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
+async def generate_swot_analysis(symbol_upper: str, min_fresh: timedelta = timedelta(0)):
+    """
+    Return the (cached) SWOT analysis response for a symbol.
+    `min_fresh` forces regeneration of cache entries expiring sooner than that (used by precompute_ai.py).
+    """
+    # Fetch company information
+    logger.debug("[SWOT Analysis] Fetching company info for %s...", symbol_upper)
+    company_info = {}
+    try:
+        finnhub_data = await asyncio.to_thread(fetch_from_finnhub, symbol_upper)
+        if finnhub_data:
+            profile = finnhub_data.get("profile", {})
+            financials = finnhub_data.get("financials", {})
+            metrics = financials.get("metric", {}) if financials else {}
+            
+            company_info = {
+                "name": profile.get("name") or symbol_upper,
+                "sector": profile.get("finnhubIndustry") or "N/A",
+                "industry": profile.get("finnhubIndustry") or "N/A",
+                "marketCap": profile.get("marketCapitalization"),
+                "pe": metrics.get("peTTM") or metrics.get("peExclExtraTTM"),
+                "profitMargin": metrics.get("netProfitMarginTTM"),
+                "revenueGrowth": metrics.get("revenueGrowthTTMYoy"),
+            }
+    except Exception as e:
+        logger.warning("[SWOT Analysis] Error fetching company info: %s", e)
+    
+    # Build SWOT prompt - request JSON format
+    company_name = company_info.get("name", symbol_upper)
+    sector = company_info.get("sector", "N/A")
+    industry = company_info.get("industry", "N/A")
+    
+    prompt = f"""Analyze the company {company_name} ({symbol_upper}) and provide a SWOT analysis.
 
 Company Information:
 - Symbol: {symbol_upper}
@@ -2445,36 +4870,20 @@ Please provide a SWOT analysis in the following JSON format:
 Rank each point by priority: "high" for most important, "medium" for moderately important, and "low" for less critical points.
 Provide 3-5 points per category, ranked by importance. Return ONLY valid JSON, no additional text or markdown."""
 
-        # Call Gemini API
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-flash-latest:generateContent?key={GOOGLE_API_KEY}"
-        
-        payload = {
-            "contents": [{
-                "parts": [{
-                    "text": prompt
-                }]
-            }]
-        }
-        
-        print(f"[SWOT Analysis] Calling Gemini API for {symbol_upper}...")
-        
-        response = requests.post(url, json=payload, headers={"Content-Type": "application/json"}, timeout=30)
-        
-        if response.status_code != 200:
-            error_text = response.text
-            print(f"[SWOT Analysis] Gemini API error: {response.status_code} - {error_text}")
-            raise HTTPException(status_code=response.status_code, detail=f"Gemini API error: {error_text}")
-        
-        data = response.json()
-        
-        # Extract analysis text
-        analysis_text = ""
-        if "candidates" in data and len(data["candidates"]) > 0:
-            candidate = data["candidates"][0]
-            if "content" in candidate and "parts" in candidate["content"]:
-                for part in candidate["content"]["parts"]:
-                    if "text" in part:
-                        analysis_text += part["text"]
+    cache_key = ai_cache_key("swot", {
+        "symbol": symbol_upper,
+        "name": company_name,
+        "sector": sector,
+        "industry": industry,
+        "marketCap": _ai_bucket(company_info.get("marketCap")),
+        "pe": _ai_bucket(company_info.get("pe")),
+        "profitMargin": _ai_bucket(company_info.get("profitMargin")),
+        "revenueGrowth": _ai_bucket(company_info.get("revenueGrowth")),
+    })
+    
+    async def generate():
+        logger.debug("[SWOT Analysis] Calling Gemini API for %s...", symbol_upper)
+        analysis_text = await asyncio.to_thread(call_gemini, prompt, "[SWOT Analysis]")
         
         if not analysis_text:
             raise HTTPException(status_code=500, detail="No analysis generated by Gemini API")
@@ -2487,8 +4896,8 @@ Provide 3-5 points per category, ranked by importance. Return ONLY valid JSON, n
         try:
             analysis = json.loads(json_text)
         except json.JSONDecodeError as e:
-            print(f"[SWOT Analysis] JSON parse error: {e}")
-            print(f"[SWOT Analysis] Raw response: {analysis_text}")
+            logger.warning("[SWOT Analysis] JSON parse error: %s", e)
+            logger.debug("[SWOT Analysis] Raw response: %s", analysis_text)
             raise HTTPException(status_code=500, detail="Failed to parse SWOT analysis from API response")
         
         return {
@@ -2496,63 +4905,66 @@ Provide 3-5 points per category, ranked by importance. Return ONLY valid JSON, n
             "analysis": analysis,
             "companyInfo": company_info
         }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"[SWOT Analysis] Error: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    
+    return await ai_single_flight(cache_key, generate, AI_SWOT_CACHE_TTL, min_fresh)
 
 
-@app.post("/api/ai-market-summary")
-async def get_ai_market_summary(request: Request):
+@app.get("/api/swot/{symbol}")
+async def get_swot_analysis(symbol: str, request: Request):
     """
-    Generate AI market summary using Google Gemini API.
-    Accepts market data as POST body and returns AI-generated analysis.
+    Generate SWOT analysis for a stock using Google Gemini API.
     API key is read from .env file - never exposed to frontend.
     """
     try:
+        symbol_upper = symbol.upper()
+        
         if not GOOGLE_API_KEY:
-            print("[Python Backend] ERROR: GOOGLE_API_KEY not configured")
+            logger.debug("[Python Backend] ERROR: GOOGLE_API_KEY not configured")
             raise HTTPException(
-                status_code=503, 
-                detail="AI Summary feature is not available. Google API key not configured."
+                status_code=503,
+                detail="SWOT Analysis feature is not available. Google API key not configured."
             )
         
-        # Get market data from request body
-        body = await request.json()
-        market_data = body.get("marketData", {})
-        
-        if not market_data:
-            raise HTTPException(status_code=400, detail="marketData is required")
-        
-        # Build prompt from market data
-        time_range = market_data.get("timeRange", "1D")
-        indices = market_data.get("indices", [])
-        top_movers = market_data.get("topMovers", {})
-        currencies = market_data.get("currencies", [])
-        
-        indices_text = "\n".join([
-            f"- {idx.get('name', idx.get('symbol'))} ({idx.get('symbol')}): ${idx.get('price', 0):.2f} ({'+' if idx.get('changePercent', 0) >= 0 else ''}{idx.get('changePercent', 0):.2f}%)"
-            for idx in indices
-        ]) if indices else "No index data available"
-        
-        gainers_text = "\n".join([
-            f"- {g.get('symbol')}: ${g.get('price', 0):.2f} ({'+' if g.get('changePercent', 0) >= 0 else ''}{g.get('changePercent', 0):.2f}%)"
-            for g in top_movers.get('gainers', [])
-        ]) if top_movers.get('gainers') else "No data"
-        
-        losers_text = "\n".join([
-            f"- {l.get('symbol')}: ${l.get('price', 0):.2f} ({'+' if l.get('changePercent', 0) >= 0 else ''}{l.get('changePercent', 0):.2f}%)"
-            for l in top_movers.get('losers', [])
-        ]) if top_movers.get('losers') else "No data"
-        
-        currencies_text = "\n".join([
-            f"- {c.get('name', c.get('symbol'))} ({c.get('symbol')}): {c.get('price', 0):.4f} ({'+' if c.get('changePercent', 0) >= 0 else ''}{c.get('changePercent', 0):.2f}%)"
-            for c in currencies
-        ]) if currencies else "No currency data available"
-        
-        prompt = f"""Create a comprehensive, well-structured market analysis based on the following current market data.
+        return await generate_swot_analysis(symbol_upper)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.warning("[SWOT Analysis] Error: %s", str(e))
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _prepare_ai_market_summary(market_data: dict):
+    """
+    Build the market summary prompt from the posted market data.
+    Returns (prompt, cache_key).
+    """
+    time_range = market_data.get("timeRange", "1D")
+    indices = market_data.get("indices", [])
+    top_movers = market_data.get("topMovers", {})
+    currencies = market_data.get("currencies", [])
+    
+    indices_text = "\n".join([
+        f"- {idx.get('name', idx.get('symbol'))} ({idx.get('symbol')}): ${idx.get('price', 0):.2f} ({'+' if idx.get('changePercent', 0) >= 0 else ''}{idx.get('changePercent', 0):.2f}%)"
+        for idx in indices
+    ]) if indices else "No index data available"
+    
+    gainers_text = "\n".join([
+        f"- {g.get('symbol')}: ${g.get('price', 0):.2f} ({'+' if g.get('changePercent', 0) >= 0 else ''}{g.get('changePercent', 0):.2f}%)"
+        for g in top_movers.get('gainers', [])
+    ]) if top_movers.get('gainers') else "No data"
+    
+    losers_text = "\n".join([
+        f"- {l.get('symbol')}: ${l.get('price', 0):.2f} ({'+' if l.get('changePercent', 0) >= 0 else ''}{l.get('changePercent', 0):.2f}%)"
+        for l in top_movers.get('losers', [])
+    ]) if top_movers.get('losers') else "No data"
+    
+    currencies_text = "\n".join([
+        f"- {c.get('name', c.get('symbol'))} ({c.get('symbol')}): {c.get('price', 0):.4f} ({'+' if c.get('changePercent', 0) >= 0 else ''}{c.get('changePercent', 0):.2f}%)"
+        for c in currencies
+    ]) if currencies else "No currency data available"
+    
+    prompt = f"""Create a comprehensive, well-structured market analysis based on the following current market data.
 
 The analysis should provide investors with a solid overview of the current market situation.
 
@@ -2607,53 +5019,97 @@ Structure & Content (follow strictly):
 Please use the provided data and ensure logical, understandable argumentation.
 The output should be high-quality, precise and visually well-structured."""
 
-        # Call Gemini API
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-flash-latest:generateContent?key={GOOGLE_API_KEY}"
-        
-        headers = {
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "contents": [{
-                "parts": [{
-                    "text": prompt
-                }]
-            }]
-        }
-        
-        print(f"[AI Market Summary] Calling Gemini API...")
-        
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
-        
-        if response.status_code != 200:
-            error_text = response.text
-            print(f"[AI Market Summary] Gemini API error: {response.status_code} - {error_text}")
-            raise HTTPException(status_code=response.status_code, detail=f"Gemini API error: {error_text}")
+    # Market data bucket: symbols plus change rounded to 0.5%, so every visitor
+    # polling the same market state shares one generated summary
+    def bucket_rows(rows):
+        return [
+            (row.get('symbol'), round((row.get('changePercent') or 0) * 2) / 2)
+            for row in rows
+        ]
+    
+    cache_key = ai_cache_key("ai_market_summary", {
+        "timeRange": time_range,
+        "indices": bucket_rows(indices),
+        "gainers": bucket_rows(top_movers.get('gainers', [])),
+        "losers": bucket_rows(top_movers.get('losers', [])),
+        "currencies": bucket_rows(currencies),
+    })
+    
+    return prompt, cache_key
+
+
+@app.post("/api/ai-market-summary")
+async def get_ai_market_summary(request: Request):
+    """
+    Generate AI market summary using Google Gemini API.
+    Accepts market data as POST body and returns AI-generated analysis.
+    API key is read from .env file - never exposed to frontend.
+    """
+    try:
+        if not GOOGLE_API_KEY:
+            logger.debug("[Python Backend] ERROR: GOOGLE_API_KEY not configured")
+            raise HTTPException(
+                status_code=503,
+                detail="AI Summary feature is not available. Google API key not configured."
+            )
         
-        data = response.json()
+        # Get market data from request body
+        body = await request.json()
+        market_data = body.get("marketData", {})
         
-        # Extract summary text
-        summary = ""
-        if "candidates" in data and len(data["candidates"]) > 0:
-            candidate = data["candidates"][0]
-            if "content" in candidate and "parts" in candidate["content"]:
-                for part in candidate["content"]["parts"]:
-                    if "text" in part:
-                        summary += part["text"]
+        if not market_data:
+            raise HTTPException(status_code=400, detail="marketData is required")
         
-        if not summary:
-            raise HTTPException(status_code=500, detail="No summary generated by Gemini API")
+        prompt, cache_key = _prepare_ai_market_summary(market_data)
         
-        return {"summary": summary}
+        async def generate():
+            logger.debug("[AI Market Summary] Calling Gemini API...")
+            summary = await asyncio.to_thread(call_gemini, prompt, "[AI Market Summary]")
+            if not summary:
+                raise HTTPException(status_code=500, detail="No summary generated by Gemini API")
+            return {"summary": summary}
         
+        return await ai_single_flight(cache_key, generate, AI_MARKET_CACHE_TTL)
+    
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[AI Market Summary] Error: {str(e)}")
+        logger.warning("[AI Market Summary] Error: %s", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/ai-market-summary/stream")
+async def stream_ai_market_summary(request: Request):
+    """
+    Streaming variant of /api/ai-market-summary using Server-Sent Events.
+    Accepts the same POST body; emits `chunk`, then `done` (or `error`) events.
+    """
+    if not GOOGLE_API_KEY:
+        logger.debug("[Python Backend] ERROR: GOOGLE_API_KEY not configured")
+        raise HTTPException(
+            status_code=503,
+            detail="AI Summary feature is not available. Google API key not configured."
+        )
+    
+    body = await request.json()
+    market_data = body.get("marketData", {})
+    
+    if not market_data:
+        raise HTTPException(status_code=400, detail="marketData is required")
+    
+    prompt, cache_key = _prepare_ai_market_summary(market_data)
+    
+    return StreamingResponse(
+        _stream_ai_response(
+            cache_key, prompt, AI_MARKET_CACHE_TTL,
+            lambda text: {"summary": text},
+            "summary", "[AI Market Summary]"
+        ),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
 @app.get("/api/price-changes/{symbol}")
 async def get_price_changes(symbol: str, request: Request):
     """
@@ -2667,7 +5123,7 @@ async def get_price_changes(symbol: str, request: Request):
         if symbol_upper in price_changes_error_cache:
             cache_time = price_changes_error_cache[symbol_upper]
             if datetime.now() - cache_time < PRICE_CHANGES_ERROR_TTL:
-                print(f"[Python Backend] Skipping price changes for {symbol_upper} - cached error (no data available)")
+                log_sampled("price_changes_skip", logging.INFO, "[Python Backend] Skipping price changes for %s - cached error (no data available)", symbol_upper)
                 return {
                     "change1D": None,
                     "change1M": None,
@@ -2678,10 +5134,11 @@ async def get_price_changes(symbol: str, request: Request):
                 # Cache expired, remove it
                 del price_changes_error_cache[symbol_upper]
         
-        print(f"[Python Backend] Fetching price changes for {symbol_upper}...")
+        logger.debug("[Python Backend] Fetching price changes for %s...", symbol_upper)
         
         if not YFINANCE_AVAILABLE:
             raise HTTPException(status_code=503, detail="yfinance library not available")
+        await load_yfinance()
         
         # Use the provided symbol directly - no variant searching to avoid delays
         # User explicitly requested not to search for other tickers as it takes too long
@@ -2689,27 +5146,27 @@ async def get_price_changes(symbol: str, request: Request):
         working_symbol = symbol_upper
         
         try:
-            print(f"[Python Backend] Using symbol directly (no variant search): {working_symbol}")
-            ticker = yf.Ticker(working_symbol)
+            logger.debug("[Python Backend] Using symbol directly (no variant search): %s", working_symbol)
+            ticker = get_yfinance().Ticker(working_symbol)
             
             # Try to get current price to verify the symbol works
             test_hist = ticker.history(period="5d")
             if test_hist is None or len(test_hist) == 0:
-                print(f"[Python Backend] No data found for {working_symbol}")
+                logger.debug("[Python Backend] No data found for %s", working_symbol)
                 # Cache the error
                 price_changes_error_cache[symbol_upper] = datetime.now()
                 ticker = None
         except Exception as e:
             error_msg = str(e)
-            print(f"[Python Backend] Error with symbol {working_symbol}: {error_msg}")
+            logger.warning("[Python Backend] Error with symbol %s: %s", working_symbol, error_msg)
             # Cache errors like "delisted" or "no data"
             if "delisted" in error_msg.lower() or "no data" in error_msg.lower() or "expecting value" in error_msg.lower():
                 price_changes_error_cache[symbol_upper] = datetime.now()
-                print(f"[Python Backend] Cached price changes error for {symbol_upper}")
+                logger.warning("[Python Backend] Cached price changes error for %s", symbol_upper)
             ticker = None
         
         if ticker is None:
-            print(f"[Python Backend] Could not find data for symbol: {working_symbol}")
+            logger.warning("[Python Backend] Could not find data for symbol: %s", working_symbol)
             return {
                 "change1D": None,
                 "change1M": None,
@@ -2727,9 +5184,9 @@ async def get_price_changes(symbol: str, request: Request):
                 hist = ticker.history(period="5d", interval="1d")
                 if hist is not None and len(hist) > 0:
                     current_price = float(hist['Close'].iloc[-1])
-                    print(f"[Python Backend] Got current price from history: {current_price}")
+                    logger.debug("[Python Backend] Got current price from history: %s", current_price)
             except Exception as e:
-                print(f"[Python Backend] Could not get price from history: {e}")
+                logger.warning("[Python Backend] Could not get price from history: %s", e)
             
             # Fallback: try info (may be rate-limited)
             if current_price is None:
@@ -2737,9 +5194,9 @@ async def get_price_changes(symbol: str, request: Request):
                     info = ticker.info
                     current_price = info.get("regularMarketPrice") or info.get("currentPrice")
                     if current_price:
-                        print(f"[Python Backend] Got current price from info: {current_price}")
+                        logger.debug("[Python Backend] Got current price from info: %s", current_price)
                 except Exception as e:
-                    print(f"[Python Backend] Could not get price from info: {e}")
+                    logger.warning("[Python Backend] Could not get price from info: %s", e)
             
             # Fallback: try fast_info
             if current_price is None:
@@ -2747,12 +5204,12 @@ async def get_price_changes(symbol: str, request: Request):
                     fast_info = ticker.fast_info
                     current_price = fast_info.get("lastPrice") or fast_info.get("regularMarketPrice")
                     if current_price:
-                        print(f"[Python Backend] Got current price from fast_info: {current_price}")
+                        logger.debug("[Python Backend] Got current price from fast_info: %s", current_price)
                 except Exception as e:
-                    print(f"[Python Backend] Could not get price from fast_info: {e}")
+                    logger.warning("[Python Backend] Could not get price from fast_info: %s", e)
             
             if current_price is None:
-                print(f"[Python Backend] Could not determine current price for {working_symbol}")
+                logger.warning("[Python Backend] Could not determine current price for %s", working_symbol)
                 return {
                     "change1D": None,
                     "change1M": None,
@@ -2761,7 +5218,7 @@ async def get_price_changes(symbol: str, request: Request):
                 }
             
             current_price = float(current_price)
-            print(f"[Python Backend] Using current price: {current_price} for {working_symbol}")
+            logger.debug("[Python Backend] Using current price: %s for %s", current_price, working_symbol)
             
             # Calculate changes for different periods
             changes = {}
@@ -2782,16 +5239,14 @@ async def get_price_changes(symbol: str, request: Request):
                     yesterday_close = float(hist_1d['Close'].iloc[-2])
                     changes["change1D"] = calc_change(yesterday_close, current_price)
                     if changes["change1D"] is not None:
-                        print(f"[Python Backend] 1D: current={current_price}, yesterday={yesterday_close}, change={changes['change1D']:.2f}%")
+                        logger.debug("[Python Backend] 1D: current=%s, yesterday=%s, change=%.2f%%", current_price, yesterday_close, changes['change1D'])
                     else:
-                        print(f"[Python Backend] Could not calculate 1D change")
+                        logger.warning("[Python Backend] Could not calculate 1D change")
                 else:
-                    print(f"[Python Backend] Not enough data for 1D: {len(hist_1d) if hist_1d is not None else 0} days")
+                    logger.debug("[Python Backend] Not enough data for 1D: %s days", len(hist_1d) if hist_1d is not None else 0)
                     changes["change1D"] = None
             except Exception as e:
-                print(f"[Python Backend] Error calculating 1D change: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.warning("[Python Backend] Error calculating 1D change: %s", e, exc_info=True)
                 changes["change1D"] = None
             
             # 1 Month: Get price from 30 days ago
@@ -2801,16 +5256,14 @@ async def get_price_changes(symbol: str, request: Request):
                     month_ago_close = float(hist_1m['Close'].iloc[0])
                     changes["change1M"] = calc_change(month_ago_close, current_price)
                     if changes["change1M"] is not None:
-                        print(f"[Python Backend] 1M: current={current_price}, month_ago={month_ago_close}, change={changes['change1M']:.2f}%")
+                        logger.debug("[Python Backend] 1M: current=%s, month_ago=%s, change=%.2f%%", current_price, month_ago_close, changes['change1M'])
                     else:
-                        print(f"[Python Backend] Could not calculate 1M change")
+                        logger.warning("[Python Backend] Could not calculate 1M change")
                 else:
-                    print(f"[Python Backend] Not enough data for 1M: {len(hist_1m) if hist_1m is not None else 0} days")
+                    logger.debug("[Python Backend] Not enough data for 1M: %s days", len(hist_1m) if hist_1m is not None else 0)
                     changes["change1M"] = None
             except Exception as e:
-                print(f"[Python Backend] Error calculating 1M change: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.warning("[Python Backend] Error calculating 1M change: %s", e, exc_info=True)
                 changes["change1M"] = None
             
             # 1 Year: Get price from 1 year ago
@@ -2820,16 +5273,14 @@ async def get_price_changes(symbol: str, request: Request):
                     year_ago_close = float(hist_1y['Close'].iloc[0])
                     changes["change1Y"] = calc_change(year_ago_close, current_price)
                     if changes["change1Y"] is not None:
-                        print(f"[Python Backend] 1Y: current={current_price}, year_ago={year_ago_close}, change={changes['change1Y']:.2f}%")
+                        logger.debug("[Python Backend] 1Y: current=%s, year_ago=%s, change=%.2f%%", current_price, year_ago_close, changes['change1Y'])
                     else:
-                        print(f"[Python Backend] Could not calculate 1Y change")
+                        logger.warning("[Python Backend] Could not calculate 1Y change")
                 else:
-                    print(f"[Python Backend] Not enough data for 1Y: {len(hist_1y) if hist_1y is not None else 0} days")
+                    logger.debug("[Python Backend] Not enough data for 1Y: %s days", len(hist_1y) if hist_1y is not None else 0)
                     changes["change1Y"] = None
             except Exception as e:
-                print(f"[Python Backend] Error calculating 1Y change: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.warning("[Python Backend] Error calculating 1Y change: %s", e, exc_info=True)
                 changes["change1Y"] = None
             
             # 10 Years: Get price from 10 years ago
@@ -2839,19 +5290,17 @@ async def get_price_changes(symbol: str, request: Request):
                     ten_years_ago_close = float(hist_10y['Close'].iloc[0])
                     changes["change10Y"] = calc_change(ten_years_ago_close, current_price)
                     if changes["change10Y"] is not None:
-                        print(f"[Python Backend] 10Y: current={current_price}, 10y_ago={ten_years_ago_close}, change={changes['change10Y']:.2f}%")
+                        logger.debug("[Python Backend] 10Y: current=%s, 10y_ago=%s, change=%.2f%%", current_price, ten_years_ago_close, changes['change10Y'])
                     else:
-                        print(f"[Python Backend] Could not calculate 10Y change")
+                        logger.warning("[Python Backend] Could not calculate 10Y change")
                 else:
-                    print(f"[Python Backend] Not enough data for 10Y: {len(hist_10y) if hist_10y is not None else 0} days")
+                    logger.debug("[Python Backend] Not enough data for 10Y: %s days", len(hist_10y) if hist_10y is not None else 0)
                     changes["change10Y"] = None
             except Exception as e:
-                print(f"[Python Backend] Error calculating 10Y change: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.warning("[Python Backend] Error calculating 10Y change: %s", e, exc_info=True)
                 changes["change10Y"] = None
             
-            print(f"[Python Backend] Price changes for {symbol_upper}: 1D={changes.get('change1D')}, 1M={changes.get('change1M')}, 1Y={changes.get('change1Y')}, 10Y={changes.get('change10Y')}")
+            logger.debug("[Python Backend] Price changes for %s: 1D=%s, 1M=%s, 1Y=%s, 10Y=%s", symbol_upper, changes.get('change1D'), changes.get('change1M'), changes.get('change1Y'), changes.get('change10Y'))
             
             return {
                 "change1D": changes.get("change1D"),
@@ -2859,19 +5308,15 @@ async def get_price_changes(symbol: str, request: Request):
                 "change1Y": changes.get("change1Y"),
                 "change10Y": changes.get("change10Y")
             }
-            
+        
         except Exception as e:
-            print(f"[Python Backend] Error fetching price changes: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.warning("[Python Backend] Error fetching price changes: %s", e, exc_info=True)
             raise HTTPException(status_code=500, detail=f"Error fetching price changes: {str(e)}")
-            
+    
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[Python Backend] Unexpected error in get_price_changes: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.warning("[Python Backend] Unexpected error in get_price_changes: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2884,7 +5329,7 @@ async def get_dividends_data(symbol: str, request: Request):
     try:
         symbol_upper = symbol.upper()
         
-        print(f"[Python Backend] Fetching dividend data from Finnhub for {symbol_upper}...")
+        logger.debug("[Python Backend] Fetching dividend data from Finnhub for %s...", symbol_upper)
         
         dividend_history = []
         dividend_yield = None
@@ -2897,12 +5342,13 @@ async def get_dividends_data(symbol: str, request: Request):
         
         if use_yfinance_dividends:
             try:
-                print(f"[Python Backend] Fetching dividend history from yfinance for {symbol_upper}...")
-                ticker = yf.Ticker(symbol_upper)
+                logger.debug("[Python Backend] Fetching dividend history from yfinance for %s...", symbol_upper)
+                await load_yfinance()
+                ticker = get_yfinance().Ticker(symbol_upper)
                 
                 # Get dividends directly (no need to download full history)
                 dividends_df = ticker.dividends
-                print(f"[Python Backend] yfinance dividends_df type: {type(dividends_df)}, length: {len(dividends_df) if dividends_df is not None else 0}")
+                logger.debug("[Python Backend] yfinance dividends_df type: %s, length: %s", type(dividends_df), len(dividends_df) if dividends_df is not None else 0)
                 
                 if dividends_df is not None and len(dividends_df) > 0:
                     for date, amount in dividends_df.items():
@@ -2912,14 +5358,14 @@ async def get_dividends_data(symbol: str, request: Request):
                         })
                     # Sort by date, newest first
                     dividend_history.sort(key=lambda x: x["date"], reverse=True)
-                    print(f"[Python Backend] Found {len(dividend_history)} dividends from yfinance")
+                    logger.debug("[Python Backend] Found %s dividends from yfinance", len(dividend_history))
                 else:
-                    print(f"[Python Backend] No dividends found in yfinance dividends_df. Trying actions...")
+                    logger.debug("[Python Backend] No dividends found in yfinance dividends_df. Trying actions...")
                     # Try actions as alternative
                     try:
                         actions = ticker.actions
                         if actions is not None and len(actions) > 0 and 'Dividends' in actions.columns:
-                            print(f"[Python Backend] Found dividends in actions: {len(actions)} rows")
+                            logger.debug("[Python Backend] Found dividends in actions: %s rows", len(actions))
                             for date, row in actions.iterrows():
                                 if 'Dividends' in row and row['Dividends'] > 0:
                                     dividend_history.append({
@@ -2927,14 +5373,12 @@ async def get_dividends_data(symbol: str, request: Request):
                                         "amount": float(row['Dividends'])
                                     })
                             dividend_history.sort(key=lambda x: x["date"], reverse=True)
-                            print(f"[Python Backend] Found {len(dividend_history)} dividends from actions")
+                            logger.debug("[Python Backend] Found %s dividends from actions", len(dividend_history))
                     except Exception as e2:
-                        print(f"[Python Backend] Error fetching from actions: {e2}")
+                        logger.warning("[Python Backend] Error fetching from actions: %s", e2)
             except Exception as e:
                 error_msg = str(e)
-                print(f"[Python Backend] Error fetching dividend history from yfinance: {error_msg}")
-                import traceback
-                traceback.print_exc()
+                logger.warning("[Python Backend] Error fetching dividend history from yfinance: %s", error_msg, exc_info=True)
                 
                 # Cache the error if it's a persistent issue
                 if "delisted" in error_msg.lower() or "no data" in error_msg.lower() or "expecting value" in error_msg.lower():
@@ -2942,42 +5386,34 @@ async def get_dividends_data(symbol: str, request: Request):
                         "error": error_msg,
                         "timestamp": datetime.now()
                     }
-                    print(f"[Python Backend] Cached yfinance error for {symbol_upper} dividends")
+                    logger.warning("[Python Backend] Cached yfinance error for %s dividends", symbol_upper)
         else:
             if symbol_upper in yfinance_error_cache:
-                print(f"[Python Backend] Skipping yfinance dividends for {symbol_upper} - cached error")
+                log_sampled("dividends_skip", logging.INFO, "[Python Backend] Skipping yfinance dividends for %s - cached error", symbol_upper)
             else:
-                print(f"[Python Backend] yfinance not available, cannot fetch dividend history")
+                logger.debug("[Python Backend] yfinance not available, cannot fetch dividend history")
         
         # Get dividend yield and rate from Finnhub metrics
         try:
-            print(f"[Python Backend] Fetching dividend metrics from Finnhub for {symbol_upper}...")
-            fundamentals_url = f"{FINNHUB_BASE_URL}/stock/metric"
-            fundamentals_params = {
-                "symbol": symbol_upper,
-                "metric": "all",
-                "token": FINNHUB_API_KEY
-            }
-            fundamentals_response = requests.get(fundamentals_url, params=fundamentals_params, timeout=10)
+            logger.debug("[Python Backend] Fetching dividend metrics from Finnhub for %s...", symbol_upper)
+            fundamentals_data = fetch_finnhub_metrics(symbol_upper)
             
-            if fundamentals_response.status_code == 200:
-                fundamentals_data = fundamentals_response.json()
-                if fundamentals_data and "metric" in fundamentals_data:
-                    metric = fundamentals_data["metric"]
-                    dividend_yield_raw = metric.get("currentDividendYieldTTM") or metric.get("dividendYieldIndicatedAnnual")
-                    dividend_rate = metric.get("dividendPerShareTTM") or metric.get("dividendPerShareAnnual")
-                    
-                    if dividend_yield_raw:
-                        dividend_yield = dividend_yield_raw
-                        # Finnhub's currentDividendYieldTTM returns as decimal (e.g., 0.0038 for 0.38% or 0.2626 for 26.26%)
-                        # It's already in decimal format, so we don't need to convert
-                        # The value is already correct (0.2626 = 26.26%)
-                        print(f"[Python Backend] Found dividend yield from Finnhub (raw): {dividend_yield_raw}, using as decimal: {dividend_yield}")
-                    
-                    if dividend_rate:
-                        print(f"[Python Backend] Found dividend rate from Finnhub: {dividend_rate}")
+            if fundamentals_data and "metric" in fundamentals_data:
+                metric = fundamentals_data["metric"]
+                dividend_yield_raw = metric.get("currentDividendYieldTTM") or metric.get("dividendYieldIndicatedAnnual")
+                dividend_rate = metric.get("dividendPerShareTTM") or metric.get("dividendPerShareAnnual")
+                
+                if dividend_yield_raw:
+                    dividend_yield = dividend_yield_raw
+                    # Finnhub's currentDividendYieldTTM returns as decimal (e.g., 0.0038 for 0.38% or 0.2626 for 26.26%)
+                    # It's already in decimal format, so we don't need to convert
+                    # The value is already correct (0.2626 = 26.26%)
+                    logger.debug("[Python Backend] Found dividend yield from Finnhub (raw): %s, using as decimal: %s", dividend_yield_raw, dividend_yield)
+                
+                if dividend_rate:
+                    logger.debug("[Python Backend] Found dividend rate from Finnhub: %s", dividend_rate)
         except Exception as e:
-            print(f"[Python Backend] Error fetching dividend metrics from Finnhub: {e}")
+            logger.warning("[Python Backend] Error fetching dividend metrics from Finnhub: %s", e)
         
         # Calculate next dividend date based on last dividend
         if dividend_history and len(dividend_history) > 0:
@@ -2986,9 +5422,9 @@ async def get_dividends_data(symbol: str, request: Request):
                 # Most US stocks pay quarterly (~90 days)
                 # Calculate next expected date
                 next_dividend_date = int((last_dividend_date + timedelta(days=90)).timestamp())
-                print(f"[Python Backend] Calculated next dividend date: {datetime.fromtimestamp(next_dividend_date)}")
+                logger.debug("[Python Backend] Calculated next dividend date: %s", datetime.fromtimestamp(next_dividend_date))
             except Exception as e:
-                print(f"[Python Backend] Error calculating next dividend date: {e}")
+                logger.warning("[Python Backend] Error calculating next dividend date: %s", e)
         
         return {
             "symbol": symbol_upper,
@@ -2998,12 +5434,10 @@ async def get_dividends_data(symbol: str, request: Request):
             "exDividendDate": ex_dividend_date,
             "nextDividendDate": next_dividend_date
         }
-        
+    
     except Exception as e:
         error_msg = str(e)
-        print(f"[Python Backend] Error fetching dividend data: {error_msg}")
-        import traceback
-        traceback.print_exc()
+        logger.warning("[Python Backend] Error fetching dividend data: %s", error_msg, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error fetching dividend data: {error_msg}")
 
 @app.get("/api/ownership/{symbol}")
@@ -3014,10 +5448,11 @@ async def get_ownership_data(symbol: str, request: Request):
     try:
         symbol_upper = symbol.upper()
         
-        print(f"[Python Backend] Fetching ownership data for {symbol_upper}...")
+        logger.debug("[Python Backend] Fetching ownership data for %s...", symbol_upper)
         
         if not YFINANCE_AVAILABLE:
             raise HTTPException(status_code=503, detail="yfinance library not available")
+        await load_yfinance()
         
         major_holders = []
         institutional_holders = []
@@ -3027,13 +5462,13 @@ async def get_ownership_data(symbol: str, request: Request):
         public_float = None
         
         try:
-            ticker = yf.Ticker(symbol_upper)
+            ticker = get_yfinance().Ticker(symbol_upper)
             
             # Get major holders
             try:
                 major_holders_df = ticker.major_holders
                 if major_holders_df is not None and len(major_holders_df) > 0:
-                    print(f"[Python Backend] Found major holders: {len(major_holders_df)} rows")
+                    logger.debug("[Python Backend] Found major holders: %s rows", len(major_holders_df))
                     for idx, row in major_holders_df.iterrows():
                         holder_info = str(row.iloc[0]) if len(row) > 0 else "N/A"
                         # Parse holder info (format: "X.XX% Name" or "Name")
@@ -3053,13 +5488,13 @@ async def get_ownership_data(symbol: str, request: Request):
                             "percent": percent
                         })
             except Exception as e:
-                print(f"[Python Backend] Error fetching major holders: {e}")
+                logger.warning("[Python Backend] Error fetching major holders: %s", e)
             
             # Get institutional holders
             try:
                 institutional_holders_df = ticker.institutional_holders
                 if institutional_holders_df is not None and len(institutional_holders_df) > 0:
-                    print(f"[Python Backend] Found institutional holders: {len(institutional_holders_df)} rows")
+                    logger.debug("[Python Backend] Found institutional holders: %s rows", len(institutional_holders_df))
                     for idx, row in institutional_holders_df.iterrows():
                         holder_name = row.iloc[0] if len(row) > 0 else "N/A"
                         shares = row.iloc[1] if len(row) > 1 else 0
@@ -3079,7 +5514,7 @@ async def get_ownership_data(symbol: str, request: Request):
                             "percent": percent
                         })
             except Exception as e:
-                print(f"[Python Backend] Error fetching institutional holders: {e}")
+                logger.warning("[Python Backend] Error fetching institutional holders: %s", e)
             
             # Get insider transactions (from Finnhub if available, otherwise try yfinance)
             try:
@@ -3089,17 +5524,17 @@ async def get_ownership_data(symbol: str, request: Request):
                         "symbol": symbol_upper,
                         "token": FINNHUB_API_KEY
                     }
-                    insider_response = requests.get(insider_url, params=insider_params, timeout=10)
+                    insider_response = http_session.get(insider_url, params=insider_params, timeout=10)
                     if insider_response.status_code == 200:
                         insider_data = insider_response.json()
                         if insider_data and isinstance(insider_data, list):
                             insider_transactions = insider_data[:10] if insider_data else []
-                            print(f"[Python Backend] Found {len(insider_transactions)} insider transactions from Finnhub")
+                            logger.debug("[Python Backend] Found %s insider transactions from Finnhub", len(insider_transactions))
                         elif insider_data and isinstance(insider_data, dict) and 'data' in insider_data:
                             insider_transactions = insider_data['data'][:10] if insider_data['data'] else []
-                            print(f"[Python Backend] Found {len(insider_transactions)} insider transactions from Finnhub (dict format)")
+                            logger.debug("[Python Backend] Found %s insider transactions from Finnhub (dict format)", len(insider_transactions))
             except Exception as e:
-                print(f"[Python Backend] Error fetching insider transactions: {e}")
+                logger.warning("[Python Backend] Error fetching insider transactions: %s", e)
             
             # Get ownership percentages and public float from info
             try:
@@ -3130,14 +5565,12 @@ async def get_ownership_data(symbol: str, request: Request):
                         else:
                             public_float = shares_outstanding
                     
-                    print(f"[Python Backend] Ownership info: institutional={institutional_ownership}, insider={insider_ownership}, float={public_float}")
+                    logger.debug("[Python Backend] Ownership info: institutional=%s, insider=%s, float=%s", institutional_ownership, insider_ownership, public_float)
             except Exception as e:
-                print(f"[Python Backend] Error fetching ownership info: {e}")
+                logger.warning("[Python Backend] Error fetching ownership info: %s", e)
         
         except Exception as e:
-            print(f"[Python Backend] Error fetching ownership data from yfinance: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.warning("[Python Backend] Error fetching ownership data from yfinance: %s", e, exc_info=True)
         
         return {
             "symbol": symbol_upper,
@@ -3148,14 +5581,12 @@ async def get_ownership_data(symbol: str, request: Request):
             "insiderOwnership": insider_ownership,
             "publicFloat": public_float
         }
-        
+    
     except HTTPException:
         raise
     except Exception as e:
         error_msg = str(e)
-        print(f"[Python Backend] Error fetching ownership data: {error_msg}")
-        import traceback
-        traceback.print_exc()
+        logger.warning("[Python Backend] Error fetching ownership data: %s", error_msg, exc_info=True)
         raise HTTPException(status_code=500, detail=error_msg)
 
 @app.get("/api/peer-comparison/{symbol}")
@@ -3168,7 +5599,7 @@ async def get_peer_comparison(symbol: str, request: Request, industry: str = Non
     try:
         symbol_upper = symbol.upper()
         
-        print(f"[Python Backend] Fetching peer comparison for {symbol_upper}...")
+        logger.debug("[Python Backend] Fetching peer comparison for %s...", symbol_upper)
         
         if not YFINANCE_AVAILABLE:
             raise HTTPException(status_code=503, detail="yfinance library not available")
@@ -3181,14 +5612,14 @@ async def get_peer_comparison(symbol: str, request: Request, industry: str = Non
         # First, use industry/sector from query parameters (from description cache)
         if industry:
             current_industry = industry
-            print(f"[Python Backend] Using industry from query parameter: {current_industry}")
+            logger.debug("[Python Backend] Using industry from query parameter: %s", current_industry)
         if sector:
             current_sector = sector
-            print(f"[Python Backend] Using sector from query parameter: {current_sector}")
+            logger.debug("[Python Backend] Using sector from query parameter: %s", current_sector)
         
         # Fetch current stock metrics using Finnhub API directly (same as peers)
         try:
-            print(f"[Python Backend] Fetching current stock metrics from Finnhub for {symbol_upper} (same as peers)...")
+            logger.debug("[Python Backend] Fetching current stock metrics from Finnhub for %s (same as peers)...", symbol_upper)
             finnhub_data = fetch_from_finnhub(symbol_upper)
             
             if finnhub_data:
@@ -3224,7 +5655,7 @@ async def get_peer_comparison(symbol: str, request: Request, industry: str = Non
                     "sector": current_sector
                 }
                 
-                print(f"[Python Backend] Successfully fetched current stock metrics from Finnhub: {current_stock_data}")
+                logger.debug("[Python Backend] Successfully fetched current stock metrics from Finnhub: %s", current_stock_data)
             else:
                 # Fallback: use basic data
                 current_stock_data = {
@@ -3239,9 +5670,7 @@ async def get_peer_comparison(symbol: str, request: Request, industry: str = Non
                     "sector": current_sector
                 }
         except Exception as finnhub_error:
-            print(f"[Python Backend] Error fetching from Finnhub for current stock: {finnhub_error}")
-            import traceback
-            traceback.print_exc()
+            logger.warning("[Python Backend] Error fetching from Finnhub for current stock: %s", finnhub_error, exc_info=True)
             # Fallback: use basic data
             current_stock_data = {
                 "symbol": symbol_upper,
@@ -3271,7 +5700,7 @@ async def get_peer_comparison(symbol: str, request: Request, industry: str = Non
         
         # If no search term, try to infer from symbol or use smart defaults
         if not search_term:
-            print(f"[Python Backend] WARNING: No industry or sector found for {symbol_upper}, trying to infer from symbol")
+            logger.debug("[Python Backend] WARNING: No industry or sector found for %s, trying to infer from symbol", symbol_upper)
             # Try to infer sector from common stock symbols
             symbol_upper_lower = symbol_upper.lower()
             if any(bank in symbol_upper_lower for bank in ['jpm', 'bac', 'wfc', 'c', 'gs', 'ms', 'schw', 'blk']):
@@ -3330,7 +5759,7 @@ async def get_peer_comparison(symbol: str, request: Request, industry: str = Non
             for industry_key, peer_symbols in industry_peers.items():
                 if search_term_lower and industry_key.lower() in search_term_lower:
                     potential_peers = peer_symbols
-                    print(f"[Python Backend] Found peers for industry key: {industry_key}")
+                    logger.debug("[Python Backend] Found peers for industry key: %s", industry_key)
                     break
         
         # If no exact match, try sector-based matching
@@ -3352,7 +5781,7 @@ async def get_peer_comparison(symbol: str, request: Request, industry: str = Non
             for sector_key, peer_symbols in sector_peers.items():
                 if sector_lower and sector_key.lower() in sector_lower:
                     potential_peers = peer_symbols
-                    print(f"[Python Backend] Found peers for sector: {sector_key}")
+                    logger.debug("[Python Backend] Found peers for sector: %s", sector_key)
                     break
         
         # If still no peers, use a default list of major stocks
@@ -3365,8 +5794,8 @@ async def get_peer_comparison(symbol: str, request: Request, industry: str = Non
         # Limit to 5-7 peers
         potential_peers = potential_peers[:5]  # Only 5 peers instead of 7-10
         
-        print(f"[Python Backend] Final potential_peers list: {potential_peers}")
-        print(f"[Python Backend] Will fetch data for {len(potential_peers)} peers")
+        logger.debug("[Python Backend] Final potential_peers list: %s", potential_peers)
+        logger.debug("[Python Backend] Will fetch data for %s peers", len(potential_peers))
         
         # Fetch metrics for each peer using Finnhub API directly - IN PARALLEL for speed
         peers_data = []
@@ -3374,7 +5803,7 @@ async def get_peer_comparison(symbol: str, request: Request, industry: str = Non
         def fetch_peer_data(peer_symbol):
             """Helper function to fetch data for a single peer"""
             try:
-                print(f"[Python Backend] Fetching data for peer {peer_symbol} using Finnhub...")
+                logger.debug("[Python Backend] Fetching data for peer %s using Finnhub...", peer_symbol)
                 
                 # Use Finnhub API directly instead of yfinance
                 try:
@@ -3405,7 +5834,7 @@ async def get_peer_comparison(symbol: str, request: Request, industry: str = Non
                             "dividendYield": dividend_yield if dividend_yield is not None else None
                         }
                         
-                        print(f"[Python Backend] Successfully fetched peer data for {peer_symbol} from Finnhub")
+                        logger.debug("[Python Backend] Successfully fetched peer data for %s from Finnhub", peer_symbol)
                         return peer_data
                     else:
                         # Fallback: add peer with symbol only
@@ -3418,11 +5847,11 @@ async def get_peer_comparison(symbol: str, request: Request, industry: str = Non
                             "beta": None,
                             "dividendYield": None
                         }
-                        print(f"[Python Backend] Added peer {peer_symbol} with limited data (no Finnhub data)")
+                        logger.debug("[Python Backend] Added peer %s with limited data (no Finnhub data)", peer_symbol)
                         return peer_data
-                        
+                
                 except Exception as finnhub_error:
-                    print(f"[Python Backend] Error fetching from Finnhub for {peer_symbol}: {finnhub_error}")
+                    logger.warning("[Python Backend] Error fetching from Finnhub for %s: %s", peer_symbol, finnhub_error)
                     # Fallback: add peer with symbol only
                     peer_data = {
                         "symbol": peer_symbol,
@@ -3431,14 +5860,12 @@ async def get_peer_comparison(symbol: str, request: Request, industry: str = Non
                         "peRatioForward": None,
                         "priceToBook": None
                     }
-                    print(f"[Python Backend] Added peer {peer_symbol} with fallback data (Finnhub error)")
+                    logger.warning("[Python Backend] Added peer %s with fallback data (Finnhub error)", peer_symbol)
                     return peer_data
-                    
+            
             except Exception as e:
                 # Even on error, add peer with symbol so it's visible
-                print(f"[Python Backend] Unexpected error for peer {peer_symbol}: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.warning("[Python Backend] Unexpected error for peer %s: %s", peer_symbol, e, exc_info=True)
                 peer_data = {
                     "symbol": peer_symbol,
                     "name": peer_symbol,
@@ -3446,14 +5873,14 @@ async def get_peer_comparison(symbol: str, request: Request, industry: str = Non
                     "peRatioForward": None,
                     "priceToBook": None
                 }
-                print(f"[Python Backend] Added peer {peer_symbol} with fallback data due to error")
+                logger.warning("[Python Backend] Added peer %s with fallback data due to error", peer_symbol)
                 return peer_data
         
         # Fetch all peers in parallel using ThreadPoolExecutor
         with ThreadPoolExecutor(max_workers=5) as executor:
-            peers_data = list(executor.map(fetch_peer_data, potential_peers))
+            peers_data = list(executor.map(with_request_context(fetch_peer_data), potential_peers))
         
-        print(f"[Python Backend] Total peers_data count: {len(peers_data)}")
+        logger.debug("[Python Backend] Total peers_data count: %s", len(peers_data))
         
         return {
             "currentStock": current_stock_data,
@@ -3461,14 +5888,12 @@ async def get_peer_comparison(symbol: str, request: Request, industry: str = Non
             "industry": current_industry or current_sector,  # Use sector as fallback for display
             "sector": current_sector
         }
-        
+    
     except HTTPException:
         raise
     except Exception as e:
         error_msg = str(e)
-        print(f"[Python Backend] Error fetching peer comparison: {error_msg}")
-        import traceback
-        traceback.print_exc()
+        logger.warning("[Python Backend] Error fetching peer comparison: %s", error_msg, exc_info=True)
         raise HTTPException(status_code=500, detail=error_msg)
 
 @app.get("/api/earnings/{symbol}")
@@ -3489,8 +5914,8 @@ async def get_earnings_data(symbol: str, request: Request):
             "token": FINNHUB_API_KEY
         }
         
-        print(f"[Python Backend] Fetching earnings calendar for {symbol_upper}...")
-        earnings_response = requests.get(earnings_url, params=earnings_params, timeout=10)
+        logger.debug("[Python Backend] Fetching earnings calendar for %s...", symbol_upper)
+        earnings_response = http_session.get(earnings_url, params=earnings_params, timeout=10)
         
         earnings_calendar = []
         if earnings_response.status_code == 200:
@@ -3505,8 +5930,8 @@ async def get_earnings_data(symbol: str, request: Request):
             "token": FINNHUB_API_KEY
         }
         
-        print(f"[Python Backend] Fetching historical earnings for {symbol_upper}...")
-        historical_response = requests.get(historical_url, params=historical_params, timeout=10)
+        logger.debug("[Python Backend] Fetching historical earnings for %s...", symbol_upper)
+        historical_response = http_session.get(historical_url, params=historical_params, timeout=10)
         
         historical_earnings = []
         if historical_response.status_code == 200:
@@ -3555,16 +5980,16 @@ async def get_earnings_data(symbol: str, request: Request):
         # Sort by date (newest first)
         all_earnings.sort(key=lambda x: x.get("date", ""), reverse=True)
         
-        print(f"[Python Backend] Found {len(all_earnings)} earnings records for {symbol_upper}")
+        logger.debug("[Python Backend] Found %s earnings records for %s", len(all_earnings), symbol_upper)
         
         return {
             "symbol": symbol_upper,
             "earnings": all_earnings[:10]  # Return last 10
         }
-        
+    
     except Exception as e:
         error_msg = str(e)
-        print(f"[Python Backend] Error fetching earnings data: {error_msg}")
+        logger.warning("[Python Backend] Error fetching earnings data: %s", error_msg)
         raise HTTPException(status_code=500, detail=f"Error fetching earnings data: {error_msg}")
 
 @app.get("/api/heatmap-quotes")
@@ -3596,10 +6021,9 @@ async def get_heatmap_quotes(symbols: str, request: Request):
         
         # Check cache first
         cache_key = f"heatmap_quotes_{','.join(sorted(symbol_list))}"
-        if cache_key in cache:
-            cached_data, cached_time = cache[cache_key]
-            if datetime.now() - cached_time < timedelta(minutes=5):  # Cache for 5 minutes
-                return cached_data
+        cached_data = get_cached("heatmap_quotes", cache_key, timedelta(minutes=5))  # Cache for 5 minutes
+        if cached_data is not None:
+            return cached_json_response(cache_key, cached_data, request)
         
         # Fetch data in parallel using ThreadPoolExecutor for better performance
         # Skip profile fetch for heatmap - only need quote data (price + change)
@@ -3633,7 +6057,7 @@ async def get_heatmap_quotes(symbols: str, request: Request):
                         }
                         
                         # Single request with short timeout for speed
-                        quote_response = requests.get(quote_url, params=quote_params, timeout=5)
+                        quote_response = http_session.get(quote_url, params=quote_params, timeout=5)
                         
                         if quote_response.status_code == 200:
                             quote_data = quote_response.json()
@@ -3662,19 +6086,19 @@ async def get_heatmap_quotes(symbols: str, request: Request):
                         continue
                 
                 return None
-                
+            
             except Exception as e:
-                print(f"[Heatmap Quotes] Error fetching {symbol}: {e}")
+                log_sampled("heatmap_quotes_error", logging.WARNING, "[Heatmap Quotes] Error fetching %s: %s", symbol, e)
                 return None
         
         # Use ThreadPoolExecutor to fetch in parallel
         # Use 40 workers to fetch all DAX stocks simultaneously
         max_workers = min(40, len(symbol_list))  # Max 40 workers for DAX 40
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            results = list(executor.map(fetch_symbol_data, symbol_list))
+            results = list(executor.map(with_request_context(fetch_symbol_data), symbol_list))
             results = [r for r in results if r is not None]  # Filter out None values
         
-        print(f"[Heatmap Quotes] Successfully fetched {len(results)} out of {len(symbol_list)} symbols")
+        logger.debug("[Heatmap Quotes] Successfully fetched %s out of %s symbols", len(results), len(symbol_list))
         
         result = {
             "quoteResponse": {
@@ -3686,10 +6110,10 @@ async def get_heatmap_quotes(symbols: str, request: Request):
         # Cache the result
         cache[cache_key] = (result, datetime.now())
         
-        return result
-        
+        return cached_json_response(cache_key, result, request)
+    
     except Exception as e:
-        print(f"[Heatmap Quotes] Error: {e}")
+        logger.warning("[Heatmap Quotes] Error: %s", e)
         raise HTTPException(status_code=500, detail=f"Error fetching heatmap quotes: {str(e)}")
 
 # =============================================================================
@@ -3718,8 +6142,9 @@ def fetch_batch_quotes(symbols: list, name_map: dict = None, sector_map: dict =
         symbols_str = ','.join(chunk)
         
         try:
-            url = f"https://query1.finance.yahoo.com/v7/finance/quote?symbols={symbols_str}"
-            response = requests.get(url, headers=headers, timeout=15)
+            url = f"{YAHOO_BASE_URL}/v7/finance/quote"
+            # Passed as a query parameter so it is URL-encoded - one odd symbol can't break the whole batch
+            response = http_session.get(url, params={"symbols": symbols_str}, headers=headers, timeout=15)
             
             if response.status_code == 200:
                 data = response.json()
@@ -3746,10 +6171,10 @@ def fetch_batch_quotes(symbols: list, name_map: dict = None, sector_map: dict =
                                 result["sector"] = sector_map[symbol]
                             results.append(result)
             else:
-                print(f"[Batch Quote] HTTP {response.status_code} for chunk {i//chunk_size + 1}")
-                
+                logger.debug("[Batch Quote] HTTP %s for chunk %s", response.status_code, i//chunk_size + 1)
+        
         except Exception as e:
-            print(f"[Batch Quote] Error fetching chunk {i//chunk_size + 1}: {e}")
+            log_sampled("batch_quote_error", logging.WARNING, "[Batch Quote] Error fetching chunk %s: %s", i//chunk_size + 1, e)
     
     return results
 
@@ -3770,8 +6195,8 @@ def fetch_chart_quotes_parallel(symbols: list, name_map: dict = None, sector_map
     
     def fetch_single(symbol):
         try:
-            url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}?interval=1d&range=5d"
-            response = requests.get(url, headers=headers, timeout=8)
+            url = f"{YAHOO_BASE_URL}/v8/finance/chart/{symbol}?interval=1d&range=5d"
+            response = http_session.get(url, headers=headers, timeout=8)
             
             if response.status_code == 200:
                 data = response.json()
@@ -3810,302 +6235,327 @@ def fetch_chart_quotes_parallel(symbols: list, name_map: dict = None, sector_map
                         if name_map and symbol in name_map:
                             res["name"] = name_map[symbol]
                         if sector_map and symbol in sector_map:
-                            res["sector"] = sector_map[symbol]
-                        return res
-            return None
-        except:
-            return None
-    
-    with ThreadPoolExecutor(max_workers=30) as executor:
-        results = list(executor.map(fetch_single, symbols))
-        return [r for r in results if r is not None]
-
-
-@app.get("/api/dax-heatmap")
-async def get_dax_heatmap(request: Request):
-    """
-    Get all DAX 40 stock data for heatmap.
-    Uses parallel chart API calls (more reliable for .DE stocks).
-    """
-    client_ip = request.client.host
-    
-    if not check_rate_limit(client_ip):
-        raise HTTPException(status_code=429, detail="Rate limit exceeded. Please try again later.")
+                            res["sector"] = sector_map[symbol]
+                        return res
+            return None
+        except:
+            return None
     
-    try:
-        cache_key = "dax_heatmap_data"
-        if cache_key in cache:
-            cached_data, cached_time = cache[cache_key]
-            if datetime.now() - cached_time < timedelta(minutes=5):
-                print(f"[DAX Heatmap] Returning cached data ({len(cached_data.get('quoteResponse', {}).get('result', []))} stocks)")
-                return cached_data
-        
-        # DAX 40 stocks
-        dax_stocks = [
-            ('ADS.DE', 'Adidas'), ('ALV.DE', 'Allianz'), ('BAS.DE', 'BASF'),
-            ('BAYN.DE', 'Bayer'), ('BEI.DE', 'Beiersdorf'), ('BMW.DE', 'BMW'),
-            ('CON.DE', 'Continental'), ('1COV.DE', 'Covestro'), ('DBK.DE', 'Deutsche Bank'),
-            ('DB1.DE', 'Deutsche Boerse'), ('DHL.DE', 'DHL Group'), ('DTE.DE', 'Deutsche Telekom'),
-            ('EOAN.DE', 'E.ON'), ('FRE.DE', 'Fresenius'), ('HEI.DE', 'Heidelberg Materials'),
-            ('HEN3.DE', 'Henkel'), ('IFX.DE', 'Infineon'), ('MRK.DE', 'Merck'),
-            ('MTX.DE', 'MTU Aero Engines'), ('MUV2.DE', 'Munich Re'), ('PAH3.DE', 'Porsche Holding'),
-            ('P911.DE', 'Porsche AG'), ('PUM.DE', 'Puma'), ('QIA.DE', 'Qiagen'),
-            ('RHM.DE', 'Rheinmetall'), ('RWE.DE', 'RWE'), ('SAP.DE', 'SAP'),
-            ('SIE.DE', 'Siemens'), ('ENR.DE', 'Siemens Energy'), ('SHL.DE', 'Siemens Healthineers'),
-            ('SY1.DE', 'Symrise'), ('VOW3.DE', 'Volkswagen'), ('VNA.DE', 'Vonovia'),
-            ('ZAL.DE', 'Zalando'), ('AIR.DE', 'Airbus'), ('HNR1.DE', 'Hannover Re'),
-            ('SRT3.DE', 'Sartorius'), ('CBK.DE', 'Commerzbank'), ('BNR.DE', 'Brenntag'),
-            ('FME.DE', 'Fresenius Medical Care'),
-        ]
-        
-        symbols = [s[0] for s in dax_stocks]
-        name_map = {s[0]: s[1] for s in dax_stocks}
-        
-        print(f"[DAX Heatmap] Fetching {len(symbols)} stocks using parallel chart API...")
-        import time as t
-        start = t.time()
-        
-        # Use chart API for German stocks (more reliable than batch quote API for .DE)
-        results = fetch_chart_quotes_parallel(symbols, name_map=name_map)
-        
-        elapsed = (t.time() - start) * 1000
-        print(f"[DAX Heatmap] Chart API returned {len(results)} stocks in {elapsed:.0f}ms")
-        
-        response_data = {
-            "quoteResponse": {
-                "result": results,
-                "error": None,
-                "count": len(results)
-            }
-        }
-        
-        cache[cache_key] = (response_data, datetime.now())
-        return response_data
-            
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"[DAX Heatmap] Error: {e}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Error fetching DAX heatmap data: {str(e)}")
+    with ThreadPoolExecutor(max_workers=30) as executor:
+        results = list(executor.map(with_request_context(fetch_single), symbols))
+        return [r for r in results if r is not None]
 
 
-@app.get("/api/sp500-heatmap")
-async def get_sp500_heatmap(request: Request):
+# =============================================================================
+# HEATMAP INDEX CONSTITUENTS
+# =============================================================================
+# Shared by the heatmap endpoints and the offline AI precompute job (precompute_ai.py)
+
+# DAX 40 stocks
+DAX_STOCKS = [
+    ('ADS.DE', 'Adidas'), ('ALV.DE', 'Allianz'), ('BAS.DE', 'BASF'),
+    ('BAYN.DE', 'Bayer'), ('BEI.DE', 'Beiersdorf'), ('BMW.DE', 'BMW'),
+    ('CON.DE', 'Continental'), ('1COV.DE', 'Covestro'), ('DBK.DE', 'Deutsche Bank'),
+    ('DB1.DE', 'Deutsche Boerse'), ('DHL.DE', 'DHL Group'), ('DTE.DE', 'Deutsche Telekom'),
+    ('EOAN.DE', 'E.ON'), ('FRE.DE', 'Fresenius'), ('HEI.DE', 'Heidelberg Materials'),
+    ('HEN3.DE', 'Henkel'), ('IFX.DE', 'Infineon'), ('MRK.DE', 'Merck'),
+    ('MTX.DE', 'MTU Aero Engines'), ('MUV2.DE', 'Munich Re'), ('PAH3.DE', 'Porsche Holding'),
+    ('P911.DE', 'Porsche AG'), ('PUM.DE', 'Puma'), ('QIA.DE', 'Qiagen'),
+    ('RHM.DE', 'Rheinmetall'), ('RWE.DE', 'RWE'), ('SAP.DE', 'SAP'),
+    ('SIE.DE', 'Siemens'), ('ENR.DE', 'Siemens Energy'), ('SHL.DE', 'Siemens Healthineers'),
+    ('SY1.DE', 'Symrise'), ('VOW3.DE', 'Volkswagen'), ('VNA.DE', 'Vonovia'),
+    ('ZAL.DE', 'Zalando'), ('AIR.DE', 'Airbus'), ('HNR1.DE', 'Hannover Re'),
+    ('SRT3.DE', 'Sartorius'), ('CBK.DE', 'Commerzbank'), ('BNR.DE', 'Brenntag'),
+    ('FME.DE', 'Fresenius Medical Care'),
+]
+
+
+# S&P 500 stocks by sector
+SP500_BY_SECTOR = {
+    'Information Technology': [
+        'AAPL', 'MSFT', 'NVDA', 'AVGO', 'ORCL', 'CRM', 'ADBE', 'AMD', 'CSCO', 'ACN',
+        'INTC', 'IBM', 'QCOM', 'TXN', 'INTU', 'AMAT', 'NOW', 'ADI', 'LRCX', 'MU',
+        'KLAC', 'SNPS', 'CDNS', 'PANW', 'FTNT', 'MCHP', 'MSI', 'APH', 'NXPI', 'TEL',
+        'ADSK', 'HPQ', 'CTSH', 'IT', 'ROP', 'GLW', 'ON', 'ANSS', 'KEYS', 'MPWR',
+        'CDW', 'HPE', 'FSLR', 'TYL', 'ZBRA', 'TRMB', 'PTC', 'TDY', 'SWKS', 'NTAP'
+    ],
+    'Health Care': [
+        'LLY', 'UNH', 'JNJ', 'ABBV', 'MRK', 'TMO', 'ABT', 'PFE', 'DHR', 'AMGN',
+        'BMY', 'MDT', 'ISRG', 'ELV', 'GILD', 'VRTX', 'SYK', 'BSX', 'REGN', 'CI',
+        'ZTS', 'CVS', 'BDX', 'MCK', 'HCA', 'EW', 'HUM', 'IDXX', 'IQV', 'CNC',
+        'A', 'GEHC', 'DXCM', 'RMD', 'MTD', 'CAH', 'BIIB', 'BAX', 'WST', 'CRL',
+        'COO', 'HOLX', 'MOH', 'ALGN', 'ZBH', 'ILMN', 'LH', 'DGX', 'TECH', 'RVTY'
+    ],
+    'Financials': [
+        'BRK.B', 'JPM', 'V', 'MA', 'BAC', 'WFC', 'GS', 'MS', 'SPGI', 'AXP',
+        'BLK', 'C', 'SCHW', 'PGR', 'CB', 'MMC', 'CME', 'ICE', 'USB', 'AON',
+        'MCO', 'PNC', 'TFC', 'AIG', 'MET', 'AJG', 'AFL', 'TRV', 'PRU', 'ALL',
+        'MSCI', 'BK', 'COF', 'FIS', 'DFS', 'STT', 'FITB', 'NDAQ', 'TROW', 'HIG',
+        'MTB', 'CINF', 'RJF', 'NTRS', 'SYF', 'WRB', 'KEY', 'HBAN', 'L', 'CFG'
+    ],
+    'Consumer Discretionary': [
+        'AMZN', 'TSLA', 'HD', 'MCD', 'NKE', 'LOW', 'BKNG', 'TJX', 'SBUX', 'CMG',
+        'ORLY', 'MAR', 'GM', 'AZO', 'HLT', 'F', 'ROST', 'DHI', 'YUM', 'LULU',
+        'LEN', 'NVR', 'DECK', 'EBAY', 'ULTA', 'GRMN', 'PHM', 'GPC', 'DRI', 'RCL',
+        'LVS', 'POOL', 'WYNN', 'CZR', 'CCL', 'EXPE', 'KMX', 'DPZ', 'BBY', 'APTV'
+    ],
+    'Communication Services': [
+        'GOOGL', 'GOOG', 'META', 'NFLX', 'DIS', 'CMCSA', 'VZ', 'T', 'TMUS', 'CHTR',
+        'EA', 'WBD', 'TTWO', 'OMC', 'LYV', 'MTCH', 'IPG', 'NWSA', 'PARA', 'FOX'
+    ],
+    'Industrials': [
+        'GE', 'CAT', 'RTX', 'HON', 'UNP', 'UPS', 'BA', 'DE', 'LMT', 'ADP',
+        'ETN', 'WM', 'ITW', 'GD', 'NOC', 'EMR', 'PH', 'CSX', 'NSC', 'TT',
+        'FDX', 'JCI', 'PCAR', 'CARR', 'CTAS', 'ODFL', 'ROK', 'CPRT', 'CMI', 'AME',
+        'FAST', 'PAYX', 'VRSK', 'GWW', 'RSG', 'PWR', 'LHX', 'OTIS', 'EFX', 'XYL',
+        'WAB', 'DOV', 'HWM', 'IR', 'DAL', 'SWK', 'LUV', 'UAL', 'URI', 'JBHT'
+    ],
+    'Consumer Staples': [
+        'PG', 'COST', 'KO', 'PEP', 'WMT', 'PM', 'MO', 'MDLZ', 'TGT', 'CL',
+        'KMB', 'STZ', 'GIS', 'ADM', 'SYY', 'KHC', 'HSY', 'MKC', 'KDP', 'K',
+        'EL', 'KR', 'CLX', 'MNST', 'CHD', 'TSN', 'CAG', 'HRL', 'CPB', 'SJM'
+    ],
+    'Energy': [
+        'XOM', 'CVX', 'COP', 'SLB', 'MPC', 'EOG', 'PXD', 'PSX', 'VLO', 'OXY',
+        'WMB', 'HES', 'KMI', 'OKE', 'HAL', 'DVN', 'FANG', 'BKR', 'CTRA', 'TRGP'
+    ],
+    'Utilities': [
+        'NEE', 'DUK', 'SO', 'D', 'SRE', 'AEP', 'CEG', 'PCG', 'EXC', 'XEL',
+        'ED', 'WEC', 'EIX', 'AWK', 'DTE', 'ES', 'ETR', 'AEE', 'PPL', 'FE',
+        'CMS', 'CNP', 'EVRG', 'ATO', 'NI', 'LNT', 'NRG', 'PNW', 'AES', 'PEG'
+    ],
+    'Real Estate': [
+        'PLD', 'AMT', 'EQIX', 'WELL', 'PSA', 'SPG', 'DLR', 'O', 'CCI', 'VICI',
+        'CBRE', 'AVB', 'EQR', 'WY', 'SBAC', 'ARE', 'EXR', 'MAA', 'INVH', 'IRM',
+        'VTR', 'ESS', 'KIM', 'HST', 'UDR', 'REG', 'CPT', 'BXP', 'FRT'
+    ],
+    'Materials': [
+        'LIN', 'SHW', 'APD', 'FCX', 'ECL', 'NUE', 'NEM', 'DD', 'DOW', 'CTVA',
+        'VMC', 'MLM', 'PPG', 'ALB', 'CE', 'IFF', 'LYB', 'CF', 'BALL', 'PKG',
+        'MOS', 'FMC', 'AVY', 'EMN', 'AMCR', 'IP', 'WRK', 'SEE'
+    ]
+}
+
+
+# Major Nikkei 225 stocks (.T suffix for Tokyo Stock Exchange)
+NIKKEI225_STOCKS = [
+    ('7203.T', 'Toyota'), ('6758.T', 'Sony'), ('9984.T', 'SoftBank'),
+    ('6861.T', 'Keyence'), ('8306.T', 'MUFJ'), ('9432.T', 'NTT'),
+    ('6501.T', 'Hitachi'), ('7741.T', 'HOYA'), ('4063.T', 'Shin-Etsu'),
+    ('8035.T', 'Tokyo Electron'), ('6098.T', 'Recruit'), ('6594.T', 'Nidec'),
+    ('4519.T', 'Chugai'), ('7974.T', 'Nintendo'), ('9433.T', 'KDDI'),
+    ('4502.T', 'Takeda'), ('6367.T', 'Daikin'), ('8058.T', 'Mitsubishi'),
+    ('8316.T', 'SMFG'), ('6971.T', 'Kyocera'), ('6752.T', 'Panasonic'),
+    ('7267.T', 'Honda'), ('4568.T', 'Daiichi Sankyo'), ('6762.T', 'TDK'),
+    ('7751.T', 'Canon'), ('4661.T', 'Oriental Land'), ('8766.T', 'Tokio Marine'),
+    ('8001.T', 'Itochu'), ('9020.T', 'JR East'), ('2914.T', 'JT'),
+    ('6954.T', 'Fanuc'), ('8031.T', 'Mitsui'), ('3382.T', 'Seven & I'),
+    ('4503.T', 'Astellas'), ('9022.T', 'JR Central'), ('6981.T', 'Murata'),
+    ('5108.T', 'Bridgestone'), ('4911.T', 'Shiseido'), ('6702.T', 'Fujitsu'),
+    ('8411.T', 'Mizuho'), ('6301.T', 'Komatsu'), ('8802.T', 'Mitsubishi Estate'),
+    ('4901.T', 'Fujifilm'), ('6503.T', 'Mitsubishi Electric'), ('8591.T', 'Orix'),
+    ('2502.T', 'Asahi'), ('4452.T', 'Kao'), ('7269.T', 'Suzuki'),
+    ('8750.T', 'Dai-ichi Life'), ('5401.T', 'Nippon Steel'), ('7201.T', 'Nissan'),
+    ('2801.T', 'Kikkoman'), ('6506.T', 'Yaskawa'), ('4543.T', 'Terumo'),
+    ('7011.T', 'MHI'), ('6857.T', 'Advantest'), ('6723.T', 'Renesas'),
+    ('9766.T', 'Konami'), ('4578.T', 'Otsuka'), ('8267.T', 'Aeon'),
+    ('7270.T', 'Subaru'), ('6326.T', 'Kubota'), ('9613.T', 'NTT Data'),
+    ('8604.T', 'Nomura'), ('9983.T', 'Fast Retailing'), ('4755.T', 'Rakuten'),
+    ('2413.T', 'M3'), ('6273.T', 'SMC'), ('9434.T', 'SoftBank Corp'),
+    ('6988.T', 'Nitto Denko'), ('4523.T', 'Eisai'), ('7832.T', 'Bandai Namco'),
+    ('6645.T', 'Omron'), ('4689.T', 'Z Holdings'), ('6504.T', 'Fuji Electric'),
+    ('6526.T', 'Socionext'), ('3407.T', 'Asahi Kasei'), ('6902.T', 'Denso'),
+]
+
+
+# Nasdaq 100 stocks
+NASDAQ100_STOCKS = [
+    ('AAPL', 'Apple'), ('MSFT', 'Microsoft'), ('AMZN', 'Amazon'), ('NVDA', 'NVIDIA'),
+    ('GOOGL', 'Alphabet A'), ('META', 'Meta'), ('TSLA', 'Tesla'), ('AVGO', 'Broadcom'),
+    ('COST', 'Costco'), ('GOOG', 'Alphabet C'), ('NFLX', 'Netflix'), ('AMD', 'AMD'),
+    ('ADBE', 'Adobe'), ('PEP', 'PepsiCo'), ('CSCO', 'Cisco'), ('TMUS', 'T-Mobile'),
+    ('INTC', 'Intel'), ('CMCSA', 'Comcast'), ('QCOM', 'Qualcomm'), ('INTU', 'Intuit'),
+    ('TXN', 'Texas Inst'), ('HON', 'Honeywell'), ('AMGN', 'Amgen'), ('AMAT', 'Applied Mat'),
+    ('BKNG', 'Booking'), ('ISRG', 'Intuitive'), ('SBUX', 'Starbucks'), ('VRTX', 'Vertex'),
+    ('ADP', 'ADP'), ('LRCX', 'Lam Research'), ('GILD', 'Gilead'), ('MU', 'Micron'),
+    ('MDLZ', 'Mondelez'), ('ADI', 'Analog Dev'), ('REGN', 'Regeneron'), ('PANW', 'Palo Alto'),
+    ('SNPS', 'Synopsys'), ('KLAC', 'KLA'), ('CDNS', 'Cadence'), ('ASML', 'ASML'),
+    ('PDD', 'PDD'), ('MELI', 'MercadoLibre'), ('PYPL', 'PayPal'), ('CTAS', 'Cintas'),
+    ('ORLY', 'OReilly'), ('ABNB', 'Airbnb'), ('FTNT', 'Fortinet'), ('CSX', 'CSX'),
+    ('MAR', 'Marriott'), ('MNST', 'Monster'), ('NXPI', 'NXP'), ('MRVL', 'Marvell'),
+    ('PCAR', 'PACCAR'), ('WDAY', 'Workday'), ('DXCM', 'DexCom'), ('AEP', 'AEP'),
+    ('KDP', 'Keurig'), ('CPRT', 'Copart'), ('ROP', 'Roper'), ('MCHP', 'Microchip'),
+    ('CEG', 'Constellation'), ('AZN', 'AstraZeneca'), ('EXC', 'Exelon'), ('PAYX', 'Paychex'),
+    ('ROST', 'Ross'), ('LULU', 'Lululemon'), ('IDXX', 'IDEXX'), ('ODFL', 'Old Dominion'),
+    ('KHC', 'Kraft Heinz'), ('FAST', 'Fastenal'), ('GEHC', 'GE Healthcare'), ('VRSK', 'Verisk'),
+    ('EA', 'EA'), ('CTSH', 'Cognizant'), ('BKR', 'Baker Hughes'), ('XEL', 'Xcel'),
+    ('ON', 'ON Semi'), ('CSGP', 'CoStar'), ('ZS', 'Zscaler'), ('DDOG', 'Datadog'),
+    ('FANG', 'Diamondback'), ('ANSS', 'ANSYS'), ('DLTR', 'Dollar Tree'), ('TTD', 'Trade Desk'),
+    ('ILMN', 'Illumina'), ('WBD', 'Warner Bros'), ('TEAM', 'Atlassian'), ('ALGN', 'Align'),
+    ('GFS', 'GlobalFoundries'), ('CRWD', 'CrowdStrike'), ('BIIB', 'Biogen'), ('MDB', 'MongoDB'),
+    ('DASH', 'DoorDash'), ('ENPH', 'Enphase'), ('SIRI', 'Sirius'), ('LCID', 'Lucid'),
+    ('RIVN', 'Rivian'), ('ZM', 'Zoom'), ('OKTA', 'Okta'), ('SPLK', 'Splunk'),
+]
+
+
+# Major Hang Seng Index stocks (.HK suffix)
+HANGSENG_STOCKS = [
+    ('0700.HK', 'Tencent'), ('9988.HK', 'Alibaba'), ('0941.HK', 'China Mobile'),
+    ('1299.HK', 'AIA'), ('0005.HK', 'HSBC'), ('0939.HK', 'CCB'),
+    ('1398.HK', 'ICBC'), ('2318.HK', 'Ping An'), ('3988.HK', 'BOC'),
+    ('0883.HK', 'CNOOC'), ('0388.HK', 'HKEX'), ('0016.HK', 'SHK Properties'),
+    ('0027.HK', 'Galaxy'), ('0002.HK', 'CLP'), ('0003.HK', 'HK Gas'),
+    ('0011.HK', 'Hang Seng Bank'), ('0012.HK', 'Henderson'), ('0017.HK', 'New World'),
+    ('0066.HK', 'MTR'), ('0175.HK', 'Geely'), ('0267.HK', 'CITIC'),
+    ('0288.HK', 'WH Group'), ('0386.HK', 'Sinopec'), ('0688.HK', 'China Overseas'),
+    ('0762.HK', 'China Unicom'), ('0823.HK', 'Link REIT'), ('0857.HK', 'PetroChina'),
+    ('1038.HK', 'CK Infra'), ('1093.HK', 'CSPC'), ('1113.HK', 'CK Asset'),
+    ('1177.HK', 'Sino Biopharm'), ('1211.HK', 'BYD'), ('1288.HK', 'ABC'),
+    ('1810.HK', 'Xiaomi'), ('1928.HK', 'Sands China'), ('2020.HK', 'ANTA'),
+    ('2269.HK', 'WuXi Bio'), ('2313.HK', 'Shenzhou'), ('2319.HK', 'Mengniu'),
+    ('2331.HK', 'Li Ning'), ('2382.HK', 'Sunny Optical'), ('2388.HK', 'BOCHK'),
+    ('2628.HK', 'China Life'), ('2688.HK', 'ENN'), ('3690.HK', 'Meituan'),
+    ('3968.HK', 'CMB'), ('9618.HK', 'JD'), ('9633.HK', 'Nongfu'),
+    ('9888.HK', 'Baidu'), ('9901.HK', 'NetEase'), ('9961.HK', 'Trip.com'),
+    ('0001.HK', 'CK Hutchison'), ('0006.HK', 'Power Assets'), ('0019.HK', 'Swire'),
+    ('0083.HK', 'Sino Land'), ('0151.HK', 'Want Want'), ('0241.HK', 'Ali Health'),
+    ('0291.HK', 'CR Beer'), ('0669.HK', 'Techtronic'), ('0728.HK', 'China Telecom'),
+    ('0992.HK', 'Lenovo'), ('1024.HK', 'Kuaishou'), ('1088.HK', 'Shenhua'),
+]
+
+# Heatmap sources: label for logs, constituents, and whether Yahoo's batch quote API works for the index
+# (US indices) or the parallel chart API is needed (.DE, .T, .HK stocks)
+HEATMAP_INDICES = {
+    "dax": {"label": "DAX", "cache_key": "dax_heatmap_data", "stocks": DAX_STOCKS, "batch": False},
+    "sp500": {"label": "S&P 500", "cache_key": "sp500_heatmap_data", "sectors": SP500_BY_SECTOR, "batch": True},
+    "nikkei225": {"label": "Nikkei 225", "cache_key": "nikkei225_heatmap_data", "stocks": NIKKEI225_STOCKS, "batch": False},
+    "nasdaq100": {"label": "Nasdaq 100", "cache_key": "nasdaq100_heatmap_data", "stocks": NASDAQ100_STOCKS, "batch": True},
+    "hangseng": {"label": "Hang Seng", "cache_key": "hangseng_heatmap_data", "stocks": HANGSENG_STOCKS, "batch": False},
+}
+HEATMAP_CACHE_TTL = timedelta(minutes=5)
+
+
+def fetch_heatmap_data(index: str) -> dict:
     """
-    Get all S&P 500 stock data for heatmap using Yahoo Finance batch quote API.
-    FAST: Fetches all ~500 stocks in 3-4 batch API calls (~800ms total).
+    Fetch a fresh heatmap snapshot for an index (blocking, bypasses the cache).
+    Returns the /api/<index>-heatmap response format.
     """
-    client_ip = request.client.host
+    spec = HEATMAP_INDICES[index]
+    log_prefix = f"[{spec['label']} Heatmap]"
     
-    if not check_rate_limit(client_ip):
-        raise HTTPException(status_code=429, detail="Rate limit exceeded. Please try again later.")
-    
-    try:
-        cache_key = "sp500_heatmap_data"
-        if cache_key in cache:
-            cached_data, cached_time = cache[cache_key]
-            if datetime.now() - cached_time < timedelta(minutes=5):
-                print(f"[S&P 500 Heatmap] Returning cached data ({len(cached_data.get('quoteResponse', {}).get('result', []))} stocks)")
-                return cached_data
-        
-        # S&P 500 stocks by sector
-        sp500_by_sector = {
-            'Information Technology': [
-                'AAPL', 'MSFT', 'NVDA', 'AVGO', 'ORCL', 'CRM', 'ADBE', 'AMD', 'CSCO', 'ACN',
-                'INTC', 'IBM', 'QCOM', 'TXN', 'INTU', 'AMAT', 'NOW', 'ADI', 'LRCX', 'MU',
-                'KLAC', 'SNPS', 'CDNS', 'PANW', 'FTNT', 'MCHP', 'MSI', 'APH', 'NXPI', 'TEL',
-                'ADSK', 'HPQ', 'CTSH', 'IT', 'ROP', 'GLW', 'ON', 'ANSS', 'KEYS', 'MPWR',
-                'CDW', 'HPE', 'FSLR', 'TYL', 'ZBRA', 'TRMB', 'PTC', 'TDY', 'SWKS', 'NTAP'
-            ],
-            'Health Care': [
-                'LLY', 'UNH', 'JNJ', 'ABBV', 'MRK', 'TMO', 'ABT', 'PFE', 'DHR', 'AMGN',
-                'BMY', 'MDT', 'ISRG', 'ELV', 'GILD', 'VRTX', 'SYK', 'BSX', 'REGN', 'CI',
-                'ZTS', 'CVS', 'BDX', 'MCK', 'HCA', 'EW', 'HUM', 'IDXX', 'IQV', 'CNC',
-                'A', 'GEHC', 'DXCM', 'RMD', 'MTD', 'CAH', 'BIIB', 'BAX', 'WST', 'CRL',
-                'COO', 'HOLX', 'MOH', 'ALGN', 'ZBH', 'ILMN', 'LH', 'DGX', 'TECH', 'RVTY'
-            ],
-            'Financials': [
-                'BRK.B', 'JPM', 'V', 'MA', 'BAC', 'WFC', 'GS', 'MS', 'SPGI', 'AXP',
-                'BLK', 'C', 'SCHW', 'PGR', 'CB', 'MMC', 'CME', 'ICE', 'USB', 'AON',
-                'MCO', 'PNC', 'TFC', 'AIG', 'MET', 'AJG', 'AFL', 'TRV', 'PRU', 'ALL',
-                'MSCI', 'BK', 'COF', 'FIS', 'DFS', 'STT', 'FITB', 'NDAQ', 'TROW', 'HIG',
-                'MTB', 'CINF', 'RJF', 'NTRS', 'SYF', 'WRB', 'KEY', 'HBAN', 'L', 'CFG'
-            ],
-            'Consumer Discretionary': [
-                'AMZN', 'TSLA', 'HD', 'MCD', 'NKE', 'LOW', 'BKNG', 'TJX', 'SBUX', 'CMG',
-                'ORLY', 'MAR', 'GM', 'AZO', 'HLT', 'F', 'ROST', 'DHI', 'YUM', 'LULU',
-                'LEN', 'NVR', 'DECK', 'EBAY', 'ULTA', 'GRMN', 'PHM', 'GPC', 'DRI', 'RCL',
-                'LVS', 'POOL', 'WYNN', 'CZR', 'CCL', 'EXPE', 'KMX', 'DPZ', 'BBY', 'APTV'
-            ],
-            'Communication Services': [
-                'GOOGL', 'GOOG', 'META', 'NFLX', 'DIS', 'CMCSA', 'VZ', 'T', 'TMUS', 'CHTR',
-                'EA', 'WBD', 'TTWO', 'OMC', 'LYV', 'MTCH', 'IPG', 'NWSA', 'PARA', 'FOX'
-            ],
-            'Industrials': [
-                'GE', 'CAT', 'RTX', 'HON', 'UNP', 'UPS', 'BA', 'DE', 'LMT', 'ADP',
-                'ETN', 'WM', 'ITW', 'GD', 'NOC', 'EMR', 'PH', 'CSX', 'NSC', 'TT',
-                'FDX', 'JCI', 'PCAR', 'CARR', 'CTAS', 'ODFL', 'ROK', 'CPRT', 'CMI', 'AME',
-                'FAST', 'PAYX', 'VRSK', 'GWW', 'RSG', 'PWR', 'LHX', 'OTIS', 'EFX', 'XYL',
-                'WAB', 'DOV', 'HWM', 'IR', 'DAL', 'SWK', 'LUV', 'UAL', 'URI', 'JBHT'
-            ],
-            'Consumer Staples': [
-                'PG', 'COST', 'KO', 'PEP', 'WMT', 'PM', 'MO', 'MDLZ', 'TGT', 'CL',
-                'KMB', 'STZ', 'GIS', 'ADM', 'SYY', 'KHC', 'HSY', 'MKC', 'KDP', 'K',
-                'EL', 'KR', 'CLX', 'MNST', 'CHD', 'TSN', 'CAG', 'HRL', 'CPB', 'SJM'
-            ],
-            'Energy': [
-                'XOM', 'CVX', 'COP', 'SLB', 'MPC', 'EOG', 'PXD', 'PSX', 'VLO', 'OXY',
-                'WMB', 'HES', 'KMI', 'OKE', 'HAL', 'DVN', 'FANG', 'BKR', 'CTRA', 'TRGP'
-            ],
-            'Utilities': [
-                'NEE', 'DUK', 'SO', 'D', 'SRE', 'AEP', 'CEG', 'PCG', 'EXC', 'XEL',
-                'ED', 'WEC', 'EIX', 'AWK', 'DTE', 'ES', 'ETR', 'AEE', 'PPL', 'FE',
-                'CMS', 'CNP', 'EVRG', 'ATO', 'NI', 'LNT', 'NRG', 'PNW', 'AES', 'PEG'
-            ],
-            'Real Estate': [
-                'PLD', 'AMT', 'EQIX', 'WELL', 'PSA', 'SPG', 'DLR', 'O', 'CCI', 'VICI',
-                'CBRE', 'AVB', 'EQR', 'WY', 'SBAC', 'ARE', 'EXR', 'MAA', 'INVH', 'IRM',
-                'VTR', 'ESS', 'KIM', 'HST', 'UDR', 'REG', 'CPT', 'BXP', 'FRT'
-            ],
-            'Materials': [
-                'LIN', 'SHW', 'APD', 'FCX', 'ECL', 'NUE', 'NEM', 'DD', 'DOW', 'CTVA',
-                'VMC', 'MLM', 'PPG', 'ALB', 'CE', 'IFF', 'LYB', 'CF', 'BALL', 'PKG',
-                'MOS', 'FMC', 'AVY', 'EMN', 'AMCR', 'IP', 'WRK', 'SEE'
-            ]
-        }
-        
+    name_map = None
+    sector_map = None
+    if "sectors" in spec:
         # Build symbol list and sector map
         symbols = []
         sector_map = {}
-        for sector, sector_symbols in sp500_by_sector.items():
+        for sector, sector_symbols in spec["sectors"].items():
             for symbol in sector_symbols:
                 symbols.append(symbol)
                 sector_map[symbol] = sector
-        
-        print(f"[S&P 500 Heatmap] Fetching {len(symbols)} stocks...")
-        import time as t
-        start = t.time()
-        
+    else:
+        symbols = [s[0] for s in spec["stocks"]]
+        name_map = {s[0]: s[1] for s in spec["stocks"]}
+    
+    logger.debug("%s Fetching %s stocks...", log_prefix, len(symbols))
+    start = time.time()
+    
+    if spec["batch"]:
         # Try batch API first (faster for US stocks)
-        results = fetch_batch_quotes(symbols, sector_map=sector_map)
-        
-        elapsed = (t.time() - start) * 1000
-        print(f"[S&P 500 Heatmap] Batch API returned {len(results)} stocks in {elapsed:.0f}ms")
+        results = fetch_batch_quotes(symbols, name_map=name_map, sector_map=sector_map)
+        elapsed = (time.time() - start) * 1000
+        logger.debug("%s Batch API returned %s stocks in %.0fms", log_prefix, len(results), elapsed)
         
         # If batch API returned less than 50% of stocks, fall back to chart API
         if len(results) < len(symbols) * 0.5:
-            print(f"[S&P 500 Heatmap] Batch API insufficient, using parallel chart API fallback...")
-            start = t.time()
-            results = fetch_chart_quotes_parallel(symbols, sector_map=sector_map)
-            elapsed = (t.time() - start) * 1000
-            print(f"[S&P 500 Heatmap] Chart API returned {len(results)} stocks in {elapsed:.0f}ms")
-        
+            logger.debug("%s Batch API insufficient, using parallel chart API fallback...", log_prefix)
+            start = time.time()
+            results = fetch_chart_quotes_parallel(symbols, name_map=name_map, sector_map=sector_map)
+            elapsed = (time.time() - start) * 1000
+            logger.debug("%s Chart API returned %s stocks in %.0fms", log_prefix, len(results), elapsed)
+    else:
+        # Chart API is more reliable for international suffixes
+        results = fetch_chart_quotes_parallel(symbols, name_map=name_map)
+        elapsed = (time.time() - start) * 1000
+        logger.debug("%s Chart API returned %s stocks in %.0fms", log_prefix, len(results), elapsed)
+    
+    response_data = {
+        "quoteResponse": {
+            "result": results,
+            "error": None,
+            "count": len(results)
+        }
+    }
+    if "sectors" in spec:
         # Sort by sector
         results.sort(key=lambda x: (x.get('sector', ''), x['symbol']))
-        
-        response_data = {
-            "quoteResponse": {
-                "result": results,
-                "error": None,
-                "count": len(results),
-                "sectors": list(sp500_by_sector.keys())
-            }
-        }
-        
-        cache[cache_key] = (response_data, datetime.now())
-        return response_data
-            
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"[S&P 500 Heatmap] Error: {e}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Error fetching S&P 500 heatmap data: {str(e)}")
+        response_data["quoteResponse"]["sectors"] = list(spec["sectors"].keys())
+    return response_data
 
 
-@app.get("/api/nikkei225-heatmap")
-async def get_nikkei225_heatmap(request: Request):
-    """
-    Get Nikkei 225 stock data for heatmap using Yahoo Finance batch quote API.
-    FAST: Fetches all ~100 stocks in a single API call (~400ms).
-    """
+def get_cached_heatmap_data(index: str):
+    """Cached heatmap snapshot if younger than HEATMAP_CACHE_TTL, else None."""
+    cache_key = HEATMAP_INDICES[index]["cache_key"]
+    return get_cached("heatmap", cache_key, HEATMAP_CACHE_TTL)
+
+
+def get_heatmap_data(index: str) -> dict:
+    """Heatmap snapshot for an index, cached for HEATMAP_CACHE_TTL (blocking)."""
+    cached_data = get_cached_heatmap_data(index)
+    if cached_data is not None:
+        logger.debug("[%s Heatmap] Returning cached data (%s stocks)", HEATMAP_INDICES[index]['label'], len(cached_data.get('quoteResponse', {}).get('result', [])))
+        return cached_data
+    
+    response_data = fetch_heatmap_data(index)
+    cache[HEATMAP_INDICES[index]["cache_key"]] = (response_data, datetime.now())
+    # Build the JSON body and its gzip/br variants now, while still off the event loop
+    encode_cache_entry(HEATMAP_INDICES[index]["cache_key"], response_data)
+    return response_data
+
+
+async def _heatmap_response(index: str, request: Request):
+    """Shared body of the /api/<index>-heatmap endpoints."""
     client_ip = request.client.host
     
     if not check_rate_limit(client_ip):
         raise HTTPException(status_code=429, detail="Rate limit exceeded. Please try again later.")
     
+    label = HEATMAP_INDICES[index]["label"]
     try:
-        cache_key = "nikkei225_heatmap_data"
-        if cache_key in cache:
-            cached_data, cached_time = cache[cache_key]
-            if datetime.now() - cached_time < timedelta(minutes=5):
-                print(f"[Nikkei 225 Heatmap] Returning cached data ({len(cached_data.get('quoteResponse', {}).get('result', []))} stocks)")
-                return cached_data
-        
-        # Major Nikkei 225 stocks (.T suffix for Tokyo Stock Exchange)
-        nikkei_stocks = [
-            ('7203.T', 'Toyota'), ('6758.T', 'Sony'), ('9984.T', 'SoftBank'),
-            ('6861.T', 'Keyence'), ('8306.T', 'MUFJ'), ('9432.T', 'NTT'),
-            ('6501.T', 'Hitachi'), ('7741.T', 'HOYA'), ('4063.T', 'Shin-Etsu'),
-            ('8035.T', 'Tokyo Electron'), ('6098.T', 'Recruit'), ('6594.T', 'Nidec'),
-            ('4519.T', 'Chugai'), ('7974.T', 'Nintendo'), ('9433.T', 'KDDI'),
-            ('4502.T', 'Takeda'), ('6367.T', 'Daikin'), ('8058.T', 'Mitsubishi'),
-            ('8316.T', 'SMFG'), ('6971.T', 'Kyocera'), ('6752.T', 'Panasonic'),
-            ('7267.T', 'Honda'), ('4568.T', 'Daiichi Sankyo'), ('6762.T', 'TDK'),
-            ('7751.T', 'Canon'), ('4661.T', 'Oriental Land'), ('8766.T', 'Tokio Marine'),
-            ('8001.T', 'Itochu'), ('9020.T', 'JR East'), ('2914.T', 'JT'),
-            ('6954.T', 'Fanuc'), ('8031.T', 'Mitsui'), ('3382.T', 'Seven & I'),
-            ('4503.T', 'Astellas'), ('9022.T', 'JR Central'), ('6981.T', 'Murata'),
-            ('5108.T', 'Bridgestone'), ('4911.T', 'Shiseido'), ('6702.T', 'Fujitsu'),
-            ('8411.T', 'Mizuho'), ('6301.T', 'Komatsu'), ('8802.T', 'Mitsubishi Estate'),
-            ('4901.T', 'Fujifilm'), ('6503.T', 'Mitsubishi Electric'), ('8591.T', 'Orix'),
-            ('2502.T', 'Asahi'), ('4452.T', 'Kao'), ('7269.T', 'Suzuki'),
-            ('8750.T', 'Dai-ichi Life'), ('5401.T', 'Nippon Steel'), ('7201.T', 'Nissan'),
-            ('2801.T', 'Kikkoman'), ('6506.T', 'Yaskawa'), ('4543.T', 'Terumo'),
-            ('7011.T', 'MHI'), ('6857.T', 'Advantest'), ('6723.T', 'Renesas'),
-            ('9766.T', 'Konami'), ('4578.T', 'Otsuka'), ('8267.T', 'Aeon'),
-            ('7270.T', 'Subaru'), ('6326.T', 'Kubota'), ('9613.T', 'NTT Data'),
-            ('8604.T', 'Nomura'), ('9983.T', 'Fast Retailing'), ('4755.T', 'Rakuten'),
-            ('2413.T', 'M3'), ('6273.T', 'SMC'), ('9434.T', 'SoftBank Corp'),
-            ('6988.T', 'Nitto Denko'), ('4523.T', 'Eisai'), ('7832.T', 'Bandai Namco'),
-            ('6645.T', 'Omron'), ('4689.T', 'Z Holdings'), ('6504.T', 'Fuji Electric'),
-            ('6526.T', 'Socionext'), ('3407.T', 'Asahi Kasei'), ('6902.T', 'Denso'),
-        ]
-        
-        symbols = [s[0] for s in nikkei_stocks]
-        name_map = {s[0]: s[1] for s in nikkei_stocks}
-        
-        print(f"[Nikkei 225 Heatmap] Fetching {len(symbols)} stocks using parallel chart API...")
-        import time as t
-        start = t.time()
-        
-        # Use chart API for Japanese stocks (more reliable for .T suffix)
-        results = fetch_chart_quotes_parallel(symbols, name_map=name_map)
-        
-        elapsed = (t.time() - start) * 1000
-        print(f"[Nikkei 225 Heatmap] Chart API returned {len(results)} stocks in {elapsed:.0f}ms")
-        
-        response_data = {
-            "quoteResponse": {
-                "result": results,
-                "error": None,
-                "count": len(results)
-            }
-        }
-        
-        cache[cache_key] = (response_data, datetime.now())
-        return response_data
-            
+        data = await asyncio.to_thread(get_heatmap_data, index)
+        return cached_json_response(HEATMAP_INDICES[index]["cache_key"], data, request)
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[Nikkei 225 Heatmap] Error: {e}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Error fetching Nikkei 225 heatmap data: {str(e)}")
+        logger.warning("[%s Heatmap] Error: %s", label, e, exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error fetching {label} heatmap data: {str(e)}")
+
+
+@app.get("/api/dax-heatmap")
+async def get_dax_heatmap(request: Request):
+    """
+    Get all DAX 40 stock data for heatmap.
+    Uses parallel chart API calls (more reliable for .DE stocks).
+    """
+    return await _heatmap_response("dax", request)
+
+
+@app.get("/api/sp500-heatmap")
+async def get_sp500_heatmap(request: Request):
+    """
+    Get all S&P 500 stock data for heatmap using Yahoo Finance batch quote API.
+    FAST: Fetches all ~500 stocks in 3-4 batch API calls (~800ms total).
+    """
+    return await _heatmap_response("sp500", request)
+
+
+@app.get("/api/nikkei225-heatmap")
+async def get_nikkei225_heatmap(request: Request):
+    """
+    Get Nikkei 225 stock data for heatmap.
+    Uses parallel chart API calls (more reliable for .T stocks).
+    """
+    return await _heatmap_response("nikkei225", request)
 
 
 @app.get("/api/nasdaq100-heatmap")
@@ -4114,164 +6564,370 @@ async def get_nasdaq100_heatmap(request: Request):
     Get Nasdaq 100 stock data for heatmap using Yahoo Finance batch quote API.
     FAST: Fetches all 100 stocks in a single API call (~400ms).
     """
-    client_ip = request.client.host
+    return await _heatmap_response("nasdaq100", request)
+
+
+@app.get("/api/hangseng-heatmap")
+async def get_hangseng_heatmap(request: Request):
+    """
+    Get Hang Seng Index stock data for heatmap.
+    Uses parallel chart API calls (more reliable for .HK stocks).
+    """
+    return await _heatmap_response("hangseng", request)
+
+
+# ===========================================
+# Live Heatmap Stream (SSE)
+# ===========================================
+# One upstream refresh loop per index, started by the first subscriber and stopped when the last
+# one leaves. Each refresh is diffed against the previous snapshot and only changed quotes are
+# broadcast; every message is encoded once and shared by all subscriber queues.
+
+HEATMAP_STREAM_INTERVAL = int(os.getenv("HEATMAP_STREAM_INTERVAL_SECONDS", "30"))
+HEATMAP_STREAM_KEEPALIVE = 15  # Seconds between SSE comments that keep idle proxies from closing the stream
+HEATMAP_SUBSCRIBER_QUEUE = 32  # Pending messages per client before it is resynced with a snapshot
+HEATMAP_DELTA_FIELDS = ("regularMarketPrice", "regularMarketChange", "regularMarketChangePercent", "regularMarketPreviousClose")
+
+
+class HeatmapStream:
+    """Shared upstream refresh loop for one heatmap index, fanned out to SSE subscribers."""
+    
+    def __init__(self, index: str):
+        self.index = index
+        self.quotes = {}  # {symbol: quote dict}
+        self.extra = {}   # Non-quote fields of quoteResponse (e.g. sectors)
+        self.version = 0
+        self.subscribers = set()
+        self.task = None
+        self._snapshot = (0, None)  # (version, encoded snapshot event)
+    
+    def snapshot_event(self) -> str:
+        version, message = self._snapshot
+        if version != self.version or message is None:
+            results = list(self.quotes.values())
+            message = _sse_event("snapshot", {
+                "v": self.version,
+                "quoteResponse": {"result": results, "error": None, "count": len(results), **self.extra},
+            })
+            self._snapshot = (self.version, message)
+        return message
+    
+    def subscribe(self) -> asyncio.Queue:
+        subscriber = asyncio.Queue(maxsize=HEATMAP_SUBSCRIBER_QUEUE)
+        
+        if self.task is None or self.task.done():
+            # No refresh loop running - whatever we still hold is stale
+            self.quotes = {}
+            self.version = 0
+        if not self.version:
+            # Seed from the REST cache so the first viewer doesn't wait for an upstream round-trip
+            cached_data = get_cached_heatmap_data(self.index)
+            if cached_data is not None:
+                self._apply(cached_data)
+        
+        # Registered only after seeding, so the initial snapshot is queued here and nowhere else
+        # (no await in between - nothing can publish to the queue before it)
+        self.subscribers.add(subscriber)
+        if self.version:
+            subscriber.put_nowait(self.snapshot_event())
+        
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+        return subscriber
+    
+    def unsubscribe(self, subscriber: asyncio.Queue):
+        self.subscribers.discard(subscriber)
+    
+    def _publish(self, message: str):
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber.put_nowait(message)
+            except asyncio.QueueFull:
+                # Slow client: drop its backlog and resync it with a full snapshot
+                while not subscriber.empty():
+                    subscriber.get_nowait()
+                subscriber.put_nowait(self.snapshot_event())
+    
+    def _apply(self, data: dict):
+        quote_response = data.get("quoteResponse", {})
+        changes = []
+        for quote in quote_response.get("result", []):
+            previous = self.quotes.get(quote["symbol"])
+            if previous is None or any(previous.get(f) != quote.get(f) for f in HEATMAP_DELTA_FIELDS):
+                changes.append(quote)
+                self.quotes[quote["symbol"]] = quote
+        self.extra = {k: v for k, v in quote_response.items() if k not in ("result", "error", "count")}
+        
+        if not self.version:
+            self.version = 1
+            self._publish(self.snapshot_event())
+        elif changes:
+            self.version += 1
+            self._publish(_sse_event("delta", {"v": self.version, "changes": changes}))
+    
+    async def _run(self):
+        label = HEATMAP_INDICES[self.index]["label"]
+        while self.subscribers:
+            try:
+                data = await asyncio.to_thread(fetch_heatmap_data, self.index)
+                # Keep the REST endpoint warm as well, precompressed variants included
+                cache_key = HEATMAP_INDICES[self.index]["cache_key"]
+                cache[cache_key] = (data, datetime.now())
+                await asyncio.to_thread(encode_cache_entry, cache_key, data)
+                self._apply(data)
+                logger.info("[%s Heatmap Stream] v%s, %s subscribers", label, self.version, len(self.subscribers))
+            except Exception as e:
+                logger.warning("[%s Heatmap Stream] Refresh failed: %s", label, e)
+            await asyncio.sleep(HEATMAP_STREAM_INTERVAL)
+
+
+heatmap_streams = {}  # {index: HeatmapStream}
+
+
+@app.get("/api/heatmap-stream/{index}")
+async def stream_heatmap(index: str, request: Request):
+    """
+    Live heatmap over Server-Sent Events.
+    Sends a `snapshot` event (same quoteResponse as /api/<index>-heatmap) and then `delta` events
+    with only the quotes that changed. Both carry a version `v`.
+    """
+    if index not in HEATMAP_INDICES:
+        raise HTTPException(status_code=404, detail=f"Unknown heatmap index: {index}")
     
+    client_ip = request.client.host
     if not check_rate_limit(client_ip):
         raise HTTPException(status_code=429, detail="Rate limit exceeded. Please try again later.")
     
+    stream = heatmap_streams.get(index)
+    if stream is None:
+        stream = heatmap_streams[index] = HeatmapStream(index)
+    
+    async def events():
+        subscriber = stream.subscribe()
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscriber.get(), HEATMAP_STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    message = ": keep-alive\n\n"
+                yield message
+        finally:
+            stream.unsubscribe(subscriber)
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+# ===========================================
+# Live Quote Hub (SSE)
+# ===========================================
+# Watchlists and portfolios subscribe to symbol sets. One hub loop refreshes each unique symbol
+# (batched upstream) at an interval tied to its market's trading hours and pushes only changed
+# quotes to the subscribers of that symbol, so upstream cost scales with unique symbols, not viewers.
+
+QUOTE_HUB_OPEN_INTERVAL = int(os.getenv("QUOTE_HUB_OPEN_INTERVAL_SECONDS", "15"))
+QUOTE_HUB_CLOSED_INTERVAL = int(os.getenv("QUOTE_HUB_CLOSED_INTERVAL_SECONDS", "300"))
+QUOTE_HUB_MAX_SYMBOLS = 50  # Per subscription
+# Unique symbols across all subscriptions - upstream cost grows with this, so it is capped
+QUOTE_HUB_MAX_UNIQUE_SYMBOLS = int(os.getenv("QUOTE_HUB_MAX_UNIQUE_SYMBOLS", "1000"))
+QUOTE_HUB_MAX_MISSES = 3  # Refreshes in a row upstream returned nothing for a symbol before it is parked
+QUOTE_HUB_UNRESOLVED_RETRY = 15 * 60  # Seconds a parked symbol waits before it is tried again
+QUOTE_HUB_TICK = 1.0  # Seconds between scheduler passes
+
+# Regular trading sessions by symbol suffix: (timezone, open (h, m), close (h, m))
+MARKET_SESSIONS = {
+    "": ("America/New_York", (9, 30), (16, 0)),
+    ".DE": ("Europe/Berlin", (9, 0), (17, 30)),
+    ".F": ("Europe/Berlin", (8, 0), (20, 0)),
+    ".L": ("Europe/London", (8, 0), (16, 30)),
+    ".PA": ("Europe/Paris", (9, 0), (17, 30)),
+    ".AS": ("Europe/Amsterdam", (9, 0), (17, 30)),
+    ".SW": ("Europe/Zurich", (9, 0), (17, 30)),
+    ".T": ("Asia/Tokyo", (9, 0), (15, 30)),
+    ".HK": ("Asia/Hong_Kong", (9, 30), (16, 0)),
+}
+
+
+def is_market_open(symbol: str, now: datetime = None) -> bool:
+    """
+    True if the symbol's home market is in its regular weekday session (exchange holidays are not modelled).
+    Crypto and FX trade around the clock.
+    """
+    symbol_upper = symbol.upper()
+    if symbol_upper.endswith("-USD") or symbol_upper.endswith("=X"):
+        return True
+    suffix = symbol_upper[symbol_upper.rfind("."):] if "." in symbol_upper else ""
+    timezone_name, (open_h, open_m), (close_h, close_m) = MARKET_SESSIONS.get(suffix, MARKET_SESSIONS[""])
     try:
-        cache_key = "nasdaq100_heatmap_data"
-        if cache_key in cache:
-            cached_data, cached_time = cache[cache_key]
-            if datetime.now() - cached_time < timedelta(minutes=5):
-                print(f"[Nasdaq 100 Heatmap] Returning cached data ({len(cached_data.get('quoteResponse', {}).get('result', []))} stocks)")
-                return cached_data
-        
-        # Nasdaq 100 stocks
-        nasdaq100_stocks = [
-            ('AAPL', 'Apple'), ('MSFT', 'Microsoft'), ('AMZN', 'Amazon'), ('NVDA', 'NVIDIA'),
-            ('GOOGL', 'Alphabet A'), ('META', 'Meta'), ('TSLA', 'Tesla'), ('AVGO', 'Broadcom'),
-            ('COST', 'Costco'), ('GOOG', 'Alphabet C'), ('NFLX', 'Netflix'), ('AMD', 'AMD'),
-            ('ADBE', 'Adobe'), ('PEP', 'PepsiCo'), ('CSCO', 'Cisco'), ('TMUS', 'T-Mobile'),
-            ('INTC', 'Intel'), ('CMCSA', 'Comcast'), ('QCOM', 'Qualcomm'), ('INTU', 'Intuit'),
-            ('TXN', 'Texas Inst'), ('HON', 'Honeywell'), ('AMGN', 'Amgen'), ('AMAT', 'Applied Mat'),
-            ('BKNG', 'Booking'), ('ISRG', 'Intuitive'), ('SBUX', 'Starbucks'), ('VRTX', 'Vertex'),
-            ('ADP', 'ADP'), ('LRCX', 'Lam Research'), ('GILD', 'Gilead'), ('MU', 'Micron'),
-            ('MDLZ', 'Mondelez'), ('ADI', 'Analog Dev'), ('REGN', 'Regeneron'), ('PANW', 'Palo Alto'),
-            ('SNPS', 'Synopsys'), ('KLAC', 'KLA'), ('CDNS', 'Cadence'), ('ASML', 'ASML'),
-            ('PDD', 'PDD'), ('MELI', 'MercadoLibre'), ('PYPL', 'PayPal'), ('CTAS', 'Cintas'),
-            ('ORLY', 'OReilly'), ('ABNB', 'Airbnb'), ('FTNT', 'Fortinet'), ('CSX', 'CSX'),
-            ('MAR', 'Marriott'), ('MNST', 'Monster'), ('NXPI', 'NXP'), ('MRVL', 'Marvell'),
-            ('PCAR', 'PACCAR'), ('WDAY', 'Workday'), ('DXCM', 'DexCom'), ('AEP', 'AEP'),
-            ('KDP', 'Keurig'), ('CPRT', 'Copart'), ('ROP', 'Roper'), ('MCHP', 'Microchip'),
-            ('CEG', 'Constellation'), ('AZN', 'AstraZeneca'), ('EXC', 'Exelon'), ('PAYX', 'Paychex'),
-            ('ROST', 'Ross'), ('LULU', 'Lululemon'), ('IDXX', 'IDEXX'), ('ODFL', 'Old Dominion'),
-            ('KHC', 'Kraft Heinz'), ('FAST', 'Fastenal'), ('GEHC', 'GE Healthcare'), ('VRSK', 'Verisk'),
-            ('EA', 'EA'), ('CTSH', 'Cognizant'), ('BKR', 'Baker Hughes'), ('XEL', 'Xcel'),
-            ('ON', 'ON Semi'), ('CSGP', 'CoStar'), ('ZS', 'Zscaler'), ('DDOG', 'Datadog'),
-            ('FANG', 'Diamondback'), ('ANSS', 'ANSYS'), ('DLTR', 'Dollar Tree'), ('TTD', 'Trade Desk'),
-            ('ILMN', 'Illumina'), ('WBD', 'Warner Bros'), ('TEAM', 'Atlassian'), ('ALGN', 'Align'),
-            ('GFS', 'GlobalFoundries'), ('CRWD', 'CrowdStrike'), ('BIIB', 'Biogen'), ('MDB', 'MongoDB'),
-            ('DASH', 'DoorDash'), ('ENPH', 'Enphase'), ('SIRI', 'Sirius'), ('LCID', 'Lucid'),
-            ('RIVN', 'Rivian'), ('ZM', 'Zoom'), ('OKTA', 'Okta'), ('SPLK', 'Splunk'),
-        ]
-        
-        symbols = [s[0] for s in nasdaq100_stocks]
-        name_map = {s[0]: s[1] for s in nasdaq100_stocks}
-        
-        print(f"[Nasdaq 100 Heatmap] Fetching {len(symbols)} stocks...")
-        import time as t
-        start = t.time()
-        
-        # Try batch API first
-        results = fetch_batch_quotes(symbols, name_map=name_map)
-        
-        elapsed = (t.time() - start) * 1000
-        print(f"[Nasdaq 100 Heatmap] Batch API returned {len(results)} stocks in {elapsed:.0f}ms")
-        
-        # Fallback to chart API if batch returned less than 50%
-        if len(results) < len(symbols) * 0.5:
-            print(f"[Nasdaq 100 Heatmap] Batch API insufficient, using parallel chart API fallback...")
-            start = t.time()
-            results = fetch_chart_quotes_parallel(symbols, name_map=name_map)
-            elapsed = (t.time() - start) * 1000
-            print(f"[Nasdaq 100 Heatmap] Chart API returned {len(results)} stocks in {elapsed:.0f}ms")
-        
-        response_data = {
-            "quoteResponse": {
-                "result": results,
-                "error": None,
-                "count": len(results)
-            }
-        }
-        
-        cache[cache_key] = (response_data, datetime.now())
-        return response_data
-            
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"[Nasdaq 100 Heatmap] Error: {e}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Error fetching Nasdaq 100 heatmap data: {str(e)}")
+        local = (now or datetime.now(dt_timezone.utc)).astimezone(ZoneInfo(timezone_name))
+    except Exception:
+        # No tz database available (e.g. slim containers without tzdata) - poll at the open-market rate
+        return True
+    if local.weekday() >= 5:
+        return False
+    minutes = local.hour * 60 + local.minute
+    return open_h * 60 + open_m <= minutes < close_h * 60 + close_m
 
 
-@app.get("/api/hangseng-heatmap")
-async def get_hangseng_heatmap(request: Request):
+def fetch_hub_quotes(symbols: list) -> list:
+    """Quotes for the hub: one batch request for all symbols, chart API for whatever the batch missed."""
+    results = fetch_batch_quotes(symbols)
+    found = {quote["symbol"] for quote in results}
+    missing = [symbol for symbol in symbols if symbol not in found]
+    if missing:
+        results.extend(fetch_chart_quotes_parallel(missing))
+    return results
+
+
+class QuoteHub:
+    """Process-wide quote subscription hub."""
+    
+    def __init__(self):
+        self.subscribers = {}   # {symbol: set of queues}
+        self.queues = {}        # {subscriber queue: tuple of symbols}
+        self.quotes = {}        # {symbol: (quote dict, encoded JSON)}
+        self.next_refresh = {}  # {symbol: monotonic time}
+        self.misses = {}        # {symbol: refreshes in a row without a quote}
+        self.unresolved = {}    # {symbol: monotonic time} - parked symbols upstream could not resolve, kept after unsubscribe
+        self.task = None
+    
+    def capacity_for(self, symbols) -> bool:
+        """True if subscribing `symbols` keeps the hub within QUOTE_HUB_MAX_UNIQUE_SYMBOLS."""
+        new = sum(1 for symbol in symbols if symbol not in self.subscribers)
+        return len(self.subscribers) + new <= QUOTE_HUB_MAX_UNIQUE_SYMBOLS
+    
+    def _snapshot_event(self, symbols) -> str:
+        encoded = [self.quotes[s][1] for s in symbols if s in self.quotes]
+        return f"event: snapshot\ndata: {{\"quotes\": [{', '.join(encoded)}]}}\n\n"
+    
+    def subscribe(self, symbols) -> asyncio.Queue:
+        subscriber = asyncio.Queue(maxsize=HEATMAP_SUBSCRIBER_QUEUE)
+        self.queues[subscriber] = tuple(symbols)
+        now = time.monotonic()
+        for symbol in symbols:
+            if symbol not in self.subscribers and self.unresolved.get(symbol, 0) > now:
+                # Still parked from an earlier subscription - resubscribing does not reset that
+                self.next_refresh[symbol] = self.unresolved[symbol]
+            self.subscribers.setdefault(symbol, set()).add(subscriber)
+        subscriber.put_nowait(self._snapshot_event(symbols))
+        
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+        return subscriber
+    
+    def unsubscribe(self, subscriber: asyncio.Queue):
+        for symbol in self.queues.pop(subscriber, ()):
+            queues = self.subscribers.get(symbol)
+            if queues is None:
+                continue
+            queues.discard(subscriber)
+            if not queues:
+                # Nobody watches this symbol any more - stop refreshing it
+                del self.subscribers[symbol]
+                self.next_refresh.pop(symbol, None)
+                self.quotes.pop(symbol, None)
+                self.misses.pop(symbol, None)
+    
+    def _publish(self, changed):
+        """Send every queue one event with the changed quotes it subscribed to."""
+        pending = {}
+        for symbol in changed:
+            for subscriber in self.subscribers.get(symbol, ()):
+                pending.setdefault(subscriber, []).append(self.quotes[symbol][1])
+        for subscriber, encoded in pending.items():
+            message = f"event: quotes\ndata: {{\"quotes\": [{', '.join(encoded)}]}}\n\n"
+            try:
+                subscriber.put_nowait(message)
+            except asyncio.QueueFull:
+                # Slow client: drop its backlog and resync it with a full snapshot
+                while not subscriber.empty():
+                    subscriber.get_nowait()
+                subscriber.put_nowait(self._snapshot_event(self.queues.get(subscriber, ())))
+    
+    def _apply(self, quotes, refreshed):
+        changed = []
+        for quote in quotes:
+            symbol = quote["symbol"]
+            if symbol not in self.subscribers:
+                continue
+            previous = self.quotes.get(symbol)
+            if previous is None or any(previous[0].get(f) != quote.get(f) for f in HEATMAP_DELTA_FIELDS):
+                self.quotes[symbol] = (quote, json.dumps(quote))
+                changed.append(symbol)
+        now = time.monotonic()
+        returned = {quote["symbol"] for quote in quotes}
+        for symbol in refreshed:
+            if symbol not in self.subscribers:
+                continue
+            if symbol in returned:
+                self.misses.pop(symbol, None)
+            else:
+                self.misses[symbol] = self.misses.get(symbol, 0) + 1
+                if self.misses[symbol] >= QUOTE_HUB_MAX_MISSES:
+                    # Unknown to upstream (or delisted) - stop paying a chart call for it every tick
+                    self.unresolved[symbol] = now + QUOTE_HUB_UNRESOLVED_RETRY
+                    self.next_refresh[symbol] = now + QUOTE_HUB_UNRESOLVED_RETRY
+                    self.misses.pop(symbol, None)
+                    log_sampled("quote_hub_unresolved", logging.INFO, "[Quote Hub] No quote for %s, parked for %ss", symbol, QUOTE_HUB_UNRESOLVED_RETRY)
+                    continue
+            interval = QUOTE_HUB_OPEN_INTERVAL if is_market_open(symbol) else QUOTE_HUB_CLOSED_INTERVAL
+            self.next_refresh[symbol] = now + interval
+        if changed:
+            self._publish(changed)
+    
+    async def _run(self):
+        while self.subscribers:
+            now = time.monotonic()
+            self.unresolved = {symbol: until for symbol, until in self.unresolved.items() if until > now}
+            due = [symbol for symbol in self.subscribers if self.next_refresh.get(symbol, 0) <= now]
+            if due:
+                try:
+                    quotes = await asyncio.to_thread(fetch_hub_quotes, due)
+                    self._apply(quotes, due)
+                except Exception as e:
+                    logger.warning("[Quote Hub] Refresh of %s symbols failed: %s", len(due), e)
+                    retry_at = time.monotonic() + QUOTE_HUB_OPEN_INTERVAL
+                    for symbol in due:
+                        self.next_refresh[symbol] = retry_at
+            await asyncio.sleep(QUOTE_HUB_TICK)
+
+
+quote_hub = QuoteHub()
+
+
+@app.get("/api/quote-stream")
+async def stream_quotes(symbols: str, request: Request):
     """
-    Get Hang Seng Index stock data for heatmap using Yahoo Finance batch quote API.
-    FAST: Fetches all ~85 stocks in a single API call (~400ms).
+    Live quotes for a set of symbols over Server-Sent Events.
+    Sends a `snapshot` event with the quotes the hub already knows, then `quotes` events with changed quotes.
+    Quotes use the heatmap quote format (regularMarketPrice, regularMarketChange, ...).
     """
-    client_ip = request.client.host
+    # Symbols end up in shared upstream requests - one invalid symbol rejects the whole stream
+    symbol_list = list(dict.fromkeys(validate_symbol(s) for s in symbols.split(",") if s.strip()))
+    if not symbol_list:
+        raise HTTPException(status_code=400, detail="No symbols provided")
+    if len(symbol_list) > QUOTE_HUB_MAX_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {QUOTE_HUB_MAX_SYMBOLS} symbols per stream")
     
+    client_ip = request.client.host
     if not check_rate_limit(client_ip):
         raise HTTPException(status_code=429, detail="Rate limit exceeded. Please try again later.")
+    if not quote_hub.capacity_for(symbol_list):
+        log_sampled("quote_hub_full", logging.WARNING, "[Quote Hub] Unique symbol cap (%s) reached", QUOTE_HUB_MAX_UNIQUE_SYMBOLS)
+        raise HTTPException(status_code=503, detail="Live quotes are at capacity. Please try again later.", headers={"Retry-After": "60"})
     
-    try:
-        cache_key = "hangseng_heatmap_data"
-        if cache_key in cache:
-            cached_data, cached_time = cache[cache_key]
-            if datetime.now() - cached_time < timedelta(minutes=5):
-                print(f"[Hang Seng Heatmap] Returning cached data ({len(cached_data.get('quoteResponse', {}).get('result', []))} stocks)")
-                return cached_data
-        
-        # Major Hang Seng Index stocks (.HK suffix)
-        hangseng_stocks = [
-            ('0700.HK', 'Tencent'), ('9988.HK', 'Alibaba'), ('0941.HK', 'China Mobile'),
-            ('1299.HK', 'AIA'), ('0005.HK', 'HSBC'), ('0939.HK', 'CCB'),
-            ('1398.HK', 'ICBC'), ('2318.HK', 'Ping An'), ('3988.HK', 'BOC'),
-            ('0883.HK', 'CNOOC'), ('0388.HK', 'HKEX'), ('0016.HK', 'SHK Properties'),
-            ('0027.HK', 'Galaxy'), ('0002.HK', 'CLP'), ('0003.HK', 'HK Gas'),
-            ('0011.HK', 'Hang Seng Bank'), ('0012.HK', 'Henderson'), ('0017.HK', 'New World'),
-            ('0066.HK', 'MTR'), ('0175.HK', 'Geely'), ('0267.HK', 'CITIC'),
-            ('0288.HK', 'WH Group'), ('0386.HK', 'Sinopec'), ('0688.HK', 'China Overseas'),
-            ('0762.HK', 'China Unicom'), ('0823.HK', 'Link REIT'), ('0857.HK', 'PetroChina'),
-            ('1038.HK', 'CK Infra'), ('1093.HK', 'CSPC'), ('1113.HK', 'CK Asset'),
-            ('1177.HK', 'Sino Biopharm'), ('1211.HK', 'BYD'), ('1288.HK', 'ABC'),
-            ('1810.HK', 'Xiaomi'), ('1928.HK', 'Sands China'), ('2020.HK', 'ANTA'),
-            ('2269.HK', 'WuXi Bio'), ('2313.HK', 'Shenzhou'), ('2319.HK', 'Mengniu'),
-            ('2331.HK', 'Li Ning'), ('2382.HK', 'Sunny Optical'), ('2388.HK', 'BOCHK'),
-            ('2628.HK', 'China Life'), ('2688.HK', 'ENN'), ('3690.HK', 'Meituan'),
-            ('3968.HK', 'CMB'), ('9618.HK', 'JD'), ('9633.HK', 'Nongfu'),
-            ('9888.HK', 'Baidu'), ('9901.HK', 'NetEase'), ('9961.HK', 'Trip.com'),
-            ('0001.HK', 'CK Hutchison'), ('0006.HK', 'Power Assets'), ('0019.HK', 'Swire'),
-            ('0083.HK', 'Sino Land'), ('0151.HK', 'Want Want'), ('0241.HK', 'Ali Health'),
-            ('0291.HK', 'CR Beer'), ('0669.HK', 'Techtronic'), ('0728.HK', 'China Telecom'),
-            ('0992.HK', 'Lenovo'), ('1024.HK', 'Kuaishou'), ('1088.HK', 'Shenhua'),
-        ]
-        
-        symbols = [s[0] for s in hangseng_stocks]
-        name_map = {s[0]: s[1] for s in hangseng_stocks}
-        
-        print(f"[Hang Seng Heatmap] Fetching {len(symbols)} stocks using parallel chart API...")
-        import time as t
-        start = t.time()
-        
-        # Use chart API for HK stocks (more reliable for .HK suffix)
-        results = fetch_chart_quotes_parallel(symbols, name_map=name_map)
-        
-        elapsed = (t.time() - start) * 1000
-        print(f"[Hang Seng Heatmap] Chart API returned {len(results)} stocks in {elapsed:.0f}ms")
-        
-        response_data = {
-            "quoteResponse": {
-                "result": results,
-                "error": None,
-                "count": len(results)
-            }
-        }
-        
-        cache[cache_key] = (response_data, datetime.now())
-        return response_data
-            
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"[Hang Seng Heatmap] Error: {e}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Error fetching Hang Seng heatmap data: {str(e)}")
+    async def events():
+        subscriber = quote_hub.subscribe(symbol_list)
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscriber.get(), HEATMAP_STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    message = ": keep-alive\n\n"
+                yield message
+        finally:
+            quote_hub.unsubscribe(subscriber)
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
 
 
 @app.get("/api/market-cap")
@@ -4303,10 +6959,9 @@ async def get_market_cap(symbols: str, request: Request):
         
         # Check cache first
         cache_key = f"market_cap_{','.join(sorted(symbol_list))}"
-        if cache_key in cache:
-            cached_data, cached_time = cache[cache_key]
-            if datetime.now() - cached_time < CACHE_DURATION:
-                return cached_data
+        cached_data = get_cached("market_cap", cache_key, CACHE_DURATION)
+        if cached_data is not None:
+            return cached_json_response(cache_key, cached_data, request)
         
         market_caps = {}
         
@@ -4322,7 +6977,7 @@ async def get_market_cap(symbols: str, request: Request):
                     "token": FINNHUB_API_KEY
                 }
                 
-                response = requests.get(quote_url, params=params, timeout=10)
+                response = http_session.get(quote_url, params=params, timeout=10)
                 response.raise_for_status()
                 quote_data = response.json()
                 
@@ -4335,7 +6990,7 @@ async def get_market_cap(symbols: str, request: Request):
                     "token": FINNHUB_API_KEY
                 }
                 
-                profile_response = requests.get(profile_url, params=profile_params, timeout=10)
+                profile_response = http_session.get(profile_url, params=profile_params, timeout=10)
                 if profile_response.status_code == 200:
                     profile_data = profile_response.json()
                     # Finnhub profile2 has marketCapitalization
@@ -4352,7 +7007,7 @@ async def get_market_cap(symbols: str, request: Request):
                     "token": FINNHUB_API_KEY
                 }
                 
-                metric_response = requests.get(metric_url, params=metric_params, timeout=10)
+                metric_response = http_session.get(metric_url, params=metric_params, timeout=10)
                 if metric_response.status_code == 200:
                     metric_data = metric_response.json()
                     # Check various possible fields
@@ -4367,14 +7022,14 @@ async def get_market_cap(symbols: str, request: Request):
                             continue
                 
                 # If still no market cap, log but don't fail
-                print(f"[Market Cap] No market cap found for {symbol}")
+                logger.debug("[Market Cap] No market cap found for %s", symbol)
                 market_caps[symbol] = None
                 
                 # Small delay to avoid rate limiting
                 time.sleep(0.1)
-                
+            
             except Exception as e:
-                print(f"[Market Cap] Error fetching market cap for {symbol}: {e}")
+                log_sampled("market_cap_error", logging.WARNING, "[Market Cap] Error fetching market cap for %s: %s", symbol, e)
                 market_caps[symbol] = None
                 continue
         
@@ -4385,10 +7040,10 @@ async def get_market_cap(symbols: str, request: Request):
         # Cache the result
         cache[cache_key] = (result, datetime.now())
         
-        return result
-        
+        return cached_json_response(cache_key, result, request)
+    
     except Exception as e:
-        print(f"[Market Cap] Error: {e}")
+        logger.warning("[Market Cap] Error: %s", e)
         raise HTTPException(status_code=500, detail=f"Error fetching market cap: {str(e)}")
 
 
@@ -4399,77 +7054,248 @@ async def get_market_cap(symbols: str, request: Request):
 # Get the directory where this script is located
 BASE_DIR = Path(__file__).resolve().parent
 
-# Serve static files from src directory
-app.mount("/src", StaticFiles(directory=BASE_DIR / "src"), name="src")
+# index.html, styles.css and src/** are read once at startup into an in-memory manifest with precompressed
+# variants and content-hash ETags, so serving them is a dict lookup. URLs carry a content version
+# (index.html references src/app.js?v=..., every relative JS import gets one too); a versioned URL never
+# changes content and is cached as immutable, unversioned requests revalidate with the ETag.
+STATIC_ROOT_FILES = ("index.html", "styles.css")
+STATIC_DIRS = ("src",)
+# Other files in the project root served as-is (favicons, images, fonts) - never code or config
+STATIC_ROOT_SUFFIXES = (".png", ".jpg", ".jpeg", ".gif", ".svg", ".ico", ".webp", ".woff", ".woff2", ".ttf")
+STATIC_COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+STATIC_IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Development: rebuild the manifest when a file under src/ (or index.html/styles.css) changes
+STATIC_ASSETS_RELOAD = os.getenv("STATIC_ASSETS_RELOAD", "False").lower() == "true"
+
+STATIC_CONTENT_TYPES = {
+    '.js': 'application/javascript',
+    '.css': 'text/css',
+    '.html': 'text/html',
+    '.json': 'application/json',
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.gif': 'image/gif',
+    '.svg': 'image/svg+xml',
+    '.ico': 'image/x-icon',
+    '.webp': 'image/webp',
+    '.woff': 'font/woff',
+    '.woff2': 'font/woff2',
+    '.ttf': 'font/ttf',
+}
+
+# Relative ES module specifiers: import ... from './x.js', export ... from '../x.js', import('./x.js')
+JS_IMPORT_PATTERN = re.compile(r"""(\b(?:from|import)\s*\(?\s*)(['"])(\.{1,2}/[^'"?#]+\.js)\2""")
+# The entry points referenced from index.html
+HTML_ASSET_PATTERN = re.compile(r"""(\b(?:src|href)=)(["'])/?((?:src/[^"'?#]+)|styles\.css)\2""")
+
+
+class StaticAsset:
+    """One file of the static manifest: body, precompressed variants and content version."""
+    
+    __slots__ = ("content_type", "body", "digest", "variants")
+    
+    def __init__(self, content_type: str, body: bytes, digest: str):
+        self.content_type = content_type
+        self.body = body
+        self.digest = digest  # Content version - the ?v= value of the asset's URL
+        self.variants = {}  # {content coding: compressed body}
+        if len(body) >= COMPRESSION_MIN_SIZE and content_type.startswith(STATIC_COMPRESSIBLE_TYPES):
+            for encoding in SUPPORTED_ENCODINGS:
+                compressed = compress_body(body, encoding, PRECOMPRESS_LEVELS)
+                if len(compressed) < len(body):
+                    self.variants[encoding] = compressed
+    
+    def etag(self, encoding: str = None) -> str:
+        if encoding is None:
+            return f'"{self.digest}"'
+        return f'"{self.digest}-{encoding}"'
+
+
+def _static_source_files(base_dir: Path) -> dict:
+    """{URL path relative to the site root: file} for everything the manifest serves."""
+    files = {}
+    for name in STATIC_ROOT_FILES:
+        if (base_dir / name).is_file():
+            files[name] = base_dir / name
+    for file_path in base_dir.iterdir():
+        if file_path.is_file() and file_path.suffix.lower() in STATIC_ROOT_SUFFIXES:
+            files[file_path.name] = file_path
+    for directory in STATIC_DIRS:
+        for file_path in sorted((base_dir / directory).rglob("*")):
+            if file_path.is_file():
+                files[file_path.relative_to(base_dir).as_posix()] = file_path
+    return files
+
+
+def _resolve_import(importer: str, specifier: str) -> str:
+    """Manifest key of a relative import specifier, e.g. ("src/pages/A.js", "../utils/b.js") -> "src/utils/b.js"."""
+    parts = importer.split("/")[:-1]
+    for segment in specifier.split("/"):
+        if segment == "..":
+            if parts:
+                parts.pop()
+        elif segment not in ("", "."):
+            parts.append(segment)
+    return "/".join(parts)
+
+
+def build_static_manifest(base_dir: Path = BASE_DIR) -> dict:
+    """
+    Read the static files into {URL path: StaticAsset}.
+    A file's version hashes its own source plus every module it (transitively) imports, so a change anywhere
+    below an import gives all importers new URLs too - cycles included - and immutable caching stays safe.
+    """
+    started = time.perf_counter()
+    sources = {key: file_path.read_bytes() for key, file_path in _static_source_files(base_dir).items()}
+    
+    imports = {}  # {key: [(specifier, imported key)]}
+    for key, source in sources.items():
+        if key.endswith(".js"):
+            text = source.decode("utf-8", errors="replace")
+            imports[key] = [(m.group(3), _resolve_import(key, m.group(3))) for m in JS_IMPORT_PATTERN.finditer(text)]
+    
+    versions = {}
+    for key in sources:
+        reachable, pending = set(), [key]
+        while pending:
+            current = pending.pop()
+            if current in reachable or current not in sources:
+                continue
+            reachable.add(current)
+            pending.extend(imported for _, imported in imports.get(current, ()))
+        digest = hashlib.blake2b(digest_size=8)
+        for name in sorted(reachable):
+            digest.update(name.encode("utf-8"))
+            digest.update(sources[name])
+        versions[key] = digest.hexdigest()
+    
+    def versioned_import(key):
+        def replace(match):
+            target = _resolve_import(key, match.group(3))
+            if target not in versions:
+                return match.group(0)
+            return f"{match.group(1)}{match.group(2)}{match.group(3)}?v={versions[target]}{match.group(2)}"
+        return replace
+    
+    def versioned_reference(match):
+        target = match.group(3)
+        if target not in versions:
+            return match.group(0)
+        return f"{match.group(1)}{match.group(2)}{target}?v={versions[target]}{match.group(2)}"
+    
+    manifest = {}
+    for key, source in sources.items():
+        body = source
+        if key in imports and imports[key]:
+            body = JS_IMPORT_PATTERN.sub(versioned_import(key), source.decode("utf-8")).encode("utf-8")
+        elif key == "index.html":
+            body = HTML_ASSET_PATTERN.sub(versioned_reference, source.decode("utf-8")).encode("utf-8")
+        content_type = STATIC_CONTENT_TYPES.get(Path(key).suffix.lower(), "application/octet-stream")
+        if content_type == "application/javascript":
+            content_type += "; charset=utf-8"  # text/* types get their charset from Response
+        manifest[key] = StaticAsset(content_type, body, versions[key])
+    
+    logger.info("[Static] Manifest built: %s files, %.0f KB (%.0f KB brotli/gzip) in %.2fs",
+                len(manifest), sum(len(a.body) for a in manifest.values()) / 1024,
+                sum(len(next(iter(a.variants.values()), a.body)) for a in manifest.values()) / 1024,
+                time.perf_counter() - started)
+    return manifest
+
+
+static_manifest = {}  # {URL path: StaticAsset}, built by the startup event
+_static_manifest_mtime = 0.0
+
+
+def _static_sources_mtime() -> float:
+    return max((file_path.stat().st_mtime for file_path in _static_source_files(BASE_DIR).values()), default=0.0)
+
+
+@app.on_event("startup")
+async def load_static_manifest():
+    global static_manifest, _static_manifest_mtime
+    _static_manifest_mtime = await asyncio.to_thread(_static_sources_mtime)
+    static_manifest = await asyncio.to_thread(build_static_manifest)
+
+
+async def get_static_asset(path: str):
+    """Manifest entry for `path` (None if there is none); rebuilds a stale manifest with STATIC_ASSETS_RELOAD."""
+    global static_manifest, _static_manifest_mtime
+    if STATIC_ASSETS_RELOAD:
+        mtime = await asyncio.to_thread(_static_sources_mtime)
+        if mtime != _static_manifest_mtime:
+            _static_manifest_mtime = mtime
+            static_manifest = await asyncio.to_thread(build_static_manifest)
+    return static_manifest.get(path)
+
+
+def static_response(asset: StaticAsset, request: Request) -> Response:
+    """
+    Response for a manifest entry: the precompressed variant matching Accept-Encoding, immutable caching when
+    the URL names the current version, otherwise revalidation via ETag (304 when unchanged).
+    """
+    if request.query_params.get("v") == asset.digest:
+        headers = {"Cache-Control": STATIC_IMMUTABLE_CACHE_CONTROL}
+    else:
+        headers = {"Cache-Control": "no-cache"}
+    encoding = None
+    if asset.variants:
+        headers["Vary"] = "Accept-Encoding"
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+        if encoding not in asset.variants:
+            encoding = None
+    headers["ETag"] = asset.etag(encoding)
+    
+    if etag_matches(request.headers.get("if-none-match"), asset.digest):
+        return Response(status_code=304, headers=headers)
+    
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+        return Response(content=asset.variants[encoding], media_type=asset.content_type, headers=headers)
+    return Response(content=asset.body, media_type=asset.content_type, headers=headers)
 
-# Serve styles.css
-@app.get("/styles.css")
-async def serve_styles():
-    return FileResponse(BASE_DIR / "styles.css", media_type="text/css")
 
 # Serve index.html for root
 @app.get("/")
-async def serve_root():
+async def serve_root(request: Request):
     """Serve index.html for root path"""
-    index_path = BASE_DIR / "index.html"
-    if index_path.exists():
-        return FileResponse(index_path, media_type="text/html")
-    raise HTTPException(status_code=404, detail="index.html not found")
+    asset = await get_static_asset("index.html")
+    if asset is None:
+        raise HTTPException(status_code=404, detail="index.html not found")
+    return static_response(asset, request)
 
-# SPA Fallback: All non-API routes serve index.html
+# Static files and SPA fallback: manifest entries are served from memory, all other non-API routes get index.html
 # This must be the LAST route defined
-# IMPORTANT: FastAPI checks routes in order, but mounts might not work as expected
-# So we explicitly exclude paths that should be handled by mounts/routes above
 @app.get("/{path:path}")
-async def serve_spa(path: str = ""):
-    """Serve index.html for all non-API routes (SPA routing)"""
-    # CRITICAL: Exclude paths that should be handled by mounts/routes above
-    # FastAPI should handle these first, but we add explicit checks as safety
-    # Check these BEFORE any other logic to prevent serving HTML for JS files
-    if path.startswith("src/"):
-        # This should be handled by the /src mount, but if we reach here,
-        # it means the mount didn't work. Return 404 to prevent serving HTML.
-        print(f"[SPA] ERROR: /{path} reached SPA fallback but should be handled by /src mount!")
-        raise HTTPException(status_code=404, detail="Static file not found")
-    
-    if path == "styles.css":
-        # This should be handled by the /styles.css route above
-        print(f"[SPA] ERROR: /{path} reached SPA fallback but should be handled by /styles.css route!")
-        raise HTTPException(status_code=404, detail="Static file not found")
-    
+async def serve_spa(request: Request, path: str = ""):
+    """Serve static files from the manifest and index.html for all other non-API routes (SPA routing)"""
     # If it's an API route that wasn't matched, return 404
     if path.startswith("api/"):
-        print(f"[SPA] API route not found: /{path}")
+        logger.warning("[SPA] API route not found: /%s", path)
         raise HTTPException(status_code=404, detail=f"API endpoint not found: /{path}")
     
-    # Check if it's a static file request in root directory (not in src/)
-    file_path = BASE_DIR / path
-    if file_path.exists() and file_path.is_file() and not path.startswith("src/"):
-        # Determine content type
-        suffix = file_path.suffix.lower()
-        content_types = {
-            '.js': 'application/javascript',
-            '.css': 'text/css',
-            '.html': 'text/html',
-            '.json': 'application/json',
-            '.png': 'image/png',
-            '.jpg': 'image/jpeg',
-            '.jpeg': 'image/jpeg',
-            '.gif': 'image/gif',
-            '.svg': 'image/svg+xml',
-            '.ico': 'image/x-icon',
-            '.woff': 'font/woff',
-            '.woff2': 'font/woff2',
-            '.ttf': 'font/ttf',
-        }
-        return FileResponse(file_path, media_type=content_types.get(suffix, 'application/octet-stream'))
+    asset = await get_static_asset(path)
+    if asset is not None:
+        return static_response(asset, request)
     
-    # For all other routes, serve index.html (SPA routing)
-    index_path = BASE_DIR / "index.html"
-    if index_path.exists():
-        return FileResponse(index_path, media_type="text/html")
+    # Missing files under src/ (or any path with a file extension) must not get HTML - a module script would fail to parse it
+    if path.startswith("src/") or Path(path).suffix.lower() in STATIC_CONTENT_TYPES:
+        raise HTTPException(status_code=404, detail="Static file not found")
     
-    raise HTTPException(status_code=404, detail="Not found")
+    # For all other routes, serve index.html (SPA routing)
+    asset = await get_static_asset("index.html")
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    return static_response(asset, request)
+
+
+@app.on_event("startup")
+async def log_startup_time():
+    # Registered last, so the time includes the other startup handlers (static manifest, background tasks)
+    global startup_seconds
+    startup_seconds = time.perf_counter() - MODULE_IMPORT_STARTED
+    logger.info("[Startup] Ready in %.2fs, resident memory %.0f MB (yfinance loaded: %s)",
+                startup_seconds, resident_memory_bytes() / 1e6, "yfinance" in _lazy_modules)
 
 
 if __name__ == "__main__":
@@ -4609,6 +7435,7 @@ if __name__ == "__main__":
     print("   - GET /api/market-news (Google News RSS)")
     print("   - GET /api/crypto-overview (Major cryptocurrencies)")
     print("   - GET /api/analyst/{symbol}")
+    print("   - GET /api/analyst?symbols=AAPL,MSFT,... (batch)")
     print("   - GET /api/sentiment/{symbol}")
     print("   - GET /api/earnings/{symbol}")
     print("   - GET /api/dax-heatmap (40 DAX stocks)")
@@ -4616,9 +7443,13 @@ if __name__ == "__main__":
     print("   - GET /api/nikkei225-heatmap (100 Nikkei 225 stocks)")
     print("   - GET /api/nasdaq100-heatmap (100 Nasdaq 100 stocks)")
     print("   - GET /api/hangseng-heatmap (85 Hang Seng stocks)")
+    print("   - GET /api/heatmap-stream/{index} (SSE live heatmap deltas)")
+    print("   - GET /api/quote-stream?symbols=AAPL,MSFT,... (SSE live quotes)")
     print("   - GET /api/market-cap?symbols=AAPL,MSFT,...")
     print("   - GET /api/heatmap-quotes?symbols=AAPL,MSFT,...")
     print("   - GET /api/search?q=apple (stock symbol search)")
+    print("   - GET /api/ai-summary/{symbol}/stream (SSE)")
+    print("   - POST /api/ai-market-summary/stream (SSE)")
     print("[SPA] URL Routing enabled:")
     print("   - /                    -> Market Overview")
     print("   - /stock/{symbol}      -> Stock Analysis")
@@ -466,6 +466,8 @@ const pythonApiPaths = [
 	'/api/nikkei225-heatmap',
 	'/api/nasdaq100-heatmap',
 	'/api/hangseng-heatmap',
+	'/api/heatmap-stream',
+	'/api/quote-stream',
 	'/api/market-cap',
 	'/api/market-news',
 	'/api/crypto-overview',
@@ -483,9 +485,19 @@ async function proxyToPython(req, res) {
 				'Content-Type': 'application/json',
 				'X-Forwarded-For': req.ip || req.connection.remoteAddress,
 				'X-Real-IP': req.ip || req.connection.remoteAddress,
+				// Let the backend pick a precompressed gzip/br variant for the client
+				'Accept-Encoding': req.get('Accept-Encoding') || 'identity',
 			},
+			// Keep compressed bodies as-is instead of decoding them here
+			compress: false,
 		};
 
+		// Conditional requests: the backend answers 304 when the cached payload is unchanged
+		const ifNoneMatch = req.get('If-None-Match');
+		if (ifNoneMatch) {
+			fetchOptions.headers['If-None-Match'] = ifNoneMatch;
+		}
+
 		// Include body for POST/PUT requests
 		if (req.method !== 'GET' && req.method !== 'HEAD' && req.body) {
 			fetchOptions.body = JSON.stringify(req.body);
@@ -512,12 +524,58 @@ async function proxyToPython(req, res) {
 			res.set('X-RateLimit-Type', rateLimitType);
 		}
 		
+		// Forward backend timing breakdown (cache / upstream / app) and upstream call accounting
+		['Server-Timing', 'X-Upstream-Calls', 'X-Upstream-Budget'].forEach(name => {
+			const value = response.headers.get(name);
+			if (value) {
+				res.set(name, value);
+			}
+		});
+
 		// Forward session remaining header
 		const sessionRemaining = response.headers.get('X-Session-Remaining');
 		if (sessionRemaining !== null) {
 			res.set('X-Session-Remaining', sessionRemaining);
 		}
 
+		// Server-Sent Events (AI summary streams): pipe through without buffering
+		if (contentType && contentType.startsWith('text/event-stream')) {
+			res.set('Cache-Control', 'no-cache');
+			res.set('X-Accel-Buffering', 'no');
+			res.flushHeaders();
+			response.body.pipe(res);
+			req.on('close', () => response.body.destroy());
+			return;
+		}
+
+		// Forward validators so browsers can revalidate cached API responses
+		const etag = response.headers.get('ETag');
+		if (etag) {
+			res.set('ETag', etag);
+		}
+		const cacheControl = response.headers.get('Cache-Control');
+		if (cacheControl) {
+			res.set('Cache-Control', cacheControl);
+		}
+		if (response.status === 304) {
+			res.end();
+			return;
+		}
+
+		// Compressed and ETag-tagged responses are forwarded byte-for-byte so encoding and validator stay in sync
+		const contentEncoding = response.headers.get('content-encoding');
+		if (contentEncoding || etag) {
+			if (contentEncoding) {
+				res.set('Content-Encoding', contentEncoding);
+			}
+			const vary = response.headers.get('Vary');
+			if (vary) {
+				res.set('Vary', vary);
+			}
+			res.send(await response.buffer());
+			return;
+		}
+
 		// Get response data
 		const data = await response.text();
 
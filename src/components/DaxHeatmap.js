@@ -1,4 +1,5 @@
 import { API_BASE_URL } from '../config.js';
+import { startLiveHeatmap, stopLiveHeatmap } from '../utils/heatmapStream.js';
 
 export class DaxHeatmap extends HTMLElement {
 	constructor() {
@@ -179,12 +180,17 @@ export class DaxHeatmap extends HTMLElement {
 
 			this.data = stockData;
 			this.renderHeatmap();
+			startLiveHeatmap(this, 'dax');
 		} catch (error) {
 			console.error('Error loading DAX heatmap data:', error);
 			container.innerHTML = `<div class="error">Error loading DAX heatmap data: ${error.message}</div>`;
 		}
 	}
 
+	disconnectedCallback() {
+		stopLiveHeatmap(this);
+	}
+
 	renderHeatmap() {
 		const container = this.shadowRoot.getElementById('heatmap-container');
 		container.innerHTML = '';
@@ -1,4 +1,5 @@
 import { API_BASE_URL } from '../config.js';
+import { startLiveHeatmap, stopLiveHeatmap } from '../utils/heatmapStream.js';
 
 export class HangSengHeatmap extends HTMLElement {
 	constructor() {
@@ -182,12 +183,17 @@ export class HangSengHeatmap extends HTMLElement {
 
 			this.data = stockData;
 			this.renderHeatmap();
+			startLiveHeatmap(this, 'hangseng');
 		} catch (error) {
 			console.error('Error loading Hang Seng heatmap data:', error);
 			container.innerHTML = `<div class="error">Error loading Hang Seng heatmap data: ${error.message}</div>`;
 		}
 	}
 
+	disconnectedCallback() {
+		stopLiveHeatmap(this);
+	}
+
 	renderHeatmap() {
 		const container = this.shadowRoot.getElementById('heatmap-container');
 		container.innerHTML = '';
@@ -1,4 +1,5 @@
 import { API_BASE_URL } from '../config.js';
+import { startLiveHeatmap, stopLiveHeatmap } from '../utils/heatmapStream.js';
 
 export class Nasdaq100Heatmap extends HTMLElement {
 	constructor() {
@@ -182,12 +183,17 @@ export class Nasdaq100Heatmap extends HTMLElement {
 
 			this.data = stockData;
 			this.renderHeatmap();
+			startLiveHeatmap(this, 'nasdaq100');
 		} catch (error) {
 			console.error('Error loading Nasdaq 100 heatmap data:', error);
 			container.innerHTML = `<div class="error">Error loading Nasdaq 100 heatmap data: ${error.message}</div>`;
 		}
 	}
 
+	disconnectedCallback() {
+		stopLiveHeatmap(this);
+	}
+
 	renderHeatmap() {
 		const container = this.shadowRoot.getElementById('heatmap-container');
 		container.innerHTML = '';
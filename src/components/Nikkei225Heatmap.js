@@ -1,4 +1,5 @@
 import { API_BASE_URL } from '../config.js';
+import { startLiveHeatmap, stopLiveHeatmap } from '../utils/heatmapStream.js';
 
 export class Nikkei225Heatmap extends HTMLElement {
 	constructor() {
@@ -182,12 +183,17 @@ export class Nikkei225Heatmap extends HTMLElement {
 
 			this.data = stockData;
 			this.renderHeatmap();
+			startLiveHeatmap(this, 'nikkei225');
 		} catch (error) {
 			console.error('Error loading Nikkei 225 heatmap data:', error);
 			container.innerHTML = `<div class="error">Error loading Nikkei 225 heatmap data: ${error.message}</div>`;
 		}
 	}
 
+	disconnectedCallback() {
+		stopLiveHeatmap(this);
+	}
+
 	renderHeatmap() {
 		const container = this.shadowRoot.getElementById('heatmap-container');
 		container.innerHTML = '';
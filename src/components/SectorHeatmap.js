@@ -1,4 +1,5 @@
 import { API_BASE_URL } from '../config.js';
+import { startLiveHeatmap, stopLiveHeatmap } from '../utils/heatmapStream.js';
 
 export class SectorHeatmap extends HTMLElement {
 	constructor() {
@@ -236,12 +237,17 @@ export class SectorHeatmap extends HTMLElement {
 
 			this.data = stockData;
 			this.renderHeatmap();
+			startLiveHeatmap(this, 'sp500');
 		} catch (error) {
 			console.error('Error loading S&P 500 heatmap data:', error);
 			container.innerHTML = `<div class="error">Error loading heatmap data: ${error.message}</div>`;
 		}
 	}
 
+	disconnectedCallback() {
+		stopLiveHeatmap(this);
+	}
+
 	renderHeatmap() {
 		const container = this.shadowRoot.getElementById('heatmap-container');
 		container.innerHTML = '';
@@ -3467,16 +3467,30 @@ export class StockChart extends HTMLElement {
 
 		// Generate AI summary using Gemini API (direct call, same as SWOT analysis)
 		try {
-			// Call backend API for AI summary - API key is read from .env on server
-			const response = await fetch(`/api/ai-summary/${this.symbol}`);
+			// Stream the AI summary from the backend (SSE) - text is rendered as Gemini generates it
+			const response = await fetch(`/api/ai-summary/${this.symbol}/stream`);
 
 			if (!response.ok) {
 				const errorData = await response.json().catch(() => ({}));
 				throw new Error(errorData.detail || `API error: ${response.status}`);
 			}
 
-			const data = await response.json();
-			const summary = data.summary;
+			const { readEventStream } = await import('../utils/eventStream.js');
+			let summary = '';
+			await readEventStream(response, (event, data) => {
+				if (event === 'chunk') {
+					summary += data.text;
+					this.displayAISummary(summary, false);
+				} else if (event === 'done') {
+					summary = data.summary;
+				} else if (event === 'error') {
+					throw new Error(data?.detail || 'Stream error');
+				}
+			});
+
+			if (!summary) {
+				throw new Error('No summary generated');
+			}
 
 			// Cache the summary
 			setCachedData(this.symbol, 'ai-summary', summary);
@@ -4281,7 +4281,7 @@ export class MarketOverview extends HTMLElement {
 						console.log('[Search] Using cached results for:', query);
 						this.renderSearchResults(cachedData.results, dropdown);
 						// Still load scores asynchronously for fresh data
-						this.loadDataScores(cachedData.results.map(r => r.symbol));
+						this.loadDataScores(cachedData.results);
 					}
 					return;
 				}
@@ -4357,7 +4357,7 @@ export class MarketOverview extends HTMLElement {
 			if (this.currentSearchQuery === query) {
 				this.renderSearchResults(results, dropdown);
 				// Load data scores asynchronously (non-blocking)
-				this.loadDataScores(results.map(r => r.symbol));
+				this.loadDataScores(results);
 			}
 
 		} catch (error) {
@@ -4533,7 +4533,7 @@ export class MarketOverview extends HTMLElement {
 				<span class="autocomplete-name">${item.name}</span>
 				<span class="autocomplete-type">${item.type}</span>
 				<div class="autocomplete-score" id="score-${item.symbol.replace('.', '-')}">
-					<div class="loading-dots"><span></span><span></span><span></span></div>
+					${item.dataScore ? this.renderDataScore(item.dataScore.score, item.dataScore.maxScore) : '<div class="loading-dots"><span></span><span></span><span></span></div>'}
 				</div>
 			</div>
 		`).join('');
@@ -4555,8 +4555,16 @@ export class MarketOverview extends HTMLElement {
 		});
 	}
 
-	async loadDataScores(symbols) {
-		if (!symbols || symbols.length === 0) return;
+	async loadDataScores(results) {
+		if (!results || results.length === 0) return;
+
+		// Search results from the backend index already carry their data score
+		const scores = {};
+		results.forEach(r => {
+			if (r.dataScore) scores[r.symbol] = r.dataScore;
+		});
+		const symbols = results.filter(r => !r.dataScore).map(r => r.symbol);
+		if (symbols.length === 0) return;
 
 		try {
 			// Use a shorter timeout for score loading (non-critical)
@@ -4571,7 +4579,7 @@ export class MarketOverview extends HTMLElement {
 			if (!response.ok) return;
 
 			const data = await response.json();
-			const scores = data.scores || {};
+			Object.assign(scores, data.scores || {});
 
 			// Update the score displays
 			for (const symbol of symbols) {
@@ -6170,8 +6178,8 @@ export class MarketOverview extends HTMLElement {
 			// Collect all market data (includes current time range)
 			const marketData = this.collectMarketData();
 
-			// Call backend API for AI market summary - API key is read from .env on server
-			const response = await fetch('/api/ai-market-summary', {
+			// Stream the AI market summary from the backend (SSE) - text is rendered as Gemini generates it
+			const response = await fetch('/api/ai-market-summary/stream', {
 				method: 'POST',
 				headers: { 'Content-Type': 'application/json' },
 				body: JSON.stringify({ marketData })
@@ -6182,8 +6190,22 @@ export class MarketOverview extends HTMLElement {
 				throw new Error(errorData.detail || `API error: ${response.status}`);
 			}
 
-			const data = await response.json();
-			const summary = data.summary;
+			const { readEventStream } = await import('../utils/eventStream.js');
+			let summary = '';
+			await readEventStream(response, (event, data) => {
+				if (event === 'chunk') {
+					summary += data.text;
+					this.displayMarketSummary(summary, false);
+				} else if (event === 'done') {
+					summary = data.summary;
+				} else if (event === 'error') {
+					throw new Error(data?.detail || 'Stream error');
+				}
+			});
+
+			if (!summary) {
+				throw new Error('No summary generated');
+			}
 
 			// Cache the summary with time range in key
 			setCachedData('market', cacheKey, summary);
@@ -1488,7 +1488,7 @@ export class StockAnalysis extends HTMLElement {
 					<span class="autocomplete-name">${item.name}</span>
 					<span class="autocomplete-type">${item.type}</span>
 					<div class="autocomplete-score" id="score-${item.symbol.replace('.', '-')}">
-						<div class="loading-dots"><span></span><span></span><span></span></div>
+						${item.dataScore ? this.renderDataScore(item.dataScore.score, item.dataScore.maxScore) : '<div class="loading-dots"><span></span><span></span><span></span></div>'}
 					</div>
 				</div>
 			`).join('');
@@ -1505,7 +1505,7 @@ export class StockAnalysis extends HTMLElement {
 			});
 			
 			// Load data scores asynchronously
-			this.loadDataScores(results.map(r => r.symbol));
+			this.loadDataScores(results);
 			
 		} catch (error) {
 			console.error('[Autocomplete] Error:', error);
@@ -1547,15 +1547,23 @@ export class StockAnalysis extends HTMLElement {
 		return `<span class="score-label" style="color: ${labelColor};">${label}</span>${dot}`;
 	}
 	
-	async loadDataScores(symbols) {
-		if (!symbols || symbols.length === 0) return;
+	async loadDataScores(results) {
+		if (!results || results.length === 0) return;
+		
+		// Search results from the backend index already carry their data score
+		const scores = {};
+		results.forEach(r => {
+			if (r.dataScore) scores[r.symbol] = r.dataScore;
+		});
+		const symbols = results.filter(r => !r.dataScore).map(r => r.symbol);
+		if (symbols.length === 0) return;
 		
 		try {
 			const response = await fetch(`${API_BASE_URL}/api/check-data?symbols=${symbols.join(',')}`);
 			if (!response.ok) return;
 			
 			const data = await response.json();
-			const scores = data.scores || {};
+			Object.assign(scores, data.scores || {});
 			
 			// Update the score displays
 			for (const symbol of symbols) {
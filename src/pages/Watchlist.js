@@ -1,4 +1,5 @@
 import { API_BASE_URL } from '../config.js';
+import { subscribeQuotes } from '../utils/quoteStream.js';
 
 export class Watchlist extends HTMLElement {
 	constructor() {
@@ -549,6 +550,8 @@ export class Watchlist extends HTMLElement {
 		
 		console.log('[Watchlist] Rendering watchlist with', this.watchlist.length, 'stocks');
 		
+		this.stopLiveQuotes();
+		
 		if (this.watchlist.length === 0) {
 			content.innerHTML = `
 				<div class="empty-state">
@@ -586,6 +589,9 @@ export class Watchlist extends HTMLElement {
 		
 		tbody.innerHTML = rows.join('');
 		
+		// Keep prices current via the backend quote hub
+		this.startLiveQuotes();
+		
 		// Setup delete button listeners
 		tbody.querySelectorAll('.delete-btn').forEach(btn => {
 			btn.addEventListener('click', (e) => {
@@ -671,12 +677,12 @@ export class Watchlist extends HTMLElement {
 			const changeSign = change >= 0 ? '+' : '';
 			
 			return `
-				<tr>
+				<tr data-symbol="${symbol}">
 					<td class="symbol-cell" data-symbol="${symbol}">${symbol}</td>
 					<td>${name}</td>
 					<td class="price-cell">$${price.toFixed(2)}</td>
-					<td class="change-cell ${changeClass}">${changeSign}${change.toFixed(2)}</td>
-					<td class="change-cell ${changeClass}">${changeSign}${changePercent.toFixed(2)}%</td>
+					<td class="change-cell ${changeClass}" data-field="change">${changeSign}${change.toFixed(2)}</td>
+					<td class="change-cell ${changeClass}" data-field="change-percent">${changeSign}${changePercent.toFixed(2)}%</td>
 					<td>${marketCap ? this.formatMarketCap(marketCap) : 'N/A'}</td>
 					<td>${peRatio ? peRatio.toFixed(2) : 'N/A'}</td>
 					<td>
@@ -697,6 +703,51 @@ export class Watchlist extends HTMLElement {
 		}
 	}
 	
+	startLiveQuotes() {
+		this.stopLiveQuotes();
+		if (this.watchlist.length === 0) return;
+		this.quoteSource = subscribeQuotes(this.watchlist.slice(0, 50), quotes => this.applyLiveQuotes(quotes));
+	}
+	
+	stopLiveQuotes() {
+		if (this.quoteSource) {
+			this.quoteSource.close();
+			this.quoteSource = null;
+		}
+	}
+	
+	applyLiveQuotes(quotes) {
+		const tbody = this.shadowRoot.getElementById('watchlist-tbody');
+		if (!tbody) return;
+		
+		quotes.forEach(quote => {
+			const row = tbody.querySelector(`tr[data-symbol="${quote.symbol}"]`);
+			if (!row || !quote.regularMarketPrice) return;
+			
+			const change = quote.regularMarketChange || 0;
+			const changePercent = quote.regularMarketChangePercent || 0;
+			const changeClass = change >= 0 ? 'positive' : 'negative';
+			const changeSign = change >= 0 ? '+' : '';
+			
+			const priceCell = row.querySelector('.price-cell');
+			const changeCell = row.querySelector('[data-field="change"]');
+			const changePercentCell = row.querySelector('[data-field="change-percent"]');
+			if (priceCell) priceCell.textContent = `$${quote.regularMarketPrice.toFixed(2)}`;
+			if (changeCell) {
+				changeCell.textContent = `${changeSign}${change.toFixed(2)}`;
+				changeCell.className = `change-cell ${changeClass}`;
+			}
+			if (changePercentCell) {
+				changePercentCell.textContent = `${changeSign}${changePercent.toFixed(2)}%`;
+				changePercentCell.className = `change-cell ${changeClass}`;
+			}
+		});
+	}
+	
+	disconnectedCallback() {
+		this.stopLiveQuotes();
+	}
+	
 	formatMarketCap(cap) {
 		if (cap >= 1e12) return `$${(cap / 1e12).toFixed(2)}T`;
 		if (cap >= 1e9) return `$${(cap / 1e9).toFixed(2)}B`;
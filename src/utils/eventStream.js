@@ -0,0 +1,47 @@
+/**
+ * Utility for reading Server-Sent Events from a fetch() response
+ * (EventSource only supports GET, the AI market summary stream is a POST)
+ */
+
+/**
+ * Read an SSE response body and call onEvent(event, data) for every event
+ * @param {Response} response - fetch response with a text/event-stream body
+ * @param {function} onEvent - callback receiving the event name and parsed JSON data
+ */
+export async function readEventStream(response, onEvent) {
+	const reader = response.body.getReader();
+	const decoder = new TextDecoder();
+	let buffer = '';
+
+	while (true) {
+		const { value, done } = await reader.read();
+		if (done) break;
+		buffer += decoder.decode(value, { stream: true });
+
+		// Events are separated by a blank line
+		let separator;
+		while ((separator = buffer.indexOf('\n\n')) !== -1) {
+			const rawEvent = buffer.slice(0, separator);
+			buffer = buffer.slice(separator + 2);
+
+			let event = 'message';
+			let data = '';
+			rawEvent.split('\n').forEach(line => {
+				if (line.startsWith('event:')) {
+					event = line.slice(6).trim();
+				} else if (line.startsWith('data:')) {
+					data += line.slice(5).trim();
+				}
+			});
+
+			let payload = null;
+			try {
+				payload = data ? JSON.parse(data) : null;
+			} catch (error) {
+				console.warn('[EventStream] Could not parse event data:', error);
+				continue;
+			}
+			onEvent(event, payload);
+		}
+	}
+}
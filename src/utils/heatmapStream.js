@@ -0,0 +1,68 @@
+/**
+ * Live heatmap updates from the Python backend (/api/heatmap-stream/{index})
+ * The server sends a full snapshot first and then only the quotes that changed.
+ */
+
+import { API_BASE_URL } from '../config.js';
+
+/**
+ * Subscribe to live quote updates for an index heatmap
+ * @param {string} index - dax, sp500, nikkei225, nasdaq100 or hangseng
+ * @param {function} onQuotes - called with an array of (changed) quote objects
+ * @returns {EventSource} call close() to unsubscribe
+ */
+export function subscribeHeatmap(index, onQuotes) {
+	const source = new EventSource(`${API_BASE_URL}/api/heatmap-stream/${index}`);
+	let version = 0;
+
+	source.addEventListener('snapshot', event => {
+		const data = JSON.parse(event.data);
+		version = data.v;
+		onQuotes(data.quoteResponse?.result || []);
+	});
+
+	source.addEventListener('delta', event => {
+		const data = JSON.parse(event.data);
+		// Ignore anything older than what we already applied
+		if (data.v <= version) return;
+		version = data.v;
+		onQuotes(data.changes || []);
+	});
+
+	return source;
+}
+
+/**
+ * Keep a heatmap component's stocks live: patches price/changePercent of the entries in
+ * component.data (matched by ticker) and re-renders once per update that changed anything
+ * @param {HTMLElement} component - heatmap element with data[] and renderHeatmap()
+ * @param {string} index - heatmap index id passed to subscribeHeatmap
+ */
+export function startLiveHeatmap(component, index) {
+	if (component.liveSource) return;
+	component.liveSource = subscribeHeatmap(index, quotes => {
+		let changed = false;
+		quotes.forEach(quote => {
+			const stock = component.data.find(s => s.ticker === quote.symbol);
+			if (stock && quote.regularMarketPrice > 0) {
+				stock.price = quote.regularMarketPrice;
+				stock.changePercent = quote.regularMarketChangePercent || 0;
+				changed = true;
+			}
+		});
+		if (changed) {
+			component.renderHeatmap();
+		}
+	});
+}
+
+/**
+ * Close the live subscription started by startLiveHeatmap (call from disconnectedCallback)
+ * @param {HTMLElement} component
+ */
+export function stopLiveHeatmap(component) {
+	if (component.liveSource) {
+		component.liveSource.close();
+		component.liveSource = null;
+	}
+}
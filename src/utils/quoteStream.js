@@ -0,0 +1,27 @@
+/**
+ * Live quotes from the Python backend quote hub (/api/quote-stream)
+ * One stream per page covers all of its symbols; the backend refreshes each symbol once for all viewers.
+ */
+
+import { API_BASE_URL } from '../config.js';
+
+/**
+ * Subscribe to live quotes for a set of symbols
+ * @param {string[]} symbols - symbols to watch (max 50)
+ * @param {function} onQuotes - called with an array of quote objects (snapshot first, then changes)
+ * @returns {EventSource} call close() to unsubscribe
+ */
+export function subscribeQuotes(symbols, onQuotes) {
+	const source = new EventSource(`${API_BASE_URL}/api/quote-stream?symbols=${symbols.map(encodeURIComponent).join(',')}`);
+
+	const handle = event => {
+		const data = JSON.parse(event.data);
+		if (data.quotes && data.quotes.length > 0) {
+			onQuotes(data.quotes);
+		}
+	};
+	source.addEventListener('snapshot', handle);
+	source.addEventListener('quotes', handle);
+
+	return source;
+}